@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+合成樂譜庫產生器
+
+依「曲目數 × 樂章數 × 聲部數」在指定目錄產生模擬的樂譜庫：
+    ROOT/作曲家/曲目/檔案.pdf
+
+檔名刻意混亂：分隔符號、大小寫、中英文樂器名稱、聲部編號寫法與
+「final」「v2」之類的尾綴都隨機變化，樂章編號可能在曲名前或後。
+相同的 seed 產生相同的樂譜庫。
+
+使用範例：
+    library = generate_library("/tmp/lib", LibrarySpec(pieces=20, movements=4, parts=16))
+    for folder in library.composer_dirs:
+        ...
+"""
+import os
+import random
+from dataclasses import dataclass, field
+from typing import List
+
+COMPOSERS = [
+    "Beethoven", "Brahms", "Dvořák", "Mahler", "Tchaikovsky", "Sibelius",
+    "馬水龍", "蕭泰然", "Ravel", "Debussy", "Shostakovich", "Bruckner",
+]
+
+PIECE_WORDS = [
+    "Symphony", "Overture", "Suite", "Serenade", "Concerto", "Rhapsody",
+    "交響曲", "序曲", "組曲", "幻想曲", "Variations", "Dances",
+]
+
+# (英文, 中文, 縮寫)
+INSTRUMENTS = [
+    ("Flute", "長笛", "Fl"), ("Oboe", "雙簧管", "Ob"), ("Clarinet", "單簧管", "Cl"),
+    ("Bassoon", "低音管", "Bsn"), ("Horn", "法國號", "Hn"), ("Trumpet", "小號", "Tpt"),
+    ("Trombone", "長號", "Tbn"), ("Tuba", "低音號", "Tba"), ("Timpani", "定音鼓", "Timp"),
+    ("Percussion", "打擊", "Perc"), ("Harp", "豎琴", "Hp"), ("Violin", "小提琴", "Vln"),
+    ("Viola", "中提琴", "Vla"), ("Cello", "大提琴", "Vc"), ("Contrabass", "低音提琴", "Cb"),
+]
+
+SEPARATORS = ["_", " - ", " ", ".", "-"]
+SUFFIXES = ["", "", "", " final", "_v2", " (1)", " FINAL", "-rev"]
+
+# 最小的 PDF 檔頭，讓需要時可被當作 PDF 開啟
+PDF_HEADER = b"%PDF-1.4\n"
+
+
+@dataclass
+class LibrarySpec:
+    """樂譜庫規模"""
+    pieces: int = 10
+    movements: int = 4
+    parts: int = 12
+    seed: int = 0
+    # 中文樂器名稱的比例（其餘為英文或縮寫）
+    zh_ratio: float = 0.3
+
+    @property
+    def file_count(self) -> int:
+        return self.pieces * self.movements * self.parts
+
+
+@dataclass
+class GeneratedLibrary:
+    """產生結果"""
+    root: str
+    # 依序排列的聲部名稱（英文），可作為專案的樂器表
+    instruments: List[str] = field(default_factory=list)
+    composer_dirs: List[str] = field(default_factory=list)
+    piece_dirs: List[str] = field(default_factory=list)
+    file_count: int = 0
+
+
+def part_names(count: int) -> List[str]:
+    """產生 count 個聲部名稱，樂器不足時加上編號（Violin 1、Violin 2...）"""
+    names = []
+    number = 1
+    while len(names) < count:
+        for english, _, _ in INSTRUMENTS:
+            if len(names) >= count:
+                break
+            names.append(english if number == 1 else f"{english} {number}")
+        number += 1
+    return names
+
+
+def _messy_part(rng: random.Random, index: int, spec: LibrarySpec) -> str:
+    english, chinese, short = INSTRUMENTS[index % len(INSTRUMENTS)]
+    desk = index // len(INSTRUMENTS) + 1
+    roll = rng.random()
+    if roll < spec.zh_ratio:
+        name = chinese
+    elif roll < spec.zh_ratio + (1 - spec.zh_ratio) / 3:
+        name = short + "."
+    else:
+        name = rng.choice([english, english.lower(), english.upper()])
+    if desk > 1:
+        name += rng.choice([f" {desk}", f"{desk}", f" {'I' * desk}"])
+    return name
+
+
+def generate_library(root: str, spec: LibrarySpec) -> GeneratedLibrary:
+    """在 root 下產生合成樂譜庫
+
+    Args:
+        root: 目標目錄（會自動建立）
+        spec: 規模
+
+    Returns:
+        產生結果
+    """
+    rng = random.Random(spec.seed)
+    library = GeneratedLibrary(root=root, instruments=part_names(spec.parts))
+    for number in range(spec.pieces):
+        composer = COMPOSERS[number % len(COMPOSERS)]
+        composer_dir = os.path.join(root, composer)
+        if composer_dir not in library.composer_dirs:
+            os.makedirs(composer_dir, exist_ok=True)
+            library.composer_dirs.append(composer_dir)
+        piece = f"{rng.choice(PIECE_WORDS)} No.{number + 1}"
+        sep = rng.choice(SEPARATORS)
+        for movement in range(1, spec.movements + 1):
+            piece_dir = os.path.join(composer_dir, f"{piece} - Mvt {movement}")
+            os.makedirs(piece_dir, exist_ok=True)
+            library.piece_dirs.append(piece_dir)
+            movement_tag = rng.choice([f"Mvt{movement}", f"{movement}.", f"第{movement}樂章"])
+            for index in range(spec.parts):
+                part = _messy_part(rng, index, spec)
+                if rng.random() < 0.5:
+                    stem = sep.join([composer, piece, movement_tag, part])
+                else:
+                    stem = sep.join([f"{index + 1:02d}", part, piece, movement_tag])
+                name = stem + rng.choice(SUFFIXES) + rng.choice([".pdf", ".PDF"])
+                with open(os.path.join(piece_dir, name), "wb") as f:
+                    f.write(PDF_HEADER + f"{composer}/{piece}/{movement}/{index}\n".encode("utf-8"))
+                library.file_count += 1
+    return library
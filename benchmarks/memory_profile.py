@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+記憶體用量量測
+
+以 tracemalloc 量測專案資料結構的記憶體用量。依序產生數種規模的合成
+樂譜庫（見 library_generator），經由 ImportService 匯入、以 ProjectService
+儲存後重新載入，並量測：
+
+- 每個 FileInfo、Group、RenameEntry 與復原對照項目常駐的位元組數
+- 匯入與載入（含展開所有群組）後每個檔案常駐的位元組數
+- 產生計畫與即時預覽期間的記憶體峰值（每個檔案的位元組數）
+
+每項在量測前清除 tracemalloc 的紀錄，只計算量測期間新配置且仍存在的
+記憶體，曲名偵測等有上限的快取會先清除，結果在同一版 Python 上是穩定
+的，tests/test_memory_budget.py 以此檢查 core.models 的記憶體預算。
+
+使用方式：
+    python benchmarks/memory_profile.py
+    python benchmarks/memory_profile.py --scales 2x4x10,10x4x25 --output memory.json
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from library_generator import LibrarySpec, generate_library  # noqa: E402
+
+from core import template_engine  # noqa: E402
+from core.instrument_matcher import auto_assign_group, matcher_for_project  # noqa: E402
+from core.models import Group, Project  # noqa: E402
+from services.file_service import FileService  # noqa: E402
+from services.import_service import ImportService  # noqa: E402
+from services.preview_service import PreviewService  # noqa: E402
+from services.project_service import ProjectService  # noqa: E402
+from services.rename_service import RenameService  # noqa: E402
+from services.undo_service import UndoService  # noqa: E402
+
+DEFAULT_SCALES = "2x4x12,10x4x25,40x4x30"
+
+
+def measure(func: Callable[[], Any]) -> Tuple[Any, int, int]:
+    """執行 func 並量測新配置的記憶體
+
+    Args:
+        func: 要量測的函式
+
+    Returns:
+        (回傳值, 結束時仍存在的位元組數, 執行期間的峰值位元組數)
+    """
+    gc.collect()
+    started = tracemalloc.is_tracing()
+    if not started:
+        tracemalloc.start()
+    # 清除紀錄後只追蹤新的配置；峰值也一併歸零
+    tracemalloc.clear_traces()
+    try:
+        result = func()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not started:
+            tracemalloc.stop()
+    return result, current, peak
+
+
+class _ManualScheduler:
+    """依序執行 after() 排入的回呼"""
+
+    def __init__(self):
+        self.pending: List[Callable[[], None]] = []
+
+    def after(self, delay_ms: int, callback: Callable[[], None]):
+        self.pending.append(callback)
+        return callback
+
+    def after_cancel(self, after_id):
+        if after_id in self.pending:
+            self.pending.remove(after_id)
+
+
+def _run_preview(project: Project, rename_service: RenameService) -> PreviewService:
+    scheduler = _ManualScheduler()
+    preview = PreviewService(scheduler, rename_service, delay_ms=0)
+    preview.attach(project)
+    while scheduler.pending:
+        scheduler.pending.pop(0)()
+        if scheduler.pending and preview._in_flight:
+            # 等待背景執行緒的結果
+            time.sleep(0.001)
+    return preview
+
+
+def profile_library(spec: LibrarySpec, work_dir: str) -> Dict[str, float]:
+    """量測一種規模
+
+    Args:
+        spec: 樂譜庫規模
+        work_dir: 工作目錄
+
+    Returns:
+        量測項目 -> 位元組數
+    """
+    library = generate_library(os.path.join(work_dir, "library"), spec)
+    file_service = FileService()
+    import_service = ImportService(file_service)
+    clear_caches = template_engine._detect_piece_name_cached.cache_clear
+    result: Dict[str, float] = {"files": library.file_count}
+
+    paths = [
+        os.path.join(d, name) for d in library.piece_dirs for name in sorted(os.listdir(d))
+    ]
+    files, retained, _ = measure(lambda: import_service.import_files(paths))
+    result["bytes_per_file_info"] = retained / len(files)
+
+    names = [f"Group {i}" for i in range(len(library.piece_dirs))]
+    groups, retained, _ = measure(lambda: [Group(name=name) for name in names])
+    result["bytes_per_group"] = retained / len(groups)
+    del files, groups
+
+    def import_all():
+        imported = []
+        for folder in library.composer_dirs:
+            imported.extend(import_service.import_folder(folder)[0])
+        clear_caches()
+        return imported
+
+    clear_caches()
+    groups, retained, _ = measure(import_all)
+    result["import_bytes_per_file"] = retained / library.file_count
+
+    project = Project(instruments=list(library.instruments))
+    project.groups = groups
+    matcher = matcher_for_project(project)
+    for group in project.groups:
+        auto_assign_group(group, matcher)
+    project_path = os.path.join(work_dir, "library.llproj")
+    ProjectService().save_project(project, project_path)
+
+    def load_all():
+        loaded = ProjectService().load_project(project_path)
+        for group in loaded.groups:
+            group.files
+        return loaded
+
+    loaded, retained, _ = measure(load_all)
+    result["load_bytes_per_file"] = retained / library.file_count
+
+    plan, retained, peak = measure(lambda: RenameService(file_service).generate_rename_plan(loaded))
+    result["bytes_per_rename_entry"] = retained / len(plan)
+    result["plan_peak_bytes_per_file"] = peak / len(plan)
+
+    preview, _, peak = measure(lambda: _run_preview(loaded, RenameService(file_service)))
+    result["preview_peak_bytes_per_file"] = peak / max(1, len(preview.entries))
+    preview.shutdown()
+
+    undo_dir = os.path.join(work_dir, "undo")
+    undo_service = UndoService(file_service, undo_dir)
+    record = RenameService(file_service).execute_rename(plan, loaded)
+    undo_service.save_undo_record(record)
+    del record
+    loaded_record, retained, _ = measure(undo_service.get_latest_undo_record)
+    result["bytes_per_undo_mapping"] = retained / len(loaded_record.mappings)
+    undo_service.execute_undo(loaded_record)
+    return result
+
+
+def profile_scales(specs: List[LibrarySpec], tmpdir: Optional[str] = None) -> List[Dict[str, float]]:
+    """依序量測多種規模
+
+    先以極小的樂譜庫完整執行一次，讓第一次呼叫才建立的內部快取
+    （例如直譯器的特化資料）不計入第一個規模的結果。
+
+    Args:
+        specs: 規模清單
+        tmpdir: 產生樂譜庫的目錄
+
+    Returns:
+        各規模的量測結果
+    """
+    results = []
+    for spec in [LibrarySpec(pieces=1, movements=2, parts=4)] + list(specs):
+        work_dir = tempfile.mkdtemp(prefix="lingling-mem-", dir=tmpdir)
+        try:
+            results.append(profile_library(spec, work_dir))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results[1:]
+
+
+def parse_scale(text: str) -> LibrarySpec:
+    """解析「曲目x樂章x聲部」格式的規模"""
+    pieces, movements, parts = (int(n) for n in text.lower().split("x"))
+    return LibrarySpec(pieces=pieces, movements=movements, parts=parts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="記憶體用量量測")
+    parser.add_argument("--scales", default=DEFAULT_SCALES,
+                        help="以逗號分隔的「曲目x樂章x聲部」規模")
+    parser.add_argument("--tmpdir", help="產生樂譜庫的目錄，預設為系統暫存目錄")
+    parser.add_argument("--output", help="將結果寫入 JSON 檔")
+    args = parser.parse_args(argv)
+
+    scales = [text.strip() for text in args.scales.split(",") if text.strip()]
+    results = profile_scales([parse_scale(text) for text in scales], args.tmpdir)
+    for text, result in zip(scales, results):
+        result["scale"] = text
+        print(f"{text}: {result['files']} files")
+        for key, value in result.items():
+            if key.endswith("_file") or key.startswith("bytes_per"):
+                print(f"  {key:<30} {value:10.1f} B")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
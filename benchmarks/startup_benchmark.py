@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+啟動效能測試
+
+1. 匯入時間：以 python -X importtime 匯入 main，取累計時間的中位數，
+   超過預算即失敗（不需要顯示器），並列出自身耗時最多的模組。
+2. 第一次繪製：以 --startup-benchmark 參數啟動程式，量測從建立程序到
+   主視窗第一次繪製的時間，超過預算即失敗；沒有顯示器時略過。
+
+使用方式：
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs 10 --import-budget-ms 200 --paint-budget-ms 1200
+
+結束代碼為 0 表示通過，1 表示超過預算。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+MAIN_SCRIPT = os.path.join(SRC_DIR, "main.py")
+
+DEFAULT_IMPORT_BUDGET_MS = 250.0
+DEFAULT_PAINT_BUDGET_MS = 1500.0
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """解析 -X importtime 的輸出
+
+    Args:
+        stderr: 子程序的標準錯誤輸出
+
+    Returns:
+        模組名稱 -> (自身耗時, 累計耗時)，單位為微秒
+    """
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        result[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return result
+
+
+def measure_import(module: str = "main") -> Dict[str, Tuple[int, int]]:
+    """在新的直譯器中匯入模組並回傳各模組的匯入時間"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def measure_first_paint(timeout: float = 60.0) -> Optional[dict]:
+    """啟動程式並量測第一次繪製的時間
+
+    Returns:
+        {"first_paint": 秒, "ready": 秒, "stages": [...]}；沒有顯示器時為 None
+    """
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        return None
+    began = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, MAIN_SCRIPT, "--startup-benchmark"],
+        cwd=SRC_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        line = proc.stdout.readline()
+        received = time.perf_counter()
+        _, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        raise
+    if not line:
+        if "display" in stderr.lower():
+            return None
+        raise RuntimeError(f"程式啟動失敗：\n{stderr}")
+    report = json.loads(line)
+    # 子程序的時間以其 PROCESS_START 為起點，換算成自建立程序起
+    offset = (received - began) - report["now"]
+    stages = {entry["stage"]: entry for entry in report["timings"]}
+    return {
+        "first_paint": stages["first_paint"]["at"] + offset,
+        "ready": report["timings"][-1]["at"] + offset,
+        "stages": report["timings"],
+        "errors": report["errors"],
+    }
+
+
+def _median_ms(values: List[float]) -> float:
+    return statistics.median(values) * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="啟動效能測試")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS)
+    parser.add_argument("--paint-budget-ms", type=float, default=DEFAULT_PAINT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="列出自身耗時最多的模組數")
+    args = parser.parse_args(argv)
+    failed = False
+
+    import_times = []
+    modules: Dict[str, Tuple[int, int]] = {}
+    for _ in range(args.runs):
+        modules = measure_import()
+        import_times.append(modules["main"][1] / 1e6)
+    import_ms = _median_ms(import_times)
+    print(f"import main: {import_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    for name, (self_us, _) in sorted(
+        modules.items(), key=lambda item: item[1][0], reverse=True,
+    )[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+    if import_ms > args.import_budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+
+    paints, readies = [], []
+    for _ in range(args.runs):
+        result = measure_first_paint()
+        if result is None:
+            print("first paint: skipped (no display)")
+            break
+        for error in result["errors"]:
+            print(f"  startup stage failed: {error}")
+        paints.append(result["first_paint"])
+        readies.append(result["ready"])
+    if paints:
+        paint_ms = _median_ms(paints)
+        print(
+            f"first paint: {paint_ms:.1f} ms (budget {args.paint_budget_ms:.0f} ms), "
+            f"ready: {_median_ms(readies):.1f} ms"
+        )
+        for entry in result["stages"]:
+            print(f"  {entry['stage']:<14} {entry['duration'] * 1000:8.1f} ms")
+        if paint_ms > args.paint_budget_ms:
+            print("FAIL: time to first paint over budget")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+效能測試套件
+
+在暫存目錄（或 tmpfs）產生合成樂譜庫，於數種規模下量測：
+匯入資料夾、曲名偵測、產生計畫（無快取 / 有快取）、衝突偵測、自動後綴、
+執行重新命名、復原，以及專案的儲存與載入。
+
+每項取 --repeat 次的中位數，結果寫入 JSON；指定基準檔時逐項比較，
+比基準慢超過 --threshold（且差距超過雜訊下限）即視為退步。
+
+使用方式：
+    python benchmarks/suite.py
+    python benchmarks/suite.py --scales small,medium --output bench.json
+    python benchmarks/suite.py --save-baseline            # 以本次結果更新基準
+    python benchmarks/suite.py --tmpdir /dev/shm          # 排除磁碟的影響
+
+結束代碼為 0 表示沒有退步，1 表示至少一項退步。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from library_generator import LibrarySpec, generate_library  # noqa: E402
+
+from core import template_engine  # noqa: E402
+from core.instrument_matcher import auto_assign_group, matcher_for_project  # noqa: E402
+from core.models import Project  # noqa: E402
+from services.file_service import FileService  # noqa: E402
+from services.import_service import ImportService  # noqa: E402
+from services.project_service import ProjectService  # noqa: E402
+from services.rename_service import RenameService  # noqa: E402
+from services.undo_service import UndoService  # noqa: E402
+
+SCALES: Dict[str, LibrarySpec] = {
+    "small": LibrarySpec(pieces=5, movements=4, parts=12),
+    "medium": LibrarySpec(pieces=25, movements=4, parts=20),
+    "large": LibrarySpec(pieces=80, movements=4, parts=30),
+}
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+# 低於此差距（秒）的變化視為雜訊
+NOISE_FLOOR = 0.002
+
+MASTER_TEMPLATE = "{序號}. {樂器} - {曲名}.pdf"
+# 刻意讓不同樂章的檔名相同，以產生衝突
+CONFLICT_TEMPLATE = "{樂器}.pdf"
+
+
+def _median(samples: List[float]) -> dict:
+    return {"median": statistics.median(samples), "min": min(samples), "runs": len(samples)}
+
+
+def _time(func: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> dict:
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        began = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - began)
+    return _median(samples)
+
+
+def run_scale(name: str, spec: LibrarySpec, work_dir: str, repeat: int) -> Dict[str, dict]:
+    """在一種規模下量測所有項目
+
+    Args:
+        name: 規模名稱
+        spec: 樂譜庫規模
+        work_dir: 工作目錄（產生的檔案會留在其中）
+        repeat: 每項重複次數
+
+    Returns:
+        項目名稱 -> {"median", "min", "runs"}
+    """
+    root = os.path.join(work_dir, name)
+    library = generate_library(root, spec)
+    file_service = FileService()
+    import_service = ImportService(file_service)
+    project_service = ProjectService()
+    results: Dict[str, dict] = {}
+
+    def import_all():
+        groups = []
+        for folder in library.composer_dirs:
+            groups.extend(import_service.import_folder(folder)[0])
+        return groups
+
+    # 匯入時會偵測曲名，其結果有快取，每次量測前清除才能量到實際計算
+    clear_caches = template_engine._detect_piece_name_cached.cache_clear
+    results["import_folder"] = _time(import_all, repeat, setup=clear_caches)
+
+    project = Project(instruments=list(library.instruments), master_template=MASTER_TEMPLATE)
+    project.groups = import_all()
+    matcher = matcher_for_project(project)
+    for group in project.groups:
+        auto_assign_group(group, matcher)
+    filename_lists = [[f.display_name for f in group.files] for group in project.groups]
+
+    def detect_all():
+        for filenames in filename_lists:
+            template_engine.detect_piece_name(filenames)
+
+    results["detect_piece_name"] = _time(detect_all, repeat, setup=clear_caches)
+
+    rename_service = RenameService(file_service)
+    results["generate_rename_plan"] = _time(
+        lambda: rename_service.generate_rename_plan(project), repeat,
+        setup=rename_service.clear_plan_cache,
+    )
+    results["generate_rename_plan_cached"] = _time(
+        lambda: rename_service.generate_rename_plan(project), repeat,
+    )
+
+    project.master_template = CONFLICT_TEMPLATE
+    conflicting_plan = RenameService(file_service).generate_rename_plan(project)
+    project.master_template = MASTER_TEMPLATE
+    results["detect_conflicts"] = _time(
+        lambda: rename_service.detect_conflicts(conflicting_plan), repeat,
+    )
+    results["apply_auto_suffix"] = _time(
+        lambda: rename_service.apply_auto_suffix(conflicting_plan), repeat,
+    )
+
+    undo_service = UndoService(file_service, os.path.join(work_dir, "undo"))
+    plan = rename_service.generate_rename_plan(project)
+    rename_samples, undo_samples = [], []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        record = rename_service.execute_rename(plan, project)
+        rename_samples.append(time.perf_counter() - began)
+        began = time.perf_counter()
+        undo_service.execute_undo(record)
+        undo_samples.append(time.perf_counter() - began)
+    results["execute_rename"] = _median(rename_samples)
+    results["execute_undo"] = _median(undo_samples)
+
+    project_dir = os.path.join(work_dir, f"{name}-projects")
+    os.makedirs(project_dir, exist_ok=True)
+    counter = iter(range(repeat * 2))
+    saved_paths = []
+
+    def save_new():
+        path = os.path.join(project_dir, f"p{next(counter)}.llproj")
+        project_service.save_project(project, path)
+        saved_paths.append(path)
+
+    results["save_project"] = _time(save_new, repeat)
+
+    def load_and_touch():
+        loaded = project_service.load_project(saved_paths[-1])
+        # 分塊格式延遲解碼群組，讀取全部群組才是完整的載入成本
+        for group in loaded.groups:
+            group.files
+    results["load_project"] = _time(load_and_touch, repeat)
+
+    for result in results.values():
+        result["files"] = library.file_count
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """與基準比較
+
+    Args:
+        current: 本次結果
+        baseline: 基準結果
+        threshold: 允許變慢的比例（0.25 表示 25%）
+
+    Returns:
+        退步項目的說明
+    """
+    regressions = []
+    for scale, ops in current["results"].items():
+        for op, result in ops.items():
+            base = baseline.get("results", {}).get(scale, {}).get(op)
+            if base is None:
+                continue
+            now, before = result["median"], base["median"]
+            ratio = now / before if before > 0 else float("inf")
+            marker = ""
+            if now - before > NOISE_FLOOR and ratio > 1 + threshold:
+                marker = "  REGRESSION"
+                regressions.append(f"{scale}/{op}: {before * 1000:.1f} -> {now * 1000:.1f} ms")
+            print(f"  {scale:<7} {op:<28} {before * 1000:9.1f} -> {now * 1000:9.1f} ms"
+                  f"  x{ratio:.2f}{marker}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="效能測試套件")
+    parser.add_argument("--scales", default="small,medium,large",
+                        help=f"以逗號分隔，可用 {', '.join(SCALES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tmpdir", help="產生樂譜庫的目錄（例如 /dev/shm），預設為系統暫存目錄")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save-baseline", action="store_true", help="以本次結果覆寫基準檔")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"未知的規模：{', '.join(unknown)}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    work_dir = tempfile.mkdtemp(prefix="lingling-bench-", dir=args.tmpdir)
+    try:
+        for scale in scales:
+            spec = SCALES[scale]
+            print(f"{scale}: {spec.file_count} files")
+            results = run_scale(scale, spec, work_dir, args.repeat)
+            for op, result in results.items():
+                print(f"  {op:<28} {result['median'] * 1000:9.1f} ms")
+            report["results"][scale] = results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"results: {args.output}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not os.path.isfile(args.baseline):
+        print("no baseline; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"compared with baseline from {baseline['meta']['timestamp']}:")
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print("FAIL: " + "; ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
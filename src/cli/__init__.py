@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+命令列介面
+
+不需要 Tk 即可批次重新命名，供伺服器排程使用。只匯入 core 與 services，
+不會匯入 ui 或 customtkinter。
+
+使用範例（於 src 目錄下執行）：
+    python -m cli concert.llproj --dry-run
+    python -m cli exports/* --instruments Flute,Oboe,Clarinet --jobs 4 --jsonl
+"""
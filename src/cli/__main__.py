@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+命令列進入點
+
+使用方式（於 src 目錄下執行）：
+    python -m cli SOURCE [SOURCE ...] [選項]
+
+SOURCE 為 .llproj 專案檔或資料夾；資料夾會依 --instruments 與模板參數
+建立專案並依檔名自動對應樂器。結束代碼為 0 表示全部成功，1 表示至少
+一個專案失敗。
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+from cli.batch import CONFLICT_FAIL, CONFLICT_SUFFIX, RenameJob, run_jobs
+from core import tracing
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="不開啟視窗，依專案檔或資料夾批次重新命名樂譜檔案",
+    )
+    parser.add_argument("sources", nargs="+", help=".llproj 專案檔或資料夾")
+    parser.add_argument("--dry-run", action="store_true", help="只輸出計畫，不實際重新命名")
+    parser.add_argument(
+        "--on-conflict", choices=(CONFLICT_FAIL, CONFLICT_SUFFIX), default=CONFLICT_FAIL,
+        help="檔名衝突時中止（fail）或自動加上後綴（suffix）",
+    )
+    parser.add_argument("--allow-long-paths", action="store_true", help="允許超過 255 字元的路徑")
+    parser.add_argument("--instruments", default="", help="資料夾來源的樂器表，以逗號分隔")
+    parser.add_argument("--template", help="資料夾來源的大模板")
+    parser.add_argument("--subfolder-template", help="資料夾來源的子資料夾模板（指定即啟用）")
+    parser.add_argument("--cluster", action="store_true", help="沒有子資料夾時依檔名分群")
+    parser.add_argument("--undo-dir", help="復原紀錄目錄（預設為應用程式資料夾）")
+    parser.add_argument("--lang", choices=("zh_TW", "en"), default="zh_TW", help="復原紀錄說明的語言")
+    parser.add_argument("--jobs", type=int, default=1, help="同時處理的專案數（程序數）")
+    parser.add_argument("--jsonl", action="store_true", help="每個事件輸出一行 JSON")
+    parser.add_argument(
+        "--trace", metavar="PATH",
+        help="將效能追蹤寫成 Chrome trace JSON（--jobs 大於 1 時不含子程序）",
+    )
+    return parser
+
+
+def format_event(event: dict) -> Optional[str]:
+    """將事件格式化為一行文字（不需顯示的事件回傳 None）"""
+    kind = event["event"]
+    source = event["source"]
+    if kind == "rename":
+        return f"{source}: {event['original']} -> {event['new']}"
+    if kind == "mismatch":
+        return (f"{source}: 警告：群組「{event['group']}」有 {event['instruments']} 個樂器"
+                f" / {event['files']} 個檔案")
+    if kind == "conflict":
+        return f"{source}: 衝突：{event['target']} <- {', '.join(event['sources'])}"
+    if kind == "error":
+        if event.get("undo_record"):
+            return f"{source}: 錯誤：{event['message']}（復原紀錄：{event['undo_record']}）"
+        return f"{source}: 錯誤：{event['message']}"
+    if kind == "done":
+        action = "試跑" if event["dry_run"] else "完成"
+        return f"{source}: {action}，{event['planned']} 個檔案"
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        tracing.enable()
+    instruments = [name.strip() for name in args.instruments.split(",") if name.strip()]
+    jobs = [
+        RenameJob(
+            source=source,
+            dry_run=args.dry_run,
+            on_conflict=args.on_conflict,
+            allow_long_paths=args.allow_long_paths,
+            instruments=instruments,
+            master_template=args.template,
+            subfolder_template=args.subfolder_template,
+            cluster=args.cluster,
+            undo_dir=args.undo_dir,
+            locale=args.lang,
+        )
+        for source in args.sources
+    ]
+    failed = 0
+    for events in run_jobs(jobs, args.jobs):
+        for event in events:
+            if args.jsonl:
+                line = json.dumps(event, ensure_ascii=False)
+            else:
+                if event["event"] == "rename" and not args.dry_run:
+                    continue
+                line = format_event(event)
+            if line is not None:
+                print(line, flush=True)
+        if events and events[-1]["event"] == "error":
+            failed += 1
+    if args.trace:
+        tracing.export_chrome_trace(args.trace)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+批次重新命名工作
+
+每個工作處理一個專案：讀取 .llproj 專案檔（或由資料夾與模板參數建立
+專案）、產生重新命名計畫、偵測衝突，再實際執行或僅試跑並寫入復原紀錄。
+工作的輸入與結果都是可 pickle 的簡單資料，可交給 ProcessPoolExecutor
+同時處理多個專案。
+
+使用範例：
+    job = RenameJob(source="concert.llproj", dry_run=True)
+    for event in run_job(job):
+        print(event)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from core.constants import PROJECT_EXTENSION
+from core.locale import set_locale, t
+from core.models import Project, RenameEntry, UndoMapping, UndoRecord
+
+# 衝突處理方式
+CONFLICT_FAIL = "fail"
+CONFLICT_SUFFIX = "suffix"
+
+# Windows 路徑長度上限
+MAX_PATH_LENGTH = 255
+
+Event = Dict[str, Any]
+
+
+@dataclass
+class RenameJob:
+    """單一專案的批次重新命名設定"""
+    source: str
+    dry_run: bool = False
+    on_conflict: str = CONFLICT_FAIL
+    allow_long_paths: bool = False
+    # 以下只用於由資料夾建立專案；None 表示沿用專案預設值
+    instruments: List[str] = field(default_factory=list)
+    master_template: Optional[str] = None
+    subfolder_template: Optional[str] = None
+    cluster: bool = False
+    undo_dir: Optional[str] = None
+    locale: str = "zh_TW"
+
+
+class JobError(Exception):
+    """工作無法繼續執行"""
+
+    def __init__(self, message: str, undo_record: Optional[str] = None):
+        """
+        Args:
+            message: 錯誤訊息
+            undo_record: 中途失敗時已移動檔案的復原紀錄路徑
+        """
+        super().__init__(message)
+        self.undo_record = undo_record
+
+
+def is_project_file(path: str) -> bool:
+    """路徑是否為專案檔"""
+    return path.lower().endswith(PROJECT_EXTENSION)
+
+
+def load_job_project(job: RenameJob) -> Project:
+    """讀取專案檔，或由資料夾與模板參數建立專案
+
+    Args:
+        job: 工作設定
+
+    Returns:
+        專案資料
+
+    Raises:
+        JobError: 來源不存在或資料夾中沒有可處理的檔案
+    """
+    if is_project_file(job.source):
+        if not os.path.isfile(job.source):
+            raise JobError(f"找不到專案檔：{job.source}")
+        from services.project_service import ProjectService
+        return ProjectService().load_project(job.source)
+    if not os.path.isdir(job.source):
+        raise JobError(f"找不到資料夾：{job.source}")
+    if not job.instruments:
+        raise JobError("由資料夾建立專案時必須指定樂器表")
+    from core.instrument_matcher import auto_assign_group, matcher_for_project
+    from services.file_service import FileService
+    from services.import_service import ImportService
+    project = Project(instruments=list(job.instruments))
+    if job.master_template is not None:
+        project.master_template = job.master_template
+    if job.subfolder_template is not None:
+        project.use_subfolders = True
+        project.subfolder_template = job.subfolder_template
+    matcher = matcher_for_project(project)
+    groups, ungrouped = ImportService(FileService()).import_folder(
+        job.source, cluster=job.cluster, matcher=matcher,
+    )
+    if not groups:
+        raise JobError(f"資料夾中沒有 PDF 檔案：{job.source}")
+    for group in groups:
+        auto_assign_group(group, matcher)
+    project.groups = groups
+    project.ungrouped_files = ungrouped
+    return project
+
+
+def run_job(job: RenameJob) -> List[Event]:
+    """執行單一工作
+
+    與介面上的「預覽並重新命名」相同：大模板為空、檔案不存在時中止；
+    樂器與檔案數量不符的群組只輸出警告。
+
+    Args:
+        job: 工作設定
+
+    Returns:
+        事件清單；最後一個事件的 event 為 "done" 或 "error"
+    """
+    events: List[Event] = []
+
+    def emit(event: str, **fields):
+        events.append(dict(source=job.source, event=event, **fields))
+
+    set_locale(job.locale)
+    try:
+        _run(job, emit)
+    except JobError as e:
+        if e.undo_record:
+            emit("error", message=str(e), undo_record=e.undo_record)
+        else:
+            emit("error", message=str(e))
+    except (OSError, ValueError) as e:
+        emit("error", message=str(e))
+    return events
+
+
+def _run(job: RenameJob, emit):
+    from services.file_service import FileService
+    from services.rename_service import RenameService
+    from services.undo_service import UndoService
+    project = load_job_project(job)
+    if not project.master_template.strip():
+        raise JobError("大模板為空")
+    for group in project.groups:
+        n_inst, n_files = len(group.selected_instruments), len(group.files)
+        if n_files and n_inst and n_files != n_inst:
+            emit("mismatch", group=group.name or group.id[:8],
+                 instruments=n_inst, files=n_files)
+    missing = [
+        f.original_path for group in project.groups for f in group.files
+        if not os.path.isfile(f.original_path)
+    ]
+    if missing:
+        raise JobError(f"{len(missing)} 個檔案不存在，例如 {missing[0]}")
+    file_service = FileService()
+    rename_service = RenameService(file_service)
+    plan = rename_service.generate_rename_plan(project)
+    conflicts = rename_service.detect_conflicts(plan)
+    for target, sources in conflicts.items():
+        emit("conflict", target=target, sources=sources)
+    if conflicts:
+        if job.on_conflict != CONFLICT_SUFFIX:
+            raise JobError(f"{len(conflicts)} 個檔名衝突")
+        plan = rename_service.apply_auto_suffix(plan)
+    long_paths = [e.new_path for e in plan if len(e.new_path) > MAX_PATH_LENGTH]
+    if long_paths and not job.allow_long_paths:
+        raise JobError(f"{len(long_paths)} 個新路徑超過 {MAX_PATH_LENGTH} 字元")
+    undo_path = None
+    if job.dry_run:
+        for entry in plan:
+            emit("rename", original=entry.original_path, new=entry.new_path)
+    else:
+        undo_service = UndoService(file_service, job.undo_dir)
+        new_directories = sorted({
+            os.path.dirname(e.new_path) for e in plan
+            if not os.path.isdir(os.path.dirname(e.new_path))
+        })
+        try:
+            record = rename_service.execute_rename(plan, project)
+        except OSError as e:
+            # 已移動的檔案仍需可復原
+            record = _partial_undo_record(plan, new_directories)
+            if not record.mappings:
+                raise
+            for mapping in record.mappings:
+                emit("rename", original=mapping.original, new=mapping.renamed)
+            raise JobError(
+                f"重新命名中途失敗（已完成 {len(record.mappings)} / {len(plan)} 個）：{e}",
+                undo_record=undo_service.save_undo_record(record),
+            ) from e
+        undo_path = undo_service.save_undo_record(record)
+        for mapping in record.mappings:
+            emit("rename", original=mapping.original, new=mapping.renamed)
+    emit("done", planned=len(plan), conflicts=len(conflicts),
+         dry_run=job.dry_run, undo_record=undo_path)
+
+
+def _partial_undo_record(plan: List[RenameEntry], new_directories: List[str]) -> UndoRecord:
+    """依檔案系統的現況，為中途失敗的計畫建立已移動檔案的復原紀錄
+
+    Args:
+        plan: 執行中的重新命名計畫
+        new_directories: 執行前尚不存在的目標資料夾
+
+    Returns:
+        復原紀錄；沒有任何檔案被移動時 mappings 為空
+    """
+    mappings = [
+        UndoMapping(original=entry.original_path, renamed=entry.new_path)
+        for entry in plan
+        if os.path.isfile(entry.new_path) and not os.path.exists(entry.original_path)
+    ]
+    return UndoRecord(
+        timestamp=datetime.now().strftime("%Y%m%d_%H%M%S_%f"),
+        description=t("rename.undo_description", count=len(mappings)),
+        mappings=mappings,
+        created_directories=[d for d in new_directories if os.path.isdir(d)],
+    )
+
+
+def run_jobs(jobs: Sequence[RenameJob], workers: int = 1) -> Iterator[List[Event]]:
+    """執行多個工作，依完成順序產生各工作的事件清單
+
+    Args:
+        jobs: 工作清單
+        workers: 同時執行的程序數；1 表示在目前程序中依序執行
+
+    Yields:
+        每個工作的事件清單
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield run_job(job)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                # 子程序異常結束（例如記憶體不足）
+                job = futures[future]
+                yield [dict(source=job.source, event="error", message=str(e))]
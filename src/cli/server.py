@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+本機 JSON-RPC 計畫服務
+
+讓型錄程式與打譜軟體的匯出腳本不必啟動介面或新程序，就能查詢目標檔名。
+只計算，不會重新命名任何檔案。
+
+使用方式（於 src 目錄下執行）：
+    python -m cli.server [--host 127.0.0.1] [--port 8765]
+    python -m cli.server --socket /tmp/lingling.sock
+
+通訊協定為 JSON-RPC 2.0，每行一個請求、每行一個回應（UTF-8）：
+    {"jsonrpc": "2.0", "id": 1, "method": "plan", "params": {"source": "concert.llproj"}}
+單一請求最大 MAX_REQUEST_BYTES，超過時該請求回傳 id 為 null 的錯誤。
+
+方法：
+    plan               產生重新命名計畫與衝突；參數同命令列（source、instruments、
+                       template、subfolder_template、cluster、on_conflict）
+    conflicts          偵測衝突；參數為 entries（[{"original", "new"}, ...]）或同 plan
+    detect_piece_name  由 filenames 偵測曲名，可指定 quorum
+    validate_template  檢查 template 中的變數
+
+專案與資料夾匯入結果以來源的修改時間為鍵保留在記憶體中，來源未變動時
+直接沿用上次載入與對應樂器的結果，並沿用各專案的計畫快取；模板的拆解
+結果由 compile_template 快取。
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from cli.batch import CONFLICT_SUFFIX, JobError, RenameJob, is_project_file, load_job_project
+from core.models import Project, RenameEntry
+from core.template_engine import (
+    detect_piece_name, needs_pdf_metadata, referenced_variables, validate_template,
+)
+from services.file_service import FileService
+from services.rename_service import RenameService
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 記憶體中保留的專案數
+PROJECT_CACHE_SIZE = 16
+
+# 單一請求（一行）的大小上限；數萬筆 entries 的 conflicts 請求仍在範圍內
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# JSON-RPC 錯誤代碼
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class RpcError(Exception):
+    """回傳給用戶端的 JSON-RPC 錯誤"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _source_stamp(job: RenameJob) -> tuple:
+    """來源的修改時間；資料夾包含一層子資料夾（檔案增刪會改變目錄的修改時間）"""
+    st = os.stat(job.source)
+    if is_project_file(job.source):
+        return st.st_mtime_ns, st.st_size
+    stamps = [st.st_mtime_ns]
+    with os.scandir(job.source) as it:
+        for entry in it:
+            if entry.is_dir():
+                stamps.append((entry.name, entry.stat().st_mtime_ns))
+    return tuple(sorted(stamps, key=str))
+
+
+class PlanServer:
+    """JSON-RPC 方法的實作與快取"""
+
+    def __init__(self, cache_size: int = PROJECT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.file_service = FileService()
+        # 來源鍵 -> (修改時間, 專案, 該專案的重新命名服務)，依最近使用排序
+        self._projects: "OrderedDict[tuple, Tuple[tuple, Project, RenameService]]" = OrderedDict()
+        self._methods: Dict[str, Callable[[dict], Any]] = {
+            "plan": self.plan,
+            "conflicts": self.conflicts,
+            "detect_piece_name": self.detect_piece_name,
+            "validate_template": self.validate_template,
+        }
+
+    # ── 請求處理 ──
+
+    def handle(self, request: Any) -> Optional[dict]:
+        """處理一個 JSON-RPC 請求
+
+        Args:
+            request: 已解析的請求物件
+
+        Returns:
+            回應物件；通知（沒有 id 的請求）回傳 None
+        """
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "Invalid Request")
+            method = self._methods.get(request["method"])
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params 必須為物件")
+            try:
+                result = method(params)
+            except (JobError, KeyError, TypeError, ValueError) as e:
+                raise RpcError(INVALID_PARAMS, str(e))
+            except OSError as e:
+                raise RpcError(SERVER_ERROR, str(e))
+        except RpcError as e:
+            response = {"jsonrpc": "2.0", "id": request_id,
+                        "error": {"code": e.code, "message": str(e)}}
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        if isinstance(request, dict) and "id" not in request:
+            return None
+        return response
+
+    def handle_line(self, line: bytes) -> Optional[bytes]:
+        """處理一行請求並回傳一行回應"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return error_line(PARSE_ERROR, "Parse error")
+        response = self.handle(request)
+        if response is None:
+            return None
+        return json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    # ── 方法 ──
+
+    def plan(self, params: dict) -> dict:
+        """產生重新命名計畫"""
+        project, rename_service = self._load(params)
+        plan = rename_service.generate_rename_plan(project)
+        conflicts = rename_service.detect_conflicts(plan)
+        if conflicts and params.get("on_conflict") == CONFLICT_SUFFIX:
+            plan = rename_service.apply_auto_suffix(plan)
+        mismatches = [
+            {"group": group.name or group.id[:8],
+             "instruments": len(group.selected_instruments), "files": len(group.files)}
+            for group in project.groups
+            if group.files and group.selected_instruments
+            and len(group.files) != len(group.selected_instruments)
+        ]
+        return {
+            "entries": [
+                {"original": e.original_path, "new": e.new_path, "group": e.group_id}
+                for e in plan
+            ],
+            "conflicts": conflicts,
+            "mismatches": mismatches,
+        }
+
+    def conflicts(self, params: dict) -> dict:
+        """偵測檔名衝突"""
+        if "entries" in params:
+            plan = [RenameEntry(original_path=e["original"], new_path=e["new"])
+                    for e in params["entries"]]
+            rename_service = RenameService(self.file_service)
+        else:
+            project, rename_service = self._load(params)
+            plan = rename_service.generate_rename_plan(project)
+        return {"conflicts": rename_service.detect_conflicts(plan)}
+
+    def detect_piece_name(self, params: dict) -> dict:
+        """偵測曲名"""
+        filenames = params["filenames"]
+        if not isinstance(filenames, list):
+            raise ValueError("filenames 必須為陣列")
+        quorum = float(params.get("quorum", 1.0))
+        return {"piece_name": detect_piece_name([str(f) for f in filenames], quorum)}
+
+    def validate_template(self, params: dict) -> dict:
+        """檢查模板"""
+        template = params["template"]
+        if not isinstance(template, str):
+            raise ValueError("template 必須為字串")
+        return {
+            "unknown": validate_template(template),
+            "variables": sorted(referenced_variables(template)),
+            "needs_metadata": needs_pdf_metadata(template),
+        }
+
+    # ── 專案快取 ──
+
+    def _load(self, params: dict) -> Tuple[Project, RenameService]:
+        job = RenameJob(
+            source=os.path.abspath(params["source"]),
+            instruments=list(params.get("instruments", [])),
+            master_template=params.get("template"),
+            subfolder_template=params.get("subfolder_template"),
+            cluster=bool(params.get("cluster", False)),
+        )
+        if not os.path.exists(job.source):
+            raise JobError(f"找不到來源：{job.source}")
+        key = (job.source, tuple(job.instruments), job.master_template,
+               job.subfolder_template, job.cluster)
+        stamp = _source_stamp(job)
+        cached = self._projects.get(key)
+        if cached is not None and cached[0] == stamp:
+            self._projects.move_to_end(key)
+            return cached[1], cached[2]
+        project = load_job_project(job)
+        rename_service = RenameService(self.file_service)
+        self._projects[key] = (stamp, project, rename_service)
+        self._projects.move_to_end(key)
+        while len(self._projects) > self.cache_size:
+            self._projects.popitem(last=False)
+        return project, rename_service
+
+
+def error_line(code: int, message: str) -> bytes:
+    """不對應任何請求（id 為 null）的錯誤回應行"""
+    response = {"jsonrpc": "2.0", "id": None, "error": {"code": code, "message": message}}
+    return json.dumps(response).encode("utf-8") + b"\n"
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """讀取一行請求
+
+    Returns:
+        請求行；連線結束時為 b""；超過 reader 的 limit 時丟棄整行並回傳 None
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+    # 丟棄過長的一行，之後的請求仍可照常處理
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b"\n")
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+
+
+async def serve(
+    server: PlanServer,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    on_ready: Optional[Callable[[List[Any]], None]] = None,
+    limit: int = MAX_REQUEST_BYTES,
+):
+    """啟動服務直到被取消
+
+    請求依序交由單一背景執行緒處理，快取不需加鎖，且大型專案的計畫
+    不會阻塞其他連線的收發。
+
+    Args:
+        server: 方法實作
+        host: 監聽位址（僅用於 TCP）
+        port: 監聽埠號；0 表示自動選擇
+        socket_path: UNIX socket 路徑；指定時不使用 TCP
+        on_ready: 開始監聽後以監聽位址清單呼叫
+        limit: 單一請求的位元組上限；超過時丟棄該請求並回傳錯誤
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rpc")
+
+    async def on_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await _read_request(reader)
+                if line is None:
+                    writer.write(error_line(INVALID_REQUEST, "Request too large"))
+                    await writer.drain()
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await loop.run_in_executor(executor, server.handle_line, line)
+                if response is not None:
+                    writer.write(response)
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    if socket_path:
+        listener = await asyncio.start_unix_server(on_client, path=socket_path, limit=limit)
+    else:
+        listener = await asyncio.start_server(on_client, host=host, port=port, limit=limit)
+    try:
+        async with listener:
+            if on_ready:
+                on_ready([sock.getsockname() for sock in listener.sockets])
+            await listener.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m cli.server",
+        description="本機 JSON-RPC 服務：計畫、衝突偵測、曲名偵測與模板檢查",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="監聽位址（預設只接受本機連線）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="改用 UNIX socket（不支援 Windows）")
+    args = parser.parse_args(argv)
+
+    def on_ready(addresses):
+        for address in addresses:
+            print(f"listening on {address}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(serve(PlanServer(), args.host, args.port, args.socket, on_ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
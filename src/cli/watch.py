@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+收件匣監看常駐程式
+
+使用方式（於 src 目錄下執行）：
+    python -m cli.watch CONFIG.json [--jsonl]
+
+設定檔格式：
+    {
+        "state_file": "watch-state.json",
+        "poll_interval": 2,
+        "quiet_period": 10,
+        "workers": 2,
+        "undo_dir": null,
+        "lang": "zh_TW",
+        "folders": [
+            {"inbox": "D:/exports", "library": "//server/library", "template": "orchestra.llproj"}
+        ]
+    }
+
+相對路徑以設定檔所在目錄為準。收到 SIGINT / SIGTERM 時等待處理中的
+批次完成後結束。
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from typing import List, Optional
+from core.locale import set_locale
+from services.watch_service import (
+    DEFAULT_QUIET_PERIOD, DEFAULT_WORKERS, WatchFolder, WatchService,
+)
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def load_config(path: str) -> dict:
+    """讀取設定檔並將相對路徑轉為絕對路徑"""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value: Optional[str]) -> Optional[str]:
+        return os.path.join(base, value) if value else value
+
+    config["state_file"] = resolve(config.get("state_file") or "watch-state.json")
+    config["undo_dir"] = resolve(config.get("undo_dir"))
+    config["folders"] = [
+        WatchFolder(
+            inbox=resolve(folder["inbox"]),
+            library=resolve(folder["library"]),
+            template=resolve(folder.get("template", "")),
+        )
+        for folder in config.get("folders", [])
+    ]
+    return config
+
+
+def format_event(event: dict) -> str:
+    """將事件格式化為一行文字"""
+    if event["event"] == "error":
+        return f"{event['batch']}: 錯誤：{event['message']}"
+    return f"{event['batch']}: 完成，{event['renamed']} 個檔案"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m cli.watch",
+        description="監看收件匣，依模板重新命名新匯出的樂譜並移到檔案庫",
+    )
+    parser.add_argument("config", help="設定檔（JSON）")
+    parser.add_argument("--jsonl", action="store_true", help="每個事件輸出一行 JSON")
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+    if not config["folders"]:
+        print("設定檔中沒有 folders", file=sys.stderr)
+        return 1
+    set_locale(config.get("lang", "zh_TW"))
+
+    def on_event(event: dict):
+        line = json.dumps(event, ensure_ascii=False) if args.jsonl else format_event(event)
+        print(line, flush=True)
+
+    service = WatchService(
+        config["folders"],
+        config["state_file"],
+        quiet_period=config.get("quiet_period", DEFAULT_QUIET_PERIOD),
+        workers=config.get("workers", DEFAULT_WORKERS),
+        undo_dir=config["undo_dir"],
+        on_event=on_event,
+    )
+    for path in service.recover():
+        print(f"已補寫中斷批次的復原紀錄：{path}", file=sys.stderr, flush=True)
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    poll_interval = config.get("poll_interval", DEFAULT_POLL_INTERVAL)
+    try:
+        while not stop.is_set():
+            service.scan()
+            stop.wait(poll_interval)
+    finally:
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,13 +6,18 @@
 """
 import os
 from dataclasses import dataclass
-from typing import List
+from typing import FrozenSet, List, Tuple
 
 APP_NAME = "LingLingSuite"
 APP_DISPLAY_NAME = "泠靈小工具"
 APP_VERSION = "1.0.0"
 APPDATA_DIR = os.path.join(os.environ.get("APPDATA", ""), APP_NAME)
 UNDO_DIR = os.path.join(APPDATA_DIR, "undo")
+AUTOSAVE_DIR = os.path.join(APPDATA_DIR, "autosave")
+WATCHDOG_LOG = os.path.join(APPDATA_DIR, "ui_stalls.log")
+AUTOSAVE_DELAY_MS = 3000
+AUTOSAVE_KEEP = 10
+PREVIEW_DELAY_MS = 250
 PROJECT_EXTENSION = ".llproj"
 DEFAULT_MASTER_TEMPLATE = "{序號}. {樂器} - {曲名}.pdf"
 DEFAULT_MASTER_TEMPLATE_EN = "{Number}. {Instrument} - {PieceName}.pdf"
@@ -35,8 +40,42 @@ TEMPLATE_VARIABLES: List[TemplateVariable] = [
     TemplateVariable("曲名", "PieceName", "群組層級", "從檔名共同部分自動偵測，使用者可覆寫"),
     TemplateVariable("樂章編號", "MovementNum", "群組層級", "使用者輸入"),
     TemplateVariable("樂章名稱", "MovementName", "群組層級", "使用者輸入"),
+    TemplateVariable("頁數", "PageCount", "逐檔不同", "從 PDF 讀取的總頁數"),
+    TemplateVariable("標題", "Title", "逐檔不同", "PDF 文件資訊中的標題"),
+    TemplateVariable("檔案大小", "FileSize", "逐檔不同", "檔案大小，例如 1.2 MB"),
 ]
 
+# 需要讀取 PDF 內容才能取得的變數，僅在模板實際引用時才會讀取
+METADATA_VARIABLE_NAMES: FrozenSet[str] = frozenset(
+    ["頁數", "標題", "檔案大小", "PageCount", "Title", "FileSize"],
+)
+
 VARIABLE_NAMES: List[str] = [v.name for v in TEMPLATE_VARIABLES]
 VARIABLE_NAMES_EN: List[str] = [v.name_en for v in TEMPLATE_VARIABLES]
 ALL_VARIABLE_NAMES: List[str] = VARIABLE_NAMES + VARIABLE_NAMES_EN
+
+# 內建樂器同義詞：樂器表中的名稱若屬於某一組，該組所有名稱都會被用來比對檔名
+DEFAULT_INSTRUMENT_ALIASES: List[Tuple[str, ...]] = [
+    ("Piccolo", "Picc.", "Ottavino", "短笛"),
+    ("Flute", "Fl.", "Flauto", "Flöte", "長笛"),
+    ("Oboe", "Ob.", "Hautbois", "雙簧管"),
+    ("English Horn", "Cor Anglais", "E.H.", "Corno Inglese", "英國管"),
+    ("Clarinet", "Cl.", "Clarinetto", "Klarinette", "單簧管", "豎笛"),
+    ("Bass Clarinet", "B.Cl.", "Clarinetto Basso", "低音單簧管"),
+    ("Bassoon", "Bsn.", "Fg.", "Fagotto", "Fagott", "低音管", "巴松管"),
+    ("Contrabassoon", "Cbsn.", "Contrafagotto", "倍低音管"),
+    ("Horn", "Hn.", "Cor.", "Corno", "French Horn", "法國號"),
+    ("Trumpet", "Tpt.", "Tromba", "Trompete", "小號"),
+    ("Trombone", "Tbn.", "Trb.", "Posaune", "長號"),
+    ("Bass Trombone", "B.Tbn.", "低音長號"),
+    ("Tuba", "Tba.", "低音號"),
+    ("Timpani", "Timp.", "Pauken", "定音鼓"),
+    ("Percussion", "Perc.", "Schlagzeug", "打擊樂"),
+    ("Harp", "Hp.", "Arpa", "Harfe", "豎琴"),
+    ("Piano", "Pno.", "Pianoforte", "Klavier", "鋼琴"),
+    ("Celesta", "Cel.", "鋼片琴"),
+    ("Violin", "Vln.", "Vn.", "Violino", "Violine", "小提琴"),
+    ("Viola", "Vla.", "Va.", "Bratsche", "中提琴"),
+    ("Cello", "Vc.", "Vlc.", "Violoncello", "大提琴"),
+    ("Double Bass", "Cb.", "Db.", "Contrabass", "Contrabbasso", "Kontrabass", "低音提琴", "低音大提琴"),
+]
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+檔名分群
+
+將同一資料夾內混雜多首曲目的檔案依檔名相似度分群，每群代表一首曲目。
+
+流程：
+1. 以 tokenize_filename 拆詞並轉小寫，先以樂器比對器遮蔽樂器名稱、去除開頭的
+   聲部編號，只留下曲名相關的詞彙
+2. 詞彙集合完全相同的檔案直接合併
+3. 以 MinHash 簽章與 LSH 分桶找出候選相似集合，僅對同桶內最近幾個不同群的
+   成員計算 IDF 加權 Jaccard 相似度，達門檻者以併查集合併
+
+整體成本與檔案數量成近線性關係，兩萬個檔案可在數秒內完成。
+
+使用範例：
+    from core.filename_clustering import cluster_filenames
+    clusters = cluster_filenames(names, matcher=matcher)
+"""
+import math
+import os
+import random
+import zlib
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Sequence
+from core.constants import DEFAULT_INSTRUMENT_ALIASES
+from core.instrument_matcher import InstrumentMatcher, normalize_name
+from core.template_engine import tokenize_filename
+
+DEFAULT_THRESHOLD = 0.6
+NUM_PERMUTATIONS = 24
+ROWS_PER_BAND = 2
+BUCKET_WINDOW = 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _default_matcher() -> InstrumentMatcher:
+    """以內建同義詞表的樂器名稱建立比對器（未提供專案比對器時使用）
+
+    每個樂器另外加入 1~4 號聲部，讓 "Violin II"、"Horn 3" 的編號一併被遮蔽。
+    """
+    global _DEFAULT_MATCHER
+    if _DEFAULT_MATCHER is None:
+        names = []
+        for synonyms in DEFAULT_INSTRUMENT_ALIASES:
+            names.append(synonyms[0])
+            names.extend(f"{synonyms[0]} {n}" for n in range(1, 5))
+        _DEFAULT_MATCHER = InstrumentMatcher(names)
+    return _DEFAULT_MATCHER
+
+
+_DEFAULT_MATCHER: Optional[InstrumentMatcher] = None
+
+
+class _UnionFind:
+    """併查集（路徑壓縮 + 依大小合併）"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+
+def filename_tokens(
+    name: str, matcher: Optional[InstrumentMatcher] = None,
+) -> FrozenSet[str]:
+    """取得檔名中用於分群的詞彙集合
+
+    Args:
+        name: 檔名（可含副檔名）
+        matcher: 樂器比對器；提供時會移除樂器名稱部分
+
+    Returns:
+        小寫詞彙集合
+    """
+    text = normalize_name(os.path.splitext(name)[0])
+    if matcher is not None:
+        chars = list(text)
+        for _, start, length in matcher.find_all(name):
+            chars[start:start + length] = " " * length
+        text = "".join(chars)
+    tokens = [tok for tok in tokenize_filename(text) if tok]
+    if len(tokens) > 1 and tokens[0].isdigit():
+        # 開頭的純數字通常是聲部編號（例如 "01_Flute_..."），與曲目無關
+        tokens = tokens[1:]
+    return frozenset(tokens)
+
+
+def _weighted_jaccard(
+    a: FrozenSet[str], b: FrozenSet[str], weights: Dict[str, float],
+) -> float:
+    """以 IDF 加權的 Jaccard 相似度：罕見詞彙（例如作品編號）影響較大"""
+    union = sum(weights[t] for t in a | b)
+    if union == 0:
+        return 1.0
+    return sum(weights[t] for t in a & b) / union
+
+
+def _minhash_signatures(token_sets: Sequence[FrozenSet[str]]) -> List[tuple]:
+    """計算 MinHash 簽章；每個不同詞彙的雜湊向量只計算一次"""
+    vectors: Dict[str, List[int]] = {}
+    empty = tuple([_MERSENNE_PRIME] * NUM_PERMUTATIONS)
+    signatures = []
+    for tokens in token_sets:
+        if not tokens:
+            signatures.append(empty)
+            continue
+        columns = []
+        for tok in tokens:
+            vec = vectors.get(tok)
+            if vec is None:
+                h = zlib.crc32(tok.encode("utf-8"))
+                vec = [(a * h + b) % _MERSENNE_PRIME for a, b in _PERMUTATIONS]
+                vectors[tok] = vec
+            columns.append(vec)
+        signatures.append(tuple(map(min, zip(*columns))))
+    return signatures
+
+
+def _idf_weights(
+    unique_sets: Sequence[FrozenSet[str]],
+    members: Sequence[List[int]],
+    total: int,
+) -> Dict[str, float]:
+    """計算每個詞彙的 IDF 權重（以檔案數計算文件頻率）"""
+    df: Dict[str, int] = defaultdict(int)
+    for tokens, files in zip(unique_sets, members):
+        for tok in tokens:
+            df[tok] += len(files)
+    return {tok: math.log((total + 1) / count) for tok, count in df.items()}
+
+
+def cluster_filenames(
+    names: Sequence[str],
+    matcher: Optional[InstrumentMatcher] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[List[int]]:
+    """依檔名相似度分群
+
+    Args:
+        names: 檔名清單
+        matcher: 樂器比對器，比對前會移除樂器名稱；未提供時使用內建樂器名稱
+        threshold: 詞彙集合的加權 Jaccard 相似度門檻（0~1）
+
+    Returns:
+        各群的索引清單；群內依輸入順序排列，群之間依第一個成員的順序排列
+    """
+    if not names:
+        return []
+    if matcher is None:
+        matcher = _default_matcher()
+    # 詞彙集合相同的檔案先行合併，LSH 只處理不重複的集合
+    set_index: Dict[FrozenSet[str], int] = {}
+    members: List[List[int]] = []
+    for i, name in enumerate(names):
+        tokens = filename_tokens(name, matcher)
+        idx = set_index.get(tokens)
+        if idx is None:
+            idx = set_index[tokens] = len(members)
+            members.append([])
+        members[idx].append(i)
+    unique_sets = list(set_index)
+    weights = _idf_weights(unique_sets, members, len(names))
+    uf = _UnionFind(len(unique_sets))
+    signatures = _minhash_signatures(unique_sets)
+    for band_start in range(0, NUM_PERMUTATIONS, ROWS_PER_BAND):
+        buckets: Dict[tuple, List[int]] = defaultdict(list)
+        for idx, sig in enumerate(signatures):
+            buckets[sig[band_start:band_start + ROWS_PER_BAND]].append(idx)
+        for bucket in buckets.values():
+            # 每個成員只與桶內最近幾個不同群的代表比較，維持線性成本
+            recent: List[int] = []
+            for cur in bucket:
+                for other in recent:
+                    if uf.find(other) == uf.find(cur):
+                        break
+                    similarity = _weighted_jaccard(
+                        unique_sets[other], unique_sets[cur], weights,
+                    )
+                    if similarity >= threshold:
+                        uf.union(other, cur)
+                        break
+                else:
+                    recent.append(cur)
+                    if len(recent) > BUCKET_WINDOW:
+                        recent.pop(0)
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for idx, file_indexes in enumerate(members):
+        clusters[uf.find(idx)].extend(file_indexes)
+    result = [sorted(c) for c in clusters.values()]
+    result.sort(key=lambda c: c[0])
+    return result
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+樂器名稱比對
+
+將樂器表與別名（例如 "Fl."、"Flauto"、"長笛"）編譯為 Aho-Corasick 自動機，
+每個檔名只需線性掃描一次即可找出對應的樂器，並據此自動勾選群組樂器、
+排列檔案順序。
+
+使用範例：
+    from core.instrument_matcher import InstrumentMatcher, auto_assign_group
+    matcher = InstrumentMatcher(["Flute", "Oboe"], {"Flute": ["長笛"]})
+    matcher.match("Brahms Sym 4 - 長笛.pdf")   # -> 0
+    unmatched = auto_assign_group(group, matcher)
+"""
+import os
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from core.constants import DEFAULT_INSTRUMENT_ALIASES
+from core.models import FileInfo, Group, Project
+
+_SEPARATOR_RE = re.compile(r'[\s\-_.,;:()\[\]]+')
+_NUMBERED_RE = re.compile(r'^(.*?)\s*\b(\d{1,2}|[IVX]{1,4})$', re.IGNORECASE)
+_ROMAN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"]
+
+
+def normalize_name(text: str) -> str:
+    """正規化名稱：轉小寫並將分隔符號統一為單一空白
+
+    Args:
+        text: 原始文字
+
+    Returns:
+        正規化後的文字
+    """
+    return _SEPARATOR_RE.sub(" ", text.casefold()).strip()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+def _numeral_variants(numeral: str) -> List[str]:
+    """阿拉伯數字與羅馬數字互轉（1 <-> I）"""
+    upper = numeral.upper()
+    if upper.isdigit():
+        value = int(upper)
+        if 1 <= value <= len(_ROMAN):
+            return [upper, _ROMAN[value - 1]]
+        return [upper]
+    if upper in _ROMAN:
+        return [upper, str(_ROMAN.index(upper) + 1)]
+    return [upper]
+
+
+def _expand_aliases(name: str, user_aliases: Sequence[str]) -> List[str]:
+    """產生單一樂器的所有比對字串
+
+    包含樂器名稱本身、使用者別名、內建同義詞，以及編號聲部的變化
+    （例如 "Violin II" 也會比對 "Vln. 2"、"小提琴 II"）。
+    """
+    patterns = [name, *user_aliases]
+    base, numerals = name, [""]
+    numbered = _NUMBERED_RE.match(name.strip())
+    if numbered and numbered.group(1):
+        base = numbered.group(1)
+        numerals = _numeral_variants(numbered.group(2))
+    base_key = normalize_name(base)
+    for synonyms in DEFAULT_INSTRUMENT_ALIASES:
+        if base_key in (normalize_name(s) for s in synonyms):
+            for synonym in synonyms:
+                for numeral in numerals:
+                    patterns.append(f"{synonym} {numeral}" if numeral else synonym)
+            break
+    else:
+        for numeral in numerals[1:]:
+            patterns.append(f"{base} {numeral}")
+    return patterns
+
+
+class InstrumentMatcher:
+    """以 Aho-Corasick 自動機比對檔名中的樂器名稱"""
+
+    def __init__(
+        self,
+        instruments: Sequence[str],
+        aliases: Optional[Dict[str, List[str]]] = None,
+    ):
+        aliases = aliases or {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 每個狀態的輸出：(樂器索引, 比對字串長度)
+        self._out: List[List[Tuple[int, int]]] = [[]]
+        seen = set()
+        for index, name in enumerate(instruments):
+            for pattern in _expand_aliases(name, aliases.get(name, [])):
+                key = normalize_name(pattern)
+                if key and (key, index) not in seen:
+                    seen.add((key, index))
+                    self._add_pattern(key, index)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, index: int):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((index, len(pattern)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, name: str) -> List[Tuple[int, int, int]]:
+        """找出名稱中所有符合詞界的樂器比對
+
+        Args:
+            name: 檔名（可含副檔名）
+
+        Returns:
+            (樂器索引, 起始位置, 長度) 清單，位置以正規化後的文字計算
+        """
+        text = normalize_name(os.path.splitext(name)[0])
+        matches = []
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index, length in self._out[state]:
+                start = pos - length + 1
+                if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+                    continue
+                if pos + 1 < len(text) and _is_word_char(text[pos]) and _is_word_char(text[pos + 1]):
+                    continue
+                matches.append((index, start, length))
+        return matches
+
+    def match(self, name: str) -> Optional[int]:
+        """找出名稱對應的樂器
+
+        有多個比對時取最長者，長度相同時取最先出現者。
+
+        Args:
+            name: 檔名
+
+        Returns:
+            樂器索引，無法對應時回傳 None
+        """
+        best = None
+        for index, start, length in self.find_all(name):
+            key = (length, -start)
+            if best is None or key > best[0]:
+                best = (key, index)
+        return best[1] if best else None
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(
+    instruments: Tuple[str, ...],
+    aliases: Tuple[Tuple[str, Tuple[str, ...]], ...],
+) -> InstrumentMatcher:
+    return InstrumentMatcher(instruments, {k: list(v) for k, v in aliases})
+
+
+def matcher_for_project(project: Project) -> InstrumentMatcher:
+    """取得專案樂器表與別名的比對器（相同內容會重用已編譯的自動機）
+
+    Args:
+        project: 專案資料
+
+    Returns:
+        InstrumentMatcher
+    """
+    aliases = tuple(sorted(
+        (name, tuple(values))
+        for name, values in project.instrument_aliases.items()
+    ))
+    return _cached_matcher(tuple(project.instruments), aliases)
+
+
+def auto_assign_group(group: Group, matcher: InstrumentMatcher) -> List[FileInfo]:
+    """依檔名自動勾選樂器並排列檔案順序
+
+    可對應的檔案依樂器在樂器表中的順序排列在前，無法對應（或與其他檔案
+    對應到同一樂器）的檔案保留原順序排在最後，方便使用者手動處理。
+    沒有任何檔案可對應時不修改群組，保留使用者手動的勾選與順序。
+
+    Args:
+        group: 要處理的群組（會直接修改 files 與 selected_instruments）
+        matcher: 樂器比對器
+
+    Returns:
+        無法對應的檔案清單
+    """
+    assigned: Dict[int, FileInfo] = {}
+    unmatched: List[FileInfo] = []
+    for file_info in group.files:
+        index = matcher.match(file_info.display_name)
+        if index is None or index in assigned:
+            unmatched.append(file_info)
+        else:
+            assigned[index] = file_info
+    if not assigned:
+        return unmatched
+    order = sorted(assigned)
+    group.selected_instruments = order
+    group.files = [assigned[i] for i in order] + unmatched
+    return unmatched
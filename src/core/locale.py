@@ -25,13 +25,17 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "menu.file.open": "開啟專案...",
         "menu.file.save": "儲存專案",
         "menu.file.save_as": "另存新檔...",
+        "menu.file.recover_autosave": "復原自動儲存...",
         # 選單 - 編輯
         "menu.edit": "編輯",
         "menu.edit.undo": "復原上次操作",
+        "menu.edit.find_duplicates": "檢查重複檔案",
+        "menu.edit.instrument_aliases": "樂器別名...",
         # 選單 - 匯入
         "menu.import": "匯入",
         "menu.import.files": "匯入檔案...",
         "menu.import.folder": "匯入資料夾...",
+        "menu.import.folder_clustered": "匯入資料夾（依檔名分群）...",
         # 選單 - 檢視
         "menu.view": "檢視",
         "menu.view.appearance": "外觀模式",
@@ -39,6 +43,10 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "menu.view.appearance.light": "亮色",
         "menu.view.appearance.system": "跟隨系統",
         "menu.view.language": "語言",
+        "menu.view.preview_panel": "顯示即時預覽",
+        "menu.view.tracing": "記錄效能追蹤",
+        "menu.view.export_trace": "匯出效能追蹤...",
+        "menu.view.metrics": "操作統計...",
         "menu.view.language.zh_TW": "繁體中文",
         "menu.view.language.en": "English",
         # 對話框標題
@@ -76,6 +84,9 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "dialog.delete_group.message": "確定要刪除「{name}」？\n群組內的檔案將移回未分組。",
         "dialog.info.create_group_first": "請先建立群組。",
         "dialog.info.cannot_detect": "無法自動偵測曲名。",
+        "dialog.duplicates": "重複檔案",
+        "dialog.duplicates.none": "沒有內容重複的檔案。",
+        "dialog.duplicates.header": "以下 {count} 組檔案內容完全相同：",
         # 檔案對話框
         "filedialog.select_pdf": "選擇 PDF 檔案",
         "filedialog.pdf_files": "PDF 檔案",
@@ -83,6 +94,9 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "filedialog.open_project": "開啟專案",
         "filedialog.project_files": "泠靈專案檔",
         "filedialog.save_project": "儲存專案",
+        "filedialog.export_trace": "匯出效能追蹤",
+        "filedialog.trace_files": "Chrome 追蹤檔",
+        "filedialog.recover_autosave": "選擇自動儲存版本",
         # 狀態列
         "status.ready": "就緒",
         "status.imported_files": "已匯入 {count} 個檔案",
@@ -91,6 +105,17 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "status.undone": "已復原上次操作",
         "status.opened": "已開啟專案：{path}",
         "status.saved": "已儲存專案：{path}",
+        "status.saving": "正在儲存專案：{path}",
+        "status.trace_exported": "已匯出 {count} 個追蹤事件：{path}",
+        "status.startup_failed": "啟動階段 {stage} 失敗：{error}",
+        "status.group_panel_failed": "無法建立群組面板：{error}",
+        # 操作統計
+        "metrics.title": "操作統計",
+        "metrics.reset": "清除",
+        "metrics.empty": "尚無統計資料",
+        "status.recovered": "已從自動儲存復原：{path}（尚未儲存）",
+        "status.duplicates_found": "發現 {count} 個內容重複的檔案",
+        "status.auto_assigned": "已自動對應 {matched} 個檔案，{unmatched} 個無法對應",
         # 底部面板
         "panel.master_template": "大模板：",
         "panel.insert_variable": "插入變數",
@@ -115,15 +140,26 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "group.mismatch": "勾選 {n_inst} 個樂器 / {n_files} 個檔案（不匹配）",
         "group.match": "{count} 個樂器 = {count} 個檔案",
         "group.loading": "群組面板（載入中...）",
+        "group.load_failed": "群組面板載入失敗",
+        "group.retry": "重試",
         "group.move_to_group": "移至群組...",
+        "group.auto_assign": "自動對應樂器",
+        "group.auto_assign_all": "全部自動對應",
         # 未分組
         "ungrouped.empty": "沒有未分組的檔案。\n使用「匯入」選單加入 PDF 檔案。",
+        "ungrouped.cluster": "依檔名分群",
+        "status.clustered": "已依檔名建立 {groups} 個群組，{files} 個檔案仍未分組",
         # 檔案清單
         "file_list.empty": "尚無檔案",
+        "file_list.duplicate": "（重複）",
         # 樂器表
         "instrument.title": "樂器表",
         "instrument.placeholder": "輸入樂器名稱...",
         "instrument.add": "新增",
+        "alias.title": "樂器別名",
+        "alias.hint": "每行一個樂器：樂器名稱 = 別名1, 別名2",
+        "alias.save": "儲存",
+        "alias.cancel": "取消",
         # 預覽對話框
         "preview.title": "預覽重新命名",
         "preview.conflict_warning": "偵測到 {count} 個檔名衝突！選擇「繼續」將自動加後綴區分。",
@@ -131,6 +167,14 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "preview.cancel": "取消",
         "preview.execute": "執行重新命名",
         "preview.execute_with_suffix": "繼續（自動加後綴）",
+        "preview.filter_conflicts": "只顯示衝突",
+        "preview.filter_all_groups": "所有群組",
+        "preview.search": "搜尋檔名…",
+        "preview.shown_count": "顯示 {shown} / {count} 個檔案",
+        "preview_panel.title": "即時預覽",
+        "preview_panel.conflicts": "{count} 個檔案衝突",
+        "preview_panel.empty": "沒有可預覽的檔案",
+        "preview_panel.error": "預覽失敗：{error}",
         # 重新命名服務
         "rename.undo_description": "重新命名 {count} 個檔案",
     },
@@ -144,13 +188,17 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "menu.file.open": "Open Project...",
         "menu.file.save": "Save Project",
         "menu.file.save_as": "Save As...",
+        "menu.file.recover_autosave": "Recover Autosave...",
         # 選單 - 編輯
         "menu.edit": "Edit",
         "menu.edit.undo": "Undo Last Operation",
+        "menu.edit.find_duplicates": "Find Duplicate Files",
+        "menu.edit.instrument_aliases": "Instrument Aliases...",
         # 選單 - 匯入
         "menu.import": "Import",
         "menu.import.files": "Import Files...",
         "menu.import.folder": "Import Folder...",
+        "menu.import.folder_clustered": "Import Folder (Cluster by Name)...",
         # 選單 - 檢視
         "menu.view": "View",
         "menu.view.appearance": "Appearance",
@@ -158,6 +206,10 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "menu.view.appearance.light": "Light",
         "menu.view.appearance.system": "System",
         "menu.view.language": "Language",
+        "menu.view.preview_panel": "Show Live Preview",
+        "menu.view.tracing": "Record Performance Trace",
+        "menu.view.export_trace": "Export Performance Trace...",
+        "menu.view.metrics": "Operation Metrics...",
         "menu.view.language.zh_TW": "繁體中文",
         "menu.view.language.en": "English",
         # 對話框標題
@@ -195,6 +247,9 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "dialog.delete_group.message": 'Delete "{name}"?\nFiles will be moved back to ungrouped.',
         "dialog.info.create_group_first": "Please create a group first.",
         "dialog.info.cannot_detect": "Cannot auto-detect piece name.",
+        "dialog.duplicates": "Duplicate Files",
+        "dialog.duplicates.none": "No duplicate files found.",
+        "dialog.duplicates.header": "The following {count} set(s) of files have identical content:",
         # 檔案對話框
         "filedialog.select_pdf": "Select PDF Files",
         "filedialog.pdf_files": "PDF Files",
@@ -202,6 +257,9 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "filedialog.open_project": "Open Project",
         "filedialog.project_files": "Ling Ling Project",
         "filedialog.save_project": "Save Project",
+        "filedialog.export_trace": "Export Performance Trace",
+        "filedialog.trace_files": "Chrome Trace",
+        "filedialog.recover_autosave": "Select Autosave Version",
         # 狀態列
         "status.ready": "Ready",
         "status.imported_files": "Imported {count} file(s)",
@@ -210,6 +268,17 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "status.undone": "Undone last operation",
         "status.opened": "Opened project: {path}",
         "status.saved": "Saved project: {path}",
+        "status.saving": "Saving project: {path}",
+        "status.trace_exported": "Exported {count} trace event(s): {path}",
+        "status.startup_failed": "Startup stage {stage} failed: {error}",
+        "status.group_panel_failed": "Could not create the group panel: {error}",
+        # 操作統計
+        "metrics.title": "Operation Metrics",
+        "metrics.reset": "Reset",
+        "metrics.empty": "No metrics recorded yet",
+        "status.recovered": "Recovered from autosave: {path} (not yet saved)",
+        "status.duplicates_found": "Found {count} duplicate file(s)",
+        "status.auto_assigned": "Auto-assigned {matched} file(s), {unmatched} unmatched",
         # 底部面板
         "panel.master_template": "Master Template:",
         "panel.insert_variable": "Insert Variable",
@@ -234,15 +303,26 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "group.mismatch": "{n_inst} instruments / {n_files} files (mismatch)",
         "group.match": "{count} instruments = {count} files",
         "group.loading": "Group Panel (loading...)",
+        "group.load_failed": "The group panel failed to load",
+        "group.retry": "Retry",
         "group.move_to_group": "Move to Group...",
+        "group.auto_assign": "Auto Assign",
+        "group.auto_assign_all": "Auto Assign All",
         # 未分組
         "ungrouped.empty": "No ungrouped files.\nUse the Import menu to add PDF files.",
+        "ungrouped.cluster": "Cluster by Name",
+        "status.clustered": "Created {groups} group(s) by file name, {files} file(s) left ungrouped",
         # 檔案清單
         "file_list.empty": "No files",
+        "file_list.duplicate": " (duplicate)",
         # 樂器表
         "instrument.title": "Instruments",
         "instrument.placeholder": "Enter instrument name...",
         "instrument.add": "Add",
+        "alias.title": "Instrument Aliases",
+        "alias.hint": "One instrument per line: Name = alias1, alias2",
+        "alias.save": "Save",
+        "alias.cancel": "Cancel",
         # 預覽對話框
         "preview.title": "Preview Rename",
         "preview.conflict_warning": "Detected {count} filename conflict(s)! Choosing 'Continue' will add suffixes automatically.",
@@ -250,6 +330,14 @@ _STRINGS: Dict[str, Dict[str, str]] = {
         "preview.cancel": "Cancel",
         "preview.execute": "Execute Rename",
         "preview.execute_with_suffix": "Continue (auto suffix)",
+        "preview.filter_conflicts": "Conflicts only",
+        "preview.filter_all_groups": "All groups",
+        "preview.search": "Search filenames…",
+        "preview.shown_count": "Showing {shown} of {count} file(s)",
+        "preview_panel.title": "Live Preview",
+        "preview_panel.conflicts": "{count} conflicting file(s)",
+        "preview_panel.empty": "No files to preview",
+        "preview_panel.error": "Preview failed: {error}",
         # 重新命名服務
         "rename.undo_description": "Renamed {count} file(s)",
     },
@@ -3,18 +3,39 @@
 資料模型
 
 定義專案、群組、檔案資訊等核心資料結構。
+
+專案可被訂閱：經由 Project 的 add_group / update_group / touch_group /
+update 等方法修改時會發出 ChangeEvent，介面與服務只需處理變動的群組，
+不必每次掃描整個專案。每個群組另有 version 編號，任何欄位被重新指定時
+自動換成新的編號；編號在整個程序中不重複，(群組 ID, version) 可作為快取鍵。
+
+樂器表在執行期另有穩定的樂器 ID。群組的 selected_instruments 仍以位置
+儲存；經由 Project.apply_instrument_change 新增、刪除或移動樂器時，只有
+選取位置受影響的群組會被更新，事件附帶 InstrumentChange 讓介面只修補
+受影響的勾選框。
 """
+import bisect
+import itertools
 import uuid
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from core.constants import DEFAULT_MASTER_TEMPLATE, DEFAULT_SUBFOLDER_TEMPLATE
 
 
+_version_counter = itertools.count(1)
+
+
+def next_version() -> int:
+    """取得新的群組版本編號（整個程序中遞增且不重複）"""
+    return next(_version_counter)
+
+
 @dataclass
 class FileInfo:
     """檔案資訊"""
     original_path: str
     display_name: str
+    duplicate_of: str = ""  # 內容相同的原始檔路徑（僅執行期標記，不儲存）
 
 
 @dataclass
@@ -29,6 +50,14 @@ class Group:
     movement_name: str = ""
     use_small_template: bool = False
     small_template: str = ""
+    # 版本編號（不儲存、不參與比較）；清單欄位原地修改時需經由
+    # Project.touch_group 更新
+    version: int = field(default_factory=next_version, compare=False, repr=False)
+
+    def __setattr__(self, name, value):
+        if name != "version" and "version" in self.__dict__:
+            object.__setattr__(self, "version", next_version())
+        object.__setattr__(self, name, value)
 
 
 @dataclass
@@ -55,6 +84,84 @@ class RenameEntry:
     group_id: Optional[str] = None
 
 
+@dataclass
+class PdfMetadata:
+    """PDF 中繼資料"""
+    file_size: int = 0
+    page_count: Optional[int] = None
+    title: str = ""
+
+
+@dataclass
+class InstrumentChange:
+    """樂器表的單一變動
+
+    kind 為下列其一：
+        "insert"：在 index 插入名為 name 的樂器
+        "remove"：刪除位置 index 的樂器
+        "move"：將位置 index 的樂器移到 new_index
+    instrument_id 由 Project.apply_instrument_change 填入。
+    """
+    kind: str
+    index: int
+    new_index: int = -1
+    name: str = ""
+    instrument_id: str = ""
+
+
+def remap_selection(selected: List[int], change: InstrumentChange) -> List[int]:
+    """依樂器表的變動調整群組選取的樂器位置（保留原本順序）
+
+    Args:
+        selected: 群組的 selected_instruments
+        change: 樂器表的變動
+
+    Returns:
+        調整後的位置清單；刪除的樂器會從清單中移除
+    """
+    i = change.index
+    if change.kind == "insert":
+        return [s + 1 if s >= i else s for s in selected]
+    if change.kind == "remove":
+        return [s - 1 if s > i else s for s in selected if s != i]
+    if change.kind == "move":
+        j = change.new_index
+        result = []
+        for s in selected:
+            if s == i:
+                s = j
+            elif i < s <= j:
+                s -= 1
+            elif j <= s < i:
+                s += 1
+            result.append(s)
+        return result
+    raise ValueError(f"unknown instrument change: {change.kind}")
+
+
+@dataclass
+class ChangeEvent:
+    """專案變更事件
+
+    kind 為下列其一：
+        "group_added" / "group_removed"：group_id 為該群組
+        "group_changed"：group_id 為該群組，fields 為變動的欄位
+        "project_changed"：fields 為變動的專案欄位（如 instruments、ungrouped_files）；
+            經由 apply_instrument_change 修改樂器表時 instrument_change 為該變動
+
+    modifies 為 False 表示自動填入的值（例如偵測到的曲名），預覽等衍生資料
+    需更新，但不算是使用者的修改，不應標記專案為已修改。
+    """
+    kind: str
+    group_id: Optional[str] = None
+    fields: Tuple[str, ...] = ()
+    instrument_change: Optional[InstrumentChange] = None
+    modifies: bool = True
+
+
+ChangeListener = Callable[[ChangeEvent], None]
+
+
 @dataclass
 class Project:
     """專案資料"""
@@ -64,3 +171,247 @@ class Project:
     ungrouped_files: List[FileInfo] = field(default_factory=list)
     use_subfolders: bool = False
     subfolder_template: str = DEFAULT_SUBFOLDER_TEMPLATE
+    instrument_aliases: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._listeners: List[ChangeListener] = []
+        # 專案欄位（不含群組）的修改計數器
+        self.revision = 0
+        # 樂器 ID（與 instruments 逐項對應）；instruments 被整個替換時重新編號
+        self._instrument_ids: List[str] = []
+        self._ids_source: Optional[List[str]] = None
+        self._positions: Optional[Dict[str, int]] = None
+
+    # ── 訂閱 ──
+
+    def subscribe(self, listener: ChangeListener) -> Callable[[], None]:
+        """訂閱變更事件
+
+        Args:
+            listener: 每次變更時以 ChangeEvent 呼叫
+
+        Returns:
+            取消訂閱的函式
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe():
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+        return unsubscribe
+
+    def notify(self, event: ChangeEvent):
+        """發出變更事件"""
+        for listener in list(self._listeners):
+            listener(event)
+
+    # ── 群組 ──
+
+    def add_group(self, group: Group, index: Optional[int] = None):
+        """新增群組
+
+        Args:
+            group: 群組
+            index: 插入位置，None 表示加到最後
+        """
+        if index is None:
+            self.groups.append(group)
+        else:
+            self.groups.insert(index, group)
+        self.notify(ChangeEvent("group_added", group.id))
+
+    def remove_group(self, group: Group):
+        """移除群組（群組內的檔案不會自動移到未分組）"""
+        self.groups.remove(group)
+        self.notify(ChangeEvent("group_removed", group.id))
+
+    def update_group(self, group: Group, **fields) -> bool:
+        """修改群組欄位，只有值確實改變時才發出事件
+
+        Args:
+            group: 群組
+            **fields: 欄位名稱與新值
+
+        Returns:
+            是否有欄位改變
+        """
+        return self._set_group_fields(group, fields, modifies=True)
+
+    def fill_group(self, group: Group, **fields) -> bool:
+        """填入自動產生的群組欄位值，發出 modifies 為 False 的事件
+
+        Args:
+            group: 群組
+            **fields: 欄位名稱與新值
+
+        Returns:
+            是否有欄位改變
+        """
+        return self._set_group_fields(group, fields, modifies=False)
+
+    def _set_group_fields(self, group: Group, fields: dict, modifies: bool) -> bool:
+        changed = tuple(
+            name for name, value in fields.items() if getattr(group, name) != value
+        )
+        for name in changed:
+            setattr(group, name, fields[name])
+        if changed:
+            self.notify(ChangeEvent("group_changed", group.id, changed, modifies=modifies))
+        return bool(changed)
+
+    def touch_group(self, group: Group, *fields: str):
+        """通知群組的清單欄位已被原地修改（例如 files 重新排序）
+
+        Args:
+            group: 群組
+            *fields: 被修改的欄位名稱
+        """
+        group.version = next_version()
+        self.notify(ChangeEvent("group_changed", group.id, fields))
+
+    # ── 專案欄位 ──
+
+    def update(self, **fields) -> bool:
+        """修改專案欄位，只有值確實改變時才發出事件
+
+        Args:
+            **fields: 欄位名稱與新值（不可為 groups）
+
+        Returns:
+            是否有欄位改變
+        """
+        changed = tuple(
+            name for name, value in fields.items() if getattr(self, name) != value
+        )
+        for name in changed:
+            setattr(self, name, fields[name])
+        if changed:
+            self.touch(*changed)
+        return bool(changed)
+
+    def touch(self, *fields: str):
+        """通知專案的清單欄位已被原地修改（例如 ungrouped_files.extend）"""
+        self.revision += 1
+        self.notify(ChangeEvent("project_changed", fields=fields))
+
+    # ── 樂器表 ──
+
+    def instrument_ids(self) -> List[str]:
+        """取得與 instruments 逐項對應的樂器 ID"""
+        if self._ids_source is not self.instruments \
+                or len(self._instrument_ids) != len(self.instruments):
+            self._instrument_ids = [str(uuid.uuid4()) for _ in self.instruments]
+            self._ids_source = self.instruments
+            self._positions = None
+        return self._instrument_ids
+
+    def instrument_position(self, instrument_id: str) -> int:
+        """取得樂器 ID 目前在樂器表中的位置
+
+        Raises:
+            KeyError: 樂器已不在樂器表中
+        """
+        ids = self.instrument_ids()
+        if self._positions is None:
+            self._positions = {iid: i for i, iid in enumerate(ids)}
+        return self._positions[instrument_id]
+
+    def apply_instrument_change(self, change: InstrumentChange) -> InstrumentChange:
+        """新增、刪除或移動一個樂器，並調整受影響群組的選取位置
+
+        只有選取位置實際改變的群組會被更新並發出 group_changed 事件；
+        最後發出附帶 change 的 project_changed("instruments") 事件。
+
+        Args:
+            change: 樂器表的變動
+
+        Returns:
+            同一個 change，instrument_id 已填入
+        """
+        ids = self.instrument_ids()
+        if change.kind == "insert":
+            change.instrument_id = str(uuid.uuid4())
+            self.instruments.insert(change.index, change.name)
+            ids.insert(change.index, change.instrument_id)
+            # 加在最後不影響既有的選取位置
+            affects_groups = change.index < len(self.instruments) - 1
+        elif change.kind == "remove":
+            self.instruments.pop(change.index)
+            change.instrument_id = ids.pop(change.index)
+            affects_groups = True
+        elif change.kind == "move":
+            self.instruments.insert(change.new_index, self.instruments.pop(change.index))
+            change.instrument_id = ids.pop(change.index)
+            ids.insert(change.new_index, change.instrument_id)
+            affects_groups = change.index != change.new_index
+        else:
+            raise ValueError(f"unknown instrument change: {change.kind}")
+        self._positions = None
+        if affects_groups:
+            for group in self.groups:
+                if group.selected_instruments:
+                    self.update_group(group, selected_instruments=remap_selection(
+                        group.selected_instruments, change,
+                    ))
+        self.revision += 1
+        self.notify(ChangeEvent(
+            "project_changed", fields=("instruments",), instrument_change=change,
+        ))
+        return change
+
+    def toggle_instrument(self, group: Group, instrument_id: str, selected: bool):
+        """選取或取消選取群組的一個樂器（保留其他樂器的順序）
+
+        Args:
+            group: 群組
+            instrument_id: 樂器 ID
+            selected: 是否選取
+        """
+        position = self.instrument_position(instrument_id)
+        current = group.selected_instruments
+        if selected and position not in current:
+            updated = list(current)
+            bisect.insort(updated, position)
+        elif not selected and position in current:
+            updated = [i for i in current if i != position]
+        else:
+            return
+        self.update_group(group, selected_instruments=updated)
+
+
+class DirtyTracker:
+    """收集自上次取出後有變動的群組與專案欄位
+
+    供只需處理變動部分的服務使用（例如預覽衝突索引、重新命名計畫快取）。
+
+    使用範例：
+        tracker = DirtyTracker(project)
+        ...
+        groups, fields = tracker.take()
+    """
+
+    def __init__(self, project: Project):
+        self.groups: Set[str] = set()
+        self.fields: Set[str] = set()
+        self._unsubscribe = project.subscribe(self._on_change)
+
+    def _on_change(self, event: ChangeEvent):
+        if event.group_id is not None:
+            self.groups.add(event.group_id)
+        if event.kind == "project_changed":
+            self.fields.update(event.fields)
+
+    def take(self) -> Tuple[Set[str], Set[str]]:
+        """取出並清除變動紀錄
+
+        Returns:
+            (變動的群組 ID 集合, 變動的專案欄位集合) 元組；新增或移除的群組
+            也列在群組 ID 中
+        """
+        groups, fields = self.groups, self.fields
+        self.groups, self.fields = set(), set()
+        return groups, fields
+
+    def close(self):
+        """停止追蹤"""
+        self._unsubscribe()
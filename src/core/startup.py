@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+啟動流程
+
+主視窗外框顯示後，將其餘的初始化工作（群組面板、預覽面板、預先載入服務）
+拆成多個階段，每個階段各自排在事件迴圈閒置時執行，階段之間仍會處理
+重繪與輸入事件。每個階段的耗時記錄在 timings 中，供啟動效能測試使用。
+
+單一階段失敗不會中斷啟動：錯誤記錄在 errors 並以 on_error 回報，之後
+可由 retry() 重新執行該階段（例如讓使用者重試建立群組面板）。
+
+使用範例：
+    pipeline = StartupPipeline(app)
+    pipeline.add("group_panel", build_group_panel)
+    pipeline.add("prewarm", main_window.prewarm)
+    pipeline.start()
+"""
+import time
+from typing import Any, Callable, List, Optional, Tuple
+from core import tracing
+
+# 程序啟動時間（main.py 最先匯入本模組）
+PROCESS_START = time.perf_counter()
+
+
+class StartupPipeline:
+    """依序於閒置時執行的啟動階段"""
+
+    def __init__(
+        self,
+        scheduler: Any,
+        on_finished: Optional[Callable[["StartupPipeline"], None]] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        """
+        Args:
+            scheduler: 提供 after_idle 的 Tk 元件
+            on_finished: 所有階段完成後呼叫
+            on_error: 階段失敗時以 (階段名稱, 例外) 呼叫
+        """
+        self._scheduler = scheduler
+        self._stages: List[Tuple[str, Callable[[], None]]] = []
+        self._next = 0
+        self.on_finished = on_finished
+        self.on_error = on_error
+        # (階段名稱, 自程序啟動起的完成時間, 階段耗時)，單位為秒
+        self.timings: List[Tuple[str, float, float]] = []
+        self.errors: List[Tuple[str, Exception]] = []
+
+    def add(self, name: str, func: Callable[[], None]):
+        """新增一個階段（依加入順序執行）"""
+        self._stages.append((name, func))
+
+    def start(self):
+        """記錄第一次繪製的時間並開始執行階段"""
+        self._scheduler.after_idle(self._first_paint)
+
+    def mark(self, name: str):
+        """記錄一個時間點"""
+        self.timings.append((name, time.perf_counter() - PROCESS_START, 0.0))
+
+    def elapsed(self, name: str) -> Optional[float]:
+        """取得時間點或階段完成的時間（秒，自程序啟動起）"""
+        for stage, at, _ in self.timings:
+            if stage == name:
+                return at
+        return None
+
+    def retry(self, name: str) -> bool:
+        """立即重新執行先前失敗的階段
+
+        Args:
+            name: 階段名稱
+
+        Returns:
+            是否成功；再次失敗時會記錄錯誤並呼叫 on_error
+        """
+        func = dict(self._stages)[name]
+        self.errors = [(stage, e) for stage, e in self.errors if stage != name]
+        return self._run_stage(name, func)
+
+    @property
+    def finished(self) -> bool:
+        """是否所有階段都已執行"""
+        return self._next >= len(self._stages)
+
+    def _first_paint(self):
+        # 外框的重繪在先前排入的閒置工作中完成
+        self.mark("first_paint")
+        self._run_next()
+
+    def _run_next(self):
+        if self.finished:
+            if self.on_finished:
+                self.on_finished(self)
+            return
+        name, func = self._stages[self._next]
+        self._next += 1
+        self._run_stage(name, func)
+        self._scheduler.after_idle(self._run_next)
+
+    def _run_stage(self, name: str, func: Callable[[], None]) -> bool:
+        began = time.perf_counter()
+        try:
+            with tracing.span(f"startup.{name}"):
+                func()
+        except Exception as e:
+            # 單一階段失敗不應讓程式無法啟動；由 on_error 回報，可再 retry()
+            self.errors.append((name, e))
+            if self.on_error:
+                self.on_error(name, e)
+            return False
+        finally:
+            now = time.perf_counter()
+            self.timings.append((name, now - PROCESS_START, now - began))
+        return True
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+廣義後綴自動機
+
+將多個字串建成同一個後綴自動機，並統計每個狀態（即一組子字串）出現在幾個
+不同的字串中，用來在線性時間內找出「至少出現在 k 個字串中」的最長共同子字串。
+
+使用範例：
+    from core.suffix_automaton import GeneralizedSuffixAutomaton
+    sam = GeneralizedSuffixAutomaton(["01_Flute_Brahms", "12_Tuba_Brahms"])
+    sam.common_substrings(2)   # 由長到短產生共同子字串
+"""
+from typing import Dict, Iterator, List, Sequence
+
+
+class GeneralizedSuffixAutomaton:
+    """多字串的後綴自動機"""
+
+    def __init__(self, strings: Sequence[str]):
+        self.strings = list(strings)
+        self._next: List[Dict[str, int]] = [{}]
+        self._link: List[int] = [-1]
+        self._len: List[int] = [0]
+        # 每個狀態第一次出現的位置：(字串索引, 結尾位置)
+        self._end: List[tuple] = [(0, -1)]
+        for index, text in enumerate(self.strings):
+            last = 0
+            for pos, ch in enumerate(text):
+                last = self._extend(last, ch, index, pos)
+        self._count = self._count_strings()
+
+    def _new_state(self, length: int, link: int, end: tuple, nxt=None) -> int:
+        self._next.append(dict(nxt) if nxt else {})
+        self._link.append(link)
+        self._len.append(length)
+        self._end.append(end)
+        return len(self._len) - 1
+
+    def _split(self, p: int, ch: str) -> int:
+        """若 p 經 ch 轉移到的狀態長度不連續，複製出長度剛好的狀態"""
+        q = self._next[p][ch]
+        if self._len[p] + 1 == self._len[q]:
+            return q
+        clone = self._new_state(
+            self._len[p] + 1, self._link[q], self._end[q], self._next[q],
+        )
+        while p != -1 and self._next[p].get(ch) == q:
+            self._next[p][ch] = clone
+            p = self._link[p]
+        self._link[q] = clone
+        return clone
+
+    def _extend(self, last: int, ch: str, index: int, pos: int) -> int:
+        if ch in self._next[last]:
+            # 其他字串已建立過相同的子字串，直接沿用（必要時複製狀態）
+            return self._split(last, ch)
+        cur = self._new_state(self._len[last] + 1, 0, (index, pos))
+        p = last
+        while p != -1 and ch not in self._next[p]:
+            self._next[p][ch] = cur
+            p = self._link[p]
+        if p != -1:
+            self._link[cur] = self._split(p, ch)
+        return cur
+
+    def _count_strings(self) -> List[int]:
+        """統計每個狀態出現在幾個不同字串中
+
+        沿每個字串的前綴狀態往後綴連結走，已被同一字串標記過的狀態即停止，
+        因此每個狀態對每個字串最多計數一次。
+        """
+        count = [0] * len(self._len)
+        marked = [-1] * len(self._len)
+        for index, text in enumerate(self.strings):
+            state = 0
+            for ch in text:
+                state = self._next[state][ch]
+                v = state
+                while v > 0 and marked[v] != index:
+                    marked[v] = index
+                    count[v] += 1
+                    v = self._link[v]
+        return count
+
+    def common_substrings(self, quorum: int) -> Iterator[tuple]:
+        """由長到短產生至少出現在 quorum 個字串中的子字串
+
+        每個狀態只產生其最長的子字串。
+
+        Args:
+            quorum: 最少需出現的字串數
+
+        Yields:
+            (子字串, 字串索引, 起始位置) 元組，位置為該子字串第一次出現處
+        """
+        # 依長度分桶排序，維持線性時間
+        buckets: List[List[int]] = [[] for _ in range(max(self._len) + 1)]
+        for s in range(1, len(self._len)):
+            if self._count[s] >= quorum:
+                buckets[self._len[s]].append(s)
+        for s in (s for bucket in reversed(buckets) for s in bucket):
+            index, end = self._end[s]
+            start = end - self._len[s] + 1
+            yield self.strings[index][start:end + 1], index, start
@@ -4,16 +4,52 @@
 
 提供模板解析、變數替換與曲名偵測功能。
 """
+import math
 import os
 import re
-from typing import Dict, List
-from core.constants import ALL_VARIABLE_NAMES, TEMPLATE_VARIABLES
-from core.models import Group
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from core.constants import (
+    ALL_VARIABLE_NAMES,
+    METADATA_VARIABLE_NAMES,
+    TEMPLATE_VARIABLES,
+)
+from core.models import Group, PdfMetadata
+from core.suffix_automaton import GeneralizedSuffixAutomaton
+
+_TOKEN_SPLIT_RE = re.compile(r'[\s\-_.,;:]+')
+
+
+_VARIABLE_RE = re.compile(r'\{([^{}]+)\}')
+
+
+@lru_cache(maxsize=512)
+def compile_template(template: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """將模板拆解為固定文字與變數名稱（結果會快取）
+
+    Args:
+        template: 模板字串，例如 "{序號}. {樂器}.pdf"
+
+    Returns:
+        (固定文字, 變數名稱) 元組；固定文字比變數名稱多一項，兩者交錯
+        組合即為原模板，例如 ("", ". ", ".pdf") 與 ("序號", "樂器")
+    """
+    literals = []
+    names = []
+    position = 0
+    for match in _VARIABLE_RE.finditer(template):
+        literals.append(template[position:match.start()])
+        names.append(match.group(1))
+        position = match.end()
+    literals.append(template[position:])
+    return tuple(literals), tuple(names)
 
 
 def substitute_template(template: str, variables: Dict[str, str]) -> str:
     """將模板中的 {變數} 替換為對應值
 
+    未提供值的變數保留原樣。
+
     Args:
         template: 模板字串，例如 "{序號}. {樂器}.pdf"
         variables: 變數名稱到值的對應字典
@@ -21,16 +57,23 @@ def substitute_template(template: str, variables: Dict[str, str]) -> str:
     Returns:
         替換後的字串
     """
-    result = template
-    for name, value in variables.items():
-        result = result.replace(f"{{{name}}}", value)
-    return result
+    literals, names = compile_template(template)
+    if not names:
+        return template
+    parts = [literals[0]]
+    for name, literal in zip(names, literals[1:]):
+        value = variables.get(name)
+        parts.append(f"{{{name}}}" if value is None else value)
+        parts.append(literal)
+    return "".join(parts)
 
 
 def build_variables_for_file(
     file_index: int,
     group: Group,
     instruments: List[str],
+    metadata: Optional[PdfMetadata] = None,
+    piece_name: Optional[str] = None,
 ) -> Dict[str, str]:
     """為單一檔案組合所有模板變數（同時產生中英文鍵名）
 
@@ -38,6 +81,8 @@ def build_variables_for_file(
         file_index: 檔案在群組中的索引（從 0 開始）
         group: 所屬群組
         instruments: 完整樂器表
+        metadata: 檔案的 PDF 中繼資料；未提供時不產生 {頁數} 等變數
+        piece_name: {曲名} 的值；未提供時使用 group.piece_name
 
     Returns:
         變數名稱到值的對應字典（包含中英文鍵名）
@@ -55,10 +100,16 @@ def build_variables_for_file(
     values = {
         "序號": sequence_number,
         "樂器": instrument_name,
-        "曲名": group.piece_name,
+        "曲名": group.piece_name if piece_name is None else piece_name,
         "樂章編號": group.movement_number,
         "樂章名稱": group.movement_name,
     }
+    if metadata is not None:
+        values["頁數"] = (
+            str(metadata.page_count) if metadata.page_count is not None else ""
+        )
+        values["標題"] = re.sub(r'[\\/:*?"<>|]', "_", metadata.title)
+        values["檔案大小"] = format_file_size(metadata.file_size)
     en_mapping = {tv.name: tv.name_en for tv in TEMPLATE_VARIABLES}
     for zh_name, val in list(values.items()):
         en_name = en_mapping.get(zh_name)
@@ -67,25 +118,98 @@ def build_variables_for_file(
     return values
 
 
-def detect_piece_name(filenames: List[str]) -> str:
+def format_file_size(size: int) -> str:
+    """將位元組數格式化為易讀的檔案大小
+
+    Args:
+        size: 位元組數
+
+    Returns:
+        例如 "512 B"、"245 KB"、"1.2 MB"
+    """
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{round(size / 1024)} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def referenced_variables(template: str) -> Set[str]:
+    """取得模板中引用的所有變數名稱
+
+    Args:
+        template: 模板字串
+
+    Returns:
+        變數名稱集合
+    """
+    return set(compile_template(template)[1])
+
+
+def needs_pdf_metadata(*templates: str) -> bool:
+    """判斷模板是否引用需要讀取 PDF 內容的變數
+
+    Args:
+        *templates: 一或多個模板字串
+
+    Returns:
+        是否引用 {頁數}、{標題}、{檔案大小} 等變數
+    """
+    return any(
+        referenced_variables(tpl) & METADATA_VARIABLE_NAMES
+        for tpl in templates if tpl
+    )
+
+
+def resolve_piece_name(group: Group) -> str:
+    """取得群組的曲名；未填寫時由檔名偵測（不修改群組）
+
+    開啟專案後未曾檢視的群組也能在計畫與預覽中得到曲名。
+
+    Args:
+        group: 群組
+
+    Returns:
+        曲名，無法偵測時為空字串
+    """
+    if group.piece_name.strip() or not group.files:
+        return group.piece_name
+    return detect_piece_name([f.display_name for f in group.files])
+
+
+def detect_piece_name(filenames: List[str], quorum: float = 1.0) -> str:
     """從檔名清單偵測共同的曲名
 
-    依序嘗試兩種策略：
-    1. 共同前綴法：取所有檔名的 commonprefix，清除尾端分隔符號
-    2. 共同詞彙法：將檔名拆為詞彙，取所有檔案共有的詞彙，按原始順序組合
+    依序嘗試三種策略：
+    1. 共同前綴法：取所有檔名的 commonprefix，清除尾端不完整的詞彙與分隔符號
+    2. 最長共同子字串法：以後綴自動機找出至少 quorum 比例檔名共有的最長
+       子字串，可處理曲名位於不同聲部編號之後的情況
+       （例如 "01_Flute_Brahms Sym 4" 與 "12_Tuba_Brahms Sym 4"）
+    3. 共同詞彙法：將檔名拆為詞彙，取所有檔案共有的詞彙，按原始順序組合
+
+    結果會依檔名清單快取，重複偵測相同檔案不需重新計算。
 
     Args:
         filenames: 檔案名稱清單（不含路徑）
+        quorum: 最長共同子字串法中，子字串至少需出現在多少比例的檔名中（0~1）
 
     Returns:
         偵測到的曲名，若無法偵測則回傳空字串
     """
+    return _detect_piece_name_cached(tuple(filenames), quorum)
+
+
+@lru_cache(maxsize=256)
+def _detect_piece_name_cached(filenames: Tuple[str, ...], quorum: float) -> str:
     if not filenames:
         return ""
     basenames = [os.path.splitext(f)[0] for f in filenames]
     if len(basenames) == 1:
         return basenames[0].strip()
     result = _detect_by_common_prefix(basenames)
+    if result:
+        return result
+    result = _detect_by_common_substring(basenames, quorum)
     if result:
         return result
     return _detect_by_common_tokens(basenames)
@@ -101,6 +225,8 @@ def _detect_by_common_prefix(basenames: List[str]) -> str:
         偵測到的曲名
     """
     prefix = os.path.commonprefix(basenames)
+    if prefix:
+        prefix = _trim_partial_tokens(basenames[0], 0, len(prefix))
     prefix = re.sub(r'[\s\-_.,;:]+$', '', prefix)
     prefix = re.sub(r'[\s\-_.,;:]\d+$', '', prefix)
     result = prefix.strip()
@@ -109,6 +235,74 @@ def _detect_by_common_prefix(basenames: List[str]) -> str:
     return result
 
 
+def _is_separator(ch: str) -> bool:
+    return bool(_TOKEN_SPLIT_RE.fullmatch(ch))
+
+
+def _trim_partial_tokens(source: str, start: int, end: int) -> str:
+    """去除子字串兩端被截斷的詞彙與分隔符號
+
+    Args:
+        source: 子字串所在的完整檔名
+        start: 子字串起始位置
+        end: 子字串結束位置（不含）
+
+    Returns:
+        只含完整詞彙的子字串
+    """
+    text = source[start:end]
+    if start > 0 and not _is_separator(source[start - 1]) and not _is_separator(text[0]):
+        match = _TOKEN_SPLIT_RE.search(text)
+        text = text[match.end():] if match else ""
+    if text and end < len(source) and not _is_separator(source[end]) \
+            and not _is_separator(text[-1]):
+        parts = _TOKEN_SPLIT_RE.split(text)
+        text = text[:len(text) - len(parts[-1])]
+    return re.sub(r'^[\s\-_.,;:]+|[\s\-_.,;:]+$', '', text)
+
+
+def _detect_by_common_substring(basenames: List[str], quorum: float = 1.0) -> str:
+    """使用最長共同子字串法偵測曲名
+
+    以廣義後綴自動機列舉共同子字串（由長到短），去除兩端不完整的詞彙後，
+    取第一個至少兩個字元且不是純數字的結果。
+
+    Args:
+        basenames: 去除副檔名後的檔名清單
+        quorum: 子字串至少需出現在多少比例的檔名中（0~1）
+
+    Returns:
+        偵測到的曲名
+    """
+    required = max(2, math.ceil(len(basenames) * quorum - 1e-9))
+    if len(basenames) < required:
+        return ""
+    sam = GeneralizedSuffixAutomaton(basenames)
+    best = ""
+    for text, index, start in sam.common_substrings(required):
+        if len(text) <= len(best):
+            break
+        candidate = _trim_partial_tokens(
+            basenames[index], start, start + len(text),
+        )
+        if len(candidate) > len(best) and len(candidate) >= 2 \
+                and not candidate.replace(" ", "").isdigit():
+            best = candidate
+    return best
+
+
+def tokenize_filename(name: str) -> List[str]:
+    """將檔名（不含副檔名）依常見分隔符號拆為詞彙
+
+    Args:
+        name: 檔名
+
+    Returns:
+        詞彙清單（可能含空字串）
+    """
+    return _TOKEN_SPLIT_RE.split(name)
+
+
 def _detect_by_common_tokens(basenames: List[str]) -> str:
     """使用共同詞彙法偵測曲名
 
@@ -121,7 +315,7 @@ def _detect_by_common_tokens(basenames: List[str]) -> str:
     Returns:
         偵測到的曲名
     """
-    tokenized = [re.split(r'[\s\-_.,;:]+', name) for name in basenames]
+    tokenized = [tokenize_filename(name) for name in basenames]
     if not tokenized:
         return ""
     token_sets = [set(tokens) for tokens in tokenized]
@@ -144,6 +338,7 @@ def validate_template(template: str) -> List[str]:
     Returns:
         未知變數名稱清單，空清單表示所有變數皆合法
     """
-    found = re.findall(r'\{([^}]+)\}', template)
-    unknown = [name for name in found if name not in ALL_VARIABLE_NAMES]
+    unknown = [
+        name for name in compile_template(template)[1] if name not in ALL_VARIABLE_NAMES
+    ]
     return unknown
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+效能追蹤
+
+以 span() 內容管理器或 @traced 裝飾器標記耗時區段，記錄為 Chrome trace
+的完整事件（"ph": "X"），可用 export_chrome_trace() 匯出後在
+chrome://tracing 或 https://ui.perfetto.dev 開啟。
+
+預設停用：停用時 span() 回傳共用的空物件，@traced 只多一次旗標判斷，
+不會取得時間或配置記憶體。事件最多保留 MAX_EVENTS 個，超過時捨棄最舊的。
+
+使用範例：
+    from core import tracing
+
+    @tracing.traced("rename.plan")
+    def generate_plan(...): ...
+
+    with tracing.span("import.scan", folder=path):
+        ...
+
+    tracing.enable()
+    ...
+    tracing.export_chrome_trace("trace.json")
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+MAX_EVENTS = 200_000
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_enabled = False
+_events: Deque[Dict[str, Any]] = deque(maxlen=MAX_EVENTS)
+_thread_names: Dict[int, str] = {}
+_origin_ns = time.perf_counter_ns()
+
+
+def enable():
+    """開始記錄"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """停止記錄（已記錄的事件保留到 clear()）"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """是否正在記錄"""
+    return _enabled
+
+
+def clear():
+    """清除已記錄的事件"""
+    _events.clear()
+    _thread_names.clear()
+
+
+def events() -> List[Dict[str, Any]]:
+    """已記錄事件的複本"""
+    return list(_events)
+
+
+def _record(name: str, start_ns: int, end_ns: int, args: Optional[Dict[str, Any]]):
+    thread = threading.current_thread()
+    tid = thread.ident or 0
+    if tid not in _thread_names:
+        _thread_names[tid] = thread.name
+    event = {
+        "name": name,
+        "ph": "X",
+        "ts": (start_ns - _origin_ns) / 1000,
+        "dur": (end_ns - start_ns) / 1000,
+        "pid": os.getpid(),
+        "tid": tid,
+    }
+    if args:
+        event["args"] = args
+    _events.append(event)
+
+
+class _Span:
+    """記錄中的區段"""
+
+    __slots__ = ("name", "args", "_start")
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self._start = 0
+
+    def set(self, **args):
+        """補充區段參數（例如結束時才知道的數量）"""
+        self.args.update(args)
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _record(self.name, self._start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    """停用時使用的空區段"""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **args):
+    """標記一個耗時區段
+
+    Args:
+        name: 區段名稱，建議以「模組.動作」命名
+        **args: 顯示於追蹤檢視器的參數（需可轉為 JSON）
+
+    Returns:
+        內容管理器；停用時為不做任何事的共用物件
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """將函式的每次呼叫記錄為區段
+
+    Args:
+        name: 區段名稱，預設為函式的 __qualname__
+
+    Returns:
+        裝飾器
+    """
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            error = None
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                error = {"error": type(e).__name__}
+                raise
+            finally:
+                _record(span_name, start, time.perf_counter_ns(), error)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def export_chrome_trace(path: str) -> int:
+    """將已記錄的事件寫成 Chrome trace JSON
+
+    Args:
+        path: 輸出路徑
+
+    Returns:
+        寫入的事件數
+    """
+    recorded = list(_events)
+    pid = os.getpid()
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in list(_thread_names.items())
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"traceEvents": metadata + recorded, "displayTimeUnit": "ms"},
+            f, ensure_ascii=False,
+        )
+    return len(recorded)
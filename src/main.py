@@ -2,22 +2,43 @@
 """
 泠靈小工具 - 應用程式進入點
 
-啟動 customtkinter 主視窗。
+啟動 customtkinter 主視窗。啟動時只匯入並建立主視窗外框，群組面板、
+預覽面板與各項服務由 StartupPipeline 在第一次繪製後的閒置時間載入。
+
+加上 --startup-benchmark 參數時，啟動完成後輸出各階段的耗時（JSON）並結束，
+供 benchmarks/startup_benchmark.py 使用。
+
+加上 --trace PATH 參數時，自啟動起記錄效能追蹤，結束時寫成 Chrome trace
+JSON（也可由「檢視」選單隨時開始記錄與匯出）。
+
+執行期間以 UiWatchdog 監看事件迴圈，介面停頓的處理函式堆疊與每次
+工作階段的停頓統計寫入 APPDATA 下的 ui_stalls.log。
 """
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(__file__))
 
+from core.startup import PROCESS_START, StartupPipeline
+import json
+import time
 import tkinter as tk
+import traceback
+from typing import Optional
 import customtkinter as ctk
+from core import tracing
+from core.constants import WATCHDOG_LOG
 from core.locale import t, set_locale
 from core.models import Project
 from services.preferences_service import PreferencesService
 from ui.main_window import MainWindow
+from ui.watchdog import UiWatchdog
 
 
 def main():
+    trace_path = _option_value("--trace")
+    if trace_path:
+        tracing.enable()
     prefs = PreferencesService()
     prefs.load()
     language = prefs.get("language") or "zh_TW"
@@ -31,8 +52,15 @@ def main():
     app.minsize(900, 600)
     project = Project()
     main_window = MainWindow(app, project, prefs)
-    # 延遲載入群組面板，確保主視窗已建立
-    app.after(100, lambda: _init_group_panel(app, main_window))
+    # 先顯示外框，其餘元件與服務於閒置時依序載入
+    pipeline = StartupPipeline(app)
+    pipeline.on_error = lambda name, error: _on_stage_error(main_window, pipeline, name, error)
+    pipeline.add("group_panel", lambda: _init_group_panel(app, main_window))
+    pipeline.add("saved_panels", main_window.show_saved_panels)
+    pipeline.add("prewarm", main_window.prewarm)
+    if "--startup-benchmark" in sys.argv:
+        pipeline.on_finished = lambda p: _report_startup(app, main_window, p)
+    pipeline.start()
     # 鍵盤快捷鍵
     app.bind("<Control-n>", lambda e: main_window._new_project())
     app.bind("<Control-o>", lambda e: main_window._open_project())
@@ -42,7 +70,19 @@ def main():
     app.bind_all("<KP_Decimal>", _on_kp_decimal)
     # 關閉視窗確認
     app.protocol("WM_DELETE_WINDOW", lambda: _on_close(app, main_window))
+    watchdog = UiWatchdog(app, log_path=WATCHDOG_LOG)
+    watchdog.start()
     app.mainloop()
+    watchdog.stop()
+    if trace_path:
+        tracing.export_chrome_trace(trace_path)
+
+
+def _option_value(name: str) -> Optional[str]:
+    """取得命令列參數 name 之後的值"""
+    if name in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(name) + 1]
+    return None
 
 
 def _on_kp_decimal(event):
@@ -65,6 +105,31 @@ def _init_group_panel(app: ctk.CTk, main_window: MainWindow):
     main_window.set_group_panel(group_panel)
 
 
+def _on_stage_error(
+    main_window: MainWindow, pipeline: StartupPipeline, name: str, error: Exception,
+):
+    """回報啟動階段的錯誤；群組面板失敗時提供重試"""
+    traceback.print_exception(type(error), error, error.__traceback__)
+    if name == "group_panel":
+        main_window.show_group_panel_error(error, lambda: pipeline.retry(name))
+    else:
+        main_window._set_status("status.startup_failed", stage=name, error=error)
+
+
+def _report_startup(app: ctk.CTk, main_window: MainWindow, pipeline: StartupPipeline):
+    """輸出啟動各階段的耗時並結束程式"""
+    print(json.dumps({
+        "timings": [
+            {"stage": name, "at": at, "duration": duration}
+            for name, at, duration in pipeline.timings
+        ],
+        "errors": [f"{name}: {error}" for name, error in pipeline.errors],
+        "now": time.perf_counter() - PROCESS_START,
+    }), flush=True)
+    main_window.shutdown()
+    app.destroy()
+
+
 def _on_close(app: ctk.CTk, main_window: MainWindow):
     if main_window._modified:
         from tkinter import messagebox
@@ -73,8 +138,10 @@ def _on_close(app: ctk.CTk, main_window: MainWindow):
         )
         if result is None:
             return
-        if result:
-            main_window._save_project()
+        if result and not main_window.save_before_close():
+            # 取消另存新檔或儲存失敗時不關閉，避免遺失編輯
+            return
+    main_window.shutdown()
     app.destroy()
 
 
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+自動儲存服務
+
+編輯時呼叫 schedule()，停止編輯一段時間後才於主執行緒建立專案快照，
+再交由單一背景執行緒序列化並寫入 %APPDATA%/LingLingSuite/autosave/，
+每個專案保留最近幾個版本。手動儲存也經由同一個背景執行緒，儲存大型專案
+時不會卡住介面。
+
+所有寫入都使用「暫存檔 + fsync + os.replace」，寫入途中當機不會損毀原檔。
+
+使用範例：
+    from services.autosave_service import AutosaveService
+    autosave = AutosaveService(root_window)
+    autosave.schedule(project, project_path)          # 每次編輯後呼叫
+    autosave.save(project, path, on_done=callback)    # 手動儲存
+    autosave.drain()                                  # 等待儲存完成（關閉前）
+"""
+import copy
+import hashlib
+import os
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+from core.constants import (
+    AUTOSAVE_DELAY_MS,
+    AUTOSAVE_DIR,
+    AUTOSAVE_KEEP,
+    PROJECT_EXTENSION,
+)
+from core.models import Project
+from services.project_format import LazyGroupList, snapshot_groups
+from services.project_service import ProjectService
+
+_UNTITLED = "untitled"
+_RESULT_POLL_MS = 100
+
+
+def snapshot_project(project: Project, share_chunks: bool = False) -> Project:
+    """建立專案快照，供背景執行緒序列化
+
+    只複製清單與字典等容器，FileInfo 與尚未解析的群組區塊不會被讀取或複製，
+    因此即使是大型專案也能在主執行緒上快速完成。
+
+    Args:
+        project: 專案資料
+        share_chunks: 見 project_format.snapshot_groups
+
+    Returns:
+        專案快照
+    """
+    snapshot = copy.copy(project)
+    # 快照不會被編輯，也不應通知原專案的訂閱者
+    snapshot._listeners = []
+    snapshot.instruments = list(project.instruments)
+    snapshot.instrument_aliases = {
+        name: list(aliases) for name, aliases in project.instrument_aliases.items()
+    }
+    snapshot.ungrouped_files = list(project.ungrouped_files)
+    snapshot.groups = snapshot_groups(project.groups, share_chunks)
+    return snapshot
+
+
+class AutosaveService:
+    """防抖自動儲存與背景儲存服務"""
+
+    def __init__(
+        self,
+        scheduler: Any,
+        project_service: Optional[ProjectService] = None,
+        directory: str = AUTOSAVE_DIR,
+        keep: int = AUTOSAVE_KEEP,
+        delay_ms: int = AUTOSAVE_DELAY_MS,
+    ):
+        """
+        Args:
+            scheduler: 提供 after / after_cancel 的 Tk 元件，回呼一律在主執行緒執行
+            project_service: 專案服務
+            directory: 自動儲存目錄
+            keep: 每個專案保留的自動儲存版本數
+            delay_ms: 停止編輯多久後才自動儲存（毫秒）
+        """
+        self._scheduler = scheduler
+        self._project_service = project_service or ProjectService()
+        self.directory = directory
+        self.keep = keep
+        self.delay_ms = delay_ms
+        self._after_id = None
+        self._poll_id = None
+        self._target: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._pending_autosave: Optional[tuple] = None
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._in_flight = 0
+        self._worker = threading.Thread(
+            target=self._run, name="autosave", daemon=True,
+        )
+        self._worker.start()
+
+    # ── 主執行緒 API ──
+
+    def schedule(self, project: Project, project_path: Optional[str]):
+        """記錄一次編輯；停止編輯 delay_ms 後自動儲存
+
+        Args:
+            project: 目前的專案（快照會在實際儲存前才建立）
+            project_path: 專案檔路徑，未儲存過的專案為 None
+        """
+        self._target = (project, project_path)
+        if self._after_id is not None:
+            self._scheduler.after_cancel(self._after_id)
+        self._after_id = self._scheduler.after(self.delay_ms, self.flush)
+
+    def cancel(self):
+        """取消尚未執行的自動儲存（例如開啟其他專案時）"""
+        if self._after_id is not None:
+            self._scheduler.after_cancel(self._after_id)
+            self._after_id = None
+        self._target = None
+
+    def flush(self):
+        """立即建立快照並排入自動儲存"""
+        self._after_id = None
+        if self._target is None:
+            return
+        project, project_path = self._target
+        self._target = None
+        job = (snapshot_project(project), self._autosave_path(project_path))
+        with self._lock:
+            replaced = self._pending_autosave is not None
+            self._pending_autosave = job
+        if not replaced:
+            # 背景執行緒尚未處理上一份自動儲存時，只替換內容不重複排隊
+            self._submit(("autosave", None, None))
+
+    def save(
+        self,
+        project: Project,
+        file_path: str,
+        on_done: Optional[Callable[[Optional[Exception]], None]] = None,
+    ):
+        """在背景儲存專案
+
+        Args:
+            project: 專案資料（呼叫時立即建立快照）
+            file_path: 儲存路徑
+            on_done: 完成後於主執行緒呼叫，參數為錯誤（成功時為 None）
+        """
+        if not isinstance(project.groups, LazyGroupList):
+            # 讓快照與專案共用增量儲存狀態，之後的儲存才能只附加日誌
+            project.groups = LazyGroupList(project.groups)
+        snapshot = snapshot_project(project, share_chunks=True)
+        self._submit(("save", (snapshot, file_path), on_done))
+
+    def drain(self):
+        """等待所有排隊中的儲存完成，並於呼叫端執行緒執行其 on_done
+
+        關閉視窗前呼叫，儲存失敗時 on_done 仍會收到錯誤。
+        """
+        if self._poll_id is not None:
+            self._scheduler.after_cancel(self._poll_id)
+            self._poll_id = None
+        while self._in_flight:
+            on_done, error = self._results.get()
+            self._in_flight -= 1
+            if on_done:
+                on_done(error)
+
+    def shutdown(self, wait: bool = True):
+        """停止背景執行緒
+
+        Args:
+            wait: 是否等待排隊中的儲存完成；等待時也會執行其 on_done
+        """
+        self.cancel()
+        if wait:
+            self.drain()
+        self._jobs.put(None)
+        if wait:
+            self._worker.join()
+
+    def list_versions(self, project_path: Optional[str] = None) -> List[str]:
+        """列出自動儲存版本（新到舊）
+
+        Args:
+            project_path: 只列出此專案的版本；None 則列出全部
+
+        Returns:
+            檔案路徑清單
+        """
+        stem = self._stem(project_path) if project_path is not None else None
+        return self._versions(stem)
+
+    def _submit(self, job: tuple):
+        self._in_flight += 1
+        self._jobs.put(job)
+        if self._poll_id is None:
+            self._poll_id = self._scheduler.after(_RESULT_POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                on_done, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._in_flight -= 1
+            if on_done:
+                on_done(error)
+        if self._in_flight:
+            self._poll_id = self._scheduler.after(_RESULT_POLL_MS, self._poll)
+
+    # ── 檔案命名 ──
+
+    def _stem(self, project_path: Optional[str]) -> str:
+        if not project_path:
+            return _UNTITLED
+        name = os.path.splitext(os.path.basename(project_path))[0]
+        # 不同資料夾中的同名專案各自保留版本
+        key = os.path.normcase(os.path.abspath(project_path))
+        return f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+
+    def _autosave_path(self, project_path: Optional[str]) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        name = f"{self._stem(project_path)}.{timestamp}{PROJECT_EXTENSION}"
+        return os.path.join(self.directory, name)
+
+    def _versions(self, stem: Optional[str]) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        # 檔名格式：<專案名稱>-<路徑雜湊>.<時間戳記>.llproj
+        entries = [
+            n.rsplit(".", 2) for n in os.listdir(self.directory)
+            if n.endswith(PROJECT_EXTENSION) and n.count(".") >= 2
+        ]
+        entries = [e for e in entries if stem is None or e[0] == stem]
+        entries.sort(key=lambda e: e[1], reverse=True)
+        return [os.path.join(self.directory, ".".join(e)) for e in entries]
+
+    def _prune(self, autosave_path: str):
+        stem = os.path.basename(autosave_path).rsplit(".", 2)[0]
+        for old in self._versions(stem)[self.keep:]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    # ── 背景執行緒 ──
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            kind, payload, on_done = job
+            if kind == "autosave":
+                with self._lock:
+                    payload, self._pending_autosave = self._pending_autosave, None
+            error = None
+            try:
+                project, file_path = payload
+                if kind == "autosave":
+                    os.makedirs(self.directory, exist_ok=True)
+                self._project_service.save_project(project, file_path)
+                if kind == "autosave":
+                    self._prune(file_path)
+            except Exception as e:
+                error = e
+            self._results.put((on_done, error))
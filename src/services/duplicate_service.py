@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+重複檔案偵測服務
+
+以「檔案大小 → 頭尾區塊部分雜湊 → 完整雜湊」三段式流程找出內容完全相同的檔案。
+雜湊以 mmap 讀取並於執行緒池中計算，結果依 (路徑, 大小, mtime_ns) 快取，
+檔案未變更時重複檢查不需再讀取內容。
+
+使用範例：
+    from services.duplicate_service import DuplicateService
+    service = DuplicateService()
+    groups = service.find_duplicates(["a.pdf", "b.pdf", "c.pdf"])
+"""
+import hashlib
+import mmap
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from core.models import FileInfo, Project
+
+PARTIAL_BLOCK_SIZE = 64 * 1024
+DIGEST_SIZE = 16
+
+_CacheKey = Tuple[str, int, int]
+
+
+class DuplicateService:
+    """內容重複檔案偵測服務"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self._max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+        self._partial_cache: Dict[_CacheKey, bytes] = {}
+        self._full_cache: Dict[_CacheKey, bytes] = {}
+        self._lock = threading.Lock()
+
+    def find_duplicates(self, paths: Sequence[str]) -> List[List[str]]:
+        """找出內容完全相同的檔案
+
+        同一路徑重複出現時只計算一次；無法讀取的檔案會被略過。
+
+        Args:
+            paths: 檔案路徑清單
+
+        Returns:
+            重複群組清單，每組依輸入順序排列（第一個視為原始檔），
+            群組之間依第一個檔案的輸入順序排列
+        """
+        by_size: Dict[int, List[_CacheKey]] = defaultdict(list)
+        for path in dict.fromkeys(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            by_size[st.st_size].append((path, st.st_size, st.st_mtime_ns))
+        candidates = [keys for keys in by_size.values() if len(keys) > 1]
+        if not candidates:
+            return []
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            partial_groups = self._bucket(
+                pool, candidates, self._partial_cache, self._partial_digest,
+            )
+            need_full = [
+                keys for keys in partial_groups
+                if keys[0][1] > 2 * PARTIAL_BLOCK_SIZE
+            ]
+            confirmed = [
+                keys for keys in partial_groups
+                if keys[0][1] <= 2 * PARTIAL_BLOCK_SIZE
+            ]
+            confirmed.extend(self._bucket(
+                pool, need_full, self._full_cache, self._full_digest,
+            ))
+        order = {path: i for i, path in enumerate(dict.fromkeys(paths))}
+        result = [
+            sorted((key[0] for key in keys), key=order.__getitem__)
+            for keys in confirmed
+        ]
+        result.sort(key=lambda group: order[group[0]])
+        return result
+
+    def mark_duplicates(self, files: Sequence[FileInfo]) -> int:
+        """偵測並標記重複檔案
+
+        重複群組中除第一個以外的 FileInfo 會設定 duplicate_of 為原始檔路徑，
+        其餘檔案的標記會被清除。
+
+        Args:
+            files: FileInfo 清單
+
+        Returns:
+            被標記為重複的檔案數
+        """
+        duplicate_of: Dict[str, str] = {}
+        for group in self.find_duplicates([f.original_path for f in files]):
+            for path in group[1:]:
+                duplicate_of[path] = group[0]
+        for file_info in files:
+            file_info.duplicate_of = duplicate_of.get(file_info.original_path, "")
+        return sum(1 for f in files if f.duplicate_of)
+
+    def find_project_duplicates(self, project: Project) -> List[List[str]]:
+        """找出專案中（含所有群組與未分組檔案）內容相同的檔案
+
+        Args:
+            project: 專案資料
+
+        Returns:
+            重複群組清單，格式同 find_duplicates
+        """
+        return self.find_duplicates(self._project_paths(project))
+
+    def mark_project_duplicates(self, project: Project) -> int:
+        """標記專案中所有重複檔案
+
+        Args:
+            project: 專案資料
+
+        Returns:
+            被標記為重複的檔案數
+        """
+        files = [f for g in project.groups for f in g.files]
+        files.extend(project.ungrouped_files)
+        return self.mark_duplicates(files)
+
+    def clear_cache(self) -> None:
+        """清除雜湊快取"""
+        with self._lock:
+            self._partial_cache.clear()
+            self._full_cache.clear()
+
+    def _project_paths(self, project: Project) -> List[str]:
+        paths = [f.original_path for g in project.groups for f in g.files]
+        paths.extend(f.original_path for f in project.ungrouped_files)
+        return paths
+
+    def _bucket(self, pool, candidates, cache, digest_func) -> List[List[_CacheKey]]:
+        """以雜湊將每個候選群組再細分，僅保留仍有多個成員的群組"""
+        keys = [key for group in candidates for key in group]
+        digests = dict(zip(keys, pool.map(
+            lambda key: self._cached_digest(key, cache, digest_func), keys,
+        )))
+        result = []
+        for group in candidates:
+            buckets: Dict[bytes, List[_CacheKey]] = defaultdict(list)
+            for key in group:
+                digest = digests[key]
+                if digest is not None:
+                    buckets[digest].append(key)
+            result.extend(b for b in buckets.values() if len(b) > 1)
+        return result
+
+    def _cached_digest(self, key: _CacheKey, cache, digest_func) -> Optional[bytes]:
+        with self._lock:
+            cached = cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            digest = digest_func(key[0], key[1])
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            cache[key] = digest
+        return digest
+
+    def _partial_digest(self, path: str, size: int) -> bytes:
+        """計算頭尾區塊的雜湊（檔案小於兩個區塊時即為完整內容）"""
+        h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        with open(path, 'rb') as f:
+            if size <= 2 * PARTIAL_BLOCK_SIZE:
+                h.update(f.read())
+            else:
+                h.update(f.read(PARTIAL_BLOCK_SIZE))
+                f.seek(size - PARTIAL_BLOCK_SIZE)
+                h.update(f.read(PARTIAL_BLOCK_SIZE))
+        return h.digest()
+
+    def _full_digest(self, path: str, size: int) -> bytes:
+        """以 mmap 計算完整檔案雜湊"""
+        h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        with open(path, 'rb') as f:
+            if size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
+        return h.digest()
@@ -3,24 +3,91 @@
 檔案服務
 
 提供檔案系統操作：列出、重新命名、建立目錄等。
+
+每種操作的次數與耗時記錄在 core.metrics（file.rename、file.stat、
+file.scandir、file.mkdir、file.rmdir），可用來比較不同版本的系統呼叫次數。
 """
+import errno
 import os
 import shutil
 from typing import List
+from core import metrics
+from core.tracing import traced
+
+
+# os.link 不支援時改以複製建立新檔
+_LINK_UNSUPPORTED = {
+    errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOSYS,
+    errno.ENOTSUP, getattr(errno, "EOPNOTSUPP", errno.ENOTSUP),
+}
 
 
 class FileService:
     """檔案系統操作服務"""
 
+    def __init__(self, overwrite: bool = True):
+        """
+        Args:
+            overwrite: 重新命名時是否可取代已存在的目標檔案；False 時
+                目標已存在會引發 FileExistsError（背景處理不會覆寫檔案）
+        """
+        self.overwrite = overwrite
+
+    @traced("file.rename")
+    @metrics.timed("file.rename")
     def rename_file(self, old_path: str, new_path: str) -> None:
         """重新命名檔案
 
+        新路徑位於其他磁碟（例如網路磁碟機上的收件匣移到檔案庫）時，
+        改為複製後刪除原檔。
+
         Args:
             old_path: 原始檔案路徑
             new_path: 新檔案路徑
-        """
-        os.rename(old_path, new_path)
 
+        Raises:
+            FileExistsError: overwrite 為 False 且目標已存在
+        """
+        if not self.overwrite:
+            self._move_exclusive(old_path, new_path)
+            return
+        try:
+            os.rename(old_path, new_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            size = os.path.getsize(old_path)
+            shutil.move(old_path, new_path)
+            metrics.increment("file.cross_device_moves")
+            metrics.increment("file.bytes_copied", size)
+
+    def _move_exclusive(self, old_path: str, new_path: str) -> None:
+        """移動檔案，目標已存在時失敗而不取代
+
+        以 os.link 建立新名稱（目標存在時不可分割地失敗）後刪除原名稱；
+        不支援硬連結或跨磁碟時，以獨佔建立（"xb"）的新檔複製內容。
+        """
+        try:
+            os.link(old_path, new_path)
+        except OSError as e:
+            if isinstance(e, FileExistsError) or e.errno not in _LINK_UNSUPPORTED:
+                raise
+            size = os.path.getsize(old_path)
+            with open(old_path, "rb") as src, open(new_path, "xb") as dst:
+                try:
+                    shutil.copyfileobj(src, dst)
+                except BaseException:
+                    # 複製不完整的新檔不應留下
+                    dst.close()
+                    os.remove(new_path)
+                    raise
+            shutil.copystat(old_path, new_path)
+            metrics.increment("file.cross_device_moves")
+            metrics.increment("file.bytes_copied", size)
+        os.remove(old_path)
+
+    @traced("file.create_directory")
+    @metrics.timed("file.mkdir")
     def create_directory(self, path: str) -> None:
         """建立目錄（含父目錄）
 
@@ -29,6 +96,7 @@ class FileService:
         """
         os.makedirs(path, exist_ok=True)
 
+    @metrics.timed("file.stat")
     def file_exists(self, path: str) -> bool:
         """檢查檔案是否存在
 
@@ -40,6 +108,8 @@ class FileService:
         """
         return os.path.isfile(path)
 
+    @traced("file.list_pdfs")
+    @metrics.timed("file.scandir")
     def list_pdf_files(self, directory: str) -> List[str]:
         """列出目錄內的 PDF 檔案
 
@@ -56,6 +126,7 @@ class FileService:
         files.sort(key=lambda p: os.path.basename(p).lower())
         return files
 
+    @metrics.timed("file.scandir")
     def has_subdirectories(self, directory: str) -> bool:
         """檢查目錄是否包含子目錄
 
@@ -70,6 +141,8 @@ class FileService:
                 return True
         return False
 
+    @traced("file.list_subdirectories")
+    @metrics.timed("file.scandir")
     def list_subdirectories(self, directory: str) -> List[str]:
         """列出目錄內的子目錄
 
@@ -86,6 +159,8 @@ class FileService:
         dirs.sort(key=lambda p: os.path.basename(p).lower())
         return dirs
 
+    @traced("file.remove_empty_directory")
+    @metrics.timed("file.rmdir")
     def remove_empty_directory(self, path: str) -> None:
         """移除空目錄（若為空）
 
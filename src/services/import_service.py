@@ -5,18 +5,29 @@
 提供檔案與資料夾的匯入功能，自動建立群組。
 """
 import os
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from core import metrics
+from core.filename_clustering import cluster_filenames
+from core.instrument_matcher import InstrumentMatcher
 from core.models import FileInfo, Group
 from core.template_engine import detect_piece_name
+from core.tracing import traced
+from services.duplicate_service import DuplicateService
 from services.file_service import FileService
 
 
 class ImportService:
     """檔案匯入服務"""
 
-    def __init__(self, file_service: FileService):
+    def __init__(
+        self,
+        file_service: FileService,
+        duplicate_service: Optional[DuplicateService] = None,
+    ):
         self.file_service = file_service
+        self.duplicate_service = duplicate_service
 
+    @traced("import.files")
     def import_files(self, paths: List[str]) -> List[FileInfo]:
         """匯入多個檔案
 
@@ -28,24 +39,36 @@ class ImportService:
         """
         result = []
         for path in paths:
-            if path.lower().endswith('.pdf') and os.path.isfile(path):
+            if path.lower().endswith('.pdf') and self.file_service.file_exists(path):
                 result.append(FileInfo(
                     original_path=path,
                     display_name=os.path.basename(path),
                 ))
+        metrics.increment("import.files", len(result))
         return result
 
-    def import_folder(self, folder: str) -> Tuple[List[Group], List[FileInfo]]:
+    @traced("import.folder")
+    def import_folder(
+        self,
+        folder: str,
+        cluster: bool = False,
+        matcher: Optional[InstrumentMatcher] = None,
+    ) -> Tuple[List[Group], List[FileInfo]]:
         """匯入資料夾
 
         以「是否有含 PDF 的子資料夾」決定模式：
         - 有：每個含 PDF 的子資料夾各建立一個群組，根目錄 PDF 歸入未分組
-        - 無：根目錄所有 PDF 歸為一個群組
+        - 無：根目錄所有 PDF 歸為一個群組；若 cluster 為 True，
+          則依檔名相似度分為多個群組（見 cluster_files）
 
         僅掃描一層子資料夾，不遞迴深入。僅處理 .pdf 檔案。
+        若有設定 duplicate_service，會標記本次匯入中內容相同的檔案
+        （FileInfo.duplicate_of），但不會移除它們。
 
         Args:
             folder: 資料夾路徑
+            cluster: 沒有子資料夾時是否依檔名分群
+            matcher: 分群時用來排除樂器名稱的比對器
 
         Returns:
             (群組清單, 未分組檔案清單) 的元組
@@ -71,6 +94,12 @@ class ImportService:
             groups.extend(sub_groups)
             if root_pdfs:
                 ungrouped.extend(self.import_files(root_pdfs))
+        elif root_pdfs and cluster:
+            files = self.import_files(root_pdfs)
+            dir_name = os.path.basename(folder)
+            clustered, loose = self.cluster_files(files, dir_name, matcher)
+            groups.extend(clustered)
+            ungrouped.extend(loose)
         elif root_pdfs:
             files = self.import_files(root_pdfs)
             dir_name = os.path.basename(folder)
@@ -81,4 +110,48 @@ class ImportService:
                 files=files,
                 piece_name=detected_name,
             ))
+        if self.duplicate_service:
+            all_files = [f for g in groups for f in g.files] + ungrouped
+            self.duplicate_service.mark_duplicates(all_files)
         return groups, ungrouped
+
+    @traced("import.cluster")
+    def cluster_files(
+        self,
+        files: List[FileInfo],
+        base_name: str = "",
+        matcher: Optional[InstrumentMatcher] = None,
+    ) -> Tuple[List[Group], List[FileInfo]]:
+        """依檔名相似度將檔案分為多個群組
+
+        至少含兩個檔案的群會成為群組，並各自偵測曲名；單獨成群的檔案
+        歸入未分組。若沒有任何多檔案的群，則全部歸為一個群組。
+
+        Args:
+            files: 要分群的檔案
+            base_name: 群組名稱的後備前綴（通常為資料夾名稱）
+            matcher: 用來排除樂器名稱的比對器
+
+        Returns:
+            (群組清單, 未分組檔案清單) 的元組
+        """
+        if not files:
+            return [], []
+        clusters = cluster_filenames(
+            [f.display_name for f in files], matcher=matcher,
+        )
+        multi = [c for c in clusters if len(c) > 1]
+        if not multi or len(clusters) == 1:
+            multi, singles = [list(range(len(files)))], []
+        else:
+            singles = [c[0] for c in clusters if len(c) == 1]
+        groups = []
+        for number, indexes in enumerate(multi, start=1):
+            members = [files[i] for i in indexes]
+            detected = detect_piece_name([f.display_name for f in members])
+            if len(multi) == 1:
+                name = base_name or detected
+            else:
+                name = detected or f"{base_name} {number}".strip()
+            groups.append(Group(name=name, files=members, piece_name=detected))
+        return groups, [files[i] for i in singles]
@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+"""
+PDF 中繼資料服務
+
+以極簡的純 Python PDF 讀取器取得頁數、標題與檔案大小，供 {頁數}、{標題}、
+{檔案大小} 等模板變數使用。
+
+讀取器只以 mmap 映射檔案尾端（startxref / xref / trailer）以及實際需要的
+少數物件（Info 字典、Catalog、Pages 樹根節點）所在的小區段，從不讀入整份文件。
+結果依 (路徑, mtime_ns) 快取，批次讀取時於執行緒池中平行計算。
+
+使用範例：
+    from services.pdf_metadata_service import PdfMetadataService
+    service = PdfMetadataService()
+    metadata = service.prefetch(["a.pdf", "b.pdf"])
+    print(metadata["a.pdf"].page_count)
+"""
+import mmap
+import os
+import re
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from core.models import PdfMetadata
+
+TAIL_SIZE = 16 * 1024
+OBJECT_WINDOW = 4 * 1024
+MAX_XREF_SECTIONS = 64
+
+
+class PdfParseError(ValueError):
+    """PDF 結構無法解析"""
+
+
+# 損壞的 PDF 可能引發的例外（例如 /First 不是整數時為 TypeError）；
+# 一律視為沒有中繼資料，不應中斷整份重新命名計畫
+_PARSE_ERRORS = (PdfParseError, ValueError, IndexError, TypeError, RecursionError, zlib.error)
+
+
+class PdfRef:
+    """間接物件參照（n g R）"""
+
+    __slots__ = ("num", "gen")
+
+    def __init__(self, num: int, gen: int):
+        self.num = num
+        self.gen = gen
+
+    def __repr__(self):
+        return f"PdfRef({self.num}, {self.gen})"
+
+
+class PdfName(str):
+    """PDF 名稱物件（不含開頭斜線）"""
+
+
+class PdfStream:
+    """串流物件：字典與其資料在檔案中的位置"""
+
+    __slots__ = ("dict", "data_offset")
+
+    def __init__(self, stream_dict: dict, data_offset: int):
+        self.dict = stream_dict
+        self.data_offset = data_offset
+
+
+_WHITESPACE = b" \t\r\n\f\x00"
+_DELIMITERS = b"()<>[]{}/%"
+_NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_REF_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+R")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_ESCAPES = {
+    ord("n"): b"\n", ord("r"): b"\r", ord("t"): b"\t",
+    ord("b"): b"\b", ord("f"): b"\f", ord("("): b"(",
+    ord(")"): b")", ord("\\"): b"\\",
+}
+
+
+class _ObjectParser:
+    """PDF 物件語法的極簡解析器"""
+
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def skip_whitespace(self):
+        data = self.data
+        while self.pos < len(data):
+            c = data[self.pos]
+            if c in _WHITESPACE:
+                self.pos += 1
+            elif c == 0x25:  # % 註解
+                end = data.find(b"\n", self.pos)
+                self.pos = len(data) if end < 0 else end + 1
+            else:
+                break
+
+    def parse(self):
+        self.skip_whitespace()
+        data = self.data
+        if self.pos >= len(data):
+            raise PdfParseError("unexpected end of data")
+        c = data[self.pos]
+        if data.startswith(b"<<", self.pos):
+            return self._parse_dict()
+        if c == 0x3C:  # <
+            return self._parse_hex_string()
+        if c == 0x28:  # (
+            return self._parse_literal_string()
+        if c == 0x2F:  # /
+            return self._parse_name()
+        if c == 0x5B:  # [
+            return self._parse_array()
+        match = _NUMBER_RE.match(data, self.pos)
+        if match:
+            ref = _REF_RE.match(data, self.pos)
+            if ref:
+                self.pos = ref.end()
+                return PdfRef(int(ref.group(1)), int(ref.group(2)))
+            self.pos = match.end()
+            text = match.group(0)
+            return float(text) if b"." in text else int(text)
+        for keyword, value in ((b"true", True), (b"false", False), (b"null", None)):
+            if data.startswith(keyword, self.pos):
+                self.pos += len(keyword)
+                return value
+        raise PdfParseError(f"unexpected token at {self.pos}")
+
+    def _parse_dict(self) -> dict:
+        self.pos += 2
+        result = {}
+        while True:
+            self.skip_whitespace()
+            if self.data.startswith(b">>", self.pos):
+                self.pos += 2
+                return result
+            key = self.parse()
+            if not isinstance(key, PdfName):
+                raise PdfParseError("dictionary key is not a name")
+            result[str(key)] = self.parse()
+
+    def _parse_array(self) -> list:
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_whitespace()
+            if self.pos >= len(self.data):
+                raise PdfParseError("unterminated array")
+            if self.data[self.pos] == 0x5D:  # ]
+                self.pos += 1
+                return result
+            result.append(self.parse())
+
+    def _parse_name(self) -> PdfName:
+        start = self.pos + 1
+        end = start
+        data = self.data
+        while end < len(data) and data[end] not in _WHITESPACE and data[end] not in _DELIMITERS:
+            end += 1
+        self.pos = end
+        raw = data[start:end]
+        raw = re.sub(rb"#([0-9A-Fa-f]{2})", lambda m: bytes([int(m.group(1), 16)]), raw)
+        return PdfName(raw.decode("latin-1"))
+
+    def _parse_hex_string(self) -> bytes:
+        end = self.data.find(b">", self.pos)
+        if end < 0:
+            raise PdfParseError("unterminated hex string")
+        digits = re.sub(rb"[^0-9A-Fa-f]", b"", self.data[self.pos + 1:end])
+        self.pos = end + 1
+        if len(digits) % 2:
+            digits += b"0"
+        return bytes.fromhex(digits.decode("ascii"))
+
+    def _parse_literal_string(self) -> bytes:
+        data = self.data
+        pos = self.pos + 1
+        depth = 1
+        out = bytearray()
+        while pos < len(data):
+            c = data[pos]
+            if c == 0x5C:  # 反斜線
+                pos += 1
+                if pos >= len(data):
+                    break
+                e = data[pos]
+                if e in _ESCAPES:
+                    out += _ESCAPES[e]
+                    pos += 1
+                elif 0x30 <= e <= 0x37:
+                    octal = re.match(rb"[0-7]{1,3}", data[pos:pos + 3]).group(0)
+                    out.append(int(octal, 8) & 0xFF)
+                    pos += len(octal)
+                elif e in b"\r\n":
+                    pos += 2 if data[pos:pos + 2] == b"\r\n" else 1
+                else:
+                    out.append(e)
+                    pos += 1
+                continue
+            if c == 0x28:
+                depth += 1
+            elif c == 0x29:
+                depth -= 1
+                if depth == 0:
+                    self.pos = pos + 1
+                    return bytes(out)
+            out.append(c)
+            pos += 1
+        raise PdfParseError("unterminated literal string")
+
+
+class _PdfTailReader:
+    """僅映射所需區段的 PDF 讀取器"""
+
+    def __init__(self, f, size: int):
+        self._f = f
+        self._size = size
+        # 物件編號 -> (1, 位移, 世代) 或 (2, 物件串流編號, 索引)
+        self._xref: Dict[int, Tuple[int, int, int]] = {}
+        self._object_streams: Dict[int, Tuple[bytes, Dict[int, int]]] = {}
+        # 載入中的物件串流，避免互相（或自我）引用的串流無限遞迴
+        self._loading_streams: Set[int] = set()
+        self.trailer: dict = {}
+
+    def read(self, offset: int, length: int) -> bytes:
+        """以 mmap 映射 [offset, offset+length) 所在區段並回傳其內容"""
+        offset = max(0, offset)
+        length = min(length, self._size - offset)
+        if length <= 0:
+            return b""
+        aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+        with mmap.mmap(
+            self._f.fileno(), length + offset - aligned,
+            access=mmap.ACCESS_READ, offset=aligned,
+        ) as mm:
+            return mm[offset - aligned:]
+
+    def load_xref(self):
+        tail = self.read(self._size - TAIL_SIZE, TAIL_SIZE)
+        idx = tail.rfind(b"startxref")
+        if idx < 0:
+            raise PdfParseError("startxref not found")
+        match = re.match(rb"startxref\s+(\d+)", tail[idx:])
+        if not match:
+            raise PdfParseError("invalid startxref")
+        offset = int(match.group(1))
+        visited = set()
+        while offset and offset not in visited and len(visited) < MAX_XREF_SECTIONS:
+            visited.add(offset)
+            section_trailer = self._load_xref_section(offset)
+            for key, value in section_trailer.items():
+                self.trailer.setdefault(key, value)
+            xref_stm = section_trailer.get("XRefStm")
+            if isinstance(xref_stm, int) and xref_stm not in visited:
+                visited.add(xref_stm)
+                self._load_xref_section(xref_stm)
+            prev = section_trailer.get("Prev")
+            offset = prev if isinstance(prev, int) else 0
+
+    def _load_xref_section(self, offset: int) -> dict:
+        head = self.read(offset, OBJECT_WINDOW)
+        if head.lstrip().startswith(b"xref"):
+            return self._load_xref_table(offset)
+        obj = self._parse_object_at(offset)
+        if not isinstance(obj, PdfStream):
+            raise PdfParseError("invalid xref section")
+        self._load_xref_stream(obj)
+        return obj.dict
+
+    def _load_xref_table(self, offset: int) -> dict:
+        window = OBJECT_WINDOW
+        while True:
+            data = self.read(offset, window)
+            trailer_idx = data.find(b"trailer")
+            if trailer_idx >= 0:
+                try:
+                    trailer = _ObjectParser(data, trailer_idx + len(b"trailer")).parse()
+                    break
+                except PdfParseError:
+                    pass
+            if offset + window >= self._size:
+                raise PdfParseError("trailer not found")
+            window *= 4
+        if not isinstance(trailer, dict):
+            raise PdfParseError("invalid trailer")
+        tokens = data[data.find(b"xref") + len(b"xref"):trailer_idx].split()
+        i = 0
+        while i + 1 < len(tokens):
+            start, count = int(tokens[i]), int(tokens[i + 1])
+            i += 2
+            for n in range(count):
+                if i + 3 > len(tokens):
+                    break
+                entry_offset, gen, kind = tokens[i:i + 3]
+                i += 3
+                if kind == b"n":
+                    self._xref.setdefault(start + n, (1, int(entry_offset), int(gen)))
+        return trailer
+
+    def _load_xref_stream(self, stream: PdfStream):
+        d = stream.dict
+        widths = d.get("W")
+        if not isinstance(widths, list) or len(widths) != 3:
+            raise PdfParseError("invalid xref stream widths")
+        data = self._stream_data(stream)
+        index = d.get("Index") or [0, d.get("Size", 0)]
+        entry_len = sum(widths)
+        pos = 0
+        for k in range(0, len(index) - 1, 2):
+            start, count = index[k], index[k + 1]
+            for n in range(count):
+                if pos + entry_len > len(data):
+                    return
+                fields = []
+                for w in widths:
+                    value = int.from_bytes(data[pos:pos + w], "big") if w else None
+                    fields.append(value)
+                    pos += w
+                kind = 1 if fields[0] is None else fields[0]
+                if kind in (1, 2):
+                    self._xref.setdefault(start + n, (kind, fields[1], fields[2] or 0))
+
+    def _stream_data(self, stream: PdfStream) -> bytes:
+        d = stream.dict
+        length = self.resolve(d.get("Length"))
+        if not isinstance(length, int) or length < 0:
+            raise PdfParseError("invalid stream length")
+        raw = self.read(stream.data_offset, length)
+        filters = d.get("Filter")
+        if isinstance(filters, PdfName):
+            filters = [filters]
+        for name in filters or []:
+            if name != "FlateDecode":
+                raise PdfParseError(f"unsupported filter {name}")
+            raw = zlib.decompress(raw)
+        parms = self.resolve(d.get("DecodeParms"))
+        if isinstance(parms, list):
+            parms = parms[0] if parms else None
+        if isinstance(parms, dict) and parms.get("Predictor", 1) >= 10:
+            raw = _undo_png_predictor(raw, parms.get("Columns", 1))
+        return raw
+
+    def _parse_object_at(self, offset: int):
+        window = OBJECT_WINDOW
+        while True:
+            data = self.read(offset, window)
+            try:
+                header = _OBJ_HEADER_RE.match(data)
+                if not header:
+                    raise PdfParseError(f"no object at {offset}")
+                parser = _ObjectParser(data, header.end())
+                value = parser.parse()
+                parser.skip_whitespace()
+                if isinstance(value, dict) and data.startswith(b"stream", parser.pos):
+                    pos = parser.pos + len(b"stream")
+                    if data.startswith(b"\r\n", pos):
+                        pos += 2
+                    elif data.startswith(b"\n", pos) or data.startswith(b"\r", pos):
+                        pos += 1
+                    return PdfStream(value, offset + pos)
+                return value
+            except PdfParseError:
+                if offset + window >= self._size:
+                    raise
+                window *= 4
+
+    def get_object(self, num: int):
+        entry = self._xref.get(num)
+        if not entry:
+            return None
+        kind, a, _ = entry
+        if kind == 1:
+            return self._parse_object_at(a)
+        data, offsets = self._load_object_stream(a)
+        if num not in offsets:
+            return None
+        return _ObjectParser(data, offsets[num]).parse()
+
+    def _load_object_stream(self, num: int) -> Tuple[bytes, Dict[int, int]]:
+        cached = self._object_streams.get(num)
+        if cached:
+            return cached
+        if num in self._loading_streams:
+            raise PdfParseError("object stream references itself")
+        self._loading_streams.add(num)
+        try:
+            stream = self.get_object(num)
+        finally:
+            self._loading_streams.discard(num)
+        if not isinstance(stream, PdfStream):
+            raise PdfParseError("invalid object stream")
+        data = self._stream_data(stream)
+        first = stream.dict.get("First", 0)
+        count = stream.dict.get("N", 0)
+        if not isinstance(first, int) or not isinstance(count, int):
+            raise PdfParseError("invalid object stream header")
+        numbers = data[:first].split()
+        offsets = {
+            int(numbers[2 * i]): first + int(numbers[2 * i + 1])
+            for i in range(min(count, len(numbers) // 2))
+        }
+        self._object_streams[num] = (data, offsets)
+        return data, offsets
+
+    def resolve(self, value, depth: int = 0):
+        while isinstance(value, PdfRef) and depth < 16:
+            value = self.get_object(value.num)
+            depth += 1
+        if isinstance(value, PdfStream):
+            return value.dict
+        return value
+
+
+def _undo_png_predictor(data: bytes, columns: int) -> bytes:
+    """還原 PNG 預測器（xref 串流常用的 /Predictor 12）"""
+    row_len = columns + 1
+    out = bytearray()
+    prev = bytearray(columns)
+    for i in range(0, len(data) - columns, row_len):
+        kind = data[i]
+        row = bytearray(data[i + 1:i + row_len])
+        if kind == 2:
+            for j in range(len(row)):
+                row[j] = (row[j] + prev[j]) & 0xFF
+        elif kind == 1:
+            for j in range(1, len(row)):
+                row[j] = (row[j] + row[j - 1]) & 0xFF
+        elif kind != 0:
+            raise PdfParseError(f"unsupported PNG predictor {kind}")
+        out += row
+        prev = row
+    return bytes(out)
+
+
+def decode_pdf_text(value) -> str:
+    """將 PDF 文字字串（UTF-16BE、UTF-8 或 PDFDocEncoding）轉為 str"""
+    if not isinstance(value, bytes):
+        return ""
+    if value.startswith(b"\xfe\xff"):
+        return value[2:].decode("utf-16-be", errors="replace")
+    if value.startswith(b"\xef\xbb\xbf"):
+        return value[3:].decode("utf-8", errors="replace")
+    return value.decode("latin-1")
+
+
+def read_pdf_metadata(path: str) -> PdfMetadata:
+    """讀取單一 PDF 的中繼資料
+
+    結構損壞或加密等無法解析的情況下，頁數為 None、標題為空字串。
+
+    Args:
+        path: PDF 檔案路徑
+
+    Returns:
+        PdfMetadata
+    """
+    st = os.stat(path)
+    metadata = PdfMetadata(file_size=st.st_size)
+    if st.st_size == 0:
+        return metadata
+    with open(path, 'rb') as f:
+        reader = _PdfTailReader(f, st.st_size)
+        try:
+            reader.load_xref()
+        except _PARSE_ERRORS:
+            return metadata
+        encrypted = "Encrypt" in reader.trailer
+        try:
+            root = reader.resolve(reader.trailer.get("Root"))
+            pages = reader.resolve(root.get("Pages")) if isinstance(root, dict) else None
+            count = reader.resolve(pages.get("Count")) if isinstance(pages, dict) else None
+            if isinstance(count, int) and count >= 0:
+                metadata.page_count = count
+        except _PARSE_ERRORS:
+            pass
+        if not encrypted:
+            try:
+                info = reader.resolve(reader.trailer.get("Info"))
+                if isinstance(info, dict):
+                    metadata.title = decode_pdf_text(reader.resolve(info.get("Title"))).strip()
+            except _PARSE_ERRORS:
+                pass
+    return metadata
+
+
+class PdfMetadataService:
+    """PDF 中繼資料讀取與快取服務"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self._max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+        self._cache: Dict[Tuple[str, int], PdfMetadata] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[PdfMetadata]:
+        """取得單一檔案的中繼資料
+
+        Args:
+            path: PDF 檔案路徑
+
+        Returns:
+            PdfMetadata，檔案不存在時回傳 None
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        key = (path, mtime_ns)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            metadata = read_pdf_metadata(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._cache[key] = metadata
+        return metadata
+
+    def prefetch(self, paths: Sequence[str]) -> Dict[str, PdfMetadata]:
+        """於執行緒池中批次讀取中繼資料
+
+        Args:
+            paths: PDF 檔案路徑清單
+
+        Returns:
+            路徑到 PdfMetadata 的對應（無法讀取的檔案不會出現）
+        """
+        unique: List[str] = list(dict.fromkeys(paths))
+        if len(unique) <= 1:
+            results = [self.get(p) for p in unique]
+        else:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+                results = list(pool.map(self.get, unique))
+        return {p: m for p, m in zip(unique, results) if m is not None}
+
+    def clear_cache(self) -> None:
+        """清除快取"""
+        with self._lock:
+            self._cache.clear()
@@ -21,6 +21,7 @@ PREFERENCES_FILE = os.path.join(APPDATA_DIR, "preferences.json")
 _DEFAULTS: Dict[str, Any] = {
     "language": "zh_TW",
     "appearance_mode": "Dark",
+    "show_preview_panel": True,
 }
 
 
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+即時預覽服務
+
+訂閱專案的變更事件，停止編輯一段時間後只將變動的群組交給背景執行緒
+重新產生重新命名計畫，再於主執行緒拼接成完整預覽並更新衝突索引。
+修改母模板、樂器表或子資料夾設定時才會重新計算所有群組。
+
+使用範例：
+    from services.preview_service import PreviewService
+    preview = PreviewService(root_window, rename_service, on_updated=panel.refresh)
+    preview.attach(project)
+    preview.entries            # 目前的預覽項目（依群組順序）
+    preview.conflicts.count    # 衝突的項目數
+"""
+import copy
+import os
+import queue
+import threading
+from collections import defaultdict
+from typing import AbstractSet, Any, Callable, Dict, List, Optional, Sequence, Set
+from core.constants import PREVIEW_DELAY_MS
+from core.models import ChangeEvent, DirtyTracker, Project, RenameEntry
+from services.project_format import copy_group, group_ids
+from services.rename_service import RenameService
+
+_RESULT_POLL_MS = 50
+
+# 影響所有群組計畫的專案欄位
+PLAN_FIELDS = frozenset({
+    "instruments", "master_template", "use_subfolders", "subfolder_template",
+})
+
+
+def filter_entries(
+    entries: Sequence[RenameEntry],
+    conflict_paths: AbstractSet[str] = frozenset(),
+    conflicts_only: bool = False,
+    group_id: Optional[str] = None,
+    text: str = "",
+) -> List[int]:
+    """篩選預覽項目
+
+    Args:
+        entries: 預覽項目
+        conflict_paths: 有衝突的原始路徑
+        conflicts_only: 只保留有衝突的項目
+        group_id: 只保留此群組的項目（None 表示全部）
+        text: 舊檔名或新檔名需包含的文字（不分大小寫）
+
+    Returns:
+        符合條件的項目索引
+    """
+    needle = text.strip().lower()
+    result = []
+    for i, entry in enumerate(entries):
+        if conflicts_only and entry.original_path not in conflict_paths:
+            continue
+        if group_id is not None and entry.group_id != group_id:
+            continue
+        if needle and needle not in os.path.basename(entry.original_path).lower() \
+                and needle not in os.path.basename(entry.new_path).lower():
+            continue
+        result.append(i)
+    return result
+
+
+class ConflictIndex:
+    """以群組為單位增量維護的檔名衝突索引
+
+    與 RenameService.detect_conflicts 相同，新路徑以小寫比較。
+    """
+
+    def __init__(self):
+        self._by_group: Dict[str, List[RenameEntry]] = {}
+        # 小寫新路徑 -> 原始路徑清單
+        self._targets: Dict[str, List[str]] = defaultdict(list)
+        self.count = 0
+
+    def set_group(self, group_id: str, entries: List[RenameEntry]):
+        """替換群組的計畫項目
+
+        Args:
+            group_id: 群組 ID
+            entries: 該群組的計畫項目
+        """
+        self.remove_group(group_id)
+        self._by_group[group_id] = entries
+        for entry in entries:
+            originals = self._targets[entry.new_path.lower()]
+            originals.append(entry.original_path)
+            n = len(originals)
+            self.count += 2 if n == 2 else 1 if n > 2 else 0
+
+    def remove_group(self, group_id: str):
+        """移除群組的計畫項目"""
+        for entry in self._by_group.pop(group_id, ()):
+            key = entry.new_path.lower()
+            originals = self._targets[key]
+            n = len(originals)
+            originals.remove(entry.original_path)
+            self.count -= 2 if n == 2 else 1 if n > 2 else 0
+            if not originals:
+                del self._targets[key]
+
+    def is_conflict(self, entry: RenameEntry) -> bool:
+        """此項目的新路徑是否與其他項目衝突"""
+        return len(self._targets.get(entry.new_path.lower(), ())) > 1
+
+    def conflicts(self) -> Dict[str, List[str]]:
+        """取得所有衝突，格式同 RenameService.detect_conflicts"""
+        return {k: list(v) for k, v in self._targets.items() if len(v) > 1}
+
+
+class PreviewService:
+    """防抖、背景計算的即時重新命名預覽"""
+
+    def __init__(
+        self,
+        scheduler: Any,
+        rename_service: RenameService,
+        delay_ms: int = PREVIEW_DELAY_MS,
+        on_updated: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            scheduler: 提供 after / after_cancel 的 Tk 元件，回呼一律在主執行緒執行
+            rename_service: 重新命名服務（其計畫快取可在執行緒間共用）
+            delay_ms: 停止編輯多久後才更新預覽（毫秒）
+            on_updated: 預覽更新後於主執行緒呼叫
+        """
+        self._scheduler = scheduler
+        self._rename_service = rename_service
+        self.delay_ms = delay_ms
+        self.on_updated = on_updated
+        self.entries: List[RenameEntry] = []
+        self.conflicts = ConflictIndex()
+        self.error: Optional[Exception] = None
+        self._project: Optional[Project] = None
+        self._tracker: Optional[DirtyTracker] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        # 群組 ID -> 該群組的預覽項目；_order 為上次拼接時的群組順序
+        self._segments: Dict[str, List[RenameEntry]] = {}
+        self._order: List[str] = []
+        # 上次計算失敗的群組，下次更新時一併重新計算
+        self._failed: Set[str] = set()
+        self._full = False
+        self._after_id = None
+        self._poll_id = None
+        self._in_flight = False
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name="preview", daemon=True,
+        )
+        self._worker.start()
+
+    # ── 主執行緒 API ──
+
+    def attach(self, project: Project):
+        """開始預覽另一個專案（清除目前的預覽）
+
+        Args:
+            project: 專案資料
+        """
+        self.detach()
+        self._project = project
+        self._tracker = DirtyTracker(project)
+        self._unsubscribe = project.subscribe(self._on_change)
+        self._full = True
+        self.schedule()
+
+    def detach(self):
+        """停止預覽目前的專案"""
+        self.cancel()
+        if self._tracker:
+            self._tracker.close()
+            self._unsubscribe()
+        self._project = self._tracker = self._unsubscribe = None
+        self._segments = {}
+        self._order = []
+        self._failed = set()
+        self.entries = []
+        self.conflicts = ConflictIndex()
+
+    def schedule(self):
+        """停止編輯 delay_ms 後更新預覽"""
+        if self._after_id is not None:
+            self._scheduler.after_cancel(self._after_id)
+        self._after_id = self._scheduler.after(self.delay_ms, self.flush)
+
+    def cancel(self):
+        """取消尚未執行的更新"""
+        if self._after_id is not None:
+            self._scheduler.after_cancel(self._after_id)
+            self._after_id = None
+
+    def flush(self):
+        """立即將變動的群組交給背景執行緒重新計算"""
+        self._after_id = None
+        if self._project is None or self._in_flight:
+            # 計算中的結果回來後會再檢查一次是否有新的變動
+            return
+        project = self._project
+        dirty, fields = self._tracker.take()
+        dirty |= self._failed
+        self._failed = set()
+        full = self._full or bool(fields & PLAN_FIELDS)
+        self._full = False
+        order = group_ids(project.groups)
+        if full:
+            targets = list(order)
+            groups = [copy_group(g) for g in project.groups]
+        else:
+            positions = [i for i, gid in enumerate(order) if gid in dirty]
+            targets = [order[i] for i in positions]
+            groups = [copy_group(project.groups[i]) for i in positions]
+        removed = set(self._segments) - set(order)
+        if not targets and not removed and order == self._order:
+            return
+        snapshot = copy.copy(project)
+        snapshot._listeners = []
+        snapshot.instruments = list(project.instruments)
+        snapshot.groups = groups
+        self._in_flight = True
+        self._jobs.put((project, snapshot, order, targets))
+        if self._poll_id is None:
+            self._poll_id = self._scheduler.after(_RESULT_POLL_MS, self._poll)
+
+    def shutdown(self):
+        """停止背景執行緒"""
+        self.detach()
+        self._jobs.put(None)
+
+    def _on_change(self, event: ChangeEvent):
+        self.schedule()
+
+    def _poll(self):
+        self._poll_id = None
+        try:
+            result = self._results.get_nowait()
+        except queue.Empty:
+            self._poll_id = self._scheduler.after(_RESULT_POLL_MS, self._poll)
+            return
+        self._in_flight = False
+        self._apply(*result)
+        if self._tracker and (self._tracker.groups or self._tracker.fields or self._full):
+            self.flush()
+
+    def _apply(
+        self,
+        project: Project,
+        order: List[str],
+        targets: List[str],
+        segments: Optional[Dict[str, List[RenameEntry]]],
+        error: Optional[Exception],
+    ):
+        self.error = error
+        if project is not self._project:
+            # 計算期間已切換專案
+            return
+        if error is not None:
+            # 不立即重試，避免持續失敗時不斷重算；下次編輯時再計算
+            self._failed.update(targets)
+        else:
+            for gid in targets:
+                entries = segments.get(gid, [])
+                self._segments[gid] = entries
+                self.conflicts.set_group(gid, entries)
+        keep: Set[str] = set(order)
+        for gid in [g for g in self._segments if g not in keep]:
+            del self._segments[gid]
+            self.conflicts.remove_group(gid)
+        self._order = order
+        self.entries = [e for gid in order for e in self._segments.get(gid, ())]
+        if self.on_updated:
+            self.on_updated()
+
+    # ── 背景執行緒 ──
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            project, snapshot, order, targets = job
+            segments: Dict[str, List[RenameEntry]] = defaultdict(list)
+            error = None
+            try:
+                for entry in self._rename_service.generate_rename_plan(snapshot):
+                    segments[entry.group_id].append(entry)
+            except Exception as e:
+                error = e
+            self._results.put((project, order, targets, segments, error))
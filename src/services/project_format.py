@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+專案檔第 2 版格式
+
+大型專案（數萬個檔案）若以單一 JSON 儲存，開啟時必須解析整份檔案並建立
+所有 Group 與 FileInfo。第 2 版格式將每個群組存成獨立的區塊，開啟時只讀取
+檔頭，群組在第一次被存取時才解析；儲存時未曾存取的群組直接複製原始位元組。
+
+檔案配置（UTF-8）：
+    LLPROJ2\\n                              魔術字串
+    <檔頭位移 16 位數> <檔頭長度 16 位數>\\n  固定寬度，寫完檔頭後回填
+    <群組區塊>\\n ...                       每個群組一行緊湊 JSON
+    <檔頭 JSON>\\n                          專案設定、目錄表、未分組檔案、區塊索引
+
+檔案路徑拆為「目錄索引 + 檔名」，目錄表只會附加不會重排，因此複製的
+區塊中的目錄索引在新檔案中仍然有效。
+"""
+import copy
+import json
+import os
+import stat
+import tempfile
+import threading
+from collections.abc import MutableSequence
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from core.models import FileInfo, Group
+
+MAGIC = b"LLPROJ2\n"
+FORMAT_VERSION = 2
+_POINTER_FORMAT = "{:016d} {:016d}\n"
+_POINTER_SIZE = len(_POINTER_FORMAT.format(0, 0))
+_GROUP_FIELDS = (
+    ("name", ""),
+    ("selected_instruments", []),
+    ("piece_name", ""),
+    ("movement_number", ""),
+    ("movement_name", ""),
+    ("use_small_template", False),
+    ("small_template", ""),
+)
+
+# 保護「取代專案檔並更新區塊位置」與「依區塊位置讀取」不會交錯執行
+# （背景執行緒儲存時，主執行緒仍可能解析群組）
+io_lock = threading.RLock()
+
+
+class ProjectFormatError(ValueError):
+    """專案檔格式錯誤或已被外部修改"""
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class DirTable:
+    """目錄表：將重複的目錄路徑以索引表示"""
+
+    def __init__(self, dirs: Optional[List[str]] = None):
+        self.dirs: List[str] = list(dirs or [])
+        self._index: Dict[str, int] = {d: i for i, d in enumerate(self.dirs)}
+
+    def add(self, directory: str) -> int:
+        """取得目錄索引，不存在時附加到表尾
+
+        Args:
+            directory: 目錄路徑
+
+        Returns:
+            目錄索引
+        """
+        index = self._index.get(directory)
+        if index is None:
+            index = self._index[directory] = len(self.dirs)
+            self.dirs.append(directory)
+        return index
+
+    def encode_file(self, file_info: FileInfo) -> list:
+        """FileInfo 轉為 [目錄索引, 檔名] 或 [目錄索引, 檔名, 顯示名稱]"""
+        directory, basename = os.path.split(file_info.original_path)
+        entry = [self.add(directory), basename]
+        if file_info.display_name != basename:
+            entry.append(file_info.display_name)
+        return entry
+
+    def decode_file(self, entry: list) -> FileInfo:
+        """由 encode_file 的結果還原 FileInfo"""
+        basename = entry[1]
+        return FileInfo(
+            original_path=os.path.join(self.dirs[entry[0]], basename),
+            display_name=entry[2] if len(entry) > 2 else basename,
+        )
+
+
+def group_to_dict(group: Group, dirs: DirTable) -> Dict[str, Any]:
+    """將群組轉為可序列化的字典（檔案以目錄表索引表示）
+
+    Args:
+        group: 群組資料
+        dirs: 目錄表（新目錄會附加到表尾）
+
+    Returns:
+        字典
+    """
+    data: Dict[str, Any] = {"id": group.id}
+    for name, _ in _GROUP_FIELDS:
+        value = getattr(group, name)
+        data[name] = list(value) if isinstance(value, list) else value
+    data["files"] = [dirs.encode_file(f) for f in group.files]
+    return data
+
+
+def group_from_dict(data: Dict[str, Any], dirs: DirTable) -> Group:
+    """由 group_to_dict 的結果還原群組
+
+    Args:
+        data: 群組字典
+        dirs: 目錄表
+
+    Returns:
+        Group 物件
+    """
+    group = Group(id=data.get("id", ""))
+    for name, default in _GROUP_FIELDS:
+        value = data.get(name, default)
+        setattr(group, name, list(value) if isinstance(value, list) else value)
+    group.files = [dirs.decode_file(entry) for entry in data.get("files", [])]
+    return group
+
+
+def encode_group(group: Group, dirs: DirTable) -> bytes:
+    """將群組編碼為緊湊 JSON 區塊（不含換行）"""
+    return _dumps(group_to_dict(group, dirs))
+
+
+def decode_group(raw: bytes, dirs: DirTable) -> Group:
+    """由 encode_group 的結果還原群組"""
+    return group_from_dict(json.loads(raw), dirs)
+
+
+@dataclass
+class JournalState:
+    """專案檔目前已寫入磁碟的內容摘要，用來計算增量儲存的差異
+
+    groups 只記錄已解析過的群組；未解析的群組不可能被修改，不需比對。
+    """
+    path: str = ""
+    journal_start: int = 0
+    journal_end: int = 0
+    file_stat: Tuple[int, int] = (0, 0)
+    dir_count: int = 0
+    settings: Dict[str, Any] = field(default_factory=dict)
+    ungrouped: List[list] = field(default_factory=list)
+    order: List[str] = field(default_factory=list)
+    groups: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+def file_stat(file_path: str) -> Tuple[int, int]:
+    """取得 (大小, 修改時間) 以判斷檔案是否被外部修改"""
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime_ns
+
+
+@dataclass
+class ChunkRef:
+    """尚未解析的群組區塊"""
+    path: str
+    offset: int
+    length: int
+    id: str
+    name: str
+    # 群組解析後保留的原始位元組：原清單不再持有此區塊，之後改寫專案檔
+    # 也不會更新它的位置，仍持有它的快照改用這份位元組
+    raw: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    def read(self, f=None) -> bytes:
+        """讀取區塊位元組
+
+        Args:
+            f: 已開啟的專案檔（二進位模式）；未提供時自行開啟
+
+        Returns:
+            區塊位元組
+        """
+        if self.raw is not None:
+            return self.raw
+        if f is None:
+            with io_lock, open(self.path, 'rb') as fh:
+                return self.read(fh)
+        f.seek(self.offset)
+        raw = f.read(self.length)
+        if len(raw) != self.length:
+            raise ProjectFormatError(f"專案檔已被截斷：{self.path}")
+        return raw
+
+    def read_verified(self, f=None) -> bytes:
+        """讀取區塊位元組並確認區塊屬於此群組
+
+        不解析 JSON，只檢查區塊以此群組的 id 開頭（group_to_dict 的第一個
+        欄位）且為完整的物件，區塊位置過期時不會複製到錯誤的內容。
+
+        Raises:
+            ProjectFormatError: 區塊不屬於此群組
+        """
+        raw = self.read(f)
+        prefix = b'{"id":' + _dumps(self.id) + b','
+        if not (raw.startswith(prefix) and raw.endswith(b"}")):
+            raise ProjectFormatError(f"專案檔已被其他程式修改：{self.path}")
+        return raw
+
+
+class LazyGroupList(MutableSequence):
+    """延遲解析的群組清單
+
+    行為與 list 相同；元素在第一次被存取時才從專案檔讀取並解析。
+
+    owns_chunks 為 False 的清單（自動儲存的快照）與原清單共用 ChunkRef，
+    寫入時讀取區塊的最新位置，但不會把區塊改為指向自己寫出的檔案。
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Union[Group, ChunkRef]] = (),
+        dirs: Optional[DirTable] = None,
+        state: Optional[JournalState] = None,
+        owns_chunks: bool = True,
+    ):
+        self._items: List[Union[Group, ChunkRef]] = list(items)
+        self.dirs = dirs or DirTable()
+        self.state = state or JournalState()
+        self.owns_chunks = owns_chunks
+
+    def _materialize(self, index: int) -> Group:
+        item = self._items[index]
+        if isinstance(item, ChunkRef):
+            raw = item.read()
+            data = json.loads(raw)
+            if data.get("id") != item.id:
+                raise ProjectFormatError(f"專案檔已被其他程式修改：{item.path}")
+            item.raw = raw
+            # 記錄解析時的內容，增量儲存時與之比對
+            self.state.groups[item.id] = data
+            self._items[index] = item = group_from_dict(data, self.dirs)
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self._items)))]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError("group index out of range")
+        return self._materialize(index)
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def insert(self, index: int, value: Group):
+        self._items.insert(index, value)
+
+    def index(self, value, start: int = 0, stop: Optional[int] = None) -> int:
+        # 介面上拿到的群組必定已解析，先以識別比對避免解析整份清單
+        stop = len(self._items) if stop is None else stop
+        for i in range(start, min(stop, len(self._items))):
+            if self._items[i] is value:
+                return i
+        return super().index(value, start, stop)
+
+    def __contains__(self, value) -> bool:
+        try:
+            self.index(value)
+        except ValueError:
+            return False
+        return True
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, LazyGroupList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyGroupList({len(self._items)} groups)"
+
+    def is_materialized(self, index: int) -> bool:
+        """群組是否已解析"""
+        return not isinstance(self._items[index], ChunkRef)
+
+    def peek(self, index: int) -> Tuple[str, str]:
+        """不解析群組，取得 (id, 名稱)"""
+        item = self._items[index]
+        return item.id, item.name
+
+    def raw_items(self) -> List[Union[Group, ChunkRef]]:
+        """取得內部元素（已解析的 Group 或尚未解析的 ChunkRef）"""
+        return self._items
+
+
+def is_v2_file(file_path: str) -> bool:
+    """檢查檔案是否為第 2 版專案檔"""
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_project_file(file_path: str) -> Tuple[Dict[str, Any], LazyGroupList, List[FileInfo]]:
+    """讀取第 2 版專案檔的檢查點（只解析檔頭，不含檔頭之後的日誌）
+
+    Args:
+        file_path: 專案檔路徑
+
+    Returns:
+        (專案設定字典, 延遲解析的群組清單, 未分組檔案清單) 的元組；
+        群組清單的 state 描述檢查點內容與日誌起點
+
+    Raises:
+        ProjectFormatError: 檔案格式錯誤
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ProjectFormatError(f"不是第 2 版專案檔：{file_path}")
+        try:
+            header_offset, header_length = (int(v) for v in f.read(_POINTER_SIZE).split())
+            f.seek(header_offset)
+            header = json.loads(f.read(header_length))
+        except ValueError as e:
+            raise ProjectFormatError(f"專案檔檔頭損毀：{file_path}") from e
+    dirs = DirTable(header.get("dirs", []))
+    settings = header.get("settings", {})
+    ungrouped_entries = header.get("ungrouped_files", [])
+    journal_start = header_offset + header_length + 1
+    state = JournalState(
+        path=file_path,
+        journal_start=journal_start,
+        journal_end=journal_start,
+        file_stat=file_stat(file_path),
+        dir_count=len(dirs.dirs),
+        settings=copy.deepcopy(settings),
+        ungrouped=list(ungrouped_entries),
+        order=[entry["id"] for entry in header.get("groups", [])],
+    )
+    groups = LazyGroupList(
+        (ChunkRef(file_path, entry["offset"], entry["length"], entry["id"], entry.get("name", ""))
+         for entry in header.get("groups", [])),
+        dirs,
+        state,
+    )
+    ungrouped = [dirs.decode_file(entry) for entry in ungrouped_entries]
+    return settings, groups, ungrouped
+
+
+def write_project_file(
+    file_path: str,
+    settings: Dict[str, Any],
+    groups: List[Group],
+    ungrouped: List[FileInfo],
+) -> None:
+    """以第 2 版格式寫入專案檔
+
+    先寫入同目錄的暫存檔並 fsync，再以 os.replace 取代原檔，寫入途中當機
+    也不會損毀原檔。尚未解析的群組直接複製原始位元組；寫入完成後，這些
+    ChunkRef 會原地更新為指向新檔案。
+
+    Args:
+        file_path: 儲存路徑
+        settings: 專案設定（樂器表、模板等）
+        groups: 群組清單（可為 LazyGroupList）
+        ungrouped: 未分組檔案清單
+    """
+    if isinstance(groups, LazyGroupList):
+        dirs = groups.dirs
+        items = groups.raw_items()
+        rebind = groups.owns_chunks
+    else:
+        dirs = DirTable()
+        items = list(groups)
+        rebind = False
+    written: Dict[str, Dict[str, Any]] = {}
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=".llproj-", dir=directory)
+    sources: Dict[str, Any] = {}
+    index = []
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(MAGIC)
+            out.write(_POINTER_FORMAT.format(0, 0).encode("ascii"))
+            for item in items:
+                if isinstance(item, ChunkRef):
+                    src = None
+                    if item.raw is None:
+                        src = sources.get(item.path)
+                        if src is None:
+                            src = sources[item.path] = open(item.path, 'rb')
+                    raw = item.read_verified(src)
+                else:
+                    data = written[item.id] = group_to_dict(item, dirs)
+                    raw = _dumps(data)
+                index.append({
+                    "id": item.id, "name": item.name,
+                    "offset": out.tell(), "length": len(raw),
+                })
+                out.write(raw)
+                out.write(b"\n")
+            ungrouped_entries = [dirs.encode_file(f) for f in ungrouped]
+            header = _dumps({
+                "format": FORMAT_VERSION,
+                "settings": settings,
+                "dirs": dirs.dirs,
+                "ungrouped_files": ungrouped_entries,
+                "groups": index,
+            })
+            header_offset = out.tell()
+            out.write(header)
+            out.write(b"\n")
+            out.seek(len(MAGIC))
+            out.write(_POINTER_FORMAT.format(header_offset, len(header)).encode("ascii"))
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    finally:
+        for src in sources.values():
+            src.close()
+    # mkstemp 建立的檔案權限為 0600，沿用原檔權限
+    mode = os.stat(file_path).st_mode if os.path.exists(file_path) else 0o644
+    os.chmod(temp_path, stat.S_IMODE(mode))
+    with io_lock:
+        os.replace(temp_path, file_path)
+        for item, entry in zip(items, index):
+            if rebind and isinstance(item, ChunkRef):
+                item.path = file_path
+                item.offset = entry["offset"]
+                item.length = entry["length"]
+    if isinstance(groups, LazyGroupList):
+        journal_start = header_offset + len(header) + 1
+        state = groups.state
+        state.path = file_path
+        state.journal_start = state.journal_end = journal_start
+        state.file_stat = file_stat(file_path)
+        state.dir_count = len(dirs.dirs)
+        state.settings = copy.deepcopy(settings)
+        state.ungrouped = ungrouped_entries
+        state.order = [entry["id"] for entry in index]
+        state.groups = written
+
+
+def group_ids(groups: List[Group]) -> List[str]:
+    """取得群組 ID 清單，不解析 LazyGroupList 中尚未解析的群組"""
+    if isinstance(groups, LazyGroupList):
+        return [item.id for item in groups.raw_items()]
+    return [group.id for group in groups]
+
+
+def group_headers(groups: List[Group]) -> List[Tuple[str, str]]:
+    """取得每個群組的 (ID, 名稱)，不解析 LazyGroupList 中尚未解析的群組"""
+    items = groups.raw_items() if isinstance(groups, LazyGroupList) else groups
+    return [(item.id, item.name) for item in items]
+
+
+def copy_group(group: Group) -> Group:
+    """複製群組（清單欄位另外複製，FileInfo 共用）"""
+    clone = copy.copy(group)
+    clone.files = list(group.files)
+    clone.selected_instruments = list(group.selected_instruments)
+    clone.version = group.version
+    return clone
+
+
+def snapshot_groups(groups: List[Group], share_chunks: bool = False) -> List[Group]:
+    """建立群組清單的快照，之後修改原清單不影響快照
+
+    尚未解析的區塊不會被讀取，快照一律與原清單共用 ChunkRef：在快照寫入
+    之前完成的儲存若改寫了專案檔，快照寫入時讀到的是更新後的區塊位置。
+    share_chunks 為 True 時快照也共用增量儲存狀態，將快照存回原專案檔時
+    原清單的區塊位置會一併更新；存到其他位置（例如自動儲存）時應為 False，
+    寫入不會改變區塊位置。
+
+    Args:
+        groups: 群組清單（可為 LazyGroupList）
+        share_chunks: 快照是否代表原專案檔（寫入後更新區塊位置與儲存狀態）
+
+    Returns:
+        快照清單
+    """
+    if not isinstance(groups, LazyGroupList):
+        return [copy_group(g) for g in groups]
+    with io_lock:
+        items = [
+            copy_group(item) if isinstance(item, Group) else item
+            for item in groups.raw_items()
+        ]
+    if share_chunks:
+        return LazyGroupList(items, groups.dirs, groups.state)
+    return LazyGroupList(items, DirTable(groups.dirs.dirs), owns_chunks=False)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+專案檔增量日誌
+
+第 2 版專案檔的檔頭之後可附加編輯日誌，每行一筆緊湊 JSON 操作。儲存時只
+比對上次寫入後有變動的部分並附加到檔尾，成本與編輯量成正比，而不是與
+專案大小成正比；日誌超過門檻時才整份重寫（壓縮）為新的檢查點。
+
+操作種類：
+    {"op": "dirs", "dirs": [...]}                  目錄表新增項目
+    {"op": "project", "fields": {...}}             專案設定變更（模板、樂器表等）
+    {"op": "ungrouped", "files": [...]}            未分組檔案清單
+    {"op": "group_put", "group": {...}}            新增群組
+    {"op": "group_fields", "id": ..., "fields": {...}}  群組欄位變更（含檔案清單）
+    {"op": "group_order", "ids": [...]}            群組順序；未列出的群組視為已刪除
+
+載入時依序重播；若程式在附加途中當機，最後一行不完整，載入時會忽略，
+下次附加前也會先截掉。
+"""
+import copy
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+from core.models import FileInfo
+from services import project_format
+from services.project_format import (
+    ChunkRef,
+    JournalState,
+    LazyGroupList,
+    group_from_dict,
+    group_to_dict,
+)
+
+# 日誌大小超過此值且超過檢查點大小的一半時壓縮
+COMPACT_MIN_BYTES = 256 * 1024
+
+
+def _dumps_line(op: Dict[str, Any]) -> bytes:
+    return json.dumps(op, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def read_ops(state: JournalState) -> List[Dict[str, Any]]:
+    """讀取檔頭之後的日誌，並將 state.journal_end 設為最後一筆完整操作之後
+
+    Args:
+        state: read_project_file 產生的狀態
+
+    Returns:
+        操作清單
+    """
+    with open(state.path, 'rb') as f:
+        f.seek(state.journal_start)
+        data = f.read()
+    ops = []
+    pos = 0
+    while pos < len(data):
+        end = data.find(b"\n", pos)
+        if end < 0:
+            break
+        try:
+            op = json.loads(data[pos:end])
+        except ValueError:
+            break
+        ops.append(op)
+        pos = end + 1
+    state.journal_end = state.journal_start + pos
+    return ops
+
+
+def _apply(
+    state: JournalState,
+    op: Dict[str, Any],
+    items: Optional[Dict[str, Union[ChunkRef, Dict[str, Any]]]] = None,
+    dirs: Optional[project_format.DirTable] = None,
+):
+    """將單一操作套用到 state（重播時一併更新 items 與目錄表）"""
+    kind = op.get("op")
+    if kind == "dirs":
+        if dirs is not None:
+            for directory in op["dirs"]:
+                dirs.add(directory)
+        state.dir_count += len(op["dirs"])
+    elif kind == "project":
+        state.settings.update(copy.deepcopy(op["fields"]))
+    elif kind == "ungrouped":
+        state.ungrouped = op["files"]
+    elif kind == "group_put":
+        data = op["group"]
+        if data["id"] not in state.groups and data["id"] not in state.order:
+            state.order.append(data["id"])
+        state.groups[data["id"]] = data
+        if items is not None:
+            items[data["id"]] = data
+    elif kind == "group_fields":
+        group_id = op["id"]
+        base = state.groups.get(group_id)
+        if base is None and items is not None:
+            item = items[group_id]
+            base = json.loads(item.read()) if isinstance(item, ChunkRef) else item
+        data = dict(base)
+        data.update(op["fields"])
+        state.groups[group_id] = data
+        if items is not None:
+            items[group_id] = data
+    elif kind == "group_order":
+        state.order = list(op["ids"])
+        keep = set(state.order)
+        for group_id in [g for g in state.groups if g not in keep]:
+            del state.groups[group_id]
+
+
+def load_project_file(file_path: str) -> Tuple[Dict[str, Any], LazyGroupList, List[FileInfo]]:
+    """讀取第 2 版專案檔並重播日誌
+
+    只有被日誌操作影響的群組會被解析，其他群組維持延遲解析。
+
+    Args:
+        file_path: 專案檔路徑
+
+    Returns:
+        (專案設定字典, 群組清單, 未分組檔案清單) 的元組
+    """
+    settings, groups, ungrouped = project_format.read_project_file(file_path)
+    state = groups.state
+    ops = read_ops(state)
+    if not ops:
+        return settings, groups, ungrouped
+    items: Dict[str, Union[ChunkRef, Dict[str, Any]]] = {
+        item.id: item for item in groups.raw_items()
+    }
+    for op in ops:
+        _apply(state, op, items, groups.dirs)
+    dirs = groups.dirs
+    result = LazyGroupList(
+        (group_from_dict(items[gid], dirs) if isinstance(items[gid], dict) else items[gid]
+         for gid in state.order),
+        dirs,
+        state,
+    )
+    ungrouped = [dirs.decode_file(entry) for entry in state.ungrouped]
+    return copy.deepcopy(state.settings), result, ungrouped
+
+
+def diff_ops(
+    state: JournalState,
+    settings: Dict[str, Any],
+    groups: LazyGroupList,
+    ungrouped: List[FileInfo],
+) -> List[Dict[str, Any]]:
+    """比對目前內容與磁碟上的內容，產生日誌操作
+
+    未解析的群組必定未被修改，直接略過；已解析的群組與解析時（或上次寫入
+    時）的內容逐欄比對。
+
+    Args:
+        state: 磁碟上的內容摘要
+        settings: 目前的專案設定
+        groups: 目前的群組清單
+        ungrouped: 目前的未分組檔案
+
+    Returns:
+        操作清單（沒有變動時為空）
+    """
+    dirs = groups.dirs
+    ops: List[Dict[str, Any]] = []
+    changed = {k: v for k, v in settings.items() if state.settings.get(k) != v}
+    if changed:
+        ops.append({"op": "project", "fields": changed})
+    known = set(state.order)
+    order = []
+    for item in groups.raw_items():
+        order.append(item.id)
+        if isinstance(item, ChunkRef):
+            continue
+        data = group_to_dict(item, dirs)
+        old = state.groups.get(item.id) if item.id in known else None
+        if old is None:
+            ops.append({"op": "group_put", "group": data})
+            continue
+        fields = {k: v for k, v in data.items() if old.get(k) != v}
+        if fields:
+            ops.append({"op": "group_fields", "id": item.id, "fields": fields})
+    entries = [dirs.encode_file(f) for f in ungrouped]
+    if entries != state.ungrouped:
+        ops.append({"op": "ungrouped", "files": entries})
+    if order != state.order:
+        ops.append({"op": "group_order", "ids": order})
+    if len(dirs.dirs) > state.dir_count:
+        ops.insert(0, {"op": "dirs", "dirs": dirs.dirs[state.dir_count:]})
+    return ops
+
+
+def can_append(state: JournalState, file_path: str) -> bool:
+    """檢查是否可將日誌附加到 file_path（同一檔案且未被外部修改）"""
+    if not state.path or not os.path.isfile(file_path):
+        return False
+    if os.path.abspath(state.path) != os.path.abspath(file_path):
+        return False
+    return project_format.file_stat(file_path) == state.file_stat
+
+
+def needs_compaction(state: JournalState, pending_bytes: int) -> bool:
+    """日誌（含即將附加的部分）是否超過壓縮門檻
+
+    Args:
+        state: 磁碟上的內容摘要
+        pending_bytes: 即將附加的位元組數
+
+    Returns:
+        是否應整份重寫
+    """
+    journal_size = state.journal_end - state.journal_start + pending_bytes
+    return journal_size > max(COMPACT_MIN_BYTES, state.journal_start // 2)
+
+
+def append_ops(state: JournalState, ops: List[Dict[str, Any]]):
+    """將操作附加到日誌尾端並 fsync
+
+    先截掉上次未寫完的殘行，再附加新的操作。
+
+    Args:
+        state: 磁碟上的內容摘要（會更新為附加後的內容）
+        ops: 操作清單
+    """
+    data = b"".join(_dumps_line(op) for op in ops)
+    with open(state.path, 'r+b') as f:
+        f.seek(state.journal_end)
+        f.truncate()
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    state.journal_end += len(data)
+    state.file_stat = project_format.file_stat(state.path)
+    for op in ops:
+        _apply(state, op)
+
+
+def save_project_file(
+    file_path: str,
+    settings: Dict[str, Any],
+    groups: LazyGroupList,
+    ungrouped: List[FileInfo],
+) -> bool:
+    """儲存專案：可行時附加日誌，否則（或日誌過大時）重寫檢查點
+
+    Args:
+        file_path: 儲存路徑
+        settings: 專案設定
+        groups: 群組清單
+        ungrouped: 未分組檔案
+
+    Returns:
+        是否以附加日誌方式儲存
+    """
+    state = groups.state
+    if can_append(state, file_path):
+        ops = diff_ops(state, settings, groups, ungrouped)
+        pending = sum(len(_dumps_line(op)) for op in ops)
+        if not needs_compaction(state, pending):
+            if ops:
+                append_ops(state, ops)
+            return True
+    project_format.write_project_file(file_path, settings, groups, ungrouped)
+    return False
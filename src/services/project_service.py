@@ -2,40 +2,89 @@
 """
 專案服務
 
-提供專案檔案的儲存與載入功能。
+提供專案檔案的儲存與載入功能。預設以第 2 版格式儲存（見 project_format），
+再次儲存同一檔案時只附加增量日誌（見 project_journal）；仍可載入第 1 版的
+JSON 專案檔。
 """
 import json
 from core.constants import APP_VERSION
 from core.models import FileInfo, Group, Project
+from core.tracing import traced
+from services import project_format, project_journal
+from services.project_format import LazyGroupList
 
 
 class ProjectService:
     """專案檔管理服務"""
 
-    def save_project(self, project: Project, file_path: str) -> None:
-        """將專案序列化為 JSON 並儲存
+    @traced("project.save")
+    def save_project(
+        self, project: Project, file_path: str, format_version: int = 2,
+    ) -> None:
+        """儲存專案
+
+        第 2 版格式下，若 file_path 就是專案載入（或上次儲存）的檔案，只會
+        將變動附加為日誌；否則寫入完整的檢查點。project.groups 若為一般
+        list，會轉為 LazyGroupList 以便之後增量儲存。
 
         Args:
             project: 專案資料
             file_path: 儲存路徑
+            format_version: 檔案格式版本；2 為分塊格式，1 為單一 JSON
+        """
+        if format_version == 1:
+            self._save_v1(project, file_path)
+            return
+        if not isinstance(project.groups, LazyGroupList):
+            project.groups = LazyGroupList(project.groups)
+        project_journal.save_project_file(
+            file_path,
+            self._serialize_settings(project),
+            project.groups,
+            project.ungrouped_files,
+        )
+
+    def _serialize_settings(self, project: Project) -> dict:
+        """序列化專案層級的設定
+
+        Args:
+            project: 專案資料
+
+        Returns:
+            可序列化的字典
         """
-        data = {
+        return {
             "version": APP_VERSION,
             "instruments": project.instruments,
             "master_template": project.master_template,
             "use_subfolders": project.use_subfolders,
             "subfolder_template": project.subfolder_template,
+            "instrument_aliases": project.instrument_aliases,
+        }
+
+    def _save_v1(self, project: Project, file_path: str) -> None:
+        """以第 1 版格式（單一 JSON）儲存專案
+
+        Args:
+            project: 專案資料
+            file_path: 儲存路徑
+        """
+        data = self._serialize_settings(project)
+        data.update({
             "ungrouped_files": [
                 {"original_path": f.original_path, "display_name": f.display_name}
                 for f in project.ungrouped_files
             ],
             "groups": [self._serialize_group(g) for g in project.groups],
-        }
+        })
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
+    @traced("project.load")
     def load_project(self, file_path: str) -> Project:
-        """從 JSON 檔案載入專案
+        """載入專案檔（自動判斷格式版本）
+
+        第 2 版專案檔只解析檔頭，群組在第一次存取時才解析。
 
         Args:
             file_path: 專案檔路徑
@@ -43,14 +92,15 @@ class ProjectService:
         Returns:
             還原的 Project 物件
         """
+        if project_format.is_v2_file(file_path):
+            settings, groups, ungrouped = project_journal.load_project_file(file_path)
+            project = self._deserialize_settings(settings)
+            project.groups = groups
+            project.ungrouped_files = ungrouped
+            return project
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        project = Project(
-            instruments=data.get("instruments", []),
-            master_template=data.get("master_template", ""),
-            use_subfolders=data.get("use_subfolders", False),
-            subfolder_template=data.get("subfolder_template", ""),
-        )
+        project = self._deserialize_settings(data)
         project.ungrouped_files = [
             FileInfo(
                 original_path=f["original_path"],
@@ -64,6 +114,23 @@ class ProjectService:
         ]
         return project
 
+    def _deserialize_settings(self, data: dict) -> Project:
+        """由設定字典建立 Project（不含群組與檔案）
+
+        Args:
+            data: 設定字典
+
+        Returns:
+            Project 物件
+        """
+        return Project(
+            instruments=data.get("instruments", []),
+            master_template=data.get("master_template", ""),
+            use_subfolders=data.get("use_subfolders", False),
+            subfolder_template=data.get("subfolder_template", ""),
+            instrument_aliases=data.get("instrument_aliases", {}),
+        )
+
     def _serialize_group(self, group: Group) -> dict:
         """序列化單一群組
 
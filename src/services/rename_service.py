@@ -3,64 +3,170 @@
 重新命名服務
 
 提供批次重新命名計畫生成、衝突偵測與執行。
+
+重新命名計畫以群組為單位快取，鍵為群組 ID，並以（群組版本、實際模板、
+子資料夾模板、樂器表）判斷是否失效；只修改少數群組後再次預覽時，只重新
+產生失效的群組，其餘沿用快取後依群組順序拼接成完整計畫。模板引用 PDF
+中繼資料的群組因結果取決於磁碟上的檔案內容，不會被快取。
 """
 import os
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from core import metrics
 from core.locale import t
-from core.models import Project, RenameEntry, UndoMapping, UndoRecord
-from core.template_engine import build_variables_for_file, substitute_template
+from core.models import Group, Project, RenameEntry, UndoMapping, UndoRecord
+from core.template_engine import (
+    build_variables_for_file,
+    needs_pdf_metadata,
+    resolve_piece_name,
+    substitute_template,
+)
+from core.tracing import traced
 from services.file_service import FileService
+from services.pdf_metadata_service import PdfMetadataService
+
+# 計畫快取最多保留的群組數
+PLAN_CACHE_SIZE = 2048
 
 
 class RenameService:
     """批次重新命名服務"""
 
-    def __init__(self, file_service: FileService):
+    def __init__(
+        self,
+        file_service: FileService,
+        metadata_service: Optional[PdfMetadataService] = None,
+    ):
         self.file_service = file_service
+        self.metadata_service = metadata_service
+        # 群組 ID -> (失效判斷鍵, 該群組的計畫項目)，依最近使用排序
+        self._plan_cache: "OrderedDict[str, Tuple[tuple, List[RenameEntry]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
 
+    @traced("rename.plan")
     def generate_rename_plan(self, project: Project) -> List[RenameEntry]:
         """根據專案設定產生重新命名計畫
 
+        只有在模板引用 {頁數}、{標題}、{檔案大小} 等變數時，才會讀取
+        對應群組檔案的 PDF 中繼資料（於執行緒池中批次讀取）。
+
+        群組內容未變的群組直接沿用上次的結果；清單欄位原地修改後需呼叫
+        Project.touch_group 使快取失效。回傳的 RenameEntry 可能與之後的
+        計畫共用，請勿直接修改。
+
         Args:
             project: 專案資料
 
         Returns:
             重新命名項目清單
         """
+        subfolder_template = (
+            project.subfolder_template if project.use_subfolders else ""
+        )
+        instruments = tuple(project.instruments)
+        metadata = self._prefetch_metadata(project, subfolder_template)
+        needs_metadata: Dict[str, bool] = {}
         plan = []
-        for group in project.groups:
-            if not group.files or not group.selected_instruments:
-                continue
-            template = (
-                group.small_template
-                if group.use_small_template and group.small_template
-                else project.master_template
-            )
-            for i, file_info in enumerate(group.files):
-                if i >= len(group.selected_instruments):
-                    break
-                variables = build_variables_for_file(
-                    i, group, project.instruments,
-                )
-                new_name = substitute_template(template, variables)
-                original_dir = os.path.dirname(file_info.original_path)
-                if project.use_subfolders and project.subfolder_template:
-                    subfolder_name = substitute_template(
-                        project.subfolder_template, variables,
+        hits = misses = 0
+        with self._cache_lock:
+            for group in project.groups:
+                if not group.files or not group.selected_instruments:
+                    continue
+                template = self._effective_template(group, project)
+                if template not in needs_metadata:
+                    needs_metadata[template] = needs_pdf_metadata(
+                        template, subfolder_template,
                     )
-                    target_dir = os.path.join(original_dir, subfolder_name)
+                if needs_metadata[template]:
+                    plan.extend(self._plan_group(
+                        group, template, subfolder_template, instruments, metadata,
+                    ))
+                    continue
+                key = (group.version, template, subfolder_template, instruments)
+                cached = self._plan_cache.get(group.id)
+                if cached is not None and cached[0] == key:
+                    self._plan_cache.move_to_end(group.id)
+                    entries = cached[1]
+                    hits += 1
                 else:
-                    target_dir = original_dir
-                new_path = os.path.join(target_dir, new_name)
-                plan.append(RenameEntry(
-                    original_path=file_info.original_path,
-                    new_path=new_path,
-                    group_id=group.id,
-                ))
+                    misses += 1
+                    entries = self._plan_group(
+                        group, template, subfolder_template, instruments, {},
+                    )
+                    self._plan_cache[group.id] = (key, entries)
+                    self._plan_cache.move_to_end(group.id)
+                    if len(self._plan_cache) > PLAN_CACHE_SIZE:
+                        self._plan_cache.popitem(last=False)
+                plan.extend(entries)
+        metrics.increment("rename.files_planned", len(plan))
+        metrics.increment("rename.plan_cache_hits", hits)
+        metrics.increment("rename.plan_cache_misses", misses)
         return plan
 
+    def clear_plan_cache(self):
+        """清除計畫快取（例如檔案在程式外被改名後）"""
+        with self._cache_lock:
+            self._plan_cache.clear()
+
+    def _plan_group(
+        self,
+        group: Group,
+        template: str,
+        subfolder_template: str,
+        instruments: Tuple[str, ...],
+        metadata: dict,
+    ) -> List[RenameEntry]:
+        """產生單一群組的重新命名項目"""
+        entries = []
+        # 曲名未填寫時使用偵測結果；偵測只依檔名，群組版本未變時結果相同
+        piece_name = resolve_piece_name(group)
+        for i, file_info in enumerate(group.files):
+            if i >= len(group.selected_instruments):
+                break
+            variables = build_variables_for_file(
+                i, group, instruments,
+                metadata.get(file_info.original_path),
+                piece_name,
+            )
+            new_name = substitute_template(template, variables)
+            original_dir = os.path.dirname(file_info.original_path)
+            if subfolder_template:
+                subfolder_name = substitute_template(subfolder_template, variables)
+                target_dir = os.path.join(original_dir, subfolder_name)
+            else:
+                target_dir = original_dir
+            entries.append(RenameEntry(
+                original_path=file_info.original_path,
+                new_path=os.path.join(target_dir, new_name),
+                group_id=group.id,
+            ))
+        return entries
+
+    def _effective_template(self, group: Group, project: Project) -> str:
+        """取得群組實際使用的模板（小模板優先）"""
+        if group.use_small_template and group.small_template:
+            return group.small_template
+        return project.master_template
+
+    @traced("rename.prefetch_metadata")
+    def _prefetch_metadata(self, project: Project, subfolder_template: str) -> dict:
+        """批次讀取引用中繼資料變數之群組的 PDF 資訊"""
+        paths = []
+        for group in project.groups:
+            template = self._effective_template(group, project)
+            if not needs_pdf_metadata(template, subfolder_template):
+                continue
+            count = len(group.selected_instruments)
+            paths.extend(f.original_path for f in group.files[:count])
+        if not paths:
+            return {}
+        if not self.metadata_service:
+            self.metadata_service = PdfMetadataService()
+        return self.metadata_service.prefetch(paths)
+
+    @traced("rename.detect_conflicts")
     def detect_conflicts(self, plan: List[RenameEntry]) -> Dict[str, List[str]]:
         """偵測重新命名計畫中的檔名衝突
 
@@ -76,8 +182,11 @@ class RenameService:
         for entry in plan:
             key = entry.new_path.lower()
             path_map[key].append(entry.original_path)
-        return {k: v for k, v in path_map.items() if len(v) > 1}
+        conflicts = {k: v for k, v in path_map.items() if len(v) > 1}
+        metrics.increment("rename.conflicts_found", len(conflicts))
+        return conflicts
 
+    @traced("rename.auto_suffix")
     def apply_auto_suffix(self, plan: List[RenameEntry]) -> List[RenameEntry]:
         """為衝突的檔名自動加上後綴
 
@@ -89,6 +198,7 @@ class RenameService:
         """
         seen = defaultdict(int)
         result = []
+        suffixed = 0
         for entry in plan:
             key = entry.new_path.lower()
             count = seen[key]
@@ -96,6 +206,7 @@ class RenameService:
             if count > 0:
                 base, ext = os.path.splitext(entry.new_path)
                 new_path = f"{base} ({count}){ext}"
+                suffixed += 1
             else:
                 new_path = entry.new_path
             result.append(RenameEntry(
@@ -103,8 +214,10 @@ class RenameService:
                 new_path=new_path,
                 group_id=entry.group_id,
             ))
+        metrics.increment("rename.suffixes_applied", suffixed)
         return result
 
+    @traced("rename.execute")
     def execute_rename(
         self, plan: List[RenameEntry], project: Project,
     ) -> UndoRecord:
@@ -117,8 +230,9 @@ class RenameService:
         Returns:
             復原紀錄
         """
+        # 含微秒，同一秒內的多次重新命名（例如批次處理）不會覆寫彼此的復原紀錄
         record = UndoRecord(
-            timestamp=datetime.now().strftime("%Y%m%d_%H%M%S"),
+            timestamp=datetime.now().strftime("%Y%m%d_%H%M%S_%f"),
             description=t("rename.undo_description", count=len(plan)),
         )
         created_dirs = set()
@@ -133,4 +247,5 @@ class RenameService:
                 renamed=entry.new_path,
             ))
         record.created_directories = sorted(created_dirs)
+        metrics.increment("rename.files_renamed", len(record.mappings))
         return record
@@ -8,16 +8,28 @@ import json
 import os
 from typing import Optional
 from core.constants import UNDO_DIR
+from core import metrics
 from core.models import UndoMapping, UndoRecord
+from core.tracing import traced
 from services.file_service import FileService
 
 
 class UndoService:
     """復原操作管理服務"""
 
-    def __init__(self, file_service: FileService):
+    def __init__(self, file_service: FileService, directory: Optional[str] = None):
+        """
+        Args:
+            file_service: 檔案服務
+            directory: 復原紀錄目錄，None 表示使用 UNDO_DIR
+        """
         self.file_service = file_service
+        self.directory = directory
+
+    def _directory(self) -> str:
+        return self.directory or UNDO_DIR
 
+    @traced("undo.save_record")
     def save_undo_record(self, record: UndoRecord) -> str:
         """儲存復原紀錄至檔案
 
@@ -27,9 +39,10 @@ class UndoService:
         Returns:
             儲存的檔案路徑
         """
-        os.makedirs(UNDO_DIR, exist_ok=True)
+        directory = self._directory()
+        os.makedirs(directory, exist_ok=True)
         filename = f"undo_{record.timestamp}.json"
-        filepath = os.path.join(UNDO_DIR, filename)
+        filepath = os.path.join(directory, filename)
         data = {
             "timestamp": record.timestamp,
             "description": record.description,
@@ -41,24 +54,27 @@ class UndoService:
         }
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            metrics.increment("undo.record_bytes", f.tell())
         return filepath
 
+    @traced("undo.latest_record")
     def get_latest_undo_record(self) -> Optional[UndoRecord]:
         """取得最近一次的復原紀錄
 
         Returns:
             復原紀錄，若無則回傳 None
         """
-        if not os.path.isdir(UNDO_DIR):
+        directory = self._directory()
+        if not os.path.isdir(directory):
             return None
         files = [
-            f for f in os.listdir(UNDO_DIR)
+            f for f in os.listdir(directory)
             if f.startswith("undo_") and f.endswith(".json")
         ]
         if not files:
             return None
         files.sort(reverse=True)
-        filepath = os.path.join(UNDO_DIR, files[0])
+        filepath = os.path.join(directory, files[0])
         return self._load_record(filepath)
 
     def _load_record(self, filepath: str) -> UndoRecord:
@@ -84,20 +100,28 @@ class UndoService:
             ))
         return record
 
+    @traced("undo.execute")
     def execute_undo(self, record: UndoRecord) -> None:
         """執行復原操作
 
-        逆序重新命名檔案，然後清理空的子資料夾。
+        逆序重新命名檔案，然後清理空的子資料夾。已不存在的檔案會略過
+        （計入 undo.skipped）。
 
         Args:
             record: 復原紀錄
         """
+        restored = skipped = 0
         for mapping in reversed(record.mappings):
-            if os.path.isfile(mapping.renamed):
+            if self.file_service.file_exists(mapping.renamed):
                 target_dir = os.path.dirname(mapping.original)
                 if target_dir and not os.path.isdir(target_dir):
                     self.file_service.create_directory(target_dir)
                 self.file_service.rename_file(mapping.renamed, mapping.original)
+                restored += 1
+            else:
+                skipped += 1
+        metrics.increment("undo.files_restored", restored)
+        metrics.increment("undo.skipped", skipped)
         for dir_path in reversed(sorted(record.created_directories)):
             self.file_service.remove_empty_directory(dir_path)
         self._remove_record_file(record)
@@ -109,6 +133,6 @@ class UndoService:
             record: 復原紀錄
         """
         filename = f"undo_{record.timestamp}.json"
-        filepath = os.path.join(UNDO_DIR, filename)
+        filepath = os.path.join(self._directory(), filename)
         if os.path.isfile(filepath):
             os.remove(filepath)
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+"""
+收件匣監看服務
+
+定期掃描設定的收件匣資料夾，把陸續匯出的 PDF 分批重新命名並移到檔案庫：
+
+- 分批：收件匣中每個含 PDF 的子資料夾為一批，根目錄的 PDF 為一批
+  （依檔名分群並偵測曲名，見 ImportService.cluster_files）。
+- 靜止期：一批檔案的名稱、大小與修改時間在 quiet_period 秒內都沒有變動，
+  才視為匯出完成並開始處理。
+- 模板：套用資料夾設定的 .llproj 專案檔（未設定時使用收件匣根目錄中的
+  第一個 .llproj）的樂器表、別名與模板，依檔名自動對應樂器。
+- 背景處理：最多 workers 批同時處理；每批的重新命名都寫入復原紀錄。
+- 進度：已處理與失敗的批次（以內容簽章判斷）以及執行中的計畫記錄在
+  狀態檔，重新啟動後不會重複處理；中途當機的批次於 recover() 時依磁碟
+  上的結果補寫復原紀錄。
+
+使用範例：
+    service = WatchService([WatchFolder(inbox, library)], state_path)
+    service.recover()
+    while running:
+        service.scan()
+        time.sleep(2)
+    service.shutdown()
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from core.constants import PROJECT_EXTENSION
+from core.locale import t
+from core.models import Group, Project, RenameEntry, UndoMapping, UndoRecord
+from services.file_service import FileService
+
+DEFAULT_QUIET_PERIOD = 10.0
+DEFAULT_WORKERS = 2
+
+Event = Dict[str, Any]
+
+
+@dataclass
+class WatchFolder:
+    """一個監看的收件匣"""
+    inbox: str
+    library: str
+    # 套用的 .llproj；空字串表示使用收件匣根目錄中的第一個 .llproj
+    template: str = ""
+
+
+@dataclass
+class Batch:
+    """一批待處理的檔案"""
+    key: str
+    folder: WatchFolder
+    directory: str
+    files: List[str] = field(default_factory=list)
+    signature: str = ""
+
+    @property
+    def is_root(self) -> bool:
+        """是否為收件匣根目錄的檔案"""
+        return self.directory == self.folder.inbox
+
+
+def _signature(entries: List[Tuple[str, int, int]]) -> str:
+    digest = hashlib.sha1()
+    for name, size, mtime in sorted(entries):
+        digest.update(f"{name}\0{size}\0{mtime}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _scan_pdfs(directory: str) -> Tuple[List[str], str]:
+    """列出目錄中的 PDF 並計算內容簽章"""
+    entries = []
+    paths = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.lower().endswith(".pdf"):
+                st = entry.stat()
+                entries.append((entry.name, st.st_size, st.st_mtime_ns))
+                paths.append(entry.path)
+    paths.sort(key=lambda p: os.path.basename(p).lower())
+    return paths, _signature(entries)
+
+
+def _write_json_atomic(path: str, data: Any):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".watch-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WatchState:
+    """持久化的處理進度"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # 批次鍵 -> 已處理的內容簽章
+        self.done: Dict[str, str] = {}
+        # 批次鍵 -> 失敗時的內容簽章（內容改變後才重試）
+        self.failed: Dict[str, str] = {}
+        # 批次鍵 -> 執行中的計畫 {"mappings": [[原路徑, 新路徑], ...], "new_directories": [...]}
+        self.in_progress: Dict[str, Dict[str, list]] = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """讀取狀態檔（不存在時為空白狀態）"""
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.done = dict(data.get("done", {}))
+        self.failed = dict(data.get("failed", {}))
+        self.in_progress = dict(data.get("in_progress", {}))
+
+    def update(self, func: Callable[["WatchState"], None]):
+        """修改狀態並立即寫入狀態檔"""
+        with self._lock:
+            func(self)
+            _write_json_atomic(self.path, {
+                "done": self.done,
+                "failed": self.failed,
+                "in_progress": self.in_progress,
+            })
+
+    def is_handled(self, key: str, signature: str) -> bool:
+        """此內容的批次是否已處理過（成功或失敗）"""
+        with self._lock:
+            return self.done.get(key) == signature or self.failed.get(key) == signature
+
+
+class WatchService:
+    """收件匣監看與背景重新命名"""
+
+    def __init__(
+        self,
+        folders: List[WatchFolder],
+        state_path: str,
+        quiet_period: float = DEFAULT_QUIET_PERIOD,
+        workers: int = DEFAULT_WORKERS,
+        undo_dir: Optional[str] = None,
+        on_event: Optional[Callable[[Event], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            folders: 監看的收件匣
+            state_path: 狀態檔路徑
+            quiet_period: 一批檔案靜止多久（秒）後才處理
+            workers: 同時處理的批次數
+            undo_dir: 復原紀錄目錄，None 表示使用 UNDO_DIR
+            on_event: 以事件字典呼叫（可能在背景執行緒）
+            clock: 取得目前時間的函式（秒）
+        """
+        self.folders = folders
+        self.quiet_period = quiet_period
+        self.undo_dir = undo_dir
+        self.on_event = on_event
+        self._clock = clock
+        self.state = WatchState(state_path)
+        self.state.load()
+        # 背景處理不覆寫檔案庫中已存在的檔案
+        self.file_service = FileService(overwrite=False)
+        # 批次鍵 -> (目前的簽章, 簽章開始維持不變的時間)
+        self._observed: Dict[str, Tuple[str, float]] = {}
+        self._running: Set[str] = set()
+        self._running_lock = threading.Lock()
+        # 檔案庫 -> 鎖；同一檔案庫的批次從決定目標檔名到移動完成依序進行
+        self._library_locks: Dict[str, threading.Lock] = {}
+        # 模板路徑 -> (修改時間, 專案)
+        self._templates: Dict[str, Tuple[int, Project]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="watch")
+        self._futures = []
+
+    # ── 掃描 ──
+
+    def scan(self, now: Optional[float] = None) -> List[Batch]:
+        """掃描所有收件匣，將靜止時間已滿的批次交給背景處理
+
+        Args:
+            now: 目前時間；None 表示使用 clock()
+
+        Returns:
+            本次開始處理的批次
+        """
+        now = self._clock() if now is None else now
+        seen = set()
+        started = []
+        for folder in self.folders:
+            for batch in self._find_batches(folder):
+                seen.add(batch.key)
+                observed = self._observed.get(batch.key)
+                if observed is None or observed[0] != batch.signature:
+                    self._observed[batch.key] = (batch.signature, now)
+                    if self.quiet_period > 0:
+                        continue
+                elif now - observed[1] < self.quiet_period:
+                    continue
+                if self.state.is_handled(batch.key, batch.signature):
+                    continue
+                with self._running_lock:
+                    if batch.key in self._running:
+                        continue
+                    self._running.add(batch.key)
+                self._futures.append(self._pool.submit(self._process, batch))
+                started.append(batch)
+        for key in [k for k in self._observed if k not in seen]:
+            del self._observed[key]
+        self._futures = [f for f in self._futures if not f.done()]
+        return started
+
+    def _find_batches(self, folder: WatchFolder) -> List[Batch]:
+        if not os.path.isdir(folder.inbox):
+            return []
+        batches = []
+        directories = [folder.inbox] + self.file_service.list_subdirectories(folder.inbox)
+        for directory in directories:
+            try:
+                files, signature = _scan_pdfs(directory)
+            except OSError:
+                # 資料夾在掃描途中被移除
+                continue
+            if files:
+                batches.append(Batch(
+                    key=os.path.normpath(directory), folder=folder,
+                    directory=directory, files=files, signature=signature,
+                ))
+        return batches
+
+    def wait(self):
+        """等待所有處理中的批次完成"""
+        for future in list(self._futures):
+            future.result()
+        self._futures = []
+
+    def shutdown(self):
+        """等待處理中的批次完成並停止背景執行緒"""
+        self._pool.shutdown(wait=True)
+
+    # ── 處理 ──
+
+    def _emit(self, event: str, batch: Batch, **fields):
+        if self.on_event:
+            self.on_event(dict(event=event, batch=batch.key, **fields))
+
+    def _process(self, batch: Batch):
+        try:
+            renamed, undo_path = self.process_batch(batch)
+        except Exception as e:
+            self.state.update(lambda s: s.failed.__setitem__(batch.key, batch.signature))
+            self._emit("error", batch, message=str(e))
+        else:
+            self._emit("done", batch, renamed=renamed, undo_record=undo_path)
+        finally:
+            with self._running_lock:
+                self._running.discard(batch.key)
+
+    def process_batch(self, batch: Batch) -> Tuple[int, Optional[str]]:
+        """重新命名一批檔案並移到檔案庫
+
+        Args:
+            batch: 批次
+
+        Returns:
+            (移動的檔案數, 復原紀錄路徑) 元組；沒有可處理的檔案時路徑為 None
+        """
+        from services.rename_service import RenameService
+        project = self._build_project(batch)
+        rename_service = RenameService(self.file_service)
+        with self._library_lock(batch.folder.library):
+            return self._move_batch(batch, project, rename_service)
+
+    def _library_lock(self, library: str) -> threading.Lock:
+        key = os.path.normcase(os.path.abspath(library))
+        with self._running_lock:
+            return self._library_locks.setdefault(key, threading.Lock())
+
+    def _move_batch(self, batch: Batch, project: Project, rename_service) -> Tuple[int, Optional[str]]:
+        plan = self._relocate(batch, rename_service.generate_rename_plan(project))
+        if not plan:
+            self.state.update(lambda s: self._finish(s, batch))
+            return 0, None
+        new_directories = sorted({
+            os.path.dirname(e.new_path) for e in plan
+            if not os.path.isdir(os.path.dirname(e.new_path))
+        })
+
+        def begin(state: WatchState):
+            state.in_progress[batch.key] = {
+                "mappings": [[e.original_path, e.new_path] for e in plan],
+                "new_directories": new_directories,
+            }
+        self.state.update(begin)
+        try:
+            record = rename_service.execute_rename(plan, project)
+        except OSError:
+            # 已移動的檔案仍需可復原；目標檔名被其他程式佔用時
+            # （FileExistsError）整批失敗，不覆寫檔案庫中的檔案
+            self._recover_batch(batch.key)
+            raise
+        undo_path = self._undo_service().save_undo_record(record)
+        self.state.update(lambda s: self._finish(s, batch))
+        return len(record.mappings), undo_path
+
+    @staticmethod
+    def _finish(state: WatchState, batch: Batch):
+        state.in_progress.pop(batch.key, None)
+        state.failed.pop(batch.key, None)
+        state.done[batch.key] = batch.signature
+
+    def _undo_service(self):
+        from services.undo_service import UndoService
+        return UndoService(self.file_service, self.undo_dir)
+
+    def _build_project(self, batch: Batch) -> Project:
+        from core.instrument_matcher import auto_assign_group, matcher_for_project
+        from core.template_engine import detect_piece_name
+        from services.import_service import ImportService
+        template = self._load_template(batch.folder)
+        # 每批使用新的專案，模板快取不會被背景執行緒修改
+        project = Project(
+            instruments=list(template.instruments),
+            master_template=template.master_template,
+            use_subfolders=template.use_subfolders,
+            subfolder_template=template.subfolder_template,
+            instrument_aliases={
+                name: list(aliases) for name, aliases in template.instrument_aliases.items()
+            },
+        )
+        matcher = matcher_for_project(project)
+        import_service = ImportService(self.file_service)
+        files = import_service.import_files(batch.files)
+        if batch.is_root:
+            groups, _ = import_service.cluster_files(
+                files, os.path.basename(batch.folder.inbox), matcher,
+            )
+        else:
+            groups = [Group(
+                name=os.path.basename(batch.directory),
+                files=files,
+                piece_name=detect_piece_name([f.display_name for f in files]),
+            )]
+        for group in groups:
+            auto_assign_group(group, matcher)
+        project.groups = groups
+        return project
+
+    def _load_template(self, folder: WatchFolder) -> Project:
+        path = folder.template
+        if not path:
+            candidates = sorted(glob.glob(os.path.join(folder.inbox, "*" + PROJECT_EXTENSION)))
+            if not candidates:
+                raise FileNotFoundError(f"收件匣中沒有 {PROJECT_EXTENSION} 模板：{folder.inbox}")
+            path = candidates[0]
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._templates.get(path)
+        if cached is None or cached[0] != mtime:
+            from services.project_service import ProjectService
+            cached = (mtime, ProjectService().load_project(path))
+            self._templates[path] = cached
+        return cached[1]
+
+    def _relocate(self, batch: Batch, plan: List[RenameEntry]) -> List[RenameEntry]:
+        """將計畫的新路徑移到檔案庫，並避開計畫內與檔案庫中已存在的檔名"""
+        relocated = []
+        for entry in plan:
+            relative = os.path.relpath(entry.new_path, os.path.dirname(entry.original_path))
+            relocated.append(RenameEntry(
+                original_path=entry.original_path,
+                new_path=os.path.join(batch.folder.library, relative),
+                group_id=entry.group_id,
+            ))
+        taken: Set[str] = set()
+        for entry in relocated:
+            base, ext = os.path.splitext(entry.new_path)
+            candidate, number = entry.new_path, 0
+            while candidate.lower() in taken or os.path.exists(candidate):
+                number += 1
+                candidate = f"{base} ({number}){ext}"
+            taken.add(candidate.lower())
+            entry.new_path = candidate
+        return relocated
+
+    # ── 當機復原 ──
+
+    def recover(self) -> List[str]:
+        """為上次中途停止的批次補寫復原紀錄
+
+        Returns:
+            補寫的復原紀錄路徑
+        """
+        paths = []
+        for key in list(self.state.in_progress):
+            path = self._recover_batch(key)
+            if path:
+                paths.append(path)
+        return paths
+
+    def _recover_batch(self, key: str) -> Optional[str]:
+        journal = self.state.in_progress.get(key)
+        if journal is None:
+            return None
+        mappings = [
+            UndoMapping(original=original, renamed=renamed)
+            for original, renamed in journal["mappings"]
+            if os.path.isfile(renamed) and not os.path.exists(original)
+        ]
+        undo_path = None
+        if mappings:
+            record = UndoRecord(
+                timestamp=datetime.now().strftime("%Y%m%d_%H%M%S_%f"),
+                description=t("rename.undo_description", count=len(mappings)),
+                mappings=mappings,
+                created_directories=[
+                    d for d in journal.get("new_directories", []) if os.path.isdir(d)
+                ],
+            )
+            undo_path = self._undo_service().save_undo_record(record)
+        # 未移動的檔案留在收件匣，內容簽章改變後會成為新的批次
+        self.state.update(lambda s: s.in_progress.pop(key, None))
+        return undo_path
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+樂器別名對話框
+
+以文字方式編輯樂器別名，每行格式為「樂器名稱 = 別名1, 別名2」。
+"""
+from typing import Callable, Dict, List, Optional
+import customtkinter as ctk
+from core.locale import t
+
+
+def format_aliases(instruments: List[str], aliases: Dict[str, List[str]]) -> str:
+    """將別名表轉為編輯用文字（樂器表中的樂器都會列出）
+
+    Args:
+        instruments: 樂器表
+        aliases: 樂器名稱到別名清單的對應
+
+    Returns:
+        多行文字
+    """
+    names = list(instruments) + [n for n in aliases if n not in instruments]
+    return "\n".join(
+        f"{name} = {', '.join(aliases.get(name, []))}".rstrip()
+        for name in names
+    )
+
+
+def parse_aliases(text: str) -> Dict[str, List[str]]:
+    """解析編輯用文字為別名表，忽略空行與沒有別名的樂器
+
+    Args:
+        text: 多行文字
+
+    Returns:
+        樂器名稱到別名清單的對應
+    """
+    result = {}
+    for line in text.splitlines():
+        if "=" not in line:
+            continue
+        name, _, values = line.partition("=")
+        name = name.strip()
+        aliases = [a.strip() for a in values.split(",") if a.strip()]
+        if name and aliases:
+            result[name] = aliases
+    return result
+
+
+class AliasDialog(ctk.CTkToplevel):
+    """樂器別名編輯對話框"""
+
+    def __init__(
+        self,
+        master,
+        instruments: List[str],
+        aliases: Dict[str, List[str]],
+        on_save: Optional[Callable[[Dict[str, List[str]]], None]] = None,
+        **kwargs,
+    ):
+        super().__init__(master, **kwargs)
+        self.title(t("alias.title"))
+        self.geometry("520x480")
+        self.minsize(400, 300)
+        self._on_save = on_save
+        self._build_ui(format_aliases(instruments, aliases))
+        self.transient(master)
+        self.focus_set()
+
+    def _build_ui(self, text: str):
+        ctk.CTkLabel(self, text=t("alias.hint"), anchor="w").pack(
+            fill="x", padx=8, pady=(8, 4),
+        )
+        self._textbox = ctk.CTkTextbox(self)
+        self._textbox.pack(fill="both", expand=True, padx=8, pady=4)
+        self._textbox.insert("1.0", text)
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.pack(fill="x", padx=8, pady=8)
+        ctk.CTkButton(
+            btn_frame, text=t("alias.cancel"), width=100,
+            fg_color="gray", hover_color="gray30",
+            command=self.destroy,
+        ).pack(side="right", padx=4)
+        ctk.CTkButton(
+            btn_frame, text=t("alias.save"), width=100,
+            command=self._save,
+        ).pack(side="right", padx=4)
+
+    def _save(self):
+        if self._on_save:
+            self._on_save(parse_aliases(self._textbox.get("1.0", "end")))
+        self.destroy()
@@ -2,12 +2,27 @@
 """
 檔案清單元件
 
-提供檔案列表的顯示、排序與管理功能。
+提供檔案列表的顯示、排序與管理功能。列元件建立在 VirtualList 上，只保留
+可見範圍內固定數量的列並在捲動時重新綁定資料；上下移動時只更新互換的
+兩列，不會重建整個清單。
 """
 from typing import Callable, List, Optional
 import customtkinter as ctk
 from core.locale import t
 from core.models import FileInfo
+from core.tracing import traced
+from ui.i18n import on_relabel, tr
+from ui.virtual_list import VirtualList
+
+DUPLICATE_TEXT_COLOR = ("#d35400", "#e67e22")
+ROW_HEIGHT = 30
+
+
+def file_label(file_info: FileInfo) -> str:
+    """檔案列顯示文字，重複檔案附加標記"""
+    if file_info.duplicate_of:
+        return file_info.display_name + t("file_list.duplicate")
+    return file_info.display_name
 
 
 class FileListWidget(ctk.CTkFrame):
@@ -17,76 +32,118 @@ class FileListWidget(ctk.CTkFrame):
         self,
         master,
         on_changed: Optional[Callable[[], None]] = None,
+        on_removed: Optional[Callable[[FileInfo], None]] = None,
+        reorderable: bool = True,
+        show_instruments: bool = True,
+        action_key: str = "",
+        on_action: Optional[Callable[[int, object], None]] = None,
+        empty_key: str = "file_list.empty",
         **kwargs,
     ):
+        """
+        Args:
+            master: 父元件
+            on_changed: 清單被移動或刪除項目後呼叫（清單已原地修改）
+            on_removed: 項目被刪除後以該 FileInfo 呼叫
+            reorderable: 是否顯示上移／下移按鈕
+            show_instruments: 是否顯示樂器欄
+            action_key: 額外按鈕文字的翻譯鍵名（空字串表示不顯示）
+            on_action: 額外按鈕按下時以（索引, 列元件）呼叫
+            empty_key: 清單為空時顯示文字的翻譯鍵名
+        """
         super().__init__(master, **kwargs)
         self._files: List[FileInfo] = []
         self._instrument_labels: List[str] = []
         self._on_changed = on_changed
-        self._build_ui()
-
-    def _build_ui(self):
-        self._scroll = ctk.CTkScrollableFrame(self)
-        self._scroll.pack(fill="both", expand=True)
+        self._on_removed = on_removed
+        self._reorderable = reorderable
+        self._show_instruments = show_instruments
+        self._action_key = action_key
+        self._on_action = on_action
+        self._default_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
+        self._list = VirtualList(
+            self, self._create_row, self._bind_row, row_height=ROW_HEIGHT,
+            fg_color="transparent",
+        )
+        tr(self._list.empty_label, empty_key)
+        self._list.pack(fill="both", expand=True)
+        # 重複檔案標記隨語言變更
+        on_relabel(self, self._list.refresh)
 
+    @traced("ui.file_list.set_files")
     def set_files(self, files: List[FileInfo]):
-        """設定檔案清單
+        """設定檔案清單（與呼叫端共用同一個清單物件，移動與刪除會原地修改）
 
         Args:
             files: FileInfo 清單
         """
         self._files = files
-        self._refresh()
+        self._list.set_count(len(files))
 
     def set_instrument_labels(self, labels: List[str]):
         """設定對應的樂器標籤
 
         Args:
-            labels: 樂器名稱清單
+            labels: 依位置對應的樂器名稱清單
         """
         self._instrument_labels = labels
-        self._refresh()
+        self._list.refresh()
 
     def get_files(self) -> List[FileInfo]:
         """取得目前檔案清單"""
         return list(self._files)
 
-    def _refresh(self):
-        for widget in self._scroll.winfo_children():
-            widget.destroy()
-        if not self._files:
-            ctk.CTkLabel(
-                self._scroll, text=t("file_list.empty"), text_color="gray",
-            ).pack(pady=8)
-            return
-        for i, file_info in enumerate(self._files):
-            row = ctk.CTkFrame(self._scroll, fg_color="transparent")
-            row.pack(fill="x", pady=1)
-            if i < len(self._instrument_labels):
-                ctk.CTkLabel(
-                    row, text=self._instrument_labels[i],
-                    width=100, anchor="w",
-                    font=ctk.CTkFont(size=11),
-                    text_color=("gray40", "gray60"),
-                ).pack(side="left", padx=(4, 2))
-            ctk.CTkLabel(
-                row, text=file_info.display_name, anchor="w",
-            ).pack(side="left", fill="x", expand=True, padx=2)
-            btn_frame = ctk.CTkFrame(row, fg_color="transparent")
-            btn_frame.pack(side="right")
+    def refresh(self):
+        """清單在外部被修改後重新顯示"""
+        self._list.set_count(len(self._files))
+
+    def _create_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        row.file_index = -1
+        if self._show_instruments:
+            row.instrument_label = ctk.CTkLabel(
+                row, text="", width=100, anchor="w",
+                font=ctk.CTkFont(size=11), text_color=("gray40", "gray60"),
+            )
+            row.instrument_label.pack(side="left", padx=(4, 2))
+        row.name_label = ctk.CTkLabel(row, text="", anchor="w")
+        row.name_label.pack(side="left", fill="x", expand=True, padx=2)
+        btn_frame = ctk.CTkFrame(row, fg_color="transparent")
+        btn_frame.pack(side="right")
+        if self._action_key:
+            tr(ctk.CTkButton(
+                btn_frame, width=90, height=24,
+                command=lambda: self._on_action(row.file_index, row),
+            ), self._action_key).pack(side="left", padx=1)
+        if self._reorderable:
             ctk.CTkButton(
                 btn_frame, text="\u25B2", width=28, height=24,
-                command=lambda idx=i: self._move_up(idx),
+                command=lambda: self._move_up(row.file_index),
             ).pack(side="left", padx=1)
             ctk.CTkButton(
                 btn_frame, text="\u25BC", width=28, height=24,
-                command=lambda idx=i: self._move_down(idx),
-            ).pack(side="left", padx=1)
-            ctk.CTkButton(
-                btn_frame, text="\u2715", width=28, height=24,
-                fg_color="#c0392b", hover_color="#e74c3c",
-                command=lambda idx=i: self._remove(idx),
+                command=lambda: self._move_down(row.file_index),
             ).pack(side="left", padx=1)
+        ctk.CTkButton(
+            btn_frame, text="\u2715", width=28, height=24,
+            fg_color="#c0392b", hover_color="#e74c3c",
+            command=lambda: self._remove(row.file_index),
+        ).pack(side="left", padx=1)
+        return row
+
+    def _bind_row(self, row, index: int):
+        row.file_index = index
+        file_info = self._files[index]
+        if self._show_instruments:
+            labels = self._instrument_labels
+            row.instrument_label.configure(
+                text=labels[index] if index < len(labels) else "",
+            )
+        row.name_label.configure(
+            text=file_label(file_info),
+            text_color=DUPLICATE_TEXT_COLOR if file_info.duplicate_of
+            else self._default_color,
+        )
 
     def _move_up(self, index: int):
         if index <= 0:
@@ -94,7 +151,7 @@ class FileListWidget(ctk.CTkFrame):
         self._files[index], self._files[index - 1] = (
             self._files[index - 1], self._files[index]
         )
-        self._refresh()
+        self._list.refresh((index - 1, index))
         self._notify()
 
     def _move_down(self, index: int):
@@ -103,13 +160,15 @@ class FileListWidget(ctk.CTkFrame):
         self._files[index], self._files[index + 1] = (
             self._files[index + 1], self._files[index]
         )
-        self._refresh()
+        self._list.refresh((index, index + 1))
         self._notify()
 
     def _remove(self, index: int):
         if 0 <= index < len(self._files):
-            self._files.pop(index)
-            self._refresh()
+            removed = self._files.pop(index)
+            self._list.set_count(len(self._files))
+            if self._on_removed:
+                self._on_removed(removed)
             self._notify()
 
     def _notify(self):
@@ -3,19 +3,50 @@
 群組管理面板
 
 提供群組標籤管理、樂器勾選與群組變數輸入。
+
+所有編輯都立即經由 Project 的 update_group / touch_group 等方法寫回資料，
+不需要在預覽或儲存前逐一同步每個標籤。
 """
-from typing import List, Optional, TYPE_CHECKING
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 import customtkinter as ctk
 from core.locale import t
-from core.models import Group, Project, FileInfo
+from core.models import FileInfo, Group, InstrumentChange, Project
+from core.instrument_matcher import auto_assign_group, matcher_for_project
 from core.template_engine import detect_piece_name
+from core.tracing import traced
+from services.project_format import group_headers, group_ids
+from ui.file_list import FileListWidget
+from ui.i18n import on_relabel, tr
 
 if TYPE_CHECKING:
     from ui.main_window import MainWindow
 
+# 同時保留內容的群組標籤數
+TAB_CACHE_SIZE = 8
+
+
+def _assign_group(project: Project, group: Group, matcher) -> Tuple[List[FileInfo], bool]:
+    """自動對應群組的樂器，只在檔案順序或勾選改變時通知變更
+
+    Returns:
+        (無法對應的檔案, 群組是否改變) 元組
+    """
+    before = (list(group.files), list(group.selected_instruments))
+    unmatched = auto_assign_group(group, matcher)
+    changed = (group.files, group.selected_instruments) != before
+    if changed:
+        project.touch_group(group, "files", "selected_instruments")
+    return unmatched, changed
+
 
 class GroupPanel(ctk.CTkFrame):
-    """群組管理面板，使用 CTkTabview 管理多個群組標籤"""
+    """群組管理面板，使用 CTkTabview 管理多個群組標籤
+
+    群組標籤的內容在第一次被選取時才建立，並只保留最近使用的
+    TAB_CACHE_SIZE 個；較早的內容會被釋放，再次選取時重新建立。編輯都已
+    即時寫回群組，釋放前不需要同步。
+    """
 
     def __init__(
         self,
@@ -27,20 +58,35 @@ class GroupPanel(ctk.CTkFrame):
         super().__init__(master, **kwargs)
         self.project = project
         self.main_window = main_window
+        # 已建立內容的標籤（含未分組標籤）
         self._tab_contents = {}
+        # 標籤名稱 <-> 群組 ID
+        self._tab_groups: Dict[str, str] = {}
+        self._group_tabs: Dict[str, str] = {}
+        # 已建立內容的群組標籤，依最近使用排序
+        self._recent_tabs: "OrderedDict[str, None]" = OrderedDict()
         self._ungrouped_tab_name = t("group.ungrouped")
         self._build_ui()
 
     def _build_ui(self):
         top_bar = ctk.CTkFrame(self, fg_color="transparent")
         top_bar.pack(fill="x", padx=4, pady=(4, 0))
-        add_btn = ctk.CTkButton(
-            top_bar, text=t("group.add"), width=100,
-            command=self._add_group,
-        )
+        add_btn = tr(ctk.CTkButton(
+            top_bar, width=100, command=self._add_group,
+        ), "group.add")
         add_btn.pack(side="right")
-        self._tabview = ctk.CTkTabview(self, anchor="nw")
+        tr(ctk.CTkButton(
+            top_bar, width=100, command=self._auto_assign_all,
+        ), "group.auto_assign_all").pack(side="right", padx=(0, 4))
+        self._tabview = ctk.CTkTabview(
+            self, anchor="nw", command=self._on_tab_selected,
+        )
         self._tabview.pack(fill="both", expand=True, padx=4, pady=4)
+        self._create_tabs()
+        on_relabel(self, self._relabel)
+
+    @traced("ui.group_panel.create_tabs")
+    def _create_tabs(self):
         self._tabview.add(self._ungrouped_tab_name)
         ungrouped_content = UngroupedTabContent(
             self._tabview.tab(self._ungrouped_tab_name),
@@ -49,30 +95,56 @@ class GroupPanel(ctk.CTkFrame):
         )
         ungrouped_content.pack(fill="both", expand=True)
         self._tab_contents[self._ungrouped_tab_name] = ungrouped_content
-        for group in self.project.groups:
-            self._create_group_tab(group)
+        # 只讀取群組 ID 與名稱，尚未解析的群組維持不解析
+        for group_id, name in group_headers(self.project.groups):
+            self._create_group_tab(group_id, name, select=False)
 
     def _add_group(self):
         group = Group(name=t("group.new_name", number=len(self.project.groups) + 1))
-        self.project.groups.append(group)
-        self._create_group_tab(group)
-        self.main_window._mark_modified()
-
-    def _create_group_tab(self, group: Group):
-        tab_name = group.name or group.id[:8]
-        if tab_name in [self._tabview._name_list[i] for i in range(len(self._tabview._name_list))] if hasattr(self._tabview, '_name_list') else False:
-            tab_name = f"{tab_name} ({group.id[:4]})"
+        self.project.add_group(group)
+        self._create_group_tab(group.id, group.name)
+
+    def _create_group_tab(self, group_id: str, name: str, select: bool = True):
+        tab_name = name or group_id[:8]
+        if tab_name in self._tab_groups or tab_name == self._ungrouped_tab_name:
+            tab_name = f"{tab_name} ({group_id[:4]})"
         self._tabview.add(tab_name)
-        content = GroupTabContent(
-            self._tabview.tab(tab_name),
-            group,
-            self.project,
-            self.main_window,
-            on_delete=lambda g=group, t_name=tab_name: self._delete_group(g, t_name),
-        )
-        content.pack(fill="both", expand=True)
-        self._tab_contents[tab_name] = content
-        self._tabview.set(tab_name)
+        self._tab_groups[tab_name] = group_id
+        self._group_tabs[group_id] = tab_name
+        if select:
+            self._tabview.set(tab_name)
+            self._on_tab_selected()
+
+    @traced("ui.group_panel.select_tab")
+    def _on_tab_selected(self):
+        """建立目前標籤的內容，並釋放超出最近使用範圍的標籤"""
+        tab_name = self._tabview.get()
+        if tab_name not in self._tab_groups:
+            return
+        if tab_name not in self._tab_contents:
+            group = self._find_group(self._tab_groups[tab_name])
+            if group is None:
+                return
+            content = GroupTabContent(
+                self._tabview.tab(tab_name),
+                group,
+                self.project,
+                self.main_window,
+                on_delete=lambda g=group, t_name=tab_name: self._delete_group(g, t_name),
+            )
+            content.pack(fill="both", expand=True)
+            self._tab_contents[tab_name] = content
+        self._recent_tabs[tab_name] = None
+        self._recent_tabs.move_to_end(tab_name)
+        while len(self._recent_tabs) > TAB_CACHE_SIZE:
+            old_name, _ = self._recent_tabs.popitem(last=False)
+            self._tab_contents.pop(old_name).destroy()
+
+    def _find_group(self, group_id: str) -> Optional[Group]:
+        ids = group_ids(self.project.groups)
+        if group_id not in ids:
+            return None
+        return self.project.groups[ids.index(group_id)]
 
     def _delete_group(self, group: Group, tab_name: str):
         from tkinter import messagebox
@@ -82,50 +154,93 @@ class GroupPanel(ctk.CTkFrame):
         ):
             return
         self.project.ungrouped_files.extend(group.files)
+        self.project.touch("ungrouped_files")
         if group in self.project.groups:
-            self.project.groups.remove(group)
-        if tab_name in self._tab_contents:
-            del self._tab_contents[tab_name]
+            self.project.remove_group(group)
+        self._tab_contents.pop(tab_name, None)
+        self._recent_tabs.pop(tab_name, None)
+        self._tab_groups.pop(tab_name, None)
+        self._group_tabs.pop(group.id, None)
         self._tabview.delete(tab_name)
         self._tabview.set(self._ungrouped_tab_name)
         self.refresh_ungrouped()
-        self.main_window._mark_modified()
 
-    def on_instruments_changed(self, instruments: List[str]):
-        """樂器表變更時更新所有群組的勾選框"""
+    def _auto_assign_all(self):
+        """依檔名為所有群組自動對應樂器"""
+        matcher = matcher_for_project(self.project)
+        matched = unmatched = 0
+        changed = set()
+        for group in self.project.groups:
+            missed, modified = _assign_group(self.project, group, matcher)
+            if modified:
+                changed.add(group.id)
+            unmatched += len(missed)
+            matched += len(group.files) - len(missed)
+        for content in self._tab_contents.values():
+            group = getattr(content, '_group', None)
+            if group is not None and group.id in changed:
+                content.reload_from_group()
+        self.main_window._set_status(
+            "status.auto_assigned", matched=matched, unmatched=unmatched,
+        )
+
+    @traced("ui.group_panel.instrument_change")
+    def on_instrument_change(self, change: InstrumentChange):
+        """樂器表變動時修補已建立標籤的勾選框（未建立的標籤建立時直接讀取專案）"""
         for name, content in self._tab_contents.items():
-            if hasattr(content, 'on_instruments_changed'):
-                content.on_instruments_changed(instruments)
+            if hasattr(content, 'apply_instrument_change'):
+                content.apply_instrument_change(change)
+
+    def _relabel(self):
+        """切換語言後重新命名未分組標籤（與群組同名時保留原名）"""
+        old_name, new_name = self._ungrouped_tab_name, t("group.ungrouped")
+        if new_name == old_name or new_name in self._tab_groups:
+            return
+        self._tabview.rename(old_name, new_name)
+        self._tab_contents[new_name] = self._tab_contents.pop(old_name)
+        self._ungrouped_tab_name = new_name
 
     def refresh_ungrouped(self):
         """重新整理未分組標籤"""
         if self._ungrouped_tab_name in self._tab_contents:
             self._tab_contents[self._ungrouped_tab_name].refresh()
 
+    @traced("ui.group_panel.refresh_group")
+    def refresh_group(self, group: Group):
+        """群組資料在外部被修改後，重新整理該群組的標籤（尚未建立則略過）"""
+        content = self._tab_contents.get(self._group_tabs.get(group.id))
+        if content is not None:
+            content.refresh_file_list()
+
+    def set_project(self, project: Project):
+        """切換到另一個專案（開啟或新建專案時）並重新載入所有標籤
+
+        Args:
+            project: 新的專案資料
+        """
+        self.project = project
+        self.reload_all()
+
+    @traced("ui.group_panel.reload_all")
     def reload_all(self):
-        """重新載入所有標籤（用於專案開啟或重設）"""
-        for name in list(self._tab_contents.keys()):
-            if name != self._ungrouped_tab_name:
-                self._tabview.delete(name)
+        """重新載入所有標籤（群組清單在外部被大幅修改時）"""
+        for name in list(self._tab_groups) + [self._ungrouped_tab_name]:
+            self._tabview.delete(name)
         self._tab_contents = {}
-        self._tabview.delete(self._ungrouped_tab_name)
+        self._tab_groups = {}
+        self._group_tabs = {}
+        self._recent_tabs = OrderedDict()
         self._ungrouped_tab_name = t("group.ungrouped")
-        self._tabview.add(self._ungrouped_tab_name)
-        ungrouped_content = UngroupedTabContent(
-            self._tabview.tab(self._ungrouped_tab_name),
-            self.project,
-            self.main_window,
-        )
-        ungrouped_content.pack(fill="both", expand=True)
-        self._tab_contents[self._ungrouped_tab_name] = ungrouped_content
-        for group in self.project.groups:
-            self._create_group_tab(group)
+        self._create_tabs()
 
-    def sync_to_project(self):
-        """將所有面板的目前狀態同步至 project 資料"""
+    @traced("ui.group_panel.refresh_file_lists")
+    def refresh_file_lists(self):
+        """重新整理已建立標籤的檔案清單（例如重複檔案標記變更後）"""
         for name, content in self._tab_contents.items():
-            if hasattr(content, 'sync_to_group'):
-                content.sync_to_group()
+            if hasattr(content, 'refresh_file_list'):
+                content.refresh_file_list()
+            elif hasattr(content, 'refresh'):
+                content.refresh()
 
 
 class UngroupedTabContent(ctk.CTkFrame):
@@ -138,38 +253,27 @@ class UngroupedTabContent(ctk.CTkFrame):
         self._build_ui()
 
     def _build_ui(self):
-        self._scroll = ctk.CTkScrollableFrame(self)
-        self._scroll.pack(fill="both", expand=True, padx=4, pady=4)
+        toolbar = ctk.CTkFrame(self, fg_color="transparent")
+        toolbar.pack(fill="x", padx=4, pady=(4, 0))
+        tr(ctk.CTkButton(
+            toolbar, width=110, command=self._cluster_files,
+        ), "ungrouped.cluster").pack(side="right", padx=2)
+        self._file_list = FileListWidget(
+            self,
+            on_changed=lambda: self.project.touch("ungrouped_files"),
+            reorderable=False,
+            show_instruments=False,
+            action_key="group.move_to_group",
+            on_action=self._move_to_group,
+            empty_key="ungrouped.empty",
+        )
+        self._file_list.pack(fill="both", expand=True, padx=4, pady=4)
         self._refresh_list()
 
     def _refresh_list(self):
-        for widget in self._scroll.winfo_children():
-            widget.destroy()
-        if not self.project.ungrouped_files:
-            ctk.CTkLabel(
-                self._scroll, text=t("ungrouped.empty"),
-                font=ctk.CTkFont(size=13), text_color="gray",
-            ).pack(expand=True, pady=40)
-            return
-        for i, file_info in enumerate(self.project.ungrouped_files):
-            row = ctk.CTkFrame(self._scroll, fg_color="transparent")
-            row.pack(fill="x", pady=1)
-            ctk.CTkLabel(row, text=file_info.display_name, anchor="w").pack(
-                side="left", fill="x", expand=True, padx=4,
-            )
-            move_btn = ctk.CTkButton(
-                row, text=t("group.move_to_group"), width=90,
-                command=lambda idx=i: self._move_to_group(idx),
-            )
-            move_btn.pack(side="right", padx=2)
-            del_btn = ctk.CTkButton(
-                row, text="\u2715", width=28, height=24,
-                fg_color="#c0392b", hover_color="#e74c3c",
-                command=lambda idx=i: self._remove_file(idx),
-            )
-            del_btn.pack(side="right", padx=2)
+        self._file_list.set_files(self.project.ungrouped_files)
 
-    def _move_to_group(self, file_index: int):
+    def _move_to_group(self, file_index: int, widget):
         if not self.project.groups:
             from tkinter import messagebox
             messagebox.showinfo(t("dialog.info"), t("dialog.info.create_group_first"))
@@ -181,34 +285,42 @@ class UngroupedTabContent(ctk.CTkFrame):
                 label=group.name or group.id[:8],
                 command=lambda g=group, fi=file_info, idx=file_index: self._do_move(fi, g, idx),
             )
-        widget = self._scroll.winfo_children()[file_index] if file_index < len(self._scroll.winfo_children()) else self._scroll
         menu.tk_popup(widget.winfo_rootx(), widget.winfo_rooty())
 
     def _do_move(self, file_info: FileInfo, group: Group, index: int):
         if 0 <= index < len(self.project.ungrouped_files):
             self.project.ungrouped_files.pop(index)
         group.files.append(file_info)
+        self.project.touch("ungrouped_files")
+        self.project.touch_group(group, "files")
         self._refresh_list()
-        self.main_window._mark_modified()
         group_panel = self.main_window._group_panel
         if group_panel:
-            for name, content in group_panel._tab_contents.items():
-                if hasattr(content, '_group') and content._group is group:
-                    content.refresh_file_list()
+            group_panel.refresh_group(group)
 
-    def _remove_file(self, index: int):
-        if 0 <= index < len(self.project.ungrouped_files):
-            self.project.ungrouped_files.pop(index)
-            self._refresh_list()
-            self.main_window._mark_modified()
+    def _cluster_files(self):
+        """依檔名相似度將未分組檔案分為新群組"""
+        files = self.project.ungrouped_files
+        if len(files) < 2:
+            return
+        groups, loose = self.main_window.import_service.cluster_files(
+            files, matcher=matcher_for_project(self.project),
+        )
+        group_panel = self.main_window._group_panel
+        for group in groups:
+            self.project.add_group(group)
+        self.project.update(ungrouped_files=loose)
+        self.main_window._set_status(
+            "status.clustered", groups=len(groups), files=len(loose),
+        )
+        if group_panel:
+            # 重新載入會銷毀本標籤，延後到事件處理結束後執行
+            self.main_window.after_idle(group_panel.reload_all)
 
     def refresh(self):
         """重新整理顯示"""
         self._refresh_list()
 
-    def on_instruments_changed(self, instruments: List[str]):
-        pass
-
 
 class GroupTabContent(ctk.CTkFrame):
     """群組標籤內容"""
@@ -227,49 +339,56 @@ class GroupTabContent(ctk.CTkFrame):
         self.project = project
         self.main_window = main_window
         self._on_delete = on_delete
-        self._instrument_vars = []
-        self._file_list_widget = None
+        # 樂器 ID -> (勾選框, BooleanVar)
+        self._instrument_checks: Dict[str, tuple] = {}
+        self._no_instruments_label = None
         self._build_ui()
+        on_relabel(self, self._check_mismatch)
 
     def _build_ui(self):
         top = ctk.CTkFrame(self, fg_color="transparent")
         top.pack(fill="x", padx=8, pady=(8, 4))
-        del_btn = ctk.CTkButton(
-            top, text=t("group.delete"), width=100,
+        del_btn = tr(ctk.CTkButton(
+            top, width=100,
             fg_color="#c0392b", hover_color="#e74c3c",
             command=self._on_delete,
-        )
+        ), "group.delete")
         del_btn.pack(side="right")
         name_frame = ctk.CTkFrame(top, fg_color="transparent")
         name_frame.pack(side="left", fill="x", expand=True)
-        ctk.CTkLabel(name_frame, text=t("group.name_label")).pack(side="left")
-        self._name_entry = ctk.CTkEntry(name_frame, width=200)
+        tr(ctk.CTkLabel(name_frame), "group.name_label").pack(side="left")
+        self._name_var = self._field_var("name")
+        self._name_entry = ctk.CTkEntry(
+            name_frame, width=200, textvariable=self._name_var,
+        )
         self._name_entry.pack(side="left", padx=4)
-        self._name_entry.insert(0, self._group.name)
         vars_frame = ctk.CTkFrame(self, fg_color="transparent")
         vars_frame.pack(fill="x", padx=8, pady=4)
-        ctk.CTkLabel(vars_frame, text=t("group.piece_name_label")).pack(side="left")
-        self._piece_name_entry = ctk.CTkEntry(vars_frame, width=200)
-        self._piece_name_entry.pack(side="left", padx=(4, 8))
-        self._piece_name_entry.insert(0, self._group.piece_name)
-        auto_btn = ctk.CTkButton(
-            vars_frame, text=t("group.auto_detect"), width=80,
-            command=self._auto_detect_piece_name,
+        tr(ctk.CTkLabel(vars_frame), "group.piece_name_label").pack(side="left")
+        self._piece_name_var = self._field_var("piece_name")
+        self._piece_name_entry = ctk.CTkEntry(
+            vars_frame, width=200, textvariable=self._piece_name_var,
         )
+        self._piece_name_entry.pack(side="left", padx=(4, 8))
+        auto_btn = tr(ctk.CTkButton(
+            vars_frame, width=80, command=self._auto_detect_piece_name,
+        ), "group.auto_detect")
         auto_btn.pack(side="left", padx=(0, 16))
-        ctk.CTkLabel(vars_frame, text=t("group.movement_num_label")).pack(side="left")
-        self._movement_num_entry = ctk.CTkEntry(vars_frame, width=60)
+        tr(ctk.CTkLabel(vars_frame), "group.movement_num_label").pack(side="left")
+        self._movement_num_entry = ctk.CTkEntry(
+            vars_frame, width=60, textvariable=self._field_var("movement_number"),
+        )
         self._movement_num_entry.pack(side="left", padx=(4, 8))
-        self._movement_num_entry.insert(0, self._group.movement_number)
-        ctk.CTkLabel(vars_frame, text=t("group.movement_name_label")).pack(side="left")
-        self._movement_name_entry = ctk.CTkEntry(vars_frame, width=150)
+        tr(ctk.CTkLabel(vars_frame), "group.movement_name_label").pack(side="left")
+        self._movement_name_entry = ctk.CTkEntry(
+            vars_frame, width=150, textvariable=self._field_var("movement_name"),
+        )
         self._movement_name_entry.pack(side="left", padx=4)
-        self._movement_name_entry.insert(0, self._group.movement_name)
         middle = ctk.CTkFrame(self, fg_color="transparent")
         middle.pack(fill="both", expand=True, padx=8, pady=4)
         left_col = ctk.CTkFrame(middle)
         left_col.pack(side="left", fill="both", expand=False, padx=(0, 4))
-        ctk.CTkLabel(left_col, text=t("group.instrument_check"), font=ctk.CTkFont(weight="bold")).pack(pady=(4, 2))
+        tr(ctk.CTkLabel(left_col, font=ctk.CTkFont(weight="bold")), "group.instrument_check").pack(pady=(4, 2))
         self._instrument_scroll = ctk.CTkScrollableFrame(left_col, width=180)
         self._instrument_scroll.pack(fill="both", expand=True, padx=4, pady=4)
         self._mismatch_label = ctk.CTkLabel(
@@ -279,28 +398,35 @@ class GroupTabContent(ctk.CTkFrame):
         self._mismatch_label.pack(padx=4, pady=2)
         right_col = ctk.CTkFrame(middle)
         right_col.pack(side="left", fill="both", expand=True, padx=(4, 0))
-        ctk.CTkLabel(right_col, text=t("group.file_list"), font=ctk.CTkFont(weight="bold")).pack(pady=(4, 2))
-        self._file_scroll = ctk.CTkScrollableFrame(right_col)
-        self._file_scroll.pack(fill="both", expand=True, padx=4, pady=4)
+        tr(ctk.CTkLabel(right_col, font=ctk.CTkFont(weight="bold")), "group.file_list").pack(pady=(4, 2))
+        self._file_list = FileListWidget(
+            right_col,
+            on_changed=self._on_files_changed,
+            on_removed=self._on_file_removed,
+        )
+        self._file_list.pack(fill="both", expand=True, padx=4, pady=4)
         file_btn_row = ctk.CTkFrame(right_col, fg_color="transparent")
         file_btn_row.pack(fill="x", padx=4, pady=4)
-        ctk.CTkButton(
-            file_btn_row, text=t("group.add_files"), width=100,
-            command=self._add_files,
-        ).pack(side="left")
+        tr(ctk.CTkButton(
+            file_btn_row, width=100, command=self._add_files,
+        ), "group.add_files").pack(side="left")
+        tr(ctk.CTkButton(
+            file_btn_row, width=100, command=self._auto_assign,
+        ), "group.auto_assign").pack(side="left", padx=(4, 0))
         bottom = ctk.CTkFrame(self, fg_color="transparent")
         bottom.pack(fill="x", padx=8, pady=(4, 8))
         self._small_template_var = ctk.BooleanVar(value=self._group.use_small_template)
-        self._small_template_check = ctk.CTkCheckBox(
-            bottom, text=t("group.use_small_template"),
+        self._small_template_check = tr(ctk.CTkCheckBox(
+            bottom,
             variable=self._small_template_var,
             command=self._on_small_template_toggled,
-        )
+        ), "group.use_small_template")
         self._small_template_check.pack(side="left")
-        self._small_template_entry = ctk.CTkEntry(bottom, width=400)
+        self._small_template_entry = ctk.CTkEntry(
+            bottom, width=400,
+            textvariable=self._field_var("small_template", strip=False),
+        )
         self._small_template_entry.pack(side="left", fill="x", expand=True, padx=8)
-        if self._group.small_template:
-            self._small_template_entry.insert(0, self._group.small_template)
         self._small_template_entry.configure(
             state="normal" if self._group.use_small_template else "disabled",
         )
@@ -308,48 +434,109 @@ class GroupTabContent(ctk.CTkFrame):
         self._refresh_file_list()
         self._auto_detect_if_empty()
 
+    def _field_var(self, field_name: str, strip: bool = True) -> ctk.StringVar:
+        """建立與群組欄位雙向綁定的 StringVar，輸入時立即寫回群組"""
+        var = ctk.StringVar(value=getattr(self._group, field_name))
+
+        def on_write(*_):
+            value = var.get()
+            self.project.update_group(
+                self._group, **{field_name: value.strip() if strip else value},
+            )
+        var.trace_add("write", on_write)
+        return var
+
     def _auto_detect_if_empty(self):
         """曲名欄位為空時自動偵測一次"""
-        if self._piece_name_entry.get().strip():
+        if self._piece_name_var.get().strip():
             return
         if not self._group.files:
             return
         filenames = [f.display_name for f in self._group.files]
         detected = detect_piece_name(filenames)
         if detected:
-            self._piece_name_entry.delete(0, "end")
-            self._piece_name_entry.insert(0, detected)
-            self._group.piece_name = detected
+            # 先寫入群組並通知預覽；自動填入不算是使用者的修改
+            self.project.fill_group(self._group, piece_name=detected)
+            self._piece_name_var.set(detected)
 
     def _refresh_instruments(self):
         for widget in self._instrument_scroll.winfo_children():
             widget.destroy()
-        self._instrument_vars = []
-        instruments = self.project.instruments
-        if not instruments:
-            ctk.CTkLabel(
-                self._instrument_scroll, text=t("group.no_instruments"),
-                text_color="gray",
-            ).pack(pady=8)
-            return
-        for i, name in enumerate(instruments):
-            var = ctk.BooleanVar(value=(i in self._group.selected_instruments))
-            cb = ctk.CTkCheckBox(
-                self._instrument_scroll, text=name,
-                variable=var,
-                command=self._on_instrument_check_changed,
-            )
+        self._instrument_checks = {}
+        self._no_instruments_label = tr(ctk.CTkLabel(
+            self._instrument_scroll, text_color="gray",
+        ), "group.no_instruments")
+        selected = set(self._group.selected_instruments)
+        for i, (instrument_id, name) in enumerate(
+            zip(self.project.instrument_ids(), self.project.instruments)
+        ):
+            cb = self._create_instrument_check(instrument_id, name, i in selected)
+            cb.pack(anchor="w", padx=4, pady=1)
+        self._update_no_instruments()
+        self._check_mismatch()
+
+    def _create_instrument_check(self, instrument_id: str, name: str, checked: bool):
+        var = ctk.BooleanVar(value=checked)
+        cb = ctk.CTkCheckBox(
+            self._instrument_scroll, text=name,
+            variable=var,
+            command=lambda: self._on_instrument_toggled(instrument_id),
+        )
+        self._instrument_checks[instrument_id] = (cb, var)
+        return cb
+
+    def _pack_instrument_check(self, cb, position: int):
+        """將勾選框放到樂器表中的 position 位置"""
+        ids = self.project.instrument_ids()
+        if position + 1 < len(ids) and ids[position + 1] in self._instrument_checks:
+            cb.pack(anchor="w", padx=4, pady=1,
+                    before=self._instrument_checks[ids[position + 1]][0])
+        else:
             cb.pack(anchor="w", padx=4, pady=1)
-            self._instrument_vars.append(var)
+
+    def _update_no_instruments(self):
+        if self._instrument_checks:
+            self._no_instruments_label.pack_forget()
+        else:
+            self._no_instruments_label.pack(pady=8)
+
+    def _sync_instrument_checks(self):
+        """依群組的選取更新勾選狀態（不重建勾選框）"""
+        selected = set(self._group.selected_instruments)
+        for instrument_id, (cb, var) in self._instrument_checks.items():
+            checked = self.project.instrument_position(instrument_id) in selected
+            if var.get() != checked:
+                var.set(checked)
+        self._check_mismatch()
+
+    @traced("ui.group_tab.instrument_change")
+    def apply_instrument_change(self, change: InstrumentChange):
+        """樂器表變動時只修補受影響的勾選框
+
+        專案已調整群組的選取位置，其餘勾選框以樂器 ID 對應，狀態不變。
+
+        Args:
+            change: 已套用到專案的樂器表變動
+        """
+        if change.kind == "insert":
+            cb = self._create_instrument_check(change.instrument_id, change.name, False)
+            self._pack_instrument_check(cb, change.index)
+        elif change.kind == "remove":
+            cb, _ = self._instrument_checks.pop(change.instrument_id)
+            cb.destroy()
+        elif change.kind == "move":
+            cb, _ = self._instrument_checks[change.instrument_id]
+            cb.pack_forget()
+            self._pack_instrument_check(cb, change.new_index)
+        self._update_no_instruments()
         self._check_mismatch()
+        self._refresh_file_list()
 
-    def _on_instrument_check_changed(self):
-        self._group.selected_instruments = [
-            i for i, var in enumerate(self._instrument_vars) if var.get()
-        ]
+    def _on_instrument_toggled(self, instrument_id: str):
+        _, var = self._instrument_checks[instrument_id]
+        self.project.toggle_instrument(self._group, instrument_id, var.get())
         self._check_mismatch()
         self._refresh_file_list()
-        self.main_window._mark_modified()
 
     def _check_mismatch(self):
         n_instruments = len(self._group.selected_instruments)
@@ -367,69 +554,24 @@ class GroupTabContent(ctk.CTkFrame):
             self._mismatch_label.configure(text_color=("green", "#2ecc71"))
 
     def _refresh_file_list(self):
-        for widget in self._file_scroll.winfo_children():
-            widget.destroy()
-        if not self._group.files:
-            ctk.CTkLabel(
-                self._file_scroll, text=t("file_list.empty"), text_color="gray",
-            ).pack(pady=8)
-            return
         instruments = self.project.instruments
-        selected = self._group.selected_instruments
-        for i, file_info in enumerate(self._group.files):
-            row = ctk.CTkFrame(self._file_scroll, fg_color="transparent")
-            row.pack(fill="x", pady=1)
-            if i < len(selected) and selected[i] < len(instruments):
-                inst_text = instruments[selected[i]]
-                ctk.CTkLabel(
-                    row, text=inst_text, width=100, anchor="w",
-                    font=ctk.CTkFont(size=11), text_color=("gray40", "gray60"),
-                ).pack(side="left", padx=(4, 2))
-            ctk.CTkLabel(row, text=file_info.display_name, anchor="w").pack(
-                side="left", fill="x", expand=True, padx=2,
-            )
-            btn_frame = ctk.CTkFrame(row, fg_color="transparent")
-            btn_frame.pack(side="right")
-            ctk.CTkButton(
-                btn_frame, text="\u25B2", width=28, height=24,
-                command=lambda idx=i: self._move_file_up(idx),
-            ).pack(side="left", padx=1)
-            ctk.CTkButton(
-                btn_frame, text="\u25BC", width=28, height=24,
-                command=lambda idx=i: self._move_file_down(idx),
-            ).pack(side="left", padx=1)
-            ctk.CTkButton(
-                btn_frame, text="\u2715", width=28, height=24,
-                fg_color="#c0392b", hover_color="#e74c3c",
-                command=lambda idx=i: self._remove_file(idx),
-            ).pack(side="left", padx=1)
-
-    def _move_file_up(self, index: int):
-        if index <= 0:
-            return
-        files = self._group.files
-        files[index], files[index - 1] = files[index - 1], files[index]
-        self._refresh_file_list()
-        self.main_window._mark_modified()
+        self._file_list.set_instrument_labels([
+            instruments[index] if index < len(instruments) else ""
+            for index in self._group.selected_instruments
+        ])
+        self._file_list.set_files(self._group.files)
+
+    def _on_files_changed(self):
+        """檔案被移動或刪除（清單已原地修改）"""
+        self.project.touch_group(self._group, "files")
+        self._check_mismatch()
 
-    def _move_file_down(self, index: int):
-        files = self._group.files
-        if index >= len(files) - 1:
-            return
-        files[index], files[index + 1] = files[index + 1], files[index]
-        self._refresh_file_list()
-        self.main_window._mark_modified()
-
-    def _remove_file(self, index: int):
-        if 0 <= index < len(self._group.files):
-            removed = self._group.files.pop(index)
-            self.project.ungrouped_files.append(removed)
-            self._refresh_file_list()
-            self._check_mismatch()
-            self.main_window._mark_modified()
-            group_panel = self.main_window._group_panel
-            if group_panel:
-                group_panel.refresh_ungrouped()
+    def _on_file_removed(self, file_info: FileInfo):
+        self.project.ungrouped_files.append(file_info)
+        self.project.touch("ungrouped_files")
+        group_panel = self.main_window._group_panel
+        if group_panel:
+            group_panel.refresh_ungrouped()
 
     def _add_files(self):
         from tkinter import filedialog
@@ -444,56 +586,49 @@ class GroupTabContent(ctk.CTkFrame):
         import_svc = ImportService(FileService())
         files = import_svc.import_files(list(paths))
         self._group.files.extend(files)
+        self.project.touch_group(self._group, "files")
         self._refresh_file_list()
         self._check_mismatch()
         self._auto_detect_if_empty()
-        self.main_window._mark_modified()
+
+    def _auto_assign(self):
+        """依檔名自動勾選樂器並排列檔案"""
+        matcher = matcher_for_project(self.project)
+        unmatched, modified = _assign_group(self.project, self._group, matcher)
+        if modified:
+            self.reload_from_group()
+        self.main_window._set_status(
+            "status.auto_assigned",
+            matched=len(self._group.files) - len(unmatched),
+            unmatched=len(unmatched),
+        )
+
+    @traced("ui.group_tab.reload")
+    def reload_from_group(self):
+        """群組資料在外部被修改後，重新整理勾選狀態與檔案清單"""
+        self._sync_instrument_checks()
+        self._refresh_file_list()
 
     def _auto_detect_piece_name(self):
         filenames = [f.display_name for f in self._group.files]
         detected = detect_piece_name(filenames)
         if detected:
-            self._piece_name_entry.delete(0, "end")
-            self._piece_name_entry.insert(0, detected)
-            self.main_window._mark_modified()
+            self._piece_name_var.set(detected)
         else:
             from tkinter import messagebox
             messagebox.showinfo(t("dialog.info"), t("dialog.info.cannot_detect"))
 
     def _on_small_template_toggled(self):
         enabled = self._small_template_var.get()
-        self._group.use_small_template = enabled
+        self.project.update_group(self._group, use_small_template=enabled)
         if enabled:
             self._small_template_entry.configure(state="normal")
             if not self._small_template_entry.get():
                 self._small_template_entry.insert(0, self.project.master_template)
         else:
             self._small_template_entry.configure(state="disabled")
-        self.main_window._mark_modified()
-
-    def on_instruments_changed(self, instruments: List[str]):
-        """樂器表變更時重新建立勾選框"""
-        valid = set(range(len(instruments)))
-        self._group.selected_instruments = [
-            i for i in self._group.selected_instruments if i in valid
-        ]
-        self._refresh_instruments()
-        self._refresh_file_list()
 
     def refresh_file_list(self):
         """從外部觸發檔案清單重新整理"""
         self._refresh_file_list()
         self._check_mismatch()
-
-    def sync_to_group(self):
-        """將 UI 狀態同步至 group 資料物件"""
-        self._group.name = self._name_entry.get().strip()
-        self._group.piece_name = self._piece_name_entry.get().strip()
-        self._group.movement_number = self._movement_num_entry.get().strip()
-        self._group.movement_name = self._movement_name_entry.get().strip()
-        self._group.use_small_template = self._small_template_var.get()
-        if self._group.use_small_template:
-            self._group.small_template = self._small_template_entry.get()
-        self._group.selected_instruments = [
-            i for i, var in enumerate(self._instrument_vars) if var.get()
-        ]
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+可翻譯元件登記
+
+建立元件時以 tr() 設定文字並登記（元件, 選項, 鍵名, 參數），切換語言後
+呼叫 relabel() 就地重新套用登記的文字，不必銷毀並重建介面。文字由資料
+計算而來的元件（例如狀態列、衝突數）以 on_relabel() 登記重新整理的函式。
+已銷毀的元件在下次 relabel() 或登記數量倍增時清除。
+
+使用範例：
+    from ui.i18n import tr, add_menu_item, relabel
+    tr(ctk.CTkLabel(frame), "group.name_label").pack(side="left")
+    add_menu_item(file_menu, "command", "menu.file.new", command=new_project)
+    set_locale("en")
+    relabel()
+"""
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Tuple
+from core.locale import t
+
+_MIN_PURGE_SIZE = 256
+
+
+def _alive(widget) -> bool:
+    try:
+        return bool(widget.winfo_exists())
+    except tk.TclError:
+        return False
+
+
+class TranslationRegistry:
+    """可翻譯元件的登記表"""
+
+    def __init__(self):
+        # 元件 -> {選項: (鍵名, 參數)}
+        self._widgets: Dict[Any, Dict[str, Tuple[str, dict]]] = {}
+        # 選單 -> {項目索引: (鍵名, 參數)}
+        self._menus: Dict[Any, Dict[int, Tuple[str, dict]]] = {}
+        # 擁有者元件 -> 重新整理函式
+        self._callbacks: Dict[Any, List[Callable[[], None]]] = {}
+        self._purge_at = _MIN_PURGE_SIZE
+
+    def __len__(self) -> int:
+        return len(self._widgets) + len(self._menus) + len(self._callbacks)
+
+    def bind(self, widget, key: str, option: str = "text", **kwargs):
+        """以 t(key, **kwargs) 設定元件選項並登記
+
+        Args:
+            widget: 元件（需支援 configure 與 winfo_exists）
+            key: 翻譯鍵名
+            option: 要設定的選項，例如 "text"、"placeholder_text"
+            **kwargs: 翻譯字串的格式參數
+        """
+        widget.configure(**{option: t(key, **kwargs)})
+        self._widgets.setdefault(widget, {})[option] = (key, kwargs)
+        self._maybe_purge()
+
+    def bind_menu(self, menu, index: int, key: str, **kwargs):
+        """以 t(key, **kwargs) 設定選單項目的標籤並登記
+
+        Args:
+            menu: tk.Menu
+            index: 項目索引
+            key: 翻譯鍵名
+            **kwargs: 翻譯字串的格式參數
+        """
+        menu.entryconfigure(index, label=t(key, **kwargs))
+        self._menus.setdefault(menu, {})[index] = (key, kwargs)
+        self._maybe_purge()
+
+    def on_relabel(self, owner, callback: Callable[[], None]):
+        """登記切換語言後呼叫的函式（owner 銷毀後不再呼叫）
+
+        Args:
+            owner: 擁有者元件
+            callback: 重新整理文字的函式
+        """
+        self._callbacks.setdefault(owner, []).append(callback)
+        self._maybe_purge()
+
+    def relabel(self):
+        """以目前語言重新套用所有登記的文字"""
+        self.purge()
+        for widget, options in self._widgets.items():
+            widget.configure(**{
+                option: t(key, **kwargs) for option, (key, kwargs) in options.items()
+            })
+        for menu, entries in self._menus.items():
+            for index, (key, kwargs) in entries.items():
+                menu.entryconfigure(index, label=t(key, **kwargs))
+        for callbacks in list(self._callbacks.values()):
+            for callback in callbacks:
+                callback()
+
+    def purge(self):
+        """清除已銷毀元件的登記"""
+        for table in (self._widgets, self._menus, self._callbacks):
+            for widget in [w for w in table if not _alive(w)]:
+                del table[widget]
+        self._purge_at = max(_MIN_PURGE_SIZE, 2 * len(self))
+
+    def _maybe_purge(self):
+        if len(self) >= self._purge_at:
+            self.purge()
+
+
+registry = TranslationRegistry()
+
+
+def tr(widget, key: str, option: str = "text", **kwargs):
+    """設定元件的翻譯文字並登記到預設登記表
+
+    Args:
+        widget: 元件
+        key: 翻譯鍵名
+        option: 要設定的選項
+        **kwargs: 翻譯字串的格式參數
+
+    Returns:
+        同一個元件，方便串接 pack()
+    """
+    registry.bind(widget, key, option, **kwargs)
+    return widget
+
+
+def add_menu_item(menu, kind: str, key: str, **options):
+    """新增選單項目並以翻譯鍵名登記其標籤
+
+    Args:
+        menu: tk.Menu
+        kind: 項目類型，例如 "command"、"cascade"、"radiobutton"
+        key: 標籤的翻譯鍵名
+        **options: 其他選單項目選項（command、variable 等）
+    """
+    menu.add(kind, label=t(key), **options)
+    registry.bind_menu(menu, menu.index("end"), key)
+
+
+def on_relabel(owner, callback: Callable[[], None]):
+    """登記切換語言後呼叫的函式到預設登記表"""
+    registry.on_relabel(owner, callback)
+
+
+def relabel():
+    """以目前語言重新套用預設登記表中的所有文字"""
+    registry.relabel()
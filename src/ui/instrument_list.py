@@ -2,11 +2,14 @@
 """
 樂器表編輯器
 
-提供樂器新增、刪除、排序的 UI 元件。
+提供樂器新增、刪除、排序的 UI 元件。每次編輯以 InstrumentChange 通知，
+由呼叫端套用到專案。
 """
 from typing import Callable, List, Optional
 import customtkinter as ctk
 from core.locale import t
+from core.models import InstrumentChange
+from ui.i18n import tr
 
 
 class InstrumentListEditor(ctk.CTkFrame):
@@ -15,27 +18,27 @@ class InstrumentListEditor(ctk.CTkFrame):
     def __init__(
         self,
         master,
-        on_instruments_changed: Optional[Callable[[List[str]], None]] = None,
+        on_instrument_change: Optional[Callable[[InstrumentChange], None]] = None,
         **kwargs,
     ):
         super().__init__(master, **kwargs)
         self._instruments: List[str] = []
-        self._on_changed = on_instruments_changed
+        self._on_change = on_instrument_change
         self._build_ui()
 
     def _build_ui(self):
-        title = ctk.CTkLabel(self, text=t("instrument.title"), font=ctk.CTkFont(size=14, weight="bold"))
+        title = tr(ctk.CTkLabel(self, font=ctk.CTkFont(size=14, weight="bold")), "instrument.title")
         title.pack(padx=8, pady=(8, 4))
         self._scroll_frame = ctk.CTkScrollableFrame(self, width=210)
         self._scroll_frame.pack(fill="both", expand=True, padx=4, pady=4)
         input_frame = ctk.CTkFrame(self, fg_color="transparent")
         input_frame.pack(fill="x", padx=4, pady=(0, 8))
-        self._entry = ctk.CTkEntry(input_frame, placeholder_text=t("instrument.placeholder"))
+        self._entry = tr(ctk.CTkEntry(input_frame), "instrument.placeholder", "placeholder_text")
         self._entry.pack(side="left", fill="x", expand=True, padx=(4, 4))
         self._entry.bind("<Return>", lambda e: self._add_instrument())
-        add_btn = ctk.CTkButton(
-            input_frame, text=t("instrument.add"), width=50, command=self._add_instrument,
-        )
+        add_btn = tr(ctk.CTkButton(
+            input_frame, width=50, command=self._add_instrument,
+        ), "instrument.add")
         add_btn.pack(side="right", padx=(0, 4))
 
     def _add_instrument(self):
@@ -45,7 +48,7 @@ class InstrumentListEditor(ctk.CTkFrame):
         self._instruments.append(name)
         self._entry.delete(0, "end")
         self._refresh_list()
-        self._notify_changed()
+        self._notify(InstrumentChange("insert", len(self._instruments) - 1, name=name))
 
     def _move_up(self, index: int):
         if index <= 0:
@@ -54,7 +57,7 @@ class InstrumentListEditor(ctk.CTkFrame):
             self._instruments[index - 1], self._instruments[index]
         )
         self._refresh_list()
-        self._notify_changed()
+        self._notify(InstrumentChange("move", index, new_index=index - 1))
 
     def _move_down(self, index: int):
         if index >= len(self._instruments) - 1:
@@ -63,13 +66,13 @@ class InstrumentListEditor(ctk.CTkFrame):
             self._instruments[index + 1], self._instruments[index]
         )
         self._refresh_list()
-        self._notify_changed()
+        self._notify(InstrumentChange("move", index, new_index=index + 1))
 
     def _remove(self, index: int):
         if 0 <= index < len(self._instruments):
             self._instruments.pop(index)
             self._refresh_list()
-            self._notify_changed()
+            self._notify(InstrumentChange("remove", index))
 
     def _refresh_list(self):
         for widget in self._scroll_frame.winfo_children():
@@ -98,20 +101,19 @@ class InstrumentListEditor(ctk.CTkFrame):
             )
             del_btn.pack(side="left", padx=1)
 
-    def _notify_changed(self):
-        if self._on_changed:
-            self._on_changed(list(self._instruments))
+    def _notify(self, change: InstrumentChange):
+        if self._on_change:
+            self._on_change(change)
 
     def get_instruments(self) -> List[str]:
         """取得目前樂器清單"""
         return list(self._instruments)
 
     def set_instruments(self, instruments: List[str]):
-        """設定樂器清單
+        """設定顯示的樂器清單（例如開啟專案時；不會發出變動通知）
 
         Args:
             instruments: 樂器名稱清單
         """
         self._instruments = list(instruments)
         self._refresh_list()
-        self._notify_changed()
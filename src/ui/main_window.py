@@ -6,7 +6,7 @@
 """
 import os
 import tkinter as tk
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import customtkinter as ctk
 from core.constants import (
     DEFAULT_MASTER_TEMPLATE,
@@ -16,10 +16,12 @@ from core.constants import (
     TEMPLATE_VARIABLES,
 )
 from core.locale import t, get_locale, set_locale
-from core.models import Project
+from core.models import ChangeEvent, Project
+from core import tracing
+from core.tracing import traced
 from services.file_service import FileService
-from services.import_service import ImportService
 from services.preferences_service import PreferencesService
+from ui.i18n import add_menu_item, on_relabel, relabel, tr
 from ui.instrument_list import InstrumentListEditor
 
 
@@ -38,52 +40,143 @@ class MainWindow(ctk.CTkFrame):
         self.project = project
         self._preferences = preferences
         self.file_service = FileService()
-        self.import_service = ImportService(self.file_service)
         self._project_path: Optional[str] = None
         self._modified = False
+        self._edit_serial = 0
+        self._unsubscribe_project = project.subscribe(self._on_project_changed)
         self._group_panel = None
+        self._metrics_panel = None
+        # 狀態列目前顯示的訊息（語系鍵, 參數），切換語言時重新翻譯
+        self._status: List[Tuple[str, Dict[str, Any]]] = [("status.ready", {})]
+        # 以下服務在第一次使用或啟動後閒置時才建立，見 prewarm()
+        self._duplicate_service = None
+        self._import_service = None
         self._rename_service = None
+        self._preview_service = None
+        self._autosave = None
+        self._preview_panel = None
         self._undo_service = None
         self._project_service = None
         self.pack(fill="both", expand=True)
         self._create_menu()
         self._create_layout()
         self._update_title()
+        on_relabel(self, self._relabel)
+
+    # ── 延遲建立的服務 ──
+
+    @property
+    def duplicate_service(self):
+        """重複檔案服務"""
+        if self._duplicate_service is None:
+            from services.duplicate_service import DuplicateService
+            self._duplicate_service = DuplicateService()
+        return self._duplicate_service
+
+    @property
+    def import_service(self):
+        """匯入服務"""
+        if self._import_service is None:
+            from services.import_service import ImportService
+            self._import_service = ImportService(
+                self.file_service, self.duplicate_service,
+            )
+        return self._import_service
+
+    @property
+    def rename_service(self):
+        """重新命名服務"""
+        if self._rename_service is None:
+            from services.rename_service import RenameService
+            self._rename_service = RenameService(self.file_service)
+        return self._rename_service
+
+    @property
+    def preview_service(self):
+        """即時預覽服務"""
+        if self._preview_service is None:
+            from services.preview_service import PreviewService
+            self._preview_service = PreviewService(
+                self, self.rename_service, on_updated=self._on_preview_updated,
+            )
+        return self._preview_service
+
+    @property
+    def autosave(self):
+        """自動儲存服務"""
+        if self._autosave is None:
+            from services.autosave_service import AutosaveService
+            self._autosave = AutosaveService(self)
+        return self._autosave
+
+    def prewarm(self):
+        """預先建立服務並載入之後才會用到的模組（於啟動後閒置時呼叫）"""
+        self.autosave
+        self.import_service
+        self.rename_service
+        import core.instrument_matcher  # noqa: F401
+        import services.undo_service  # noqa: F401
+        import ui.preview_dialog  # noqa: F401
+
+    def show_saved_panels(self):
+        """依偏好設定顯示啟動時延後建立的面板"""
+        if self._preview_var.get() and not self._preview_panel:
+            self._show_preview_panel()
 
     def _create_menu(self):
         self._menubar = tk.Menu(self.master_window)
         self.master_window.config(menu=self._menubar)
         # 檔案選單
         file_menu = tk.Menu(self._menubar, tearoff=0)
-        file_menu.add_command(
-            label=t("menu.file.new"), command=self._new_project, accelerator="Ctrl+N",
+        add_menu_item(
+            file_menu, "command", "menu.file.new",
+            command=self._new_project, accelerator="Ctrl+N",
         )
-        file_menu.add_command(
-            label=t("menu.file.open"), command=self._open_project, accelerator="Ctrl+O",
+        add_menu_item(
+            file_menu, "command", "menu.file.open",
+            command=self._open_project, accelerator="Ctrl+O",
         )
         file_menu.add_separator()
-        file_menu.add_command(
-            label=t("menu.file.save"), command=self._save_project, accelerator="Ctrl+S",
+        add_menu_item(
+            file_menu, "command", "menu.file.save",
+            command=self._save_project, accelerator="Ctrl+S",
+        )
+        add_menu_item(
+            file_menu, "command", "menu.file.save_as", command=self._save_project_as,
         )
-        file_menu.add_command(
-            label=t("menu.file.save_as"), command=self._save_project_as,
+        add_menu_item(
+            file_menu, "command", "menu.file.recover_autosave",
+            command=self._recover_autosave,
         )
-        self._menubar.add_cascade(label=t("menu.file"), menu=file_menu)
+        add_menu_item(self._menubar, "cascade", "menu.file", menu=file_menu)
         # 編輯選單
         edit_menu = tk.Menu(self._menubar, tearoff=0)
-        edit_menu.add_command(
-            label=t("menu.edit.undo"), command=self._undo_last, accelerator="Ctrl+Z",
+        add_menu_item(
+            edit_menu, "command", "menu.edit.undo",
+            command=self._undo_last, accelerator="Ctrl+Z",
+        )
+        add_menu_item(
+            edit_menu, "command", "menu.edit.find_duplicates",
+            command=self._find_duplicates,
         )
-        self._menubar.add_cascade(label=t("menu.edit"), menu=edit_menu)
+        add_menu_item(
+            edit_menu, "command", "menu.edit.instrument_aliases",
+            command=self._edit_instrument_aliases,
+        )
+        add_menu_item(self._menubar, "cascade", "menu.edit", menu=edit_menu)
         # 匯入選單
         import_menu = tk.Menu(self._menubar, tearoff=0)
-        import_menu.add_command(
-            label=t("menu.import.files"), command=self._import_files,
+        add_menu_item(
+            import_menu, "command", "menu.import.files", command=self._import_files,
+        )
+        add_menu_item(
+            import_menu, "command", "menu.import.folder", command=self._import_folder,
         )
-        import_menu.add_command(
-            label=t("menu.import.folder"), command=self._import_folder,
+        add_menu_item(
+            import_menu, "command", "menu.import.folder_clustered",
+            command=lambda: self._import_folder(cluster=True),
         )
-        self._menubar.add_cascade(label=t("menu.import"), menu=import_menu)
+        add_menu_item(self._menubar, "cascade", "menu.import", menu=import_menu)
         # 檢視選單
         view_menu = tk.Menu(self._menubar, tearoff=0)
         appearance_menu = tk.Menu(view_menu, tearoff=0)
@@ -94,27 +187,51 @@ class MainWindow(ctk.CTkFrame):
             ("Light", "menu.view.appearance.light"),
             ("System", "menu.view.appearance.system"),
         ]:
-            appearance_menu.add_radiobutton(
-                label=t(label_key),
+            add_menu_item(
+                appearance_menu, "radiobutton", label_key,
                 variable=self._appearance_var,
                 value=mode,
                 command=lambda m=mode: self._set_appearance(m),
             )
-        view_menu.add_cascade(label=t("menu.view.appearance"), menu=appearance_menu)
+        add_menu_item(view_menu, "cascade", "menu.view.appearance", menu=appearance_menu)
         language_menu = tk.Menu(view_menu, tearoff=0)
         self._language_var = tk.StringVar(value=get_locale())
         for lang, label_key in [
             ("zh_TW", "menu.view.language.zh_TW"),
             ("en", "menu.view.language.en"),
         ]:
-            language_menu.add_radiobutton(
-                label=t(label_key),
+            add_menu_item(
+                language_menu, "radiobutton", label_key,
                 variable=self._language_var,
                 value=lang,
                 command=lambda la=lang: self._set_language(la),
             )
-        view_menu.add_cascade(label=t("menu.view.language"), menu=language_menu)
-        self._menubar.add_cascade(label=t("menu.view"), menu=view_menu)
+        add_menu_item(view_menu, "cascade", "menu.view.language", menu=language_menu)
+        view_menu.add_separator()
+        self._preview_var = tk.BooleanVar(
+            value=bool(self._preferences.get("show_preview_panel")),
+        )
+        add_menu_item(
+            view_menu, "checkbutton", "menu.view.preview_panel",
+            variable=self._preview_var,
+            command=self._toggle_preview_panel,
+        )
+        view_menu.add_separator()
+        self._tracing_var = tk.BooleanVar(value=tracing.is_enabled())
+        add_menu_item(
+            view_menu, "checkbutton", "menu.view.tracing",
+            variable=self._tracing_var,
+            command=self._toggle_tracing,
+        )
+        add_menu_item(
+            view_menu, "command", "menu.view.export_trace",
+            command=self._export_trace,
+        )
+        add_menu_item(
+            view_menu, "command", "menu.view.metrics",
+            command=self._show_metrics_panel,
+        )
+        add_menu_item(self._menubar, "cascade", "menu.view", menu=view_menu)
 
     def _set_appearance(self, mode: str):
         ctk.set_appearance_mode(mode)
@@ -127,53 +244,43 @@ class MainWindow(ctk.CTkFrame):
         set_locale(lang_code)
         self._preferences.set("language", lang_code)
         self._preferences.save()
-        self._rebuild_ui()
+        relabel()
 
-    def _rebuild_ui(self):
-        """銷毀並重建所有 UI 面板，用於語言切換"""
-        # 先同步群組面板的狀態
-        if self._group_panel:
-            self._group_panel.sync_to_project()
-        # 記住目前值
-        current_master_template = self.project.master_template
-        current_subfolder_template = self.project.subfolder_template
-        current_use_subfolders = self.project.use_subfolders
-        current_instruments = list(self.project.instruments)
-        # 銷毀所有子元件
-        for child in self.winfo_children():
-            child.destroy()
-        self._group_panel = None
-        # 重建選單
-        self._create_menu()
-        # 重建佈局
-        self._create_layout()
-        # 還原樂器表
-        self._instrument_editor.set_instruments(current_instruments)
-        # 還原模板值
-        self._master_template_entry.delete(0, "end")
-        self._master_template_entry.insert(0, current_master_template)
-        self._subfolder_var.set(current_use_subfolders)
-        self._subfolder_template_entry.delete(0, "end")
-        self._subfolder_template_entry.insert(0, current_subfolder_template)
-        # 更新視窗標題
-        self.master_window.title(t("app.title"))
-        self._update_title()
-        # 延遲重建群組面板
-        self.master_window.after(50, self._rebuild_group_panel)
+    def _toggle_tracing(self):
+        if self._tracing_var.get():
+            tracing.clear()
+            tracing.enable()
+        else:
+            tracing.disable()
 
-    def _rebuild_group_panel(self):
-        """重建群組面板"""
-        from ui.group_panel import GroupPanel
-        if self._center_placeholder:
-            self._center_placeholder.destroy()
-            self._center_placeholder = None
-        group_panel = GroupPanel(
-            self._center_panel,
-            self.project,
-            self,
+    def _export_trace(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            title=t("filedialog.export_trace"),
+            defaultextension=".json",
+            filetypes=[(t("filedialog.trace_files"), "*.json")],
         )
-        group_panel.pack(fill="both", expand=True)
-        self._group_panel = group_panel
+        if not path:
+            return
+        try:
+            count = tracing.export_chrome_trace(path)
+        except OSError as e:
+            from tkinter import messagebox
+            messagebox.showerror(t("dialog.error"), str(e))
+            return
+        self._set_status("status.trace_exported", count=count, path=path)
+
+    def _show_metrics_panel(self):
+        if self._metrics_panel is not None and self._metrics_panel.winfo_exists():
+            self._metrics_panel.focus_set()
+            return
+        from ui.metrics_panel import MetricsPanel
+        self._metrics_panel = MetricsPanel(self.master_window)
+
+    def _relabel(self):
+        """切換語言後更新由資料計算的文字"""
+        self._update_title()
+        self._render_status()
 
     def _create_layout(self):
         self._left_panel = ctk.CTkFrame(self, width=250)
@@ -181,59 +288,85 @@ class MainWindow(ctk.CTkFrame):
         self._left_panel.pack_propagate(False)
         self._instrument_editor = InstrumentListEditor(
             self._left_panel,
-            on_instruments_changed=self._on_instruments_changed,
+            on_instrument_change=self._on_instrument_change,
         )
         self._instrument_editor.pack(fill="both", expand=True)
         right_area = ctk.CTkFrame(self, fg_color="transparent")
         right_area.pack(side="left", fill="both", expand=True, padx=4, pady=4)
+        self._right_area = right_area
         self._center_panel = ctk.CTkFrame(right_area)
         self._center_panel.pack(fill="both", expand=True)
-        self._center_placeholder = ctk.CTkLabel(
-            self._center_panel, text=t("group.loading"),
-            font=ctk.CTkFont(size=16),
-        )
+        self._center_placeholder = tr(ctk.CTkLabel(
+            self._center_panel, font=ctk.CTkFont(size=16),
+        ), "group.loading")
         self._center_placeholder.pack(expand=True)
+        self._center_retry = None
         self._create_bottom_panel(right_area)
 
+    def _show_preview_panel(self):
+        from ui.preview_panel import PreviewPanel
+        self._preview_panel = PreviewPanel(self, self.preview_service, width=360)
+        self._preview_panel.pack_propagate(False)
+        self._preview_panel.pack(
+            side="right", fill="y", padx=(0, 4), pady=4, before=self._right_area,
+        )
+        self.preview_service.attach(self.project)
+
+    def _toggle_preview_panel(self):
+        """顯示或隱藏即時預覽面板；隱藏時停止背景計算"""
+        show = self._preview_var.get()
+        self._preferences.set("show_preview_panel", show)
+        self._preferences.save()
+        if show and not self._preview_panel:
+            self._show_preview_panel()
+        elif not show and self._preview_panel:
+            self._preview_service.detach()
+            self._preview_panel.destroy()
+            self._preview_panel = None
+
+    def _on_preview_updated(self):
+        if self._preview_panel:
+            self._preview_panel.refresh()
+
     def _create_bottom_panel(self, parent):
         bottom = ctk.CTkFrame(parent)
         bottom.pack(fill="x", pady=(4, 0))
         template_row = ctk.CTkFrame(bottom, fg_color="transparent")
         template_row.pack(fill="x", padx=8, pady=(8, 4))
-        ctk.CTkLabel(template_row, text=t("panel.master_template")).pack(side="left")
+        tr(ctk.CTkLabel(template_row), "panel.master_template").pack(side="left")
         self._master_template_entry = ctk.CTkEntry(template_row, width=400)
         self._master_template_entry.pack(side="left", fill="x", expand=True, padx=(4, 4))
         self._master_template_entry.insert(0, self.project.master_template)
         self._master_template_entry.bind("<KeyRelease>", self._on_master_template_changed)
-        vars_btn = ctk.CTkButton(
-            template_row, text=t("panel.insert_variable"), width=80,
-            command=self._show_variable_menu,
-        )
+        vars_btn = tr(ctk.CTkButton(
+            template_row, width=80, command=self._show_variable_menu,
+        ), "panel.insert_variable")
         vars_btn.pack(side="right")
         self._vars_button = vars_btn
         subfolder_row = ctk.CTkFrame(bottom, fg_color="transparent")
         subfolder_row.pack(fill="x", padx=8, pady=2)
         self._subfolder_var = ctk.BooleanVar(value=self.project.use_subfolders)
-        self._subfolder_check = ctk.CTkCheckBox(
-            subfolder_row, text=t("panel.subfolder"),
+        self._subfolder_check = tr(ctk.CTkCheckBox(
+            subfolder_row,
             variable=self._subfolder_var,
             command=self._on_subfolder_toggled,
-        )
+        ), "panel.subfolder")
         self._subfolder_check.pack(side="left")
-        ctk.CTkLabel(subfolder_row, text=t("panel.subfolder_template")).pack(side="left")
+        tr(ctk.CTkLabel(subfolder_row), "panel.subfolder_template").pack(side="left")
         self._subfolder_template_entry = ctk.CTkEntry(subfolder_row, width=300)
         self._subfolder_template_entry.pack(side="left", fill="x", expand=True, padx=4)
         self._subfolder_template_entry.insert(0, self.project.subfolder_template)
         self._subfolder_template_entry.bind("<KeyRelease>", self._on_subfolder_template_changed)
         action_row = ctk.CTkFrame(bottom, fg_color="transparent")
         action_row.pack(fill="x", padx=8, pady=(4, 8))
-        self._preview_btn = ctk.CTkButton(
-            action_row, text=t("panel.preview_rename"),
+        self._preview_btn = tr(ctk.CTkButton(
+            action_row,
             font=ctk.CTkFont(size=14, weight="bold"),
             height=36, command=self._preview_and_rename,
-        )
+        ), "panel.preview_rename")
         self._preview_btn.pack(side="right")
-        self._status_label = ctk.CTkLabel(action_row, text=t("status.ready"), anchor="w")
+        self._status_label = ctk.CTkLabel(action_row, anchor="w")
+        self._render_status()
         self._status_label.pack(side="left", fill="x", expand=True)
 
     def _show_variable_menu(self):
@@ -259,22 +392,18 @@ class MainWindow(ctk.CTkFrame):
         self._on_master_template_changed()
 
     def _on_master_template_changed(self, event=None):
-        self.project.master_template = self._master_template_entry.get()
-        self._mark_modified()
+        self.project.update(master_template=self._master_template_entry.get())
 
     def _on_subfolder_toggled(self):
-        self.project.use_subfolders = self._subfolder_var.get()
-        self._mark_modified()
+        self.project.update(use_subfolders=self._subfolder_var.get())
 
     def _on_subfolder_template_changed(self, event=None):
-        self.project.subfolder_template = self._subfolder_template_entry.get()
-        self._mark_modified()
+        self.project.update(subfolder_template=self._subfolder_template_entry.get())
 
-    def _on_instruments_changed(self, instruments):
-        self.project.instruments = instruments
-        self._mark_modified()
+    def _on_instrument_change(self, change):
+        self.project.apply_instrument_change(change)
         if self._group_panel:
-            self._group_panel.on_instruments_changed(instruments)
+            self._group_panel.on_instrument_change(change)
 
     def _import_files(self):
         from tkinter import filedialog
@@ -286,31 +415,73 @@ class MainWindow(ctk.CTkFrame):
             return
         files = self.import_service.import_files(list(paths))
         self.project.ungrouped_files.extend(files)
-        self._mark_modified()
+        self.project.touch("ungrouped_files")
         if self._group_panel:
             self._group_panel.refresh_ungrouped()
-        self._set_status(t("status.imported_files", count=len(files)))
+        self._set_status("status.imported_files", count=len(files))
 
-    def _import_folder(self):
+    def _import_folder(self, cluster: bool = False):
         from tkinter import filedialog
+        from core.instrument_matcher import matcher_for_project
         folder = filedialog.askdirectory(title=t("filedialog.select_folder"))
         if not folder:
             return
-        groups, ungrouped = self.import_service.import_folder(folder)
+        groups, ungrouped = self.import_service.import_folder(
+            folder, cluster=cluster, matcher=matcher_for_project(self.project),
+        )
         self.project.ungrouped_files.extend(ungrouped)
+        self.project.touch("ungrouped_files")
         for g in groups:
-            self.project.groups.append(g)
-        self._mark_modified()
+            self.project.add_group(g)
         if self._group_panel:
             self._group_panel.reload_all()
         self._set_status(
-            t("status.imported_groups", groups=len(groups), files=len(ungrouped)),
+            "status.imported_groups", groups=len(groups), files=len(ungrouped),
         )
+        n_duplicates = sum(
+            1 for g in groups for f in g.files if f.duplicate_of
+        ) + sum(1 for f in ungrouped if f.duplicate_of)
+        if n_duplicates:
+            self._append_status("status.duplicates_found", count=n_duplicates)
 
-    def _preview_and_rename(self):
+    def _find_duplicates(self):
         from tkinter import messagebox
+        duplicates = self.duplicate_service.find_project_duplicates(self.project)
+        self.duplicate_service.mark_project_duplicates(self.project)
         if self._group_panel:
-            self._group_panel.sync_to_project()
+            self._group_panel.refresh_file_lists()
+        if not duplicates:
+            messagebox.showinfo(t("dialog.duplicates"), t("dialog.duplicates.none"))
+            return
+        lines = [
+            "  =  ".join(os.path.basename(p) for p in paths)
+            for paths in duplicates[:10]
+        ]
+        msg = t("dialog.duplicates.header", count=len(duplicates)) + "\n\n"
+        msg += "\n".join(lines)
+        if len(duplicates) > 10:
+            msg += "\n" + t("dialog.missing_files.more", count=len(duplicates))
+        messagebox.showwarning(t("dialog.duplicates"), msg)
+        self._set_status(
+            "status.duplicates_found", count=sum(len(p) - 1 for p in duplicates),
+        )
+
+    def _edit_instrument_aliases(self):
+        from ui.alias_dialog import AliasDialog
+        dialog = AliasDialog(
+            self.master_window,
+            self.project.instruments,
+            self.project.instrument_aliases,
+            on_save=self._on_aliases_saved,
+        )
+        dialog.grab_set()
+
+    def _on_aliases_saved(self, aliases):
+        self.project.update(instrument_aliases=aliases)
+
+    @traced("ui.main_window.preview_and_rename")
+    def _preview_and_rename(self):
+        from tkinter import messagebox
         if not self.project.master_template.strip():
             messagebox.showwarning(
                 t("dialog.warning"), t("dialog.warning.empty_template"),
@@ -343,25 +514,22 @@ class MainWindow(ctk.CTkFrame):
                 msg += "\n" + t("dialog.missing_files.more", count=len(missing))
             messagebox.showerror(t("dialog.missing_files"), msg)
             return
-        if not self._rename_service:
-            from services.rename_service import RenameService
-            self._rename_service = RenameService(self.file_service)
         from ui.preview_dialog import PreviewDialog
-        plan = self._rename_service.generate_rename_plan(self.project)
+        plan = self.rename_service.generate_rename_plan(self.project)
         if not plan:
             messagebox.showinfo(t("dialog.info"), t("dialog.info.no_files"))
             return
-        conflicts = self._rename_service.detect_conflicts(plan)
+        conflicts = self.rename_service.detect_conflicts(plan)
         dialog = PreviewDialog(
             self.master_window, plan, conflicts,
             on_execute=lambda p: self._execute_rename(p),
+            group_names={g.id: g.name for g in self.project.groups},
         )
         dialog.grab_set()
 
+    @traced("ui.main_window.execute_rename")
     def _execute_rename(self, plan):
         from tkinter import messagebox
-        if not self._rename_service:
-            return
         long_paths = [e.new_path for e in plan if len(e.new_path) > 255]
         if long_paths:
             msg = t("dialog.long_path.message", count=len(long_paths)) + "\n\n"
@@ -370,12 +538,12 @@ class MainWindow(ctk.CTkFrame):
             if not messagebox.askyesno(t("dialog.long_path"), msg):
                 return
         try:
-            record = self._rename_service.execute_rename(plan, self.project)
+            record = self.rename_service.execute_rename(plan, self.project)
             if not self._undo_service:
                 from services.undo_service import UndoService
                 self._undo_service = UndoService(self.file_service)
             self._undo_service.save_undo_record(record)
-            self._set_status(t("status.renamed", count=len(record.mappings)))
+            self._set_status("status.renamed", count=len(record.mappings))
             messagebox.showinfo(
                 t("dialog.complete"),
                 t("dialog.complete.renamed", count=len(record.mappings)),
@@ -389,6 +557,7 @@ class MainWindow(ctk.CTkFrame):
                 t("dialog.error"), t("dialog.error.rename_failed", error=e),
             )
 
+    @traced("ui.main_window.undo")
     def _undo_last(self):
         if not self._undo_service:
             from services.undo_service import UndoService
@@ -406,7 +575,7 @@ class MainWindow(ctk.CTkFrame):
             return
         try:
             self._undo_service.execute_undo(record)
-            self._set_status(t("status.undone"))
+            self._set_status("status.undone")
             messagebox.showinfo(t("dialog.complete"), t("dialog.complete.undone"))
         except Exception as e:
             messagebox.showerror(
@@ -423,6 +592,7 @@ class MainWindow(ctk.CTkFrame):
                 return
             if result:
                 self._save_project()
+        self.autosave.cancel()
         locale = get_locale()
         if locale == "en":
             default_master = DEFAULT_MASTER_TEMPLATE_EN
@@ -430,9 +600,10 @@ class MainWindow(ctk.CTkFrame):
         else:
             default_master = DEFAULT_MASTER_TEMPLATE
             default_subfolder = DEFAULT_SUBFOLDER_TEMPLATE
-        self.project = Project()
-        self.project.master_template = default_master
-        self.project.subfolder_template = default_subfolder
+        self._attach_project(Project(
+            master_template=default_master,
+            subfolder_template=default_subfolder,
+        ))
         self._project_path = None
         self._modified = False
         self._instrument_editor.set_instruments([])
@@ -442,7 +613,7 @@ class MainWindow(ctk.CTkFrame):
         self._subfolder_template_entry.delete(0, "end")
         self._subfolder_template_entry.insert(0, self.project.subfolder_template)
         if self._group_panel:
-            self._group_panel.reload_all()
+            self._group_panel.set_project(self.project)
         self._update_title()
 
     def _open_project(self):
@@ -462,13 +633,33 @@ class MainWindow(ctk.CTkFrame):
         )
         if not path:
             return
+        if self._load_project(path):
+            self._set_status("status.opened", path=path)
+
+    def _recover_autosave(self):
+        from tkinter import filedialog
+        os.makedirs(self.autosave.directory, exist_ok=True)
+        path = filedialog.askopenfilename(
+            title=t("filedialog.recover_autosave"),
+            initialdir=self.autosave.directory,
+            filetypes=[(t("filedialog.project_files"), "*.llproj")],
+        )
+        if not path:
+            return
+        # 復原的內容視為尚未儲存的新專案，避免覆寫自動儲存檔
+        if self._load_project(path, recovered=True):
+            self._set_status("status.recovered", path=path)
+
+    @traced("ui.main_window.load_project")
+    def _load_project(self, path: str, recovered: bool = False) -> bool:
+        self.autosave.cancel()
         try:
             if not self._project_service:
                 from services.project_service import ProjectService
                 self._project_service = ProjectService()
-            self.project = self._project_service.load_project(path)
-            self._project_path = path
-            self._modified = False
+            self._attach_project(self._project_service.load_project(path))
+            self._project_path = None if recovered else path
+            self._modified = recovered
             self._instrument_editor.set_instruments(self.project.instruments)
             self._master_template_entry.delete(0, "end")
             self._master_template_entry.insert(0, self.project.master_template)
@@ -476,14 +667,15 @@ class MainWindow(ctk.CTkFrame):
             self._subfolder_template_entry.delete(0, "end")
             self._subfolder_template_entry.insert(0, self.project.subfolder_template)
             if self._group_panel:
-                self._group_panel.reload_all()
+                self._group_panel.set_project(self.project)
             self._update_title()
-            self._set_status(t("status.opened", path=path))
+            return True
         except Exception as e:
             from tkinter import messagebox
             messagebox.showerror(
                 t("dialog.error"), t("dialog.error.open_failed", error=e),
             )
+            return False
 
     def _save_project(self):
         if not self._project_path:
@@ -492,39 +684,86 @@ class MainWindow(ctk.CTkFrame):
         self._do_save(self._project_path)
 
     def _save_project_as(self):
+        path = self._ask_save_path()
+        if not path:
+            return
+        self._do_save(path)
+
+    def _ask_save_path(self) -> str:
         from tkinter import filedialog
-        path = filedialog.asksaveasfilename(
+        return filedialog.asksaveasfilename(
             title=t("filedialog.save_project"),
             defaultextension=".llproj",
             filetypes=[(t("filedialog.project_files"), "*.llproj")],
         )
+
+    def save_before_close(self) -> bool:
+        """關閉前儲存專案並等待寫入完成
+
+        Returns:
+            是否已儲存；取消選擇路徑或儲存失敗（已顯示錯誤）時為 False，
+            此時應取消關閉
+        """
+        path = self._project_path or self._ask_save_path()
         if not path:
-            return
+            return False
         self._do_save(path)
+        self.autosave.drain()
+        return not self._modified
 
     def _do_save(self, path: str):
-        try:
-            if self._group_panel:
-                self._group_panel.sync_to_project()
-            if not self._project_service:
-                from services.project_service import ProjectService
-                self._project_service = ProjectService()
-            self._project_service.save_project(self.project, path)
-            self._project_path = path
-            self._modified = False
-            self._update_title()
-            self._set_status(t("status.saved", path=path))
-        except Exception as e:
+        # 在背景執行緒寫入，完成前仍可繼續編輯；之後的編輯不會被標記為已儲存
+        project, serial = self.project, self._edit_serial
+        self.autosave.save(
+            project, path,
+            on_done=lambda error: self._on_saved(project, path, serial, error),
+        )
+        self._set_status("status.saving", path=path)
+
+    def _on_saved(
+        self, project: Project, path: str, serial: int, error: Optional[Exception],
+    ):
+        if error is not None:
             from tkinter import messagebox
             messagebox.showerror(
-                t("dialog.error"), t("dialog.error.save_failed", error=e),
+                t("dialog.error"), t("dialog.error.save_failed", error=error),
             )
+            return
+        self._set_status("status.saved", path=path)
+        if project is not self.project:
+            # 儲存期間已切換到其他專案
+            return
+        self._project_path = path
+        if serial == self._edit_serial:
+            self._modified = False
+        self._update_title()
+
+    def _attach_project(self, project: Project):
+        """切換目前的專案並改為訂閱新專案的變更事件"""
+        self._unsubscribe_project()
+        self.project = project
+        self._unsubscribe_project = project.subscribe(self._on_project_changed)
+        if self._preview_panel:
+            self._preview_service.attach(project)
+
+    def _on_project_changed(self, event: ChangeEvent):
+        if event.modifies:
+            self._mark_modified()
 
     def _mark_modified(self):
+        self._edit_serial += 1
+        self.autosave.schedule(self.project, self._project_path)
         if not self._modified:
             self._modified = True
             self._update_title()
 
+    def shutdown(self):
+        """關閉前等待背景儲存完成（儲存失敗時會顯示錯誤）"""
+        if self._preview_service:
+            self._preview_service.shutdown()
+        if self._autosave:
+            self._autosave.shutdown(wait=True)
+
     def _update_title(self):
         title = t("app.title")
         if self._project_path:
@@ -535,8 +774,25 @@ class MainWindow(ctk.CTkFrame):
             title += " *"
         self.master_window.title(title)
 
-    def _set_status(self, text: str):
-        self._status_label.configure(text=text)
+    def _set_status(self, key: str, **kwargs):
+        """在狀態列顯示訊息
+
+        Args:
+            key: 語系鍵
+            **kwargs: 翻譯參數
+        """
+        self._status = [(key, kwargs)]
+        self._render_status()
+
+    def _append_status(self, key: str, **kwargs):
+        """在狀態列目前的訊息後附加一段訊息"""
+        self._status.append((key, kwargs))
+        self._render_status()
+
+    def _render_status(self):
+        self._status_label.configure(
+            text="  ".join(t(key, **kwargs) for key, kwargs in self._status),
+        )
 
     def set_group_panel(self, panel):
         """設定群組面板參考
@@ -548,3 +804,22 @@ class MainWindow(ctk.CTkFrame):
         if self._center_placeholder:
             self._center_placeholder.destroy()
             self._center_placeholder = None
+        if self._center_retry:
+            self._center_retry.destroy()
+            self._center_retry = None
+
+    def show_group_panel_error(self, error: Exception, retry: Callable[[], None]):
+        """群組面板建立失敗時，在中央區域顯示錯誤與重試按鈕
+
+        Args:
+            error: 建立失敗的例外
+            retry: 按下重試時呼叫
+        """
+        self._set_status("status.group_panel_failed", error=error)
+        if self._center_placeholder:
+            tr(self._center_placeholder, "group.load_failed")
+        if self._center_retry is None:
+            self._center_retry = tr(ctk.CTkButton(
+                self._center_panel, width=100, command=retry,
+            ), "group.retry")
+            self._center_retry.pack(pady=(0, 16))
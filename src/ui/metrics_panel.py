@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+操作統計面板
+
+顯示 core.metrics 的計數器與延遲直方圖，每秒更新一次；可清除統計以便
+只量測接下來的操作。
+"""
+from typing import Any, Dict
+import customtkinter as ctk
+from core import metrics
+from core.locale import t
+
+REFRESH_MS = 1000
+
+
+def format_snapshot(snapshot: Dict[str, Any]) -> str:
+    """將統計快照轉為等寬文字表格
+
+    Args:
+        snapshot: metrics.snapshot() 的結果
+
+    Returns:
+        多行文字
+    """
+    lines = []
+    histograms = snapshot["histograms"]
+    counters = {k: v for k, v in snapshot["counters"].items() if k not in histograms}
+    if counters:
+        width = max(len(name) for name in counters)
+        lines.extend(f"{name:<{width}}  {value:>10}" for name, value in counters.items())
+    if histograms:
+        if lines:
+            lines.append("")
+        width = max(len(name) for name in histograms)
+        lines.append(
+            f"{'':<{width}}  {'count':>8}  {'p50':>9}  {'p90':>9}  {'p99':>9}  {'max':>9}"
+        )
+        for name, h in histograms.items():
+            lines.append(
+                f"{name:<{width}}  {h['count']:>8}"
+                + "".join(
+                    f"  {_format_us(h[key]):>9}"
+                    for key in ("p50_us", "p90_us", "p99_us", "max_us")
+                )
+            )
+    return "\n".join(lines)
+
+
+def _format_us(value: float) -> str:
+    if value < 1000:
+        return f"{value:.0f} µs"
+    if value < 1_000_000:
+        return f"{value / 1000:.1f} ms"
+    return f"{value / 1_000_000:.2f} s"
+
+
+class MetricsPanel(ctk.CTkToplevel):
+    """操作統計視窗"""
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.title(t("metrics.title"))
+        self.geometry("640x480")
+        self.minsize(400, 240)
+        self._textbox = ctk.CTkTextbox(self, font=ctk.CTkFont(family="Courier", size=12))
+        self._textbox.pack(fill="both", expand=True, padx=8, pady=(8, 4))
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.pack(fill="x", padx=8, pady=8)
+        ctk.CTkButton(
+            btn_frame, text=t("metrics.reset"), width=100, command=self._reset,
+        ).pack(side="right")
+        self._after_id = None
+        self._refresh()
+        self.transient(master)
+
+    def _refresh(self):
+        text = format_snapshot(metrics.snapshot()) or t("metrics.empty")
+        self._textbox.configure(state="normal")
+        self._textbox.delete("1.0", "end")
+        self._textbox.insert("1.0", text)
+        self._textbox.configure(state="disabled")
+        self._after_id = self.after(REFRESH_MS, self._refresh)
+
+    def _reset(self):
+        metrics.reset()
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        self._refresh()
+
+    def destroy(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        super().destroy()
@@ -2,13 +2,19 @@
 """
 預覽對話框
 
-顯示重新命名計畫的預覽，包含衝突警告。
+顯示重新命名計畫的預覽，包含衝突警告。清單只建立可見範圍內的列，
+顯示文字在列被捲入畫面時才產生，上萬個項目也能立即開啟；可依衝突、
+群組或檔名篩選。
 """
-import os
 from typing import Callable, Dict, List, Optional
 import customtkinter as ctk
 from core.locale import t
 from core.models import RenameEntry
+from services.preview_service import filter_entries
+from ui.preview_panel import CONFLICT_TEXT_COLOR, format_preview_entry
+from ui.virtual_list import VirtualList
+
+_SEARCH_DELAY_MS = 150
 
 
 class PreviewDialog(ctk.CTkToplevel):
@@ -20,8 +26,17 @@ class PreviewDialog(ctk.CTkToplevel):
         plan: List[RenameEntry],
         conflicts: Dict[str, List[str]],
         on_execute: Optional[Callable[[List[RenameEntry]], None]] = None,
+        group_names: Optional[Dict[str, str]] = None,
         **kwargs,
     ):
+        """
+        Args:
+            master: 父視窗
+            plan: 重新命名計畫
+            conflicts: RenameService.detect_conflicts 的結果
+            on_execute: 按下執行時以（可能加上後綴的）計畫呼叫
+            group_names: 群組 ID 到顯示名稱的對應，用於群組篩選
+        """
         super().__init__(master, **kwargs)
         self.title(t("preview.title"))
         self.geometry("800x600")
@@ -29,6 +44,14 @@ class PreviewDialog(ctk.CTkToplevel):
         self._plan = plan
         self._conflicts = conflicts
         self._on_execute = on_execute
+        self._group_names = group_names or {}
+        self._conflict_paths = set()
+        for originals in conflicts.values():
+            self._conflict_paths.update(originals)
+        # 篩選後顯示的項目索引；None 表示未篩選
+        self._visible: Optional[List[int]] = None
+        self._search_after_id = None
+        self._default_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
         self._build_ui()
         self.transient(master)
         self.focus_set()
@@ -45,33 +68,42 @@ class PreviewDialog(ctk.CTkToplevel):
                 text_color="white",
                 font=ctk.CTkFont(size=13, weight="bold"),
             ).pack(padx=12, pady=8)
-        conflict_paths = set()
-        for originals in self._conflicts.values():
-            conflict_paths.update(originals)
-        ctk.CTkLabel(
+        filter_row = ctk.CTkFrame(self, fg_color="transparent")
+        filter_row.pack(fill="x", padx=8, pady=(4, 0))
+        self._search_entry = ctk.CTkEntry(
+            filter_row, width=220, placeholder_text=t("preview.search"),
+        )
+        self._search_entry.pack(side="left")
+        self._search_entry.bind("<KeyRelease>", lambda e: self._schedule_filter())
+        self._group_labels = {t("preview.filter_all_groups"): None}
+        for group_id, name in self._group_names.items():
+            label = name or group_id[:8]
+            if label in self._group_labels:
+                label = f"{label} ({group_id[:4]})"
+            self._group_labels[label] = group_id
+        if len(self._group_labels) > 2:
+            self._group_menu = ctk.CTkOptionMenu(
+                filter_row, values=list(self._group_labels),
+                command=lambda _: self._apply_filter(),
+            )
+            self._group_menu.pack(side="left", padx=8)
+        else:
+            self._group_menu = None
+        self._conflicts_only_var = ctk.BooleanVar(value=False)
+        if has_conflicts:
+            ctk.CTkCheckBox(
+                filter_row, text=t("preview.filter_conflicts"),
+                variable=self._conflicts_only_var,
+                command=self._apply_filter,
+            ).pack(side="left", padx=8)
+        self._count_label = ctk.CTkLabel(
             self, text=t("preview.file_count", count=len(self._plan)),
             font=ctk.CTkFont(size=13),
-        ).pack(padx=8, pady=(4, 2))
-        scroll = ctk.CTkScrollableFrame(self)
-        scroll.pack(fill="both", expand=True, padx=8, pady=4)
-        for entry in self._plan:
-            is_conflict = entry.original_path in conflict_paths
-            row = ctk.CTkFrame(scroll, fg_color="transparent")
-            row.pack(fill="x", pady=1)
-            old_name = os.path.basename(entry.original_path)
-            new_name = os.path.basename(entry.new_path)
-            new_dir = os.path.dirname(entry.new_path)
-            original_dir = os.path.dirname(entry.original_path)
-            if new_dir != original_dir:
-                rel_dir = os.path.relpath(new_dir, original_dir)
-                display_new = os.path.join(rel_dir, new_name)
-            else:
-                display_new = new_name
-            text_color = "#e74c3c" if is_conflict else None
-            ctk.CTkLabel(
-                row, text=f"{old_name}  \u2192  {display_new}",
-                anchor="w", text_color=text_color,
-            ).pack(side="left", fill="x", expand=True, padx=4)
+        )
+        self._count_label.pack(padx=8, pady=(4, 2))
+        self._list = VirtualList(self, self._create_row, self._bind_row)
+        self._list.pack(fill="both", expand=True, padx=8, pady=4)
+        self._list.set_count(len(self._plan))
         btn_frame = ctk.CTkFrame(self, fg_color="transparent")
         btn_frame.pack(fill="x", padx=8, pady=8)
         cancel_btn = ctk.CTkButton(
@@ -93,6 +125,52 @@ class PreviewDialog(ctk.CTkToplevel):
             )
         exec_btn.pack(side="right", padx=4)
 
+    def _create_row(self, parent):
+        return ctk.CTkLabel(parent, text="", anchor="w")
+
+    def _bind_row(self, label, index: int):
+        if self._visible is not None:
+            index = self._visible[index]
+        entry = self._plan[index]
+        is_conflict = entry.original_path in self._conflict_paths
+        label.configure(
+            text=format_preview_entry(entry),
+            text_color=CONFLICT_TEXT_COLOR if is_conflict else self._default_color,
+        )
+
+    def _schedule_filter(self):
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(_SEARCH_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._search_after_id = None
+        group_id = (
+            self._group_labels.get(self._group_menu.get()) if self._group_menu else None
+        )
+        text = self._search_entry.get()
+        conflicts_only = self._conflicts_only_var.get()
+        if group_id is None and not text.strip() and not conflicts_only:
+            self._visible = None
+            self._count_label.configure(
+                text=t("preview.file_count", count=len(self._plan)),
+            )
+            self._list.set_count(len(self._plan), keep_position=False)
+            return
+        self._visible = filter_entries(
+            self._plan, self._conflict_paths, conflicts_only, group_id, text,
+        )
+        self._count_label.configure(text=t(
+            "preview.shown_count", shown=len(self._visible), count=len(self._plan),
+        ))
+        self._list.set_count(len(self._visible), keep_position=False)
+
+    def destroy(self):
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        super().destroy()
+
     def _execute(self):
         if self._on_execute:
             self._on_execute(self._plan)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+即時預覽面板
+
+停靠在主視窗右側，隨模板與群組欄位的編輯即時顯示重新命名結果，
+衝突的項目以紅色標示。只建立可見範圍內的列元件。
+"""
+import os
+import customtkinter as ctk
+from core.locale import t
+from core.models import RenameEntry
+from core.tracing import traced
+from services.preview_service import PreviewService
+from ui.i18n import on_relabel, tr
+from ui.virtual_list import VirtualList
+
+CONFLICT_TEXT_COLOR = "#e74c3c"
+
+
+def format_preview_entry(entry: RenameEntry) -> str:
+    """預覽列顯示文字：舊檔名 → 新檔名（移到子資料夾時顯示相對路徑）"""
+    old_name = os.path.basename(entry.original_path)
+    new_dir, new_name = os.path.split(entry.new_path)
+    original_dir = os.path.dirname(entry.original_path)
+    if new_dir != original_dir:
+        new_name = os.path.join(os.path.relpath(new_dir, original_dir), new_name)
+    return f"{old_name}  →  {new_name}"
+
+
+class PreviewPanel(ctk.CTkFrame):
+    """即時重新命名預覽面板"""
+
+    def __init__(self, master, preview_service: PreviewService, **kwargs):
+        super().__init__(master, **kwargs)
+        self._service = preview_service
+        self._default_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
+        self._build_ui()
+
+    def _build_ui(self):
+        tr(ctk.CTkLabel(
+            self, font=ctk.CTkFont(weight="bold"),
+        ), "preview_panel.title").pack(padx=8, pady=(8, 0), anchor="w")
+        self._summary_label = ctk.CTkLabel(self, text="", anchor="w")
+        self._summary_label.pack(fill="x", padx=8)
+        self._list = VirtualList(self, self._create_row, self._bind_row)
+        tr(self._list.empty_label, "preview_panel.empty")
+        self._list.pack(fill="both", expand=True, padx=4, pady=4)
+        on_relabel(self, self.refresh)
+        self.refresh()
+
+    def _create_row(self, parent):
+        return ctk.CTkLabel(parent, text="", anchor="w")
+
+    def _bind_row(self, label, index: int):
+        entry = self._service.entries[index]
+        conflict = self._service.conflicts.is_conflict(entry)
+        label.configure(
+            text=format_preview_entry(entry),
+            text_color=CONFLICT_TEXT_COLOR if conflict else self._default_color,
+        )
+
+    @traced("ui.preview_panel.refresh")
+    def refresh(self):
+        """預覽內容更新後重新顯示"""
+        entries = self._service.entries
+        if self._service.error is not None:
+            summary = t("preview_panel.error", error=self._service.error)
+        else:
+            summary = t("preview.file_count", count=len(entries))
+            if self._service.conflicts.count:
+                summary += "  " + t(
+                    "preview_panel.conflicts", count=self._service.conflicts.count,
+                )
+        self._summary_label.configure(
+            text=summary,
+            text_color=CONFLICT_TEXT_COLOR if self._service.conflicts.count
+            else self._default_color,
+        )
+        self._list.set_count(len(entries))
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+虛擬清單元件
+
+只建立可見範圍內的列元件，捲動時重複使用同一批元件並重新綁定資料，
+元件數量與清單長度無關。適用於預覽與檔案清單等可能有上萬列的清單。
+
+使用範例：
+    def create_row(parent):
+        return ctk.CTkLabel(parent, anchor="w")
+
+    def bind_row(label, index):
+        label.configure(text=items[index])
+
+    view = VirtualList(master, create_row, bind_row)
+    view.set_count(len(items))
+"""
+import tkinter as tk
+from typing import Callable, Iterable, List, Optional, Tuple
+import customtkinter as ctk
+from core.tracing import traced
+
+DEFAULT_ROW_HEIGHT = 28
+
+
+def visible_range(top: int, capacity: int, count: int) -> Tuple[int, int]:
+    """計算可見列的範圍
+
+    Args:
+        top: 第一個可見列的索引
+        capacity: 可同時顯示的列數
+        count: 總列數
+
+    Returns:
+        (起始索引, 結束索引) 元組，不含結束索引
+    """
+    top = max(0, min(top, count - capacity))
+    return top, min(count, top + capacity)
+
+
+class VirtualList(ctk.CTkFrame):
+    """固定列高、重複使用列元件的捲動清單"""
+
+    def __init__(
+        self,
+        master,
+        create_row: Callable[[ctk.CTkFrame], object],
+        bind_row: Callable[[object, int], None],
+        row_height: int = DEFAULT_ROW_HEIGHT,
+        empty_text: str = "",
+        **kwargs,
+    ):
+        """
+        Args:
+            master: 父元件
+            create_row: 建立一個列元件（父元件為清單內部框架）
+            bind_row: 將第 index 列的資料綁定到列元件
+            row_height: 列高（像素）
+            empty_text: 清單為空時顯示的文字（之後可經由 empty_label 修改）
+        """
+        super().__init__(master, **kwargs)
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self.row_height = row_height
+        self._count = 0
+        self._top = 0
+        self._capacity = 0
+        self._rows: List[object] = []
+        # 每個列元件目前綁定的資料索引（未使用為 -1）
+        self._bound: List[int] = []
+        self._body = ctk.CTkFrame(self, fg_color="transparent")
+        self._body.pack(side="left", fill="both", expand=True)
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+        self.empty_label = ctk.CTkLabel(
+            self._body, text=empty_text, text_color="gray",
+        )
+        self._body.bind("<Configure>", self._on_resize)
+        # 滾輪事件以獨立的 bindtag 綁定，列元件內的子元件也能捲動清單
+        self._wheel_tag = f"VirtualListWheel{id(self)}"
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_class(self._wheel_tag, sequence, self._on_wheel)
+        self._bind_wheel(self._body)
+        self._update_empty()
+
+    # ── 公開 API ──
+
+    @property
+    def count(self) -> int:
+        """總列數"""
+        return self._count
+
+    def set_count(self, count: int, keep_position: bool = True):
+        """設定總列數並重新綁定所有可見列
+
+        Args:
+            count: 總列數
+            keep_position: 是否保留目前捲動位置
+        """
+        self._count = count
+        if not keep_position:
+            self._top = 0
+        self._update_empty()
+        self._render(force=True)
+
+    def refresh(self, indices: Optional[Iterable[int]] = None):
+        """重新綁定列資料
+
+        Args:
+            indices: 只重新綁定這些索引（不在可見範圍內者略過）；None 表示全部可見列
+        """
+        if indices is None:
+            self._render(force=True)
+            return
+        wanted = set(indices)
+        for row, index in zip(self._rows, self._bound):
+            if index in wanted:
+                self._bind_row(row, index)
+
+    def scroll_to(self, index: int):
+        """捲動使第 index 列可見"""
+        start, end = visible_range(self._top, self._capacity, self._count)
+        if index < start:
+            self._top = index
+        elif index >= end:
+            self._top = index - self._capacity + 1
+        else:
+            return
+        self._render()
+
+    def visible_indices(self) -> range:
+        """目前可見的資料索引"""
+        return range(*visible_range(self._top, self._capacity, self._count))
+
+    # ── 版面 ──
+
+    def _on_resize(self, event):
+        capacity = max(1, event.height // self.row_height)
+        if capacity == self._capacity:
+            return
+        self._capacity = capacity
+        while len(self._rows) < capacity:
+            row = self._create_row(self._body)
+            self._bind_wheel(row)
+            self._rows.append(row)
+            self._bound.append(-1)
+        self._render(force=True)
+
+    def _update_empty(self):
+        if self._count == 0:
+            self.empty_label.place(relx=0.5, y=8, anchor="n")
+        else:
+            self.empty_label.place_forget()
+
+    @traced("ui.virtual_list.render")
+    def _render(self, force: bool = False):
+        start, end = visible_range(self._top, self._capacity, self._count)
+        self._top = start
+        for slot, row in enumerate(self._rows):
+            index = start + slot
+            if index < end:
+                if force or self._bound[slot] != index:
+                    self._bind_row(row, index)
+                    self._bound[slot] = index
+                if not row.winfo_ismapped():
+                    row.place(
+                        x=0, y=slot * self.row_height,
+                        relwidth=1, height=self.row_height,
+                    )
+            elif self._bound[slot] != -1 or row.winfo_ismapped():
+                row.place_forget()
+                self._bound[slot] = -1
+        if self._count:
+            self._scrollbar.set(start / self._count, end / self._count)
+        else:
+            self._scrollbar.set(0, 1)
+
+    # ── 捲動 ──
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._top = int(float(args[0]) * self._count)
+        elif action == "scroll":
+            amount = int(args[0])
+            step = self._capacity if args[1] == "pages" else 1
+            self._top += amount * step
+        self._render()
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            delta = -3
+        elif getattr(event, "num", None) == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self._top += delta
+        self._render()
+        return "break"
+
+    def _bind_wheel(self, widget):
+        tags = tk.Misc.bindtags(widget)
+        if self._wheel_tag not in tags:
+            tk.Misc.bindtags(widget, (self._wheel_tag,) + tuple(tags))
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
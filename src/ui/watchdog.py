@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+事件迴圈回應監看
+
+以固定間隔的 after() 心跳量測 Tk 事件迴圈的延遲：心跳比預定時間晚的
+部分就是介面無法回應的時間。另有一個背景執行緒定期檢查心跳是否逾時，
+逾時超過門檻時以 sys._current_frames() 擷取主執行緒當下的堆疊，找出
+正在執行的事件處理函式（tkinter 回呼的下一層）。
+
+每次停頓超過門檻時寫入紀錄檔（含堆疊），並計入 core.metrics 的
+ui.stall；結束時寫入本次工作階段的心跳延遲 p50 / p99 以及各處理函式的
+停頓統計，用來判斷哪些處理函式應移到背景執行緒。紀錄檔超過
+MAX_LOG_BYTES 時改名為 <紀錄檔>.1（覆寫上一份）後重新開始。
+
+使用範例：
+    watchdog = UiWatchdog(app, log_path=WATCHDOG_LOG)
+    watchdog.start()
+    app.mainloop()
+    watchdog.stop()
+"""
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from core import metrics
+from core.metrics import Histogram
+
+HEARTBEAT_MS = 100
+STALL_THRESHOLD_MS = 250
+SAMPLE_INTERVAL_MS = 50
+MAX_LOG_BYTES = 1024 * 1024
+
+_LIBRARY_DIRS = tuple(
+    os.path.normcase(os.path.abspath(path))
+    for key in ("stdlib", "platstdlib", "purelib", "platlib")
+    for path in [sysconfig.get_paths().get(key)] if path
+)
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+
+
+@dataclass
+class Stall:
+    """一次介面停頓"""
+    duration: float
+    handler: str = "?"
+    stack: List[str] = field(default_factory=list)
+
+
+def _is_library_frame(filename: str) -> bool:
+    path = os.path.normcase(os.path.abspath(filename))
+    return path == _THIS_FILE or path.startswith(_LIBRARY_DIRS)
+
+
+def find_handler(stack: List[traceback.FrameSummary]) -> str:
+    """由堆疊找出正在執行的事件處理函式
+
+    取 tkinter 回呼（CallWrapper.__call__）的下一層；找不到時取最內層的
+    非標準函式庫、非第三方套件的函式。
+
+    Args:
+        stack: 由外而內的堆疊
+
+    Returns:
+        「模組檔名:函式名稱」，無法判斷時為 "?"
+    """
+    for i in range(len(stack) - 2, -1, -1):
+        frame = stack[i]
+        if frame.name == "__call__" and os.path.basename(os.path.dirname(frame.filename)) == "tkinter":
+            return _frame_label(stack[i + 1])
+    for frame in reversed(stack):
+        if not _is_library_frame(frame.filename):
+            return _frame_label(frame)
+    return "?"
+
+
+def _frame_label(frame: traceback.FrameSummary) -> str:
+    return f"{os.path.splitext(os.path.basename(frame.filename))[0]}:{frame.name}"
+
+
+def _summary_ms(histogram: Histogram) -> Dict[str, float]:
+    return {
+        "count": histogram.count,
+        "p50_ms": histogram.percentile(50) / 1000,
+        "p99_ms": histogram.percentile(99) / 1000,
+        "max_ms": histogram.max / 1000,
+        "total_ms": histogram.total / 1000,
+    }
+
+
+class UiWatchdog:
+    """Tk 事件迴圈的心跳與停頓擷取"""
+
+    def __init__(
+        self,
+        scheduler: Any,
+        interval_ms: int = HEARTBEAT_MS,
+        threshold_ms: int = STALL_THRESHOLD_MS,
+        sample_ms: int = SAMPLE_INTERVAL_MS,
+        log_path: Optional[str] = None,
+        max_log_bytes: int = MAX_LOG_BYTES,
+        on_stall: Optional[Callable[[Stall], None]] = None,
+        thread_id: Optional[int] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        Args:
+            scheduler: 提供 after / after_cancel 的 Tk 元件
+            interval_ms: 心跳間隔（毫秒）
+            threshold_ms: 延遲超過多少毫秒視為停頓
+            sample_ms: 背景執行緒檢查心跳的間隔（毫秒）
+            log_path: 紀錄檔路徑；None 表示不寫檔
+            max_log_bytes: 紀錄檔超過此大小時輪替
+            on_stall: 每次停頓結束後於主執行緒呼叫
+            thread_id: 要擷取堆疊的執行緒，預設為主執行緒
+            clock: 取得目前時間的函式（秒）
+        """
+        self._scheduler = scheduler
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.sample_interval = sample_ms / 1000
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self.on_stall = on_stall
+        self._thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self._clock = clock
+        # 每次心跳的延遲，與各處理函式的停頓時間（微秒）
+        self.latencies = Histogram()
+        self.handlers: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._expected = 0.0
+        self._captured: Optional[List[traceback.FrameSummary]] = None
+        self._after_id = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        """開始心跳與背景取樣"""
+        self._schedule(self._clock())
+        if self.sample_interval > 0:
+            self._stop.clear()
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name="ui-watchdog", daemon=True,
+            )
+            self._sampler.start()
+
+    def stop(self):
+        """停止監看並將本次工作階段的統計寫入紀錄檔"""
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self._scheduler.after_cancel(self._after_id)
+            except Exception:
+                # 視窗已關閉
+                pass
+            self._after_id = None
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+        if self.latencies.count:
+            self._write(format_report(self.report()))
+
+    def report(self) -> Dict[str, Any]:
+        """本次工作階段的統計
+
+        Returns:
+            {"heartbeats", "stalls", "p50_ms", "p99_ms", "max_ms",
+             "handlers": {處理函式: {"count", "p50_ms", "p99_ms", "max_ms", "total_ms"}}}，
+            handlers 依停頓總時間由多到少排列
+        """
+        latency = _summary_ms(self.latencies)
+        handlers = sorted(self.handlers.items(), key=lambda item: item[1].total, reverse=True)
+        return {
+            "heartbeats": latency["count"],
+            "stalls": sum(h.count for h in self.handlers.values()),
+            "p50_ms": latency["p50_ms"],
+            "p99_ms": latency["p99_ms"],
+            "max_ms": latency["max_ms"],
+            "handlers": {name: _summary_ms(h) for name, h in handlers},
+        }
+
+    # ── 心跳（主執行緒） ──
+
+    def _schedule(self, now: float):
+        with self._lock:
+            self._expected = now + self.interval
+        self._after_id = self._scheduler.after(int(self.interval * 1000), self.beat)
+
+    def beat(self):
+        """心跳：記錄延遲，超過門檻時記錄停頓"""
+        self._after_id = None
+        now = self._clock()
+        with self._lock:
+            latency = max(0.0, now - self._expected)
+            captured, self._captured = self._captured, None
+        self.latencies.record(int(latency * 1e6))
+        if latency > self.threshold:
+            stall = Stall(
+                duration=latency,
+                handler=find_handler(captured) if captured else "?",
+                stack=traceback.format_list(captured) if captured else [],
+            )
+            self.handlers.setdefault(stall.handler, Histogram()).record(int(latency * 1e6))
+            metrics.observe("ui.stall", latency)
+            self._write(format_stall(stall))
+            if self.on_stall:
+                self.on_stall(stall)
+        if not self._stop.is_set():
+            self._schedule(now)
+
+    # ── 取樣（背景執行緒） ──
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            self.sample()
+
+    def sample(self):
+        """心跳逾時超過門檻且本次停頓尚未擷取時，擷取目標執行緒的堆疊"""
+        with self._lock:
+            if self._captured is not None or self._clock() - self._expected <= self.threshold:
+                return
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        del frame
+        with self._lock:
+            if self._captured is None:
+                self._captured = stack
+
+    def _write(self, text: str):
+        if not self.log_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            if os.path.isfile(self.log_path) \
+                    and os.path.getsize(self.log_path) >= self.max_log_bytes:
+                os.replace(self.log_path, self.log_path + ".1")
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(f"[{datetime.now().isoformat(timespec='seconds')}] {text}\n")
+        except OSError:
+            # 無法寫入紀錄不應影響介面
+            pass
+
+
+def format_stall(stall: Stall) -> str:
+    """將停頓格式化為紀錄文字"""
+    lines = [f"UI stall {stall.duration * 1000:.0f} ms in {stall.handler}"]
+    lines.extend(line.rstrip("\n") for line in stall.stack)
+    return "\n".join(lines)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """將工作階段統計格式化為紀錄文字"""
+    lines = [
+        f"UI session: {report['heartbeats']} heartbeats, {report['stalls']} stalls, "
+        f"latency p50 {report['p50_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms, "
+        f"max {report['max_ms']:.1f} ms"
+    ]
+    for name, h in report["handlers"].items():
+        lines.append(
+            f"  {name}: {h['count']} stalls, p50 {h['p50_ms']:.0f} ms, "
+            f"p99 {h['p99_ms']:.0f} ms, total {h['total_ms']:.0f} ms"
+        )
+    return "\n".join(lines)
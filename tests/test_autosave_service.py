@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+自動儲存服務單元測試
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.models import FileInfo, Group, Project
+from services import project_format
+from services.autosave_service import AutosaveService, snapshot_project
+from services.project_service import ProjectService
+
+
+class FakeScheduler:
+    """模擬 Tk 的 after / after_cancel，由測試手動執行排程"""
+
+    def __init__(self):
+        self._next_id = 0
+        self.pending = {}
+
+    def after(self, delay_ms, callback):
+        self._next_id += 1
+        self.pending[self._next_id] = callback
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks = list(self.pending.values())
+        self.pending.clear()
+        for callback in callbacks:
+            callback()
+
+
+def _make_project(name="A"):
+    return Project(
+        instruments=["Flute"],
+        groups=[Group(id="g1", name=name, files=[FileInfo("/x/fl.pdf", "fl.pdf")])],
+    )
+
+
+class TestAutosaveService(unittest.TestCase):
+    """AutosaveService 測試"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.autosave_dir = os.path.join(self.temp_dir, "autosave")
+        self.scheduler = FakeScheduler()
+        self.service = AutosaveService(
+            self.scheduler, directory=self.autosave_dir, keep=3,
+        )
+        self.project_service = ProjectService()
+
+    def tearDown(self):
+        import shutil
+        self.service.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _drain(self, timeout=5.0):
+        """等待背景執行緒完成並執行主執行緒回呼"""
+        deadline = time.monotonic() + timeout
+        while self.service._in_flight and time.monotonic() < deadline:
+            self.scheduler.run_pending()
+            time.sleep(0.01)
+
+    def test_edits_are_debounced(self):
+        project = _make_project()
+        for _ in range(5):
+            self.service.schedule(project, None)
+        self.assertEqual(len(self.scheduler.pending), 1)
+        self.scheduler.run_pending()
+        self._drain()
+        versions = self.service.list_versions(None)
+        self.assertEqual(len(versions), 1)
+        self.assertTrue(os.path.basename(versions[0]).startswith("untitled."))
+
+    def test_ring_keeps_latest_versions(self):
+        project = _make_project()
+        path = os.path.join(self.temp_dir, "season.llproj")
+        for i in range(5):
+            project.groups[0].name = f"v{i}"
+            self.service.schedule(project, path)
+            self.service.flush()
+            self._drain()
+        versions = self.service.list_versions(path)
+        self.assertEqual(len(versions), 3)
+        latest = self.project_service.load_project(versions[0])
+        self.assertEqual(latest.groups[0].name, "v4")
+
+    def test_same_named_projects_keep_separate_rings(self):
+        paths = [
+            os.path.join(self.temp_dir, folder, "season.llproj")
+            for folder in ("2024", "2025")
+        ]
+        for path in paths:
+            for i in range(3):
+                project = _make_project(f"{os.path.basename(os.path.dirname(path))}-{i}")
+                self.service.schedule(project, path)
+                self.service.flush()
+                self._drain()
+        for path in paths:
+            versions = self.service.list_versions(path)
+            self.assertEqual(len(versions), 3)
+            latest = self.project_service.load_project(versions[0])
+            self.assertEqual(
+                latest.groups[0].name, f"{os.path.basename(os.path.dirname(path))}-2",
+            )
+        self.assertEqual(len(self.service.list_versions(None)), 6)
+
+    def test_save_uses_snapshot_and_reports_back(self):
+        project = _make_project("before")
+        path = os.path.join(self.temp_dir, "p.llproj")
+        results = []
+        self.service.save(project, path, on_done=results.append)
+        project.groups[0].name = "after"
+        project.groups.append(Group(name="extra"))
+        self._drain()
+        self.assertEqual(results, [None])
+        loaded = self.project_service.load_project(path)
+        self.assertEqual([g.name for g in loaded.groups], ["before"])
+
+    def test_save_error_is_reported(self):
+        results = []
+        missing_dir = os.path.join(self.temp_dir, "missing", "p.llproj")
+        self.service.save(_make_project(), missing_dir, on_done=results.append)
+        self._drain()
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], OSError)
+
+    def test_shutdown_reports_pending_save_error(self):
+        results = []
+        missing_dir = os.path.join(self.temp_dir, "missing", "p.llproj")
+        self.service.save(_make_project(), missing_dir, on_done=results.append)
+        self.service.shutdown(wait=True)
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], OSError)
+        self.assertEqual(self.scheduler.pending, {})
+
+    def test_resave_keeps_lazy_groups_readable(self):
+        path = os.path.join(self.temp_dir, "p.llproj")
+        self.project_service.save_project(_make_project(), path)
+        loaded = self.project_service.load_project(path)
+        loaded.groups.insert(0, Group(id="new", name="new"))
+        self.service.save(loaded, path)
+        self._drain()
+        self.assertEqual(loaded.groups[1].name, "A")
+
+    def test_autosave_snapshot_survives_rewrite(self):
+        # 自動儲存快照建立後、寫入前，排在前面的手動儲存改寫了專案檔
+        path = os.path.join(self.temp_dir, "p.llproj")
+        project = _make_project()
+        project.groups.append(Group(id="g2", name="B"))
+        self.project_service.save_project(project, path)
+        loaded = self.project_service.load_project(path)
+        autosave = snapshot_project(loaded)
+        loaded.groups.insert(0, Group(id="new", name="new"))
+        loaded.groups[1].name = "A2"
+        saved = snapshot_project(loaded, share_chunks=True)
+        project_format.write_project_file(path, {}, saved.groups, [])
+        autosave_path = os.path.join(self.temp_dir, "autosave.llproj")
+        project_format.write_project_file(autosave_path, {}, autosave.groups, [])
+        restored = self.project_service.load_project(autosave_path)
+        self.assertEqual([g.name for g in restored.groups], ["A", "B"])
+        self.assertEqual(restored.groups[0].files[0].display_name, "fl.pdf")
+        # 自動儲存不會讓原專案的區塊改為指向自動儲存檔
+        self.assertEqual(loaded.groups[2].name, "B")
+        os.remove(autosave_path)
+        self.assertEqual(self.project_service.load_project(path).groups[2].name, "B")
+
+    def test_stale_chunk_is_not_copied(self):
+        path = os.path.join(self.temp_dir, "p.llproj")
+        self.project_service.save_project(_make_project(), path)
+        loaded = self.project_service.load_project(path)
+        self.project_service.save_project(_make_project("much longer name"), path)
+        with self.assertRaises(project_format.ProjectFormatError):
+            project_format.write_project_file(
+                os.path.join(self.temp_dir, "copy.llproj"), {}, loaded.groups, [],
+            )
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """寫入失敗時不損毀原檔"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_failed_write_keeps_original(self):
+        service = ProjectService()
+        path = os.path.join(self.temp_dir, "p.llproj")
+        service.save_project(_make_project("original"), path)
+        with patch.object(project_format, "group_to_dict", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                service.save_project(_make_project("broken"), path)
+        self.assertEqual(os.listdir(self.temp_dir), ["p.llproj"])
+        self.assertEqual(service.load_project(path).groups[0].name, "original")
+
+    def test_snapshot_is_independent(self):
+        project = _make_project()
+        snapshot = snapshot_project(project)
+        project.groups[0].files.append(FileInfo("/x/ob.pdf", "ob.pdf"))
+        project.instruments.append("Oboe")
+        self.assertEqual(len(snapshot.groups[0].files), 1)
+        self.assertEqual(snapshot.instruments, ["Flute"])
+
+
+if __name__ == '__main__':
+    unittest.main()
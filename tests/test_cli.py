@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+命令列批次重新命名單元測試
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from cli.batch import CONFLICT_SUFFIX, RenameJob, run_job, run_jobs
+from core.models import FileInfo, Group, Project
+from services.file_service import FileService
+from services.project_service import ProjectService
+from services.undo_service import UndoService
+
+
+class TestBatchRename(unittest.TestCase):
+    """run_job / run_jobs 測試"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.undo_dir = os.path.join(self.temp_dir, "undo")
+        self.folders = []
+        for piece in ("Sym", "Con"):
+            folder = os.path.join(self.temp_dir, piece)
+            os.makedirs(folder)
+            for name in ("Flute", "Oboe"):
+                with open(os.path.join(folder, f"{piece}_{name}.pdf"), "w") as f:
+                    f.write(piece + name)
+            self.folders.append(folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _job(self, source, **kwargs):
+        kwargs.setdefault("instruments", ["Flute", "Oboe"])
+        kwargs.setdefault("master_template", "{序號}. {樂器}.pdf")
+        return RenameJob(source=source, undo_dir=self.undo_dir, **kwargs)
+
+    def test_dry_run_does_not_touch_files(self):
+        events = run_job(self._job(self.folders[0], dry_run=True))
+        renames = [e for e in events if e["event"] == "rename"]
+        self.assertEqual(
+            [os.path.basename(e["new"]) for e in renames], ["1. Flute.pdf", "2. Oboe.pdf"],
+        )
+        self.assertEqual(events[-1]["event"], "done")
+        self.assertTrue(os.path.isfile(renames[0]["original"]))
+        self.assertFalse(os.path.isdir(self.undo_dir))
+
+    def test_execute_writes_undo_record(self):
+        events = run_job(self._job(self.folders[0]))
+        done = events[-1]
+        self.assertEqual(done["event"], "done")
+        self.assertTrue(os.path.isfile(done["undo_record"]))
+        self.assertEqual(
+            sorted(os.listdir(self.folders[0])), ["1. Flute.pdf", "2. Oboe.pdf"],
+        )
+
+    def test_partial_failure_writes_undo_record(self):
+        real_rename = FileService.rename_file
+        calls = []
+
+        def crash_on_second(self_, old, new):
+            calls.append(old)
+            if len(calls) == 2:
+                raise OSError("disk removed")
+            real_rename(self_, old, new)
+
+        with mock.patch.object(FileService, "rename_file", crash_on_second):
+            events = run_job(self._job(self.folders[0]))
+        error = events[-1]
+        self.assertEqual(error["event"], "error")
+        self.assertIn("disk removed", error["message"])
+        self.assertTrue(os.path.isfile(error["undo_record"]))
+        self.assertEqual(
+            sorted(os.listdir(self.folders[0])), ["1. Flute.pdf", "Sym_Oboe.pdf"],
+        )
+        undo_service = UndoService(FileService(), self.undo_dir)
+        record = undo_service.get_latest_undo_record()
+        self.assertEqual(len(record.mappings), 1)
+        undo_service.execute_undo(record)
+        self.assertEqual(
+            sorted(os.listdir(self.folders[0])), ["Sym_Flute.pdf", "Sym_Oboe.pdf"],
+        )
+
+    def test_failure_before_any_move_has_no_undo_record(self):
+        with mock.patch.object(FileService, "rename_file", side_effect=OSError("locked")):
+            events = run_job(self._job(self.folders[0]))
+        self.assertEqual(events[-1]["event"], "error")
+        self.assertNotIn("undo_record", events[-1])
+        self.assertFalse(os.path.isdir(self.undo_dir))
+
+    def test_conflicts_fail_or_get_suffix(self):
+        job = self._job(self.folders[0], master_template="Part.pdf")
+        events = run_job(job)
+        self.assertEqual(events[-1]["event"], "error")
+        self.assertEqual(sum(e["event"] == "conflict" for e in events), 1)
+        job.on_conflict = CONFLICT_SUFFIX
+        events = run_job(job)
+        self.assertEqual(
+            sorted(os.listdir(self.folders[0])), ["Part (1).pdf", "Part.pdf"],
+        )
+
+    def test_project_file_source(self):
+        folder = self.folders[1]
+        project = Project(
+            instruments=["Flute", "Oboe"],
+            master_template="{樂器}.pdf",
+            groups=[Group(
+                files=[FileInfo(os.path.join(folder, f"Con_{n}.pdf"), f"Con_{n}.pdf")
+                       for n in ("Oboe", "Flute")],
+                selected_instruments=[1, 0],
+            )],
+        )
+        path = os.path.join(self.temp_dir, "concert.llproj")
+        ProjectService().save_project(project, path)
+        events = run_job(RenameJob(source=path, undo_dir=self.undo_dir))
+        self.assertEqual(events[-1]["event"], "done")
+        self.assertEqual(sorted(os.listdir(folder)), ["Flute.pdf", "Oboe.pdf"])
+
+    def test_process_pool(self):
+        jobs = [self._job(folder) for folder in self.folders]
+        jobs.append(self._job(os.path.join(self.temp_dir, "missing")))
+        results = list(run_jobs(jobs, workers=2))
+        last = sorted((events[-1]["source"], events[-1]["event"]) for events in results)
+        self.assertEqual([event for _, event in last], ["done", "done", "error"])
+        self.assertEqual(len(os.listdir(self.undo_dir)), 2)
+
+    def test_does_not_import_ui(self):
+        code = (
+            "import sys, cli.__main__; "
+            "print(any(m == 'customtkinter' or m == 'ui' or m.startswith('ui.') "
+            "for m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=SRC_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        self.assertEqual(output, "False")
+
+    def test_jsonl_output(self):
+        output = subprocess.run(
+            [sys.executable, "-m", "cli", self.folders[0], "--instruments", "Flute,Oboe",
+             "--dry-run", "--jsonl"],
+            cwd=SRC_DIR, capture_output=True, text=True,
+        )
+        self.assertEqual(output.returncode, 0)
+        events = [json.loads(line) for line in output.stdout.splitlines()]
+        self.assertEqual([e["event"] for e in events], ["rename", "rename", "done"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+重複檔案偵測服務單元測試
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.models import FileInfo, Group, Project
+from services.duplicate_service import DuplicateService, PARTIAL_BLOCK_SIZE
+from services.file_service import FileService
+from services.import_service import ImportService
+
+
+class TestDuplicateService(unittest.TestCase):
+    """DuplicateService 測試"""
+
+    def setUp(self):
+        self.service = DuplicateService(max_workers=2)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_file(self, name, content: bytes):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_identical_small_files(self):
+        a = self._create_file("a.pdf", b"same content")
+        b = self._create_file("b.pdf", b"same content")
+        c = self._create_file("c.pdf", b"different!!!")
+        result = self.service.find_duplicates([a, b, c])
+        self.assertEqual(result, [[a, b]])
+
+    def test_different_sizes_not_hashed(self):
+        a = self._create_file("a.pdf", b"short")
+        b = self._create_file("b.pdf", b"much longer")
+        with patch.object(self.service, '_partial_digest') as partial:
+            result = self.service.find_duplicates([a, b])
+        self.assertEqual(result, [])
+        partial.assert_not_called()
+
+    def test_large_files_same_head_tail_differ_in_middle(self):
+        head = b"H" * PARTIAL_BLOCK_SIZE
+        tail = b"T" * PARTIAL_BLOCK_SIZE
+        a = self._create_file("a.pdf", head + b"middle-A" + tail)
+        b = self._create_file("b.pdf", head + b"middle-B" + tail)
+        c = self._create_file("c.pdf", head + b"middle-A" + tail)
+        result = self.service.find_duplicates([a, b, c])
+        self.assertEqual(result, [[a, c]])
+
+    def test_same_path_counted_once(self):
+        a = self._create_file("a.pdf", b"content")
+        self.assertEqual(self.service.find_duplicates([a, a]), [])
+
+    def test_missing_file_skipped(self):
+        a = self._create_file("a.pdf", b"content")
+        missing = os.path.join(self.temp_dir, "missing.pdf")
+        self.assertEqual(self.service.find_duplicates([a, missing]), [])
+
+    def test_cache_reused_until_file_changes(self):
+        big = b"x" * (3 * PARTIAL_BLOCK_SIZE)
+        a = self._create_file("a.pdf", big)
+        b = self._create_file("b.pdf", big)
+        self.service.find_duplicates([a, b])
+        with patch.object(self.service, '_full_digest') as full:
+            result = self.service.find_duplicates([a, b])
+        full.assert_not_called()
+        self.assertEqual(result, [[a, b]])
+        st = os.stat(b)
+        os.utime(b, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        with patch.object(
+            self.service, '_full_digest',
+            wraps=self.service._full_digest,
+        ) as full:
+            self.service.find_duplicates([a, b])
+        full.assert_called_once()
+
+    def test_mark_duplicates(self):
+        a = self._create_file("a.pdf", b"same")
+        b = self._create_file("b.pdf", b"same")
+        files = [FileInfo(a, "a.pdf"), FileInfo(b, "b.pdf")]
+        count = self.service.mark_duplicates(files)
+        self.assertEqual(count, 1)
+        self.assertEqual(files[0].duplicate_of, "")
+        self.assertEqual(files[1].duplicate_of, a)
+
+    def test_project_duplicates_across_groups(self):
+        a = self._create_file("g1/a.pdf", b"same")
+        b = self._create_file("g2/b.pdf", b"same")
+        c = self._create_file("loose.pdf", b"same")
+        project = Project(
+            groups=[
+                Group(files=[FileInfo(a, "a.pdf")]),
+                Group(files=[FileInfo(b, "b.pdf")]),
+            ],
+            ungrouped_files=[FileInfo(c, "loose.pdf")],
+        )
+        result = self.service.find_project_duplicates(project)
+        self.assertEqual(result, [[a, b, c]])
+        self.assertEqual(self.service.mark_project_duplicates(project), 2)
+
+    def test_import_folder_flags_duplicates(self):
+        self._create_file("Song - Flute.pdf", b"same")
+        self._create_file("Song - Flute (1).pdf", b"same")
+        self._create_file("Song - Oboe.pdf", b"other")
+        import_service = ImportService(FileService(), self.service)
+        groups, _ = import_service.import_folder(self.temp_dir)
+        flagged = [f.display_name for f in groups[0].files if f.duplicate_of]
+        self.assertEqual(flagged, ["Song - Flute.pdf"])
+
+    def test_empty_files(self):
+        a = self._create_file("a.pdf", b"")
+        b = self._create_file("b.pdf", b"")
+        self.assertEqual(self.service.find_duplicates([a, b]), [[a, b]])
+
+
+if __name__ == '__main__':
+    unittest.main()
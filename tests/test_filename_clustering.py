@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+檔名分群單元測試
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.filename_clustering import cluster_filenames, filename_tokens
+from core.instrument_matcher import InstrumentMatcher
+
+INSTRUMENTS = ["Flute", "Oboe", "Clarinet", "Horn", "Violin I", "Violin II", "Cello"]
+
+
+def _names_for(piece, formats):
+    names = []
+    for i, inst in enumerate(INSTRUMENTS):
+        fmt = formats[i % len(formats)]
+        names.append(fmt.format(piece=piece, inst=inst, num=i + 1))
+    return names
+
+
+class TestFilenameTokens(unittest.TestCase):
+    """filename_tokens 測試"""
+
+    def test_masks_instrument_and_part_number(self):
+        matcher = InstrumentMatcher(INSTRUMENTS)
+        self.assertEqual(
+            filename_tokens("01_Flute_Brahms Sym 4.pdf", matcher),
+            frozenset({"brahms", "sym", "4"}),
+        )
+
+    def test_without_matcher_keeps_other_words(self):
+        self.assertEqual(
+            filename_tokens("Brahms Sym 4 - Violin II.pdf"),
+            frozenset({"brahms", "sym", "4", "violin", "ii"}),
+        )
+
+
+class TestClusterFilenames(unittest.TestCase):
+    """cluster_filenames 測試"""
+
+    def setUp(self):
+        self.matcher = InstrumentMatcher(INSTRUMENTS)
+
+    def _assert_pieces(self, names, clusters, piece_count):
+        self.assertEqual(len(clusters), piece_count)
+        per_piece = len(INSTRUMENTS)
+        for cluster in clusters:
+            self.assertEqual(len({i // per_piece for i in cluster}), 1)
+            self.assertEqual(len(cluster), per_piece)
+
+    def test_mixed_naming_formats(self):
+        formats = ["{piece} - {inst}.pdf", "{num:02d}_{inst}_{piece}.pdf",
+                   "{piece}_{inst}_vFinal.pdf"]
+        pieces = ["Brahms Sym 4", "Mozart Sym 40", "Mozart Sym 41", "Dvorak Sym 9"]
+        names = [n for p in pieces for n in _names_for(p, formats)]
+        self._assert_pieces(names, cluster_filenames(names, self.matcher), 4)
+
+    def test_builtin_instruments_without_matcher(self):
+        pieces = ["Beethoven Egmont", "Sibelius Finlandia"]
+        names = [n for p in pieces for n in _names_for(p, ["{piece} - {inst}.pdf"])]
+        self._assert_pieces(names, cluster_filenames(names), 2)
+
+    def test_unrelated_file_stays_alone(self):
+        names = _names_for("Holst Planets", ["{piece} - {inst}.pdf"]) + ["Invoice 2023.pdf"]
+        clusters = cluster_filenames(names, self.matcher)
+        self.assertEqual(clusters[-1], [len(names) - 1])
+        self.assertEqual(len(clusters), 2)
+
+    def test_large_input(self):
+        names = [
+            f"Piece{k} Op {k % 97} - {inst}.pdf"
+            for k in range(300) for inst in INSTRUMENTS
+        ]
+        clusters = cluster_filenames(names, self.matcher)
+        self.assertEqual(len(clusters), 300)
+
+    def test_empty(self):
+        self.assertEqual(cluster_filenames([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+群組標籤介面單元測試（需要可用的顯示環境）
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.models import Group, Project
+
+try:
+    import customtkinter as ctk
+    from ui.group_panel import GroupTabContent
+except ImportError:
+    ctk = None
+
+
+class TestGroupTabInstruments(unittest.TestCase):
+    """GroupTabContent 樂器勾選框測試"""
+
+    def setUp(self):
+        if ctk is None:
+            self.skipTest("customtkinter 未安裝")
+        try:
+            self.root = ctk.CTk()
+        except Exception as e:
+            self.skipTest(f"無可用的顯示環境：{e}")
+        self.project = Project(
+            instruments=["Flute", "Oboe", "Clarinet"],
+            groups=[Group(id="g1", name="A", selected_instruments=[1])],
+        )
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_instrument_checks_are_packed_in_order(self):
+        tab = GroupTabContent(
+            self.root, self.project.groups[0], self.project, main_window=None,
+        )
+        tab.pack(fill="both", expand=True)
+        self.root.update()
+        checks = [tab._instrument_checks[i] for i in self.project.instrument_ids()]
+        self.assertEqual([cb.cget("text") for cb, _ in checks], self.project.instruments)
+        for cb, _ in checks:
+            self.assertEqual(cb.winfo_manager(), "pack")
+            self.assertTrue(cb.winfo_ismapped())
+        self.assertEqual([var.get() for _, var in checks], [False, True, False])
+        # 勾選框由上而下依樂器表順序排列
+        ys = [cb.winfo_y() for cb, _ in checks]
+        self.assertEqual(ys, sorted(ys))
+
+
+if __name__ == '__main__':
+    unittest.main()
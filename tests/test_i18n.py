@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+可翻譯元件登記單元測試
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.locale import get_locale, set_locale, t
+from ui.i18n import TranslationRegistry
+
+
+class FakeWidget:
+    """模擬 Tk 元件的 configure / winfo_exists"""
+
+    def __init__(self):
+        self.options = {}
+        self.configure_calls = 0
+        self.exists = True
+
+    def configure(self, **options):
+        self.options.update(options)
+        self.configure_calls += 1
+
+    def winfo_exists(self):
+        return self.exists
+
+
+class FakeMenu(FakeWidget):
+    """模擬 tk.Menu 的 entryconfigure"""
+
+    def __init__(self):
+        super().__init__()
+        self.labels = {}
+
+    def entryconfigure(self, index, label):
+        self.labels[index] = label
+
+
+class TestTranslationRegistry(unittest.TestCase):
+    """TranslationRegistry 測試"""
+
+    def setUp(self):
+        self._locale = get_locale()
+        set_locale("zh_TW")
+        self.registry = TranslationRegistry()
+
+    def tearDown(self):
+        set_locale(self._locale)
+
+    def test_relabel_in_place(self):
+        label = FakeWidget()
+        entry = FakeWidget()
+        menu = FakeMenu()
+        self.registry.bind(label, "group.match", count=3)
+        self.registry.bind(entry, "instrument.placeholder", "placeholder_text")
+        self.registry.bind_menu(menu, 2, "menu.file")
+        self.assertEqual(label.options["text"], t("group.match", count=3))
+        set_locale("en")
+        self.registry.relabel()
+        self.assertEqual(label.options["text"], t("group.match", count=3))
+        self.assertEqual(entry.options["placeholder_text"], t("instrument.placeholder"))
+        self.assertEqual(menu.labels[2], "File")
+
+    def test_destroyed_widgets_are_dropped(self):
+        alive, dead = FakeWidget(), FakeWidget()
+        calls = []
+        self.registry.bind(alive, "menu.file")
+        self.registry.bind(dead, "menu.file")
+        self.registry.on_relabel(alive, lambda: calls.append("alive"))
+        self.registry.on_relabel(dead, lambda: calls.append("dead"))
+        dead.exists = False
+        self.registry.relabel()
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(dead.configure_calls, 1)
+        self.assertEqual(calls, ["alive"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -55,6 +55,30 @@ class TestImportService(unittest.TestCase):
         self.assertEqual(len(groups[0].files), 2)
         self.assertEqual(groups[0].piece_name, "Song")
 
+    def test_import_folder_cluster(self):
+        for piece in ("Brahms Tragic", "Dvorak New World"):
+            for inst in ("Flute", "Oboe", "Horn"):
+                self._create_file(f"{piece} - {inst}.pdf")
+        self._create_file("notes.pdf")
+        groups, ungrouped = self.import_service.import_folder(
+            self.temp_dir, cluster=True,
+        )
+        self.assertEqual(
+            sorted(g.piece_name for g in groups), ["Brahms Tragic", "Dvorak New World"],
+        )
+        self.assertTrue(all(len(g.files) == 3 for g in groups))
+        self.assertEqual([f.display_name for f in ungrouped], ["notes.pdf"])
+
+    def test_import_folder_cluster_single_piece(self):
+        self._create_file("Song - Flute.pdf")
+        self._create_file("Song - Oboe.pdf")
+        groups, ungrouped = self.import_service.import_folder(
+            self.temp_dir, cluster=True,
+        )
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].name, os.path.basename(self.temp_dir))
+        self.assertEqual(ungrouped, [])
+
     def test_import_folder_nested(self):
         self._create_file("Movement1", "Sym5 - Flute.pdf")
         self._create_file("Movement1", "Sym5 - Oboe.pdf")
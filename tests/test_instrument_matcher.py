@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+樂器名稱比對單元測試
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.instrument_matcher import (
+    InstrumentMatcher,
+    auto_assign_group,
+    matcher_for_project,
+    normalize_name,
+)
+from core.models import FileInfo, Group, Project
+
+
+class TestInstrumentMatcher(unittest.TestCase):
+    """InstrumentMatcher 測試"""
+
+    def setUp(self):
+        self.instruments = ["Flute", "Oboe", "Horn", "English Horn", "Violin I", "Violin II"]
+        self.matcher = InstrumentMatcher(self.instruments)
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("Vln._II"), "vln ii")
+
+    def test_exact_name(self):
+        self.assertEqual(self.matcher.match("Brahms Sym 4 - Oboe.pdf"), 1)
+
+    def test_builtin_aliases(self):
+        self.assertEqual(self.matcher.match("01_Fl._Brahms.pdf"), 0)
+        self.assertEqual(self.matcher.match("Brahms - Flauto.pdf"), 0)
+        self.assertEqual(self.matcher.match("布拉姆斯 長笛.pdf"), 0)
+
+    def test_longest_match_wins(self):
+        self.assertEqual(self.matcher.match("Sym - English Horn.pdf"), 3)
+        self.assertEqual(self.matcher.match("Sym - Horn.pdf"), 2)
+
+    def test_word_boundaries(self):
+        self.assertIsNone(self.matcher.match("Oboeish.pdf"))
+        self.assertEqual(self.matcher.match("Sym - Violin II.pdf"), 5)
+        self.assertEqual(self.matcher.match("Sym - Violin I.pdf"), 4)
+
+    def test_numbered_part_variants(self):
+        self.assertEqual(self.matcher.match("Sym - Vln 2.pdf"), 5)
+        self.assertEqual(self.matcher.match("Sym - 小提琴 I.pdf"), 4)
+
+    def test_user_aliases(self):
+        matcher = InstrumentMatcher(["Tuba"], {"Tuba": ["Sousaphone"]})
+        self.assertEqual(matcher.match("March - Sousaphone.pdf"), 0)
+
+    def test_no_match(self):
+        self.assertIsNone(self.matcher.match("Score.pdf"))
+
+
+class TestAutoAssignGroup(unittest.TestCase):
+    """auto_assign_group 測試"""
+
+    def test_orders_files_and_selects_instruments(self):
+        project = Project(instruments=["Flute", "Oboe", "Clarinet", "Bassoon"])
+        group = Group(files=[
+            FileInfo("/x/Sym - Bsn.pdf", "Sym - Bsn.pdf"),
+            FileInfo("/x/Sym - Score.pdf", "Sym - Score.pdf"),
+            FileInfo("/x/Sym - Fl.pdf", "Sym - Fl.pdf"),
+            FileInfo("/x/Sym - Flute dup.pdf", "Sym - Flute dup.pdf"),
+            FileInfo("/x/Sym - Ob.pdf", "Sym - Ob.pdf"),
+        ])
+        unmatched = auto_assign_group(group, matcher_for_project(project))
+        self.assertEqual(group.selected_instruments, [0, 1, 3])
+        self.assertEqual(
+            [f.display_name for f in group.files],
+            ["Sym - Fl.pdf", "Sym - Ob.pdf", "Sym - Bsn.pdf",
+             "Sym - Score.pdf", "Sym - Flute dup.pdf"],
+        )
+        self.assertEqual(len(unmatched), 2)
+
+    def test_no_match_keeps_manual_selection(self):
+        project = Project(instruments=["Flute", "Oboe", "Clarinet"])
+        files = [FileInfo("/x/b.pdf", "b.pdf"), FileInfo("/x/a.pdf", "a.pdf")]
+        group = Group(files=list(files), selected_instruments=[0, 2])
+        unmatched = auto_assign_group(group, matcher_for_project(project))
+        self.assertEqual(group.selected_instruments, [0, 2])
+        self.assertEqual(group.files, files)
+        self.assertEqual(unmatched, files)
+
+    def test_matcher_reused_for_same_project_content(self):
+        project = Project(instruments=["Flute"], instrument_aliases={"Flute": ["Fl"]})
+        self.assertIs(matcher_for_project(project), matcher_for_project(project))
+
+
+if __name__ == '__main__':
+    unittest.main()
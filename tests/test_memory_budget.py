@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+記憶體預算測試
+
+以 benchmarks/memory_profile.py 量測專案資料結構的記憶體用量，超過預算
+即失敗。預算約為目前用量的 1.5 倍，容許不同 Python 版本的物件大小差異；
+修改 core.models 的欄位或計畫、預覽的資料結構後若超過預算，請確認增加
+是否合理再調整。
+"""
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'src'))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..', 'benchmarks'))
+
+from library_generator import LibrarySpec
+from memory_profile import profile_scales
+
+# 量測項目 -> 位元組數上限
+BUDGETS = {
+    "bytes_per_file_info": 400,
+    "bytes_per_group": 800,
+    "bytes_per_rename_entry": 550,
+    "bytes_per_undo_mapping": 900,
+    "import_bytes_per_file": 850,
+    "load_bytes_per_file": 1200,
+    "plan_peak_bytes_per_file": 750,
+    "preview_peak_bytes_per_file": 1600,
+}
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """專案資料結構的記憶體預算"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.result = profile_scales([LibrarySpec(pieces=4, movements=4, parts=15)])[0]
+
+    def test_within_budget(self):
+        for key, budget in BUDGETS.items():
+            with self.subTest(key=key):
+                self.assertLessEqual(
+                    self.result[key], budget,
+                    f"{key}: {self.result[key]:.0f} B > {budget} B",
+                )
+
+    def test_measurements_are_positive(self):
+        # 量測失效（例如沒有追蹤到配置）時預算檢查會誤判為通過
+        for key in BUDGETS:
+            with self.subTest(key=key):
+                self.assertGreater(self.result[key], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
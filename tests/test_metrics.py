@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+操作統計單元測試
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import metrics
+from core.metrics import Histogram, MetricsRegistry, bucket_index, bucket_upper_bound
+from core.models import RenameEntry
+from services.file_service import FileService
+from services.rename_service import RenameService
+from services.undo_service import UndoService
+
+
+class TestHistogram(unittest.TestCase):
+    """Histogram 測試"""
+
+    def test_buckets_are_contiguous(self):
+        previous = -1
+        for value in range(0, 200_000, 7):
+            index = bucket_index(value)
+            self.assertLessEqual(value, bucket_upper_bound(index))
+            if index > 0:
+                self.assertGreater(value, bucket_upper_bound(index - 1))
+            self.assertGreaterEqual(index, previous)
+            previous = index
+
+    def test_percentiles_within_relative_error(self):
+        histogram = Histogram()
+        for value in range(1, 10_001):
+            histogram.record(value)
+        self.assertEqual(histogram.count, 10_000)
+        for p in (50, 90, 99):
+            expected = 10_000 * p / 100
+            self.assertAlmostEqual(histogram.percentile(p) / expected, 1, delta=0.07)
+        self.assertEqual(histogram.percentile(100), 10_000)
+        self.assertEqual(histogram.summary()["min_us"], 1)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """MetricsRegistry 與服務統計測試"""
+
+    def setUp(self):
+        metrics.reset()
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        metrics.reset()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_snapshot(self):
+        registry = MetricsRegistry()
+        registry.increment("a", 2)
+        registry.observe("op", 0.002)
+        registry.observe("op", 0.004)
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["counters"], {"a": 2, "op": 2})
+        self.assertEqual(snapshot["histograms"]["op"]["max_us"], 4000)
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {"counters": {}, "histograms": {}})
+
+    def test_timed_counts_failed_calls(self):
+        @metrics.timed("work")
+        def work():
+            raise OSError("share offline")
+
+        with self.assertRaises(OSError):
+            work()
+        self.assertEqual(metrics.snapshot()["histograms"]["work"]["count"], 1)
+
+    def test_file_and_service_counters(self):
+        file_service = FileService()
+        rename_service = RenameService(file_service)
+        paths = []
+        for name in ("a.pdf", "b.pdf"):
+            path = os.path.join(self.temp_dir, name)
+            with open(path, "w") as f:
+                f.write(name)
+            paths.append(path)
+        target = os.path.join(self.temp_dir, "sub", "Part.pdf")
+        plan = [RenameEntry(p, target) for p in paths]
+        self.assertEqual(len(rename_service.detect_conflicts(plan)), 1)
+        plan = rename_service.apply_auto_suffix(plan)
+        record = rename_service.execute_rename(plan, None)
+        os.remove(plan[1].new_path)
+        UndoService(file_service, os.path.join(self.temp_dir, "undo")).execute_undo(record)
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters["rename.conflicts_found"], 1)
+        self.assertEqual(counters["rename.suffixes_applied"], 1)
+        self.assertEqual(counters["rename.files_renamed"], 2)
+        self.assertEqual(counters["file.rename"], 3)
+        self.assertEqual(counters["file.mkdir"], 1)
+        self.assertEqual(counters["file.stat"], 2)
+        self.assertEqual(counters["undo.files_restored"], 1)
+        self.assertEqual(counters["undo.skipped"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
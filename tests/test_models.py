@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+資料模型變更事件單元測試
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.models import (
+    ChangeEvent, DirtyTracker, FileInfo, Group, InstrumentChange, Project,
+    remap_selection,
+)
+from services.autosave_service import snapshot_project
+from services.project_format import copy_group
+
+
+class TestGroupVersion(unittest.TestCase):
+    """Group.version 測試"""
+
+    def test_assignment_bumps_version(self):
+        group = Group(name="A")
+        first = group.version
+        group.name = "B"
+        second = group.version
+        group.files = []
+        self.assertLess(first, second)
+        self.assertLess(second, group.version)
+
+    def test_versions_are_unique_across_groups(self):
+        a = Group(id="g", name="A")
+        b = Group(id="g", name="B")
+        self.assertNotEqual(a.version, b.version)
+
+    def test_version_not_compared(self):
+        a = Group(id="g", name="A")
+        b = Group(id="g", name="A")
+        b.piece_name = ""
+        self.assertNotEqual(a.version, b.version)
+        self.assertEqual(a, b)
+
+    def test_copy_keeps_version(self):
+        group = Group(name="A")
+        group.name = "B"
+        self.assertEqual(copy_group(group).version, group.version)
+
+
+class TestProjectEvents(unittest.TestCase):
+    """Project 變更事件測試"""
+
+    def setUp(self):
+        self.project = Project(groups=[Group(id="g1", name="A")])
+        self.events = []
+        self.unsubscribe = self.project.subscribe(self.events.append)
+
+    def test_update_group_emits_changed_fields(self):
+        group = self.project.groups[0]
+        self.assertTrue(self.project.update_group(group, name="B", piece_name=""))
+        self.assertEqual(self.events, [ChangeEvent("group_changed", "g1", ("name",))])
+        self.assertEqual(group.name, "B")
+
+    def test_fill_group_is_not_a_user_edit(self):
+        group = self.project.groups[0]
+        tracker = DirtyTracker(self.project)
+        self.assertTrue(self.project.fill_group(group, piece_name="Sym"))
+        self.assertFalse(self.project.fill_group(group, piece_name="Sym"))
+        self.assertEqual(len(self.events), 1)
+        self.assertFalse(self.events[0].modifies)
+        self.assertEqual(tracker.take()[0], {"g1"})
+
+    def test_unchanged_update_is_silent(self):
+        group = self.project.groups[0]
+        version = group.version
+        self.assertFalse(self.project.update_group(group, name="A"))
+        self.assertFalse(self.project.update(instruments=[]))
+        self.assertEqual(self.events, [])
+        self.assertEqual(group.version, version)
+
+    def test_touch_group_after_in_place_edit(self):
+        group = self.project.groups[0]
+        version = group.version
+        group.files.append(FileInfo("/x/a.pdf", "a.pdf"))
+        self.project.touch_group(group, "files")
+        self.assertGreater(group.version, version)
+        self.assertEqual(self.events[-1].fields, ("files",))
+
+    def test_add_and_remove_group(self):
+        group = Group(id="g2")
+        self.project.add_group(group, 0)
+        self.project.remove_group(group)
+        self.assertEqual(
+            [(e.kind, e.group_id) for e in self.events],
+            [("group_added", "g2"), ("group_removed", "g2")],
+        )
+        self.assertEqual([g.id for g in self.project.groups], ["g1"])
+
+    def test_project_update_bumps_revision(self):
+        self.project.update(master_template="{樂器}")
+        self.project.ungrouped_files.append(FileInfo("/x/a.pdf", "a.pdf"))
+        self.project.touch("ungrouped_files")
+        self.assertEqual(self.project.revision, 2)
+        self.assertEqual(
+            [e.fields for e in self.events],
+            [("master_template",), ("ungrouped_files",)],
+        )
+
+    def test_unsubscribe(self):
+        self.unsubscribe()
+        self.project.update(use_subfolders=True)
+        self.assertEqual(self.events, [])
+
+    def test_snapshot_does_not_notify(self):
+        snapshot = snapshot_project(self.project)
+        snapshot.update(use_subfolders=True)
+        self.assertEqual(self.events, [])
+
+
+class TestDirtyTracker(unittest.TestCase):
+    """DirtyTracker 測試"""
+
+    def test_collects_only_changed_groups(self):
+        project = Project(groups=[Group(id=f"g{i}") for i in range(100)])
+        tracker = DirtyTracker(project)
+        project.update_group(project.groups[3], name="x")
+        project.touch_group(project.groups[7], "files")
+        project.update(instruments=["Flute"])
+        self.assertEqual(tracker.take(), ({"g3", "g7"}, {"instruments"}))
+        self.assertEqual(tracker.take(), (set(), set()))
+        tracker.close()
+        project.update_group(project.groups[1], name="y")
+        self.assertEqual(tracker.take(), (set(), set()))
+
+
+class TestInstrumentChanges(unittest.TestCase):
+    """樂器表增量變動測試"""
+
+    def setUp(self):
+        self.project = Project(
+            instruments=["Flute", "Oboe", "Clarinet", "Horn"],
+            groups=[
+                Group(id="a", selected_instruments=[3, 0, 1]),
+                Group(id="b", selected_instruments=[2]),
+                Group(id="c"),
+            ],
+        )
+        self.events = []
+        self.project.subscribe(self.events.append)
+
+    def _names(self, group):
+        return [self.project.instruments[i] for i in group.selected_instruments]
+
+    def test_remap_selection(self):
+        self.assertEqual(remap_selection([3, 0, 1], InstrumentChange("insert", 1)), [4, 0, 2])
+        self.assertEqual(remap_selection([3, 0, 1], InstrumentChange("remove", 0)), [2, 0])
+        self.assertEqual(
+            remap_selection([3, 0, 1], InstrumentChange("move", 0, new_index=3)), [2, 3, 0],
+        )
+        self.assertEqual(
+            remap_selection([3, 0, 1], InstrumentChange("move", 3, new_index=1)), [1, 0, 2],
+        )
+
+    def test_move_keeps_selected_names(self):
+        a, b, _ = self.project.groups
+        before = self._names(a), self._names(b)
+        flute_id = self.project.instrument_ids()[0]
+        change = self.project.apply_instrument_change(
+            InstrumentChange("move", 0, new_index=2),
+        )
+        self.assertEqual(change.instrument_id, flute_id)
+        self.assertEqual(self.project.instruments, ["Oboe", "Clarinet", "Flute", "Horn"])
+        self.assertEqual((self._names(a), self._names(b)), before)
+        self.assertEqual(self.project.instrument_position(flute_id), 2)
+
+    def test_only_affected_groups_are_notified(self):
+        self.project.apply_instrument_change(InstrumentChange("remove", 2))
+        self.assertEqual(self._names(self.project.groups[0]), ["Horn", "Flute", "Oboe"])
+        self.assertEqual(self.project.groups[1].selected_instruments, [])
+        changed = [e.group_id for e in self.events if e.kind == "group_changed"]
+        self.assertEqual(changed, ["a", "b"])
+        last = self.events[-1]
+        self.assertEqual(last.fields, ("instruments",))
+        self.assertEqual(last.instrument_change.kind, "remove")
+
+    def test_append_touches_no_group(self):
+        ids = list(self.project.instrument_ids())
+        change = self.project.apply_instrument_change(
+            InstrumentChange("insert", 4, name="Tuba"),
+        )
+        self.assertEqual(self.project.instrument_ids(), ids + [change.instrument_id])
+        self.assertEqual([e.kind for e in self.events], ["project_changed"])
+
+    def test_toggle_keeps_order(self):
+        a = self.project.groups[0]
+        ids = self.project.instrument_ids()
+        self.project.toggle_instrument(a, ids[0], False)
+        self.assertEqual(a.selected_instruments, [3, 1])
+        self.project.toggle_instrument(a, ids[2], True)
+        self.assertIn(2, a.selected_instruments)
+        self.assertEqual(a.selected_instruments[0], 3)
+
+    def test_replacing_instruments_renumbers(self):
+        ids = list(self.project.instrument_ids())
+        self.project.update(instruments=["Violin"])
+        self.assertEqual(len(self.project.instrument_ids()), 1)
+        self.assertNotIn(self.project.instrument_ids()[0], ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
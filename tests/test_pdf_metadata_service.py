@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+PDF 中繼資料服務單元測試
+"""
+import os
+import sys
+import tempfile
+import unittest
+import zlib
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.models import FileInfo, Group, Project
+from core.template_engine import needs_pdf_metadata, format_file_size
+from services.file_service import FileService
+from services.pdf_metadata_service import (
+    PdfMetadataService,
+    decode_pdf_text,
+    read_pdf_metadata,
+)
+from services.rename_service import RenameService
+
+
+def build_classic_pdf(page_count: int, title: bytes, padding: int = 0) -> bytes:
+    """產生使用傳統 xref 表的最小 PDF"""
+    kids = " ".join(f"{4 + i} 0 R" for i in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode(),
+        b"<< /Title " + title + b" /Producer (test) >>",
+    ]
+    objects += [b"<< /Type /Page /Parent 2 0 R >>"] * page_count
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    out += b"% " + b"x" * padding + b"\n"
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n".encode()
+    out += b"0000000000 65535 f \n"
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 3 0 R >>\n".encode()
+    out += f"startxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def build_xref_stream_pdf(
+    page_count: int, title: bytes, first: str = "", stream_location: int = 0,
+) -> bytes:
+    """產生使用 xref 串流與物件串流（含 PNG 預測器）的最小 PDF
+
+    first 可覆寫物件串流的 /First 值，stream_location 不為 0 時物件串流
+    本身在 xref 中登記為位於該物件串流內（用於測試損壞的檔案）。
+    """
+    compressed = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [] /Count {page_count} >>".encode(),
+        3: b"<< /Title " + title + b" >>",
+    }
+    header = b""
+    body = b""
+    for num, obj in compressed.items():
+        header += f"{num} {len(body)} ".encode()
+        body += obj + b"\n"
+    objstm_data = zlib.compress(header + body)
+    out = bytearray(b"%PDF-1.5\n")
+    objstm_offset = len(out)
+    out += (
+        f"4 0 obj\n<< /Type /ObjStm /N 3 /First {first or len(header)} "
+        f"/Length 5 0 R /Filter /FlateDecode >>\nstream\n".encode()
+    )
+    out += objstm_data + b"\nendstream\nendobj\n"
+    length_offset = len(out)
+    out += f"5 0 obj\n{len(objstm_data)}\nendobj\n".encode()
+    xref_offset = len(out)
+    rows = [
+        (0, 0, 0),
+        (2, 4, 0), (2, 4, 1), (2, 4, 2),
+        (2, stream_location, 0) if stream_location else (1, objstm_offset, 0),
+        (1, length_offset, 0),
+        (1, xref_offset, 0),
+    ]
+    raw = b""
+    prev = bytes(6)
+    for kind, a, b in rows:
+        row = bytes([kind]) + a.to_bytes(4, "big") + bytes([b])
+        raw += b"\x02" + bytes((r - p) & 0xFF for r, p in zip(row, prev))
+        prev = row
+    xref_data = zlib.compress(raw)
+    out += (
+        f"6 0 obj\n<< /Type /XRef /Size 7 /W [1 4 1] /Root 1 0 R /Info 3 0 R "
+        f"/Filter /FlateDecode /DecodeParms << /Columns 6 /Predictor 12 >> "
+        f"/Length {len(xref_data)} >>\nstream\n".encode()
+    )
+    out += xref_data + b"\nendstream\nendobj\n"
+    out += f"startxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+class TestReadPdfMetadata(unittest.TestCase):
+    """read_pdf_metadata 測試"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, data: bytes):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_classic_xref(self):
+        path = self._write("a.pdf", build_classic_pdf(3, b"(Symphony \\(No. 5\\))"))
+        meta = read_pdf_metadata(path)
+        self.assertEqual(meta.page_count, 3)
+        self.assertEqual(meta.title, "Symphony (No. 5)")
+        self.assertEqual(meta.file_size, os.path.getsize(path))
+
+    def test_large_file_reads_only_windows(self):
+        data = build_classic_pdf(2, b"(Big)", padding=512 * 1024)
+        path = self._write("big.pdf", data)
+        from services import pdf_metadata_service as mod
+        reads = []
+        original = mod._PdfTailReader.read
+
+        def tracking_read(reader, offset, length):
+            reads.append(length)
+            return original(reader, offset, length)
+
+        with patch.object(mod._PdfTailReader, "read", tracking_read):
+            meta = read_pdf_metadata(path)
+        self.assertEqual(meta.page_count, 2)
+        self.assertLess(sum(reads), len(data) // 4)
+
+    def test_utf16_title(self):
+        title = "<FEFF" + "長笛".encode("utf-16-be").hex().upper() + ">"
+        path = self._write("zh.pdf", build_classic_pdf(1, title.encode()))
+        self.assertEqual(read_pdf_metadata(path).title, "長笛")
+
+    def test_xref_stream_and_object_stream(self):
+        path = self._write("x.pdf", build_xref_stream_pdf(12, b"(Compressed)"))
+        meta = read_pdf_metadata(path)
+        self.assertEqual(meta.page_count, 12)
+        self.assertEqual(meta.title, "Compressed")
+
+    def test_malformed_object_stream(self):
+        for name, data in (
+            ("first.pdf", build_xref_stream_pdf(2, b"(T)", first="/Bad")),
+            ("loop.pdf", build_xref_stream_pdf(2, b"(T)", stream_location=4)),
+        ):
+            with self.subTest(name=name):
+                meta = read_pdf_metadata(self._write(name, data))
+                self.assertIsNone(meta.page_count)
+                self.assertEqual(meta.title, "")
+
+    def test_not_a_pdf(self):
+        path = self._write("bad.pdf", b"dummy")
+        meta = read_pdf_metadata(path)
+        self.assertIsNone(meta.page_count)
+        self.assertEqual(meta.title, "")
+        self.assertEqual(meta.file_size, 5)
+
+    def test_decode_pdf_text(self):
+        self.assertEqual(decode_pdf_text(b"plain"), "plain")
+        self.assertEqual(decode_pdf_text(None), "")
+
+
+class TestPdfMetadataService(unittest.TestCase):
+    """PdfMetadataService 測試"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.service = PdfMetadataService(max_workers=2)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, data: bytes):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_prefetch_and_cache(self):
+        a = self._write("a.pdf", build_classic_pdf(2, b"(A)"))
+        b = self._write("b.pdf", build_classic_pdf(5, b"(B)"))
+        result = self.service.prefetch([a, b, a])
+        self.assertEqual(result[a].page_count, 2)
+        self.assertEqual(result[b].page_count, 5)
+        with patch("services.pdf_metadata_service.read_pdf_metadata") as reader:
+            self.service.prefetch([a, b])
+        reader.assert_not_called()
+
+    def test_missing_file(self):
+        missing = os.path.join(self.temp_dir, "missing.pdf")
+        self.assertIsNone(self.service.get(missing))
+        self.assertEqual(self.service.prefetch([missing]), {})
+
+
+class TestMetadataTemplateVariables(unittest.TestCase):
+    """{頁數} 等模板變數整合測試"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_needs_pdf_metadata(self):
+        self.assertTrue(needs_pdf_metadata("{樂器} ({頁數}p).pdf"))
+        self.assertTrue(needs_pdf_metadata("{Instrument}.pdf", "{Title}"))
+        self.assertFalse(needs_pdf_metadata("{序號}. {樂器}.pdf", ""))
+
+    def test_format_file_size(self):
+        self.assertEqual(format_file_size(512), "512 B")
+        self.assertEqual(format_file_size(2048), "2 KB")
+        self.assertEqual(format_file_size(1536 * 1024), "1.5 MB")
+
+    def test_plan_uses_page_count(self):
+        path = os.path.join(self.temp_dir, "fl.pdf")
+        with open(path, 'wb') as f:
+            f.write(build_classic_pdf(4, b"(Sym/5)"))
+        project = Project(
+            instruments=["Flute"],
+            master_template="{Instrument} ({PageCount}p) {Title}.pdf",
+            groups=[Group(files=[FileInfo(path, "fl.pdf")], selected_instruments=[0])],
+        )
+        plan = RenameService(FileService()).generate_rename_plan(project)
+        self.assertEqual(os.path.basename(plan[0].new_path), "Flute (4p) Sym_5.pdf")
+
+    def test_plan_skips_metadata_when_not_referenced(self):
+        path = os.path.join(self.temp_dir, "fl.pdf")
+        with open(path, 'wb') as f:
+            f.write(build_classic_pdf(4, b"(T)"))
+        project = Project(
+            instruments=["Flute"],
+            master_template="{序號}. {樂器}.pdf",
+            groups=[Group(files=[FileInfo(path, "fl.pdf")], selected_instruments=[0])],
+        )
+        service = RenameService(FileService())
+        with patch.object(PdfMetadataService, "prefetch") as prefetch:
+            service.generate_rename_plan(project)
+        prefetch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+本機 JSON-RPC 計畫服務單元測試
+"""
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cli.server import INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR, PlanServer, serve
+from core.models import FileInfo, Group, Project
+from core.template_engine import compile_template, substitute_template
+from services.project_service import ProjectService
+
+
+class TestCompileTemplate(unittest.TestCase):
+    """compile_template 測試"""
+
+    def test_parts(self):
+        self.assertEqual(
+            compile_template("{序號}. {樂器}.pdf"), (("", ". ", ".pdf"), ("序號", "樂器")),
+        )
+
+    def test_unknown_variables_are_kept(self):
+        self.assertEqual(substitute_template("{x}-{序號}", {"序號": "1"}), "{x}-1")
+
+
+class TestPlanServer(unittest.TestCase):
+    """PlanServer 測試"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        files = []
+        for name in ("Sym_Flute.pdf", "Sym_Oboe.pdf"):
+            path = os.path.join(self.temp_dir, name)
+            with open(path, "w") as f:
+                f.write(name)
+            files.append(FileInfo(path, name))
+        self.project_path = os.path.join(self.temp_dir, "concert.llproj")
+        ProjectService().save_project(Project(
+            instruments=["Flute", "Oboe"],
+            master_template="{序號}. {樂器}.pdf",
+            groups=[Group(files=files, selected_instruments=[0, 1])],
+        ), self.project_path)
+        self.server = PlanServer()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _call(self, method, **params):
+        return self.server.handle(
+            {"jsonrpc": "2.0", "id": 1, "method": method, "params": params},
+        )
+
+    def test_plan(self):
+        result = self._call("plan", source=self.project_path)["result"]
+        self.assertEqual(
+            [os.path.basename(e["new"]) for e in result["entries"]],
+            ["1. Flute.pdf", "2. Oboe.pdf"],
+        )
+        self.assertEqual(result["conflicts"], {})
+
+    def test_project_is_reloaded_only_when_changed(self):
+        with mock.patch.object(
+            ProjectService, "load_project", wraps=ProjectService().load_project,
+        ) as load:
+            self._call("plan", source=self.project_path)
+            self._call("plan", source=self.project_path)
+            self.assertEqual(load.call_count, 1)
+            stat = os.stat(self.project_path)
+            os.utime(self.project_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self._call("plan", source=self.project_path)
+            self.assertEqual(load.call_count, 2)
+
+    def test_conflicts_from_entries(self):
+        result = self._call("conflicts", entries=[
+            {"original": "a.pdf", "new": "Part.pdf"},
+            {"original": "b.pdf", "new": "part.pdf"},
+        ])["result"]
+        self.assertEqual(len(result["conflicts"]), 1)
+
+    def test_detect_piece_name_and_validate_template(self):
+        result = self._call("detect_piece_name", filenames=["Sym_Flute.pdf", "Sym_Oboe.pdf"])
+        self.assertEqual(result["result"]["piece_name"], "Sym")
+        result = self._call("validate_template", template="{序號} {頁數} {bad}")["result"]
+        self.assertEqual(result["unknown"], ["bad"])
+        self.assertTrue(result["needs_metadata"])
+
+    def test_errors(self):
+        self.assertEqual(self._call("nope")["error"]["code"], METHOD_NOT_FOUND)
+        self.assertEqual(self._call("plan")["error"]["code"], INVALID_PARAMS)
+        response = json.loads(self.server.handle_line(b"{not json"))
+        self.assertEqual(response["error"]["code"], PARSE_ERROR)
+        self.assertIsNone(self.server.handle({"jsonrpc": "2.0", "method": "nope"}))
+
+    def _exchange(self, requests, **options):
+        """經由 TCP 送出請求行，讀取回應直到連線關閉或收到與請求同數的回應"""
+        async def run():
+            ready = asyncio.get_running_loop().create_future()
+            task = asyncio.ensure_future(
+                serve(self.server, port=0, on_ready=ready.set_result, **options),
+            )
+            host, port = (await ready)[0][:2]
+            reader, writer = await asyncio.open_connection(host, port, limit=2 ** 20)
+            for request in requests:
+                writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            responses = []
+            while len(responses) < len(requests):
+                line = await reader.readline()
+                if not line:
+                    break
+                responses.append(json.loads(line))
+            writer.close()
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return responses
+
+        return asyncio.run(run())
+
+    def test_tcp_round_trip(self):
+        responses = self._exchange([{
+            "jsonrpc": "2.0", "id": request_id, "method": "validate_template",
+            "params": {"template": "{樂器}.pdf"},
+        } for request_id in (1, 2)])
+        self.assertEqual([r["id"] for r in responses], [1, 2])
+        self.assertEqual(responses[0]["result"]["unknown"], [])
+
+    def test_large_requests(self):
+        entries = [
+            {"original": f"/inbox/piece_{i:05d}_part.pdf", "new": f"/library/Piece {i:05d}/Part.pdf"}
+            for i in range(2000)
+        ]
+        request = {"jsonrpc": "2.0", "id": 1, "method": "conflicts", "params": {"entries": entries}}
+        responses = self._exchange([request])
+        self.assertEqual(responses[0]["id"], 1)
+        self.assertIn("result", responses[0])
+        # 超過上限的請求回傳錯誤，之後的請求照常處理
+        small = {"jsonrpc": "2.0", "id": 2, "method": "conflicts", "params": {"entries": entries[:2]}}
+        responses = self._exchange([request, small], limit=4096)
+        self.assertEqual(responses[0]["error"]["code"], INVALID_REQUEST)
+        self.assertEqual(responses[1]["id"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+即時預覽服務單元測試
+"""
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.models import FileInfo, Group, Project, RenameEntry
+from services.file_service import FileService
+from services.preview_service import ConflictIndex, PreviewService, filter_entries
+from services.rename_service import RenameService
+
+
+class FakeScheduler:
+    """模擬 Tk 的 after / after_cancel，由測試手動執行排程"""
+
+    def __init__(self):
+        self._next_id = 0
+        self.pending = {}
+
+    def after(self, delay_ms, callback):
+        self._next_id += 1
+        self.pending[self._next_id] = callback
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks = list(self.pending.values())
+        self.pending.clear()
+        for callback in callbacks:
+            callback()
+
+
+def _make_project(n_groups=4):
+    return Project(
+        instruments=["Flute", "Oboe"],
+        master_template="{樂器} - {曲名}.pdf",
+        groups=[
+            Group(
+                id=f"g{i}",
+                files=[FileInfo(f"/lib/p{i}_a.pdf", f"p{i}_a.pdf"),
+                       FileInfo(f"/lib/p{i}_b.pdf", f"p{i}_b.pdf")],
+                selected_instruments=[0, 1],
+                piece_name=f"Piece{i}",
+            )
+            for i in range(n_groups)
+        ],
+    )
+
+
+class TestConflictIndex(unittest.TestCase):
+    """ConflictIndex 測試"""
+
+    def test_incremental_count(self):
+        index = ConflictIndex()
+        index.set_group("a", [RenameEntry("/x/1.pdf", "/y/Same.pdf", "a")])
+        index.set_group("b", [RenameEntry("/x/2.pdf", "/y/same.pdf", "b"),
+                              RenameEntry("/x/3.pdf", "/y/SAME.pdf", "b")])
+        self.assertEqual(index.count, 3)
+        self.assertTrue(index.is_conflict(RenameEntry("/x/1.pdf", "/y/Same.pdf")))
+        index.set_group("b", [RenameEntry("/x/2.pdf", "/y/other.pdf", "b")])
+        self.assertEqual(index.count, 0)
+        self.assertEqual(index.conflicts(), {})
+        index.set_group("c", [RenameEntry("/x/4.pdf", "/y/same.pdf", "c")])
+        self.assertEqual(index.conflicts(), {"/y/same.pdf": ["/x/1.pdf", "/x/4.pdf"]})
+        index.remove_group("a")
+        self.assertEqual(index.count, 0)
+
+    def test_matches_detect_conflicts(self):
+        service = RenameService(FileService())
+        plan = [
+            RenameEntry(f"/x/{i}.pdf", f"/y/{i % 3}.pdf", f"g{i % 2}")
+            for i in range(7)
+        ]
+        index = ConflictIndex()
+        for gid in ("g0", "g1"):
+            index.set_group(gid, [e for e in plan if e.group_id == gid])
+        expected = service.detect_conflicts(plan)
+        self.assertEqual(
+            {k: sorted(v) for k, v in index.conflicts().items()},
+            {k: sorted(v) for k, v in expected.items()},
+        )
+        self.assertEqual(index.count, sum(len(v) for v in expected.values()))
+
+
+class TestFilterEntries(unittest.TestCase):
+    """filter_entries 測試"""
+
+    def setUp(self):
+        self.entries = [
+            RenameEntry("/x/raw_fl.pdf", "/x/1. Flute.pdf", "g1"),
+            RenameEntry("/x/raw_ob.pdf", "/x/2. Oboe.pdf", "g1"),
+            RenameEntry("/y/raw_fl.pdf", "/y/1. Flute.pdf", "g2"),
+        ]
+
+    def test_no_filter(self):
+        self.assertEqual(filter_entries(self.entries), [0, 1, 2])
+
+    def test_combined_filters(self):
+        self.assertEqual(filter_entries(self.entries, group_id="g1"), [0, 1])
+        self.assertEqual(filter_entries(self.entries, text="FLUTE"), [0, 2])
+        self.assertEqual(filter_entries(self.entries, text="raw_ob"), [1])
+        self.assertEqual(
+            filter_entries(self.entries, {"/y/raw_fl.pdf"}, conflicts_only=True, text="fl"),
+            [2],
+        )
+
+
+class TestPreviewService(unittest.TestCase):
+    """PreviewService 測試"""
+
+    def setUp(self):
+        self.scheduler = FakeScheduler()
+        self.rename_service = RenameService(FileService())
+        self.updates = 0
+        self.service = PreviewService(
+            self.scheduler, self.rename_service, on_updated=self._on_updated,
+        )
+        self.project = _make_project()
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def _on_updated(self):
+        self.updates += 1
+
+    def _drain(self, timeout=5.0):
+        """執行排程並等待背景計算完成"""
+        deadline = time.monotonic() + timeout
+        self.scheduler.run_pending()
+        while (self.service._in_flight or self.scheduler.pending) \
+                and time.monotonic() < deadline:
+            self.scheduler.run_pending()
+            time.sleep(0.005)
+
+    def _plan(self):
+        return RenameService(FileService()).generate_rename_plan(self.project)
+
+    def test_initial_preview(self):
+        self.service.attach(self.project)
+        self._drain()
+        self.assertEqual(self.service.entries, self._plan())
+        self.assertEqual(self.updates, 1)
+
+    def test_edits_are_debounced_and_incremental(self):
+        self.service.attach(self.project)
+        self._drain()
+        built = []
+        original = RenameService._plan_group
+
+        def spy(service, group, *args):
+            built.append(group.id)
+            return original(service, group, *args)
+        with patch.object(RenameService, "_plan_group", spy):
+            for name in ("A", "AB", "ABC"):
+                self.project.update_group(self.project.groups[2], piece_name=name)
+            self.assertEqual(len(self.scheduler.pending), 1)
+            self._drain()
+        self.assertEqual(built, ["g2"])
+        self.assertEqual(self.service.entries, self._plan())
+        self.assertIn("ABC", self.service.entries[4].new_path)
+
+    def test_master_template_recomputes_all(self):
+        self.service.attach(self.project)
+        self._drain()
+        self.assertEqual(self.service.conflicts.count, 0)
+        self.project.update(master_template="{樂器}.pdf")
+        self._drain()
+        self.assertEqual(self.service.entries, self._plan())
+        self.assertEqual(self.service.conflicts.count, 8)
+
+    def test_group_removal_and_reorder(self):
+        self.service.attach(self.project)
+        self._drain()
+        self.project.remove_group(self.project.groups[0])
+        self.project.add_group(self.project.groups.pop(0))
+        self._drain()
+        self.assertEqual(self.service.entries, self._plan())
+
+    def test_edit_during_computation_is_picked_up(self):
+        self.service.attach(self.project)
+        self.scheduler.run_pending()
+        self.assertTrue(self.service._in_flight)
+        self.project.update_group(self.project.groups[1], piece_name="Late")
+        self._drain()
+        self.assertEqual(self.service.entries, self._plan())
+
+    def test_switching_project_discards_old_result(self):
+        self.service.attach(self.project)
+        self.scheduler.run_pending()
+        other = _make_project(1)
+        self.service.attach(other)
+        self._drain()
+        self.assertEqual(
+            self.service.entries,
+            RenameService(FileService()).generate_rename_plan(other),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
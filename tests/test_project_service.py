@@ -9,7 +9,11 @@ import unittest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from unittest.mock import patch
+
 from core.models import FileInfo, Group, Project
+from services import project_format, project_journal
+from services.project_format import LazyGroupList
 from services.project_service import ProjectService
 
 
@@ -30,6 +34,7 @@ class TestProjectService(unittest.TestCase):
             master_template="{序號}. {樂器} - {曲名}.pdf",
             use_subfolders=True,
             subfolder_template="{曲名}",
+            instrument_aliases={"Flute": ["Fl.", "長笛"]},
         )
         project.ungrouped_files = [
             FileInfo("C:/test/ungrouped.pdf", "ungrouped.pdf"),
@@ -58,6 +63,7 @@ class TestProjectService(unittest.TestCase):
         self.assertEqual(loaded.master_template, "{序號}. {樂器} - {曲名}.pdf")
         self.assertTrue(loaded.use_subfolders)
         self.assertEqual(loaded.subfolder_template, "{曲名}")
+        self.assertEqual(loaded.instrument_aliases, {"Flute": ["Fl.", "長笛"]})
         self.assertEqual(len(loaded.ungrouped_files), 1)
         self.assertEqual(loaded.ungrouped_files[0].display_name, "ungrouped.pdf")
         self.assertEqual(len(loaded.groups), 1)
@@ -93,5 +99,207 @@ class TestProjectService(unittest.TestCase):
         self.assertEqual(loaded.groups[0].piece_name, "第21號鋼琴協奏曲")
 
 
+    def test_v1_file_still_loads(self):
+        project = Project(instruments=["Flute"])
+        project.groups = [Group(id="g1", name="A", files=[FileInfo("/x/a.pdf", "a.pdf")])]
+        path = os.path.join(self.temp_dir, "v1.llproj")
+        self.service.save_project(project, path, format_version=1)
+        with open(path, encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith("{"))
+        loaded = self.service.load_project(path)
+        self.assertEqual(loaded.groups[0].files[0].original_path, "/x/a.pdf")
+
+
+class TestProjectFormatV2(unittest.TestCase):
+    """第 2 版專案檔格式測試"""
+
+    def setUp(self):
+        self.service = ProjectService()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "season.llproj")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_project(self, n_groups=5, n_files=4):
+        project = Project(instruments=["Flute", "Oboe"])
+        for g in range(n_groups):
+            project.groups.append(Group(
+                id=f"g{g}", name=f"Piece {g}", piece_name=f"曲目 {g}",
+                selected_instruments=[0, 1],
+                files=[
+                    FileInfo(f"/lib/piece{g}/part{i}.pdf", f"part{i}.pdf")
+                    for i in range(n_files)
+                ],
+            ))
+        project.ungrouped_files = [FileInfo("/lib/misc/notes.pdf", "Notes")]
+        return project
+
+    def test_groups_materialize_lazily(self):
+        self.service.save_project(self._make_project(), self.path)
+        loaded = self.service.load_project(self.path)
+        self.assertIsInstance(loaded.groups, LazyGroupList)
+        self.assertEqual(len(loaded.groups), 5)
+        self.assertEqual(loaded.groups.peek(3), ("g3", "Piece 3"))
+        self.assertFalse(loaded.groups.is_materialized(3))
+        group = loaded.groups[3]
+        self.assertTrue(loaded.groups.is_materialized(3))
+        self.assertEqual(group.piece_name, "曲目 3")
+        self.assertEqual(group.selected_instruments, [0, 1])
+        self.assertEqual(group.files[2].original_path, "/lib/piece3/part2.pdf")
+        self.assertEqual(loaded.ungrouped_files[0].display_name, "Notes")
+        self.assertFalse(loaded.groups.is_materialized(0))
+
+    def test_unchanged_groups_copied_on_save(self):
+        self.service.save_project(self._make_project(), self.path)
+        loaded = self.service.load_project(self.path)
+        loaded.groups[1].name = "Renamed"
+        loaded.groups.append(Group(id="new", files=[FileInfo("/other/x.pdf", "x.pdf")]))
+        other = os.path.join(self.temp_dir, "copy.llproj")
+        with patch.object(
+            project_format, "group_to_dict", wraps=project_format.group_to_dict,
+        ) as encode:
+            self.service.save_project(loaded, other)
+        self.assertEqual(encode.call_count, 2)
+        # 儲存後未解析的區塊改指向新檔案，仍可正確讀取
+        os.remove(self.path)
+        self.assertEqual(loaded.groups[4].files[0].original_path, "/lib/piece4/part0.pdf")
+        reloaded = self.service.load_project(other)
+        self.assertEqual([g.name for g in reloaded.groups][:2], ["Piece 0", "Renamed"])
+        self.assertEqual(reloaded.groups[5].files[0].original_path, "/other/x.pdf")
+        self.assertEqual(reloaded.groups[4].files[3].display_name, "part3.pdf")
+
+    def test_group_list_operations(self):
+        self.service.save_project(self._make_project(), self.path)
+        groups = self.service.load_project(self.path).groups
+        second = groups[1]
+        self.assertIn(second, groups)
+        groups.remove(second)
+        self.assertEqual([groups.peek(i)[0] for i in range(len(groups))],
+                         ["g0", "g2", "g3", "g4"])
+        self.assertNotIn(second, groups)
+
+    def test_save_as_then_load(self):
+        self.service.save_project(self._make_project(), self.path)
+        loaded = self.service.load_project(self.path)
+        other = os.path.join(self.temp_dir, "copy.llproj")
+        self.service.save_project(loaded, other)
+        os.remove(self.path)
+        self.assertEqual(loaded.groups[2].name, "Piece 2")
+        self.assertEqual(self.service.load_project(other).groups[2].name, "Piece 2")
+
+    def test_corrupted_header(self):
+        with open(self.path, 'wb') as f:
+            f.write(project_format.MAGIC + b"garbage")
+        with self.assertRaises(project_format.ProjectFormatError):
+            self.service.load_project(self.path)
+
+
+class TestProjectJournal(unittest.TestCase):
+    """增量日誌儲存測試"""
+
+    def setUp(self):
+        self.service = ProjectService()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "season.llproj")
+        project = Project(instruments=["Flute", "Oboe"])
+        for g in range(20):
+            project.groups.append(Group(
+                id=f"g{g}", name=f"Piece {g}",
+                files=[FileInfo(f"/lib/p{g}/part{i}.pdf", f"part{i}.pdf") for i in range(30)],
+            ))
+        self.service.save_project(project, self.path)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _journal_ops(self):
+        from services.project_format import read_project_file
+        _, groups, _ = read_project_file(self.path)
+        return project_journal.read_ops(groups.state)
+
+    def test_small_edit_appends_small_delta(self):
+        project = self.service.load_project(self.path)
+        size = os.path.getsize(self.path)
+        project.groups[7].movement_name = "Adagio"
+        self.service.save_project(project, self.path)
+        self.assertLess(os.path.getsize(self.path) - size, 100)
+        self.assertEqual(self._journal_ops(), [
+            {"op": "group_fields", "id": "g7", "fields": {"movement_name": "Adagio"}},
+        ])
+        reloaded = self.service.load_project(self.path)
+        self.assertEqual(reloaded.groups[7].movement_name, "Adagio")
+        self.assertFalse(reloaded.groups.is_materialized(6))
+
+    def test_unchanged_save_writes_nothing(self):
+        project = self.service.load_project(self.path)
+        project.groups[3]
+        size = os.path.getsize(self.path)
+        self.service.save_project(project, self.path)
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_structural_edits_replay(self):
+        project = self.service.load_project(self.path)
+        moved = project.groups[0].files.pop(0)
+        project.groups[1].files.append(moved)
+        project.groups.remove(project.groups[2])
+        project.groups.insert(0, Group(id="new", name="New", files=[FileInfo("/new/a.pdf", "a.pdf")]))
+        project.instruments.reverse()
+        project.master_template = "{樂器}.pdf"
+        project.ungrouped_files.append(FileInfo("/loose/x.pdf", "x.pdf"))
+        self.service.save_project(project, self.path)
+        project.groups[5].name = "Second save"
+        self.service.save_project(project, self.path)
+        reloaded = self.service.load_project(self.path)
+        self.assertEqual(
+            [g.id for g in reloaded.groups],
+            ["new", "g0", "g1"] + [f"g{g}" for g in range(3, 20)],
+        )
+        self.assertEqual(reloaded.groups[0].files[0].original_path, "/new/a.pdf")
+        self.assertEqual(len(reloaded.groups[1].files), 29)
+        self.assertEqual(reloaded.groups[2].files[-1].original_path, "/lib/p0/part0.pdf")
+        self.assertEqual(reloaded.groups[5].name, "Second save")
+        self.assertEqual(reloaded.instruments, ["Oboe", "Flute"])
+        self.assertEqual(reloaded.master_template, "{樂器}.pdf")
+        self.assertEqual(reloaded.ungrouped_files[0].original_path, "/loose/x.pdf")
+
+    def test_truncated_last_entry_is_ignored(self):
+        project = self.service.load_project(self.path)
+        project.groups[0].name = "Kept"
+        self.service.save_project(project, self.path)
+        with open(self.path, 'ab') as f:
+            f.write(b'{"op":"group_fields","id":"g1","fie')
+        reloaded = self.service.load_project(self.path)
+        self.assertEqual(reloaded.groups[0].name, "Kept")
+        self.assertEqual(reloaded.groups[1].name, "Piece 1")
+        # 下次附加前會截掉殘行
+        reloaded.groups[1].name = "Fixed"
+        self.service.save_project(reloaded, self.path)
+        self.assertEqual(self.service.load_project(self.path).groups[1].name, "Fixed")
+
+    def test_journal_compacts_past_threshold(self):
+        project = self.service.load_project(self.path)
+        with patch.object(project_journal, "COMPACT_MIN_BYTES", 0):
+            for i in range(40):
+                project.groups[i % 20].files.append(FileInfo(f"/extra/{i}.pdf", f"{i}.pdf"))
+                self.service.save_project(project, self.path)
+        self.assertLess(len(self._journal_ops()), 40)
+        reloaded = self.service.load_project(self.path)
+        self.assertEqual(len(reloaded.groups[0].files), 32)
+
+    def test_external_modification_forces_rewrite(self):
+        project = self.service.load_project(self.path)
+        other = self.service.load_project(self.path)
+        other.groups[0].name = "Other"
+        self.service.save_project(other, self.path)
+        project.groups[1].name = "Mine"
+        self.service.save_project(project, self.path)
+        reloaded = self.service.load_project(self.path)
+        self.assertEqual(reloaded.groups[1].name, "Mine")
+        self.assertEqual(self._journal_ops(), [])
+
+
 if __name__ == '__main__':
     unittest.main()
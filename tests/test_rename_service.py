@@ -6,11 +6,13 @@ import os
 import sys
 import tempfile
 import unittest
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from core.models import FileInfo, Group, Project, RenameEntry
 from services.file_service import FileService
+from services import rename_service
 from services.rename_service import RenameService
 
 
@@ -133,6 +135,23 @@ class TestRenameService(unittest.TestCase):
         plan = self.rename_service.generate_rename_plan(project)
         self.assertEqual(len(plan), 0)
 
+    def test_empty_piece_name_is_detected(self):
+        files = [
+            FileInfo(self._create_file(name), name)
+            for name in ("Brahms Symphony - Flute.pdf", "Brahms Symphony - Oboe.pdf")
+        ]
+        group = Group(files=files, selected_instruments=[0, 1])
+        project = Project(
+            instruments=["Flute", "Oboe"], master_template="{曲名} - {樂器}.pdf",
+            groups=[group],
+        )
+        plan = self.rename_service.generate_rename_plan(project)
+        self.assertEqual(
+            [os.path.basename(e.new_path) for e in plan],
+            ["Brahms Symphony - Flute.pdf", "Brahms Symphony - Oboe.pdf"],
+        )
+        self.assertEqual(group.piece_name, "")
+
     def test_generate_plan_with_small_template(self):
         p1 = self._create_file("fl.pdf")
         project = Project(
@@ -150,5 +169,92 @@ class TestRenameService(unittest.TestCase):
         self.assertEqual(os.path.basename(plan[0].new_path), "Flute - Test.pdf")
 
 
+
+class TestRenamePlanCache(unittest.TestCase):
+    """重新命名計畫快取測試"""
+
+    def setUp(self):
+        self.service = RenameService(FileService())
+        self.project = Project(
+            instruments=["Flute", "Oboe"],
+            master_template="{序號}. {樂器} - {曲名}.pdf",
+            groups=[
+                Group(
+                    id=f"g{i}",
+                    files=[FileInfo(f"/lib/p{i}/a.pdf", "a.pdf"),
+                           FileInfo(f"/lib/p{i}/b.pdf", "b.pdf")],
+                    selected_instruments=[0, 1],
+                    piece_name=f"Piece{i}",
+                )
+                for i in range(5)
+            ],
+        )
+
+    def _plan_and_count(self):
+        """產生計畫並回傳重新產生的群組 ID"""
+        built = []
+        original = RenameService._plan_group
+
+        def spy(service, group, *args):
+            built.append(group.id)
+            return original(service, group, *args)
+        with patch.object(RenameService, "_plan_group", spy):
+            plan = self.service.generate_rename_plan(self.project)
+        return plan, built
+
+    def _uncached_plan(self):
+        return RenameService(FileService()).generate_rename_plan(self.project)
+
+    def test_only_changed_group_is_rebuilt(self):
+        _, built = self._plan_and_count()
+        self.assertEqual(len(built), 5)
+        self.project.update_group(self.project.groups[2], piece_name="Changed")
+        plan, built = self._plan_and_count()
+        self.assertEqual(built, ["g2"])
+        self.assertEqual(plan, self._uncached_plan())
+        self.assertIn("Changed", plan[4].new_path)
+
+    def test_in_place_edit_needs_touch(self):
+        self._plan_and_count()
+        group = self.project.groups[0]
+        group.files.reverse()
+        self.project.touch_group(group, "files")
+        plan, built = self._plan_and_count()
+        self.assertEqual(built, ["g0"])
+        self.assertEqual(plan[0].original_path, "/lib/p0/b.pdf")
+
+    def test_project_settings_invalidate_all(self):
+        self._plan_and_count()
+        self.project.update(instruments=["Piccolo", "Oboe"])
+        plan, built = self._plan_and_count()
+        self.assertEqual(len(built), 5)
+        self.assertIn("Piccolo", plan[0].new_path)
+        self.project.update(use_subfolders=True, subfolder_template="{曲名}")
+        plan, built = self._plan_and_count()
+        self.assertEqual(len(built), 5)
+        self.assertEqual(plan, self._uncached_plan())
+
+    def test_group_order_and_removal(self):
+        self._plan_and_count()
+        self.project.remove_group(self.project.groups[1])
+        self.project.add_group(self.project.groups.pop(0))
+        plan, built = self._plan_and_count()
+        self.assertEqual(built, [])
+        self.assertEqual(plan, self._uncached_plan())
+
+    def test_cache_is_bounded(self):
+        with patch.object(rename_service, "PLAN_CACHE_SIZE", 3):
+            self.service.generate_rename_plan(self.project)
+        self.assertEqual(list(self.service._plan_cache), ["g2", "g3", "g4"])
+
+    def test_metadata_templates_are_not_cached(self):
+        self.project.master_template = "{樂器} - {頁數}.pdf"
+        with patch.object(self.service, "_prefetch_metadata", return_value={}):
+            self.service.generate_rename_plan(self.project)
+            _, built = self._plan_and_count()
+        self.assertEqual(len(built), 5)
+        self.assertEqual(len(self.service._plan_cache), 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+啟動流程單元測試
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.startup import StartupPipeline
+
+
+class IdleScheduler:
+    """模擬 Tk 的 after_idle，由測試逐一執行"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after_idle(self, callback):
+        self.pending.append(callback)
+
+    def run_one(self):
+        self.pending.pop(0)()
+
+
+class TestStartupPipeline(unittest.TestCase):
+    """StartupPipeline 測試"""
+
+    def test_one_stage_per_idle(self):
+        scheduler = IdleScheduler()
+        ran = []
+        finished = []
+        pipeline = StartupPipeline(scheduler, on_finished=finished.append)
+        pipeline.add("a", lambda: ran.append("a"))
+        pipeline.add("b", lambda: ran.append("b"))
+        pipeline.start()
+        self.assertEqual(ran, [])
+        scheduler.run_one()
+        self.assertEqual(ran, ["a"])
+        self.assertIsNotNone(pipeline.elapsed("first_paint"))
+        scheduler.run_one()
+        self.assertEqual(ran, ["a", "b"])
+        self.assertTrue(pipeline.finished)
+        scheduler.run_one()
+        self.assertEqual(finished, [pipeline])
+        self.assertEqual([name for name, _, _ in pipeline.timings], ["first_paint", "a", "b"])
+
+    def test_failed_stage_does_not_stop_startup(self):
+        scheduler = IdleScheduler()
+        ran = []
+        pipeline = StartupPipeline(scheduler)
+        pipeline.add("broken", lambda: 1 / 0)
+        pipeline.add("after", lambda: ran.append("after"))
+        pipeline.start()
+        while scheduler.pending:
+            scheduler.run_one()
+        self.assertEqual(ran, ["after"])
+        self.assertEqual([name for name, _ in pipeline.errors], ["broken"])
+
+    def test_failed_stage_is_reported_and_retried(self):
+        scheduler = IdleScheduler()
+        reported = []
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise OSError("theme missing")
+
+        pipeline = StartupPipeline(scheduler, on_error=lambda name, e: reported.append(name))
+        pipeline.add("group_panel", flaky)
+        pipeline.start()
+        while scheduler.pending:
+            scheduler.run_one()
+        self.assertEqual(reported, ["group_panel"])
+        self.assertFalse(pipeline.retry("group_panel"))
+        self.assertEqual(reported, ["group_panel", "group_panel"])
+        self.assertEqual(len(pipeline.errors), 1)
+        self.assertTrue(pipeline.retry("group_panel"))
+        self.assertEqual(pipeline.errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@
 import sys
 import os
 import unittest
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -15,6 +16,7 @@ from core.template_engine import (
     validate_template,
 )
 from core.models import Group
+from core.suffix_automaton import GeneralizedSuffixAutomaton
 
 
 class TestSubstituteTemplate(unittest.TestCase):
@@ -151,6 +153,49 @@ class TestDetectPieceName(unittest.TestCase):
         result = detect_piece_name(filenames)
         self.assertEqual(result, "Mozart PC21 Mvt1")
 
+    def test_common_substring_after_part_number(self):
+        """曲名位於不同聲部編號之後時，以最長共同子字串偵測"""
+        filenames = ["01_Flute_Brahms Sym 4.pdf", "12_Tuba_Brahms Sym 4.pdf"]
+        self.assertEqual(detect_piece_name(filenames), "Brahms Sym 4")
+
+    def test_common_substring_trims_partial_tokens(self):
+        filenames = ["Flute - Holst Mars.pdf", "Flugelhorn - Holst Mars.pdf"]
+        self.assertEqual(detect_piece_name(filenames), "Holst Mars")
+
+    def test_common_substring_quorum(self):
+        filenames = [
+            "01_Flute_Brahms Sym 4.pdf",
+            "12_Tuba_Brahms Sym 4.pdf",
+            "Program notes.pdf",
+        ]
+        self.assertEqual(detect_piece_name(filenames), "")
+        self.assertEqual(detect_piece_name(filenames, quorum=0.6), "Brahms Sym 4")
+
+    def test_results_are_memoized(self):
+        filenames = ["01_Flute_Dvorak 9.pdf", "02_Oboe_Dvorak 9.pdf"]
+        detect_piece_name(filenames)
+        with patch("core.template_engine.GeneralizedSuffixAutomaton") as sam:
+            self.assertEqual(detect_piece_name(filenames), "Dvorak 9")
+        sam.assert_not_called()
+
+
+class TestGeneralizedSuffixAutomaton(unittest.TestCase):
+    """GeneralizedSuffixAutomaton 測試"""
+
+    def test_longest_common_substring(self):
+        sam = GeneralizedSuffixAutomaton(["xabcdy", "zzabcd", "abcq"])
+        text, _, _ = next(sam.common_substrings(3))
+        self.assertEqual(text, "abc")
+
+    def test_quorum(self):
+        sam = GeneralizedSuffixAutomaton(["hello world", "world peace", "say hello"])
+        self.assertEqual(next(sam.common_substrings(2))[0], "hello")
+        self.assertEqual(list(sam.common_substrings(4)), [])
+
+    def test_repeated_substring_counted_once_per_string(self):
+        sam = GeneralizedSuffixAutomaton(["aaaa", "b"])
+        self.assertEqual(list(sam.common_substrings(2)), [])
+
 
 class TestValidateTemplate(unittest.TestCase):
     """validate_template 測試"""
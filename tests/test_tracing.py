@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+效能追蹤單元測試
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import tracing
+from core.models import FileInfo, Group, Project
+from services.file_service import FileService
+from services.rename_service import RenameService
+
+
+class TestTracing(unittest.TestCase):
+    """core.tracing 測試"""
+
+    def setUp(self):
+        tracing.clear()
+
+    def tearDown(self):
+        tracing.disable()
+        tracing.clear()
+
+    def test_disabled_records_nothing(self):
+        with tracing.span("a", x=1) as s:
+            s.set(y=2)
+        self.assertIs(tracing.span("b"), tracing.span("c"))
+        self.assertEqual(tracing.events(), [])
+
+    def test_span_and_decorator(self):
+        @tracing.traced("work")
+        def work(fail=False):
+            if fail:
+                raise ValueError("bad")
+            return 42
+
+        tracing.enable()
+        with tracing.span("outer", folder="x") as s:
+            self.assertEqual(work(), 42)
+            s.set(count=3)
+        with self.assertRaises(ValueError):
+            work(fail=True)
+        events = tracing.events()
+        self.assertEqual([e["name"] for e in events], ["work", "outer", "work"])
+        self.assertEqual(events[1]["args"], {"folder": "x", "count": 3})
+        self.assertEqual(events[2]["args"], {"error": "ValueError"})
+        self.assertGreaterEqual(events[1]["dur"], events[0]["dur"])
+        self.assertTrue(all(e["ph"] == "X" for e in events))
+
+    def test_export_and_service_spans(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        project = Project(
+            instruments=["Flute"], master_template="{樂器}.pdf",
+            groups=[Group(files=[FileInfo("/a/x.pdf", "x.pdf")], selected_instruments=[0])],
+        )
+        tracing.enable()
+        RenameService(FileService()).generate_rename_plan(project)
+        path = os.path.join(temp_dir, "trace.json")
+        self.assertEqual(tracing.export_chrome_trace(path), len(tracing.events()))
+        with open(path, "r", encoding="utf-8") as f:
+            trace = json.load(f)
+        names = [e["name"] for e in trace["traceEvents"]]
+        self.assertIn("rename.plan", names)
+        self.assertIn("thread_name", names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+收件匣監看服務單元測試
+"""
+import errno
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.models import Project
+from services.file_service import FileService
+from services.project_service import ProjectService
+from services.watch_service import WatchFolder, WatchService
+
+
+class TestWatchService(unittest.TestCase):
+    """WatchService 測試"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.inbox = os.path.join(self.temp_dir, "inbox")
+        self.library = os.path.join(self.temp_dir, "library")
+        self.undo_dir = os.path.join(self.temp_dir, "undo")
+        self.state_path = os.path.join(self.temp_dir, "state.json")
+        os.makedirs(self.inbox)
+        ProjectService().save_project(
+            Project(instruments=["Flute", "Oboe"], master_template="{序號}. {樂器}.pdf"),
+            os.path.join(self.inbox, "orchestra.llproj"),
+        )
+        self.events = []
+        self.services = []
+
+    def tearDown(self):
+        for service in self.services:
+            service.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _service(self) -> WatchService:
+        service = WatchService(
+            [WatchFolder(self.inbox, self.library)], self.state_path,
+            quiet_period=5, workers=2, undo_dir=self.undo_dir,
+            on_event=self.events.append, clock=lambda: 0.0,
+        )
+        self.services.append(service)
+        return service
+
+    def _export(self, piece: str):
+        folder = os.path.join(self.inbox, piece)
+        os.makedirs(folder, exist_ok=True)
+        for name in ("Oboe", "Flute"):
+            with open(os.path.join(folder, f"{piece}_{name}.pdf"), "w") as f:
+                f.write(piece + name)
+
+    def _library_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.library)
+            for root, _, names in os.walk(self.library) for name in names
+        )
+
+    def test_waits_for_quiet_period(self):
+        self._export("Sym")
+        service = self._service()
+        self.assertEqual(service.scan(now=0), [])
+        self.assertEqual(service.scan(now=4), [])
+        self._export("Con")
+        started = service.scan(now=6)
+        self.assertEqual([os.path.basename(b.directory) for b in started], ["Sym"])
+        service.wait()
+        self.assertEqual(self._library_files(), ["1. Flute.pdf", "2. Oboe.pdf"])
+        self.assertEqual(os.listdir(os.path.join(self.inbox, "Sym")), [])
+
+    def test_batch_writes_undo_record_and_state(self):
+        self._export("Sym")
+        service = self._service()
+        service.scan(now=0)
+        service.scan(now=10)
+        service.wait()
+        done = self.events[-1]
+        self.assertEqual(done["event"], "done")
+        self.assertEqual(done["renamed"], 2)
+        self.assertTrue(os.path.isfile(done["undo_record"]))
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.assertIn(done["batch"], state["done"])
+        self.assertEqual(state["in_progress"], {})
+
+    def test_existing_library_files_get_suffix(self):
+        os.makedirs(self.library)
+        with open(os.path.join(self.library, "1. Flute.pdf"), "w") as f:
+            f.write("old")
+        self._export("Sym")
+        service = self._service()
+        service.scan(now=0)
+        service.scan(now=10)
+        service.wait()
+        self.assertEqual(
+            self._library_files(), ["1. Flute (1).pdf", "1. Flute.pdf", "2. Oboe.pdf"],
+        )
+
+    def test_concurrent_batches_do_not_overwrite(self):
+        self._export("Sym")
+        self._export("Con")
+        service = self._service()
+        service.scan(now=0)
+        self.assertEqual(len(service.scan(now=10)), 2)
+        service.wait()
+        self.assertEqual(self._library_files(), [
+            "1. Flute (1).pdf", "1. Flute.pdf", "2. Oboe (1).pdf", "2. Oboe.pdf",
+        ])
+        self.assertEqual([e["event"] for e in self.events], ["done", "done"])
+
+    def test_move_refuses_existing_target(self):
+        source = os.path.join(self.temp_dir, "a.pdf")
+        target = os.path.join(self.temp_dir, "b.pdf")
+        for path in (source, target):
+            with open(path, "w") as f:
+                f.write(path)
+        service = FileService(overwrite=False)
+        with self.assertRaises(FileExistsError):
+            service.rename_file(source, target)
+        # 不支援硬連結時改以獨佔建立複製
+        with mock.patch("os.link", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            with self.assertRaises(FileExistsError):
+                service.rename_file(source, target)
+            os.remove(target)
+            service.rename_file(source, target)
+        self.assertFalse(os.path.exists(source))
+        with open(target) as f:
+            self.assertEqual(f.read(), source)
+
+    def test_restart_does_not_redo_failed_batch(self):
+        self._export("Sym")
+        service = self._service()
+        with mock.patch.object(FileService, "rename_file", side_effect=PermissionError("locked")):
+            service.scan(now=0)
+            service.scan(now=10)
+            service.wait()
+        self.assertEqual(self.events[-1]["event"], "error")
+        restarted = self._service()
+        restarted.scan(now=0)
+        self.assertEqual(restarted.scan(now=10), [])
+        # 內容改變後重試
+        with open(os.path.join(self.inbox, "Sym", "Sym_Oboe.pdf"), "a") as f:
+            f.write("!")
+        restarted.scan(now=20)
+        self.assertEqual(len(restarted.scan(now=30)), 1)
+
+    def test_recover_writes_undo_record_for_moved_files(self):
+        self._export("Sym")
+        service = self._service()
+        real_rename = FileService.rename_file
+        calls = []
+
+        def crash_on_second(self_, old, new):
+            calls.append(old)
+            if len(calls) == 2:
+                raise OSError("disk removed")
+            real_rename(self_, old, new)
+
+        with mock.patch.object(FileService, "rename_file", crash_on_second), \
+                mock.patch.object(WatchService, "_recover_batch"):
+            service.scan(now=0)
+            service.scan(now=10)
+            service.wait()
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["in_progress"]), 1)
+
+        restarted = self._service()
+        paths = restarted.recover()
+        self.assertEqual(len(paths), 1)
+        with open(paths[0], "r", encoding="utf-8") as f:
+            record = json.load(f)
+        self.assertEqual(len(record["mappings"]), 1)
+        self.assertEqual(restarted.state.in_progress, {})
+
+    def test_cross_device_move(self):
+        source = os.path.join(self.temp_dir, "a.pdf")
+        target = os.path.join(self.temp_dir, "b.pdf")
+        with open(source, "w") as f:
+            f.write("x")
+        real_rename = os.rename
+
+        def rename(old, new):
+            if old == source:
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            real_rename(old, new)
+
+        with mock.patch("os.rename", rename):
+            FileService().rename_file(source, target)
+        self.assertFalse(os.path.exists(source))
+        self.assertTrue(os.path.isfile(target))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+事件迴圈監看單元測試
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import traceback
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core import metrics
+from ui.watchdog import UiWatchdog, find_handler
+
+
+class FakeScheduler:
+    """記錄 after() 排入的回呼，由測試手動執行"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, delay_ms, callback):
+        self.pending.append(callback)
+        return callback
+
+    def after_cancel(self, after_id):
+        if after_id in self.pending:
+            self.pending.remove(after_id)
+
+    def run(self):
+        self.pending.pop(0)()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestUiWatchdog(unittest.TestCase):
+    """UiWatchdog 測試"""
+
+    def setUp(self):
+        metrics.reset()
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "logs", "ui_stalls.log")
+        self.scheduler = FakeScheduler()
+        self.clock = FakeClock()
+        self.release = threading.Event()
+        self.entered = threading.Event()
+        self.worker = threading.Thread(target=self.slow_handler, daemon=True)
+        self.worker.start()
+        self.entered.wait(1)
+        self.watchdog = UiWatchdog(
+            self.scheduler, interval_ms=100, threshold_ms=200, sample_ms=0,
+            log_path=self.log_path, thread_id=self.worker.ident, clock=self.clock,
+        )
+
+    def tearDown(self):
+        self.release.set()
+        self.worker.join(1)
+        metrics.reset()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def slow_handler(self):
+        # 模擬在主執行緒上同步執行的事件處理函式
+        self.entered.set()
+        self.release.wait(5)
+
+    def test_stall_captures_handler_stack(self):
+        stalls = []
+        self.watchdog.on_stall = stalls.append
+        self.watchdog.start()
+        self.clock.now = 0.35
+        self.watchdog.sample()
+        self.clock.now = 0.6
+        self.scheduler.run()
+        self.assertEqual(len(stalls), 1)
+        self.assertAlmostEqual(stalls[0].duration, 0.5)
+        self.assertEqual(stalls[0].handler, "test_watchdog:slow_handler")
+        self.assertTrue(any("slow_handler" in line for line in stalls[0].stack))
+        self.assertEqual(metrics.snapshot()["histograms"]["ui.stall"]["count"], 1)
+        # 停頓結束後繼續排定下一次心跳
+        self.assertEqual(len(self.scheduler.pending), 1)
+        self.watchdog.stop()
+        self.assertEqual(self.scheduler.pending, [])
+        with open(self.log_path, encoding="utf-8") as f:
+            log = f.read()
+        self.assertIn("UI stall 500 ms in test_watchdog:slow_handler", log)
+        self.assertIn("UI session: 1 heartbeats, 1 stalls", log)
+
+    def test_no_stall_below_threshold(self):
+        self.watchdog.start()
+        for _ in range(10):
+            self.clock.now += 0.15
+            self.watchdog.sample()
+            self.scheduler.run()
+        report = self.watchdog.report()
+        self.assertEqual(report["heartbeats"], 10)
+        self.assertEqual(report["stalls"], 0)
+        self.assertAlmostEqual(report["p50_ms"], 50, delta=4)
+        self.assertFalse(os.path.exists(self.log_path))
+
+    def test_report_percentiles_per_handler(self):
+        self.watchdog.start()
+        for delay in [0.1] * 98 + [0.4, 0.9]:
+            self.clock.now += 0.1 + delay
+            self.watchdog.sample()
+            self.scheduler.run()
+        report = self.watchdog.report()
+        self.assertEqual(report["heartbeats"], 100)
+        self.assertEqual(report["stalls"], 2)
+        self.assertAlmostEqual(report["p50_ms"], 100, delta=7)
+        self.assertAlmostEqual(report["p99_ms"], 400, delta=28)
+        self.assertAlmostEqual(report["max_ms"], 900, delta=0.01)
+        handler = report["handlers"]["test_watchdog:slow_handler"]
+        self.assertEqual(handler["count"], 2)
+        self.assertAlmostEqual(handler["total_ms"], 1300, delta=0.01)
+
+    def test_log_rotates_when_over_limit(self):
+        self.watchdog.max_log_bytes = 1000
+        self.watchdog.start()
+        for _ in range(20):
+            self.clock.now += 0.1 + 0.3
+            self.watchdog.sample()
+            self.scheduler.run()
+        self.assertTrue(os.path.isfile(self.log_path + ".1"))
+        # 輪替前的紀錄檔最多只超出上限一筆停頓
+        self.assertLess(os.path.getsize(self.log_path), 2000)
+        self.assertLess(os.path.getsize(self.log_path + ".1"), 2000)
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(self.log_path))),
+            ["ui_stalls.log", "ui_stalls.log.1"],
+        )
+
+
+class TestFindHandler(unittest.TestCase):
+    """find_handler 測試"""
+
+    def test_frame_after_tkinter_callback(self):
+        stack = traceback.StackSummary.from_list([
+            ("/usr/lib/python3/tkinter/__init__.py", 1, "mainloop", ""),
+            ("/usr/lib/python3/tkinter/__init__.py", 2, "__call__", ""),
+            ("/app/src/ui/main_window.py", 3, "_import_folder", ""),
+            ("/app/src/services/import_service.py", 4, "import_folder", ""),
+            ("/usr/lib/python3/os.py", 5, "scandir", ""),
+        ])
+        self.assertEqual(find_handler(stack), "main_window:_import_folder")
+
+
+if __name__ == '__main__':
+    unittest.main()